@@ -5,9 +5,15 @@ from sqlalchemy import text
 
 from backend.database.connection import get_db
 from backend.core.templates import templates
+from backend.core.fragmentos import Perezoso, fragmento_en_cache
+from backend.database.consultas_paralelas import ejecutar_en_paralelo
+from backend.services.catalogos_service import version_catalogos
+from backend.services.localidades_service import obtener_indice
 
 router = APIRouter()
 
+PLANTILLA = "catalogos/domicilios.html"
+
 
 @router.get("/domicilios", response_class=HTMLResponse)
 def domicilios_view(
@@ -17,11 +23,43 @@ def domicilios_view(
     db: Session = Depends(get_db)
 ):
     """
-    Vista para consultar los domicilios mediante un Stored Procedure.
+    Vista para consultar los domicilios mediante Stored Procedures.
+    El SP de Unidad Académica, el de Rama y el índice de localidades son independientes: se
+    consultan al mismo tiempo, cada uno en su conexión. Rama se omite si su fragmento está
+    en caché. La forma sólo recibe las entidades; municipios y localidades se piden a
+    /catalogos/localidades.
     """
     UUsuario = request.cookies.get("nombre_usuario", "")
     Rol = str(request.cookies.get("nombre_rol",""))
+    version = version_catalogos(db)
+    es_admin = Rol == 'Administrador'
+
+    consultas = {"domicilios": lambda sesion: consultaDomicilios(sesion, UUsuario, HHost, PPeriodo)}
+    # El formulario (Rama, Entidad) sólo se muestra al Administrador
+    if es_admin:
+        consultas["entidades"] = consultaEntidades
+        if not fragmento_en_cache(PLANTILLA, "opciones_rama", version):
+            consultas["rama"] = consultaRama
+    resultados = ejecutar_en_paralelo(consultas)
+
+    # Si un fragmento vence entre la verificación y el render, Perezoso consulta en la sesión de la petición
+    Rama = resultados["rama"] if "rama" in resultados else Perezoso(consultaRama, db)
+
+    # Renderizar la plantilla HTML con los resultados
+    return templates.TemplateResponse(
+        PLANTILLA,
+        {
+            "request": request,
+            "domicilios": resultados["domicilios"],
+            "rol": Rol,
+            "rama": Rama,
+            "entidades": resultados.get("entidades", []),
+            "version_catalogos": version
+        }
+    )
 
+
+def consultaDomicilios(db: Session, UUsuario: str, HHost: str, PPeriodo: str):
     try:
         # Ejecutar el Stored Procedure con parámetros nombrados
         query = text("""
@@ -38,27 +76,12 @@ def domicilios_view(
 
         # Convertir el resultado a lista de diccionarios
         data = [dict(row) for row in resultado.mappings().all()]
-        print(data)
-        Rama = consultaRama(db)
-        #print(Rama)
-        Entidad = consultaEntidad(db)
-        #print(Entidad)
+        print(f"SP_Consulta_Catalogo_Unidad_Academica: {len(data)} registros")
+        return data
 
     except Exception as e:
         print("Error al ejecutar SP_Consulta_Catalogo_Unidad_Academica:", e)
-        data = []
-
-    # Renderizar la plantilla HTML con los resultados
-    return templates.TemplateResponse(
-        "catalogos/domicilios.html",
-        {
-            "request": request,
-            "domicilios": data,
-            "rol": Rol,
-            "rama": Rama,
-            "entidad": Entidad
-        }
-    )
+        return []
 
 
 def consultaRama(db: Session):
@@ -71,18 +94,15 @@ def consultaRama(db: Session):
         return data  
     except Exception as e:
         return {"error": str(e)}
-    
-def consultaEntidad(db: Session):
+
+
+def consultaEntidades(db: Session):
     try:
-        #Ejecutamos el SP
-        query = text("""EXEC dbo.SP_Consulta_Catalogo_Entidad""")
-        resultado = db.execute(query, )
-        # Convertir el resultado a lista de diccionarios
-        data = [dict(row) for row in resultado.mappings().all()]
-        return data  
+        return obtener_indice(db).entidades()
     except Exception as e:
-        return {"error": str(e)}
-    
+        print("Error al cargar el índice de localidades:", e)
+        return []
+
 
 @router.post("/registrarUA")
 def registrar_ua(db: Session = Depends(get_db)):
@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Depends, File, Query, Request, UploadFile
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from backend.database.connection import get_db
+from backend.services.carga_inegi_service import cargar_archivo_inegi, leer_csv_inegi
+from backend.services.jobs_service import COLA_CARGA_INEGI, submit_job
+from backend.services.localidades_service import obtener_indice
+from backend.services.usuario_service import is_super_admin, has_admin_permissions
+
+import os
+import shutil
+import tempfile
+
+router = APIRouter()
+
+
+@router.get("/catalogos/localidades/search", response_class=JSONResponse)
+def buscar_localidades(
+    q: str = Query("", max_length=100),
+    entidad: Optional[str] = Query(None, max_length=100),
+    municipio: Optional[str] = Query(None, max_length=150),
+    limite: int = Query(20, ge=1, le=100),
+    desplazamiento: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Autocompletar de localidades (sin acentos, por prefijo de cada palabra), opcionalmente
+    dentro de una entidad/municipio. Sin `q` lista las localidades del municipio.
+    """
+    total, resultados = obtener_indice(db).buscar(q, entidad, municipio, limite, desplazamiento)
+    return {
+        "q": q,
+        "total": total,
+        "limite": limite,
+        "desplazamiento": desplazamiento,
+        "resultados": resultados,
+    }
+
+
+@router.get("/catalogos/localidades/municipios", response_class=JSONResponse)
+def municipios_por_entidad(
+    entidad: str = Query(..., max_length=100),
+    db: Session = Depends(get_db)
+):
+    """Municipios de una entidad, para el selector en cascada de la forma de domicilios."""
+    return {"entidad": entidad, "municipios": obtener_indice(db).municipios(entidad)}
+
+
+def _cargar_inegi_temporal(db: Session, ruta: str, aplicar: bool):
+    """Trabajo en segundo plano: carga el archivo subido y borra la copia temporal."""
+    try:
+        return cargar_archivo_inegi(db, ruta, aplicar=aplicar)
+    finally:
+        os.remove(ruta)
+
+
+# Actualización del catálogo desde el CSV de localidades del INEGI (AGEEML).
+# Sin aplicar=true sólo reporta las diferencias. El archivo nacional tarda, así que se
+# procesa como trabajo en segundo plano (ver /jobs/{job_id}) en su propia cola: no
+# bloquea los procesos de matrícula de la UA de quien la envía
+@router.post("/catalogos/localidades/carga_inegi", response_class=JSONResponse)
+def carga_inegi(
+    request: Request,
+    archivo: UploadFile = File(...),
+    aplicar: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    id_rol = int(request.cookies.get("id_rol", 0) or 0)
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+    if not (is_super_admin(nombre_usuario, apellidoP_usuario, apellidoM_usuario) or has_admin_permissions(db, id_rol)):
+        return JSONResponse(status_code=403, content={"detail": "No tiene permisos para actualizar el catálogo de localidades"})
+
+    # El UploadFile se cierra al terminar la petición: el trabajo usa una copia en disco
+    with tempfile.NamedTemporaryFile(prefix="inegi_", suffix=".csv", delete=False) as copia:
+        shutil.copyfileobj(archivo.file, copia)
+    # Encabezados inválidos se reportan de inmediato, no como error del trabajo
+    try:
+        with open(copia.name, "rb") as contenido:
+            next(leer_csv_inegi(contenido), None)
+    except ValueError as e:
+        os.remove(copia.name)
+        return JSONResponse(status_code=400, content={"detail": f"Archivo inválido: {e}"})
+    job = submit_job(
+        "carga_inegi",
+        int(request.cookies.get("id_unidad_academica", 0) or 0),
+        int(request.cookies.get("id_usuario", 0) or 0),
+        _cargar_inegi_temporal,
+        copia.name,
+        aplicar,
+        cola=COLA_CARGA_INEGI,
+    )
+    return {
+        "job_id": job.id,
+        "estado": job.estado,
+        "aplicar": aplicar,
+        "url_estado": f"/jobs/{job.id}",
+        "url_resultado": f"/jobs/{job.id}/resultado",
+    }
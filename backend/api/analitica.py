@@ -0,0 +1,174 @@
+from fastapi import APIRouter, Request, Depends
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy.orm import Session
+
+from backend.database.connection import get_db
+from backend.services.catalogos_service import get_catalogo
+from backend.services.cubo_service import get_cubo, DIMENSIONES_CUBO
+from backend.services.jobs_service import COLA_SNAPSHOTS, submit_job
+from backend.services.matricula_service import PERIODO_DEFAULT_ID
+from backend.services.snapshot_service import (
+    etiqueta_periodo_snapshot,
+    generar_snapshot_matricula,
+    listar_snapshots,
+    get_ruta_snapshot,
+    FORMATOS_SNAPSHOT,
+)
+from backend.services.usuario_service import is_super_admin, has_admin_permissions
+from backend.services.version_service import resolver_id_periodo
+
+router = APIRouter()
+
+MEDIA_TYPES_SNAPSHOT = {
+    ".parquet": "application/vnd.apache.parquet",
+    ".arrow": "application/vnd.apache.arrow.file",
+}
+
+
+def _tiene_acceso_analitica(request: Request, db: Session) -> bool:
+    """Los snapshots institucionales son sólo para el super admin y los roles administrativos."""
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+    if is_super_admin(nombre_usuario, apellidoP_usuario, apellidoM_usuario):
+        return True
+    try:
+        id_rol = int(request.cookies.get("id_rol", 0))
+    except (TypeError, ValueError):
+        return False
+    return has_admin_permissions(db, id_rol)
+
+
+@router.get("/snapshots", response_class=JSONResponse)
+def snapshots_disponibles(request: Request, db: Session = Depends(get_db)):
+    """Snapshots columnares de Matricula disponibles para descarga."""
+    if not _tiene_acceso_analitica(request, db):
+        return JSONResponse(status_code=403, content={"detail": "No autorizado"})
+    return JSONResponse(content={"snapshots": listar_snapshots()})
+
+
+@router.post("/snapshots", response_class=JSONResponse)
+def generar_snapshot(
+    request: Request,
+    periodo: str = "",
+    formato: str = "parquet",
+    db: Session = Depends(get_db),
+):
+    """Encola la generación de un snapshot (periodo vacío = todos los periodos)."""
+    if not _tiene_acceso_analitica(request, db):
+        return JSONResponse(status_code=403, content={"detail": "No autorizado"})
+    if formato not in FORMATOS_SNAPSHOT:
+        return JSONResponse(status_code=400, content={"detail": f"Formato inválido: {formato}"})
+
+    id_periodo = resolver_id_periodo(db, periodo)
+    if periodo and not id_periodo:
+        return JSONResponse(status_code=404, content={"detail": f"Período '{periodo}' no encontrado"})
+
+    job = submit_job(
+        "snapshot_matricula",
+        0,  # proceso institucional: no pertenece a una UA (va en su propia cola)
+        int(request.cookies.get("id_usuario", 0) or 0),
+        generar_snapshot_matricula,
+        id_periodo,
+        formato,
+        cola=COLA_SNAPSHOTS,
+    )
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@router.get("/snapshots/{nombre}")
+def descargar_snapshot(nombre: str, request: Request, db: Session = Depends(get_db)):
+    """Descarga un snapshot por nombre (tal como aparece en el listado)."""
+    if not _tiene_acceso_analitica(request, db):
+        return JSONResponse(status_code=403, content={"detail": "No autorizado"})
+    ruta = get_ruta_snapshot(nombre)
+    if ruta is None:
+        return JSONResponse(status_code=404, content={"detail": "Snapshot no encontrado"})
+    extension = ".parquet" if nombre.endswith(".parquet") else ".arrow"
+    return FileResponse(ruta, media_type=MEDIA_TYPES_SNAPSHOT[extension], filename=nombre)
+
+
+def _lista_ids(valor: str) -> list:
+    return [int(v) for v in valor.split(",") if v.strip()]
+
+
+def _cubo_de_periodos(db: Session, snapshot: str, filtros: dict):
+    """
+    Cubo para la consulta. Sin filtro de periodo se consulta PERIODO_DEFAULT_ID (se agrega
+    a `filtros` para que se refleje en la respuesta); sin snapshot se usa el más reciente
+    que contiene esos periodos. Un snapshot explícito de varios periodos exige el filtro.
+    """
+    if snapshot:
+        cubo = get_cubo(snapshot)
+        if "periodo" not in filtros and len(cubo.dimensiones["periodo"].ids) > 1:
+            raise ValueError("El snapshot contiene varios periodos: indique periodo")
+        return cubo
+    filtros.setdefault("periodo", [PERIODO_DEFAULT_ID])
+    periodos = get_catalogo(db, "periodo")
+    return get_cubo(etiquetas_periodo=[etiqueta_periodo_snapshot(periodos, i) for i in filtros["periodo"]])
+
+
+@router.get("/cubo", response_class=JSONResponse)
+def consultar_cubo(
+    request: Request,
+    dimensiones: str = "",
+    snapshot: str = "",
+    db: Session = Depends(get_db),
+):
+    """
+    Totales de matrícula agrupados por las dimensiones indicadas (separadas por coma),
+    calculados en memoria sobre el snapshot más reciente del periodo (o el indicado).
+    Filtros: un parámetro por dimensión con IDs separados por coma, p. ej.
+    /analitica/cubo?dimensiones=rama,sexo&nivel=1&turno=1,2
+    Sin `periodo` se consulta el periodo por defecto; la respuesta lo incluye en `filtros`.
+    """
+    if not _tiene_acceso_analitica(request, db):
+        return JSONResponse(status_code=403, content={"detail": "No autorizado"})
+
+    agrupar = [d.strip() for d in dimensiones.split(",") if d.strip()]
+    try:
+        filtros = {
+            d: _lista_ids(request.query_params[d])
+            for d in DIMENSIONES_CUBO
+            if request.query_params.get(d)
+        }
+    except ValueError:
+        return JSONResponse(status_code=400, content={"detail": "Los filtros deben ser IDs numéricos separados por coma"})
+
+    try:
+        cubo = _cubo_de_periodos(db, snapshot, filtros)
+        return JSONResponse(content=cubo.agregar(agrupar, filtros))
+    except FileNotFoundError as e:
+        return JSONResponse(status_code=404, content={"detail": str(e)})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e), "dimensiones_validas": list(DIMENSIONES_CUBO)})
+
+
+@router.get("/cubo/miembros/{dimension}", response_class=JSONResponse)
+def miembros_dimension(
+    dimension: str,
+    request: Request,
+    snapshot: str = "",
+    periodo: str = "",
+    db: Session = Depends(get_db),
+):
+    """
+    IDs y etiquetas presentes en el snapshot para una dimensión (para armar filtros).
+    El snapshot se elige como en /cubo: el indicado o el más reciente de `periodo`.
+    """
+    if not _tiene_acceso_analitica(request, db):
+        return JSONResponse(status_code=403, content={"detail": "No autorizado"})
+    if dimension not in DIMENSIONES_CUBO:
+        return JSONResponse(status_code=400, content={"detail": f"Dimensión desconocida: {dimension}"})
+    try:
+        filtros = {"periodo": _lista_ids(periodo)} if periodo else {}
+        cubo = _cubo_de_periodos(db, snapshot, filtros)
+        return JSONResponse(content={
+            "dimension": dimension,
+            "snapshot": cubo.nombre_snapshot,
+            "miembros": cubo.miembros(dimension),
+        })
+    except FileNotFoundError as e:
+        return JSONResponse(status_code=404, content={"detail": str(e)})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
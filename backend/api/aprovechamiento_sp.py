@@ -6,9 +6,12 @@ import json
 
 from backend.core.templates import templates
 from backend.database.connection import get_db
+from backend.database.sp import ejecutar_sp
 from backend.utils.request import get_request_host
 # Importamos el servicio de matrícula para reutilizar la carga de metadatos (filtros)
 from backend.services.matricula_service import get_matricula_metadata_from_sp
+from backend.services.roles_service import es_rol_capturista
+from backend.services.version_service import incrementar_version_periodo, FORMATO_APROVECHAMIENTO
 
 # Importamos modelos necesarios para obtener nombres literales
 from backend.database.models.CatProgramas import CatProgramas
@@ -48,8 +51,7 @@ async def consulta_aprovechamiento(request: Request, db: Session = Depends(get_d
     Carga la vista principal de captura de aprovechamiento.
     """
     # 1. Validación de Rol
-    nombre_rol = request.cookies.get("nombre_rol", "")
-    if nombre_rol.lower() != 'capturista':
+    if not es_rol_capturista(db, int(request.cookies.get("id_rol", 0))):
         return templates.TemplateResponse("error.html", {
             "request": request,
             "error_message": "Acceso denegado: Solo los usuarios con rol 'Capturista' pueden acceder a esta funcionalidad.",
@@ -140,21 +142,12 @@ async def obtener_datos_aprovechamiento(request: Request, db: Session = Depends(
         print(f"Consulta Aprovechamiento: UA={unidad_sigla}, Per={periodo}, Niv={nivel_nombre}")
 
         # Ejecutar SP
-        sql = text("""
-            EXEC [dbo].[SP_Consulta_Aprovechamiento_Unidad_Academica]
-                 @UUnidad_Academica = :ua,
-                 @PPeriodo = :per,
-                 @UUsuario = :user,
-                 @HHost = :host,
-                 @NNivel = :niv
-        """)
-        
-        result = db.execute(sql, {
-            'ua': unidad_sigla,
-            'per': periodo,
-            'user': usuario_login,
-            'host': host,
-            'niv': nivel_nombre
+        result = ejecutar_sp(db, "SP_Consulta_Aprovechamiento_Unidad_Academica", {
+            'UUnidad_Academica': unidad_sigla,
+            'PPeriodo': periodo,
+            'UUsuario': usuario_login,
+            'HHost': host,
+            'NNivel': nivel_nombre
         })
         
         # Convertir resultados a lista de dicts
@@ -232,8 +225,9 @@ async def actualizar_aprovechamiento(request: Request, db: Session = Depends(get
         programa_id = data.get('programa')
 
         # Datos de sesión
+        id_unidad_academica = int(request.cookies.get("id_unidad_academica", 0))
         unidad_obj = db.query(CatUnidadAcademica).filter(
-            CatUnidadAcademica.Id_Unidad_Academica == int(request.cookies.get("id_unidad_academica", 0))
+            CatUnidadAcademica.Id_Unidad_Academica == id_unidad_academica
         ).first()
         unidad_sigla = unidad_obj.Sigla if unidad_obj else ''
         
@@ -242,21 +236,14 @@ async def actualizar_aprovechamiento(request: Request, db: Session = Depends(get
         host = get_request_host(request)
         nivel_nombre = get_nivel_nombre(db, int(programa_id))
 
-        sql = text("""
-            EXEC [dbo].[SP_Actualiza_Aprovechamiento_Por_Unidad_Academica]
-                 @UUnidad_Academica = :ua,
-                 @UUsuario = :user,
-                 @PPeriodo = :per,
-                 @HHost = :host,
-                 @NNivel = :niv
-        """)
-
-        db.execute(sql, {
-            'ua': unidad_sigla,
-            'user': usuario_login,
-            'per': periodo,
-            'host': host,
-            'niv': nivel_nombre
+        # La versión de datos se confirma junto con el SP
+        incrementar_version_periodo(db, id_unidad_academica, periodo, FORMATO_APROVECHAMIENTO)
+        ejecutar_sp(db, "SP_Actualiza_Aprovechamiento_Por_Unidad_Academica", {
+            'UUnidad_Academica': unidad_sigla,
+            'UUsuario': usuario_login,
+            'PPeriodo': periodo,
+            'HHost': host,
+            'NNivel': nivel_nombre
         })
         db.commit()
 
@@ -277,8 +264,9 @@ async def finalizar_semestre(request: Request, db: Session = Depends(get_db)):
         data = await request.json()
         
         # Obtener nombres literales desde la BD usando los IDs recibidos
+        id_unidad_academica = int(request.cookies.get("id_unidad_academica", 0))
         unidad_obj = db.query(CatUnidadAcademica).filter(
-            CatUnidadAcademica.Id_Unidad_Academica == int(request.cookies.get("id_unidad_academica", 0))
+            CatUnidadAcademica.Id_Unidad_Academica == id_unidad_academica
         ).first()
         unidad_sigla = unidad_obj.Sigla if unidad_obj else ''
 
@@ -290,27 +278,17 @@ async def finalizar_semestre(request: Request, db: Session = Depends(get_db)):
         host = get_request_host(request)
         nivel_nombre = get_nivel_nombre(db, int(data['programa']))
 
-        sql = text("""
-            EXEC [dbo].[SP_Actualiza_Aprovechamiento_Por_Semestre_AU]
-                 @UUnidad_Academica = :ua,
-                 @PPrograma = :prog,
-                 @MModalidad = :mod,
-                 @SSemestre = :sem,
-                 @UUsuario = :user,
-                 @PPeriodo = :per,
-                 @HHost = :host,
-                 @NNivel = :niv
-        """)
-
-        db.execute(sql, {
-            'ua': unidad_sigla,
-            'prog': programa.Nombre_Programa,
-            'mod': modalidad.Modalidad,
-            'sem': semestre.Semestre,
-            'user': usuario_login,
-            'per': PERIODO_DEFAULT_LITERAL,
-            'host': host,
-            'niv': nivel_nombre
+        # La versión de datos se confirma junto con el SP
+        incrementar_version_periodo(db, id_unidad_academica, PERIODO_DEFAULT_LITERAL, FORMATO_APROVECHAMIENTO)
+        ejecutar_sp(db, "SP_Actualiza_Aprovechamiento_Por_Semestre_AU", {
+            'UUnidad_Academica': unidad_sigla,
+            'PPrograma': programa.Nombre_Programa,
+            'MModalidad': modalidad.Modalidad,
+            'SSemestre': semestre.Semestre,
+            'UUsuario': usuario_login,
+            'PPeriodo': PERIODO_DEFAULT_LITERAL,
+            'HHost': host,
+            'NNivel': nivel_nombre
         })
         db.commit()
 
@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Request, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from sqlalchemy.orm import Session
+
+from backend.core.templates import templates
+from backend.database.connection import get_db
+from backend.database.models.CatPeriodo import CatPeriodo as Periodo
+from backend.services.avance_service import get_avance_institucional
+from backend.services.matricula_service import PERIODO_DEFAULT_ID
+from backend.services.usuario_service import is_super_admin, has_admin_permissions
+from backend.services.version_service import resolver_id_periodo
+
+router = APIRouter()
+
+
+def _tiene_acceso_avance(request: Request, db: Session) -> bool:
+    """El tablero institucional es sólo para el super admin y los roles administrativos."""
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+    if is_super_admin(nombre_usuario, apellidoP_usuario, apellidoM_usuario):
+        return True
+    try:
+        id_rol = int(request.cookies.get("id_rol", 0))
+    except (TypeError, ValueError):
+        return False
+    return has_admin_permissions(db, id_rol)
+
+
+@router.get("/", response_class=HTMLResponse)
+async def avance_view(request: Request, db: Session = Depends(get_db)):
+    """Vista del avance de captura de todas las Unidades Académicas. Los datos se cargan desde /avance/datos."""
+    if not _tiene_acceso_avance(request, db):
+        return templates.TemplateResponse("error.html", {
+            "request": request,
+            "error_message": "Acceso denegado: Su rol no tiene permisos para consultar el avance institucional.",
+            "redirect_url": "/mod_principal/"
+        })
+
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+    nombre_completo = " ".join(filter(None, [nombre_usuario, apellidoP_usuario, apellidoM_usuario]))
+
+    periodos = db.query(Periodo).order_by(Periodo.Id_Periodo.desc()).all()
+    return templates.TemplateResponse(
+        "avance.html",
+        {
+            "request": request,
+            "nombre_usuario": nombre_completo,
+            "rol": request.cookies.get("nombre_rol", ""),
+            "periodos": periodos,
+            "periodo_default_id": PERIODO_DEFAULT_ID,
+        },
+    )
+
+
+@router.get("/datos", response_class=JSONResponse)
+def avance_datos(
+    request: Request,
+    periodo: str = str(PERIODO_DEFAULT_ID),
+    db: Session = Depends(get_db),
+):
+    """
+    Avance por UA del periodo (semáforo, validaciones y rechazos por formato).
+    El ETag es la huella del contenido servido: si nada cambió responde 304.
+    """
+    if not _tiene_acceso_avance(request, db):
+        return JSONResponse(status_code=403, content={"detail": "No autorizado"})
+
+    id_periodo = resolver_id_periodo(db, periodo)
+    if not id_periodo:
+        return JSONResponse(status_code=404, content={"detail": f"Período '{periodo}' no encontrado"})
+
+    try:
+        avance = get_avance_institucional(db, id_periodo)
+    except Exception as e:
+        print(f"❌ Error al consultar el avance institucional: {e}")
+        return JSONResponse(status_code=500, content={"detail": "No se pudo consultar el avance"})
+
+    etag = f'W/"avance-{id_periodo}-{avance["huella"]}"'
+    encabezados = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=encabezados)
+    return JSONResponse(content=avance, headers=encabezados)
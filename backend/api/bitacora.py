@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Request, Depends
+from fastapi.responses import HTMLResponse, JSONResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from backend.core.templates import templates
+from backend.database.connection import get_db
+from backend.services.bitacora_service import (
+    get_bitacora_pagina,
+    get_resumen_bitacora,
+    get_opciones_filtro_bitacora,
+    BITACORA_LIMITE_DEFAULT,
+)
+from backend.services.usuario_service import is_super_admin, has_admin_permissions
+
+router = APIRouter()
+
+
+def _tiene_acceso_bitacora(request: Request, db: Session) -> bool:
+    """Sólo el super admin y los roles administrativos pueden consultar la bitácora."""
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+    if is_super_admin(nombre_usuario, apellidoP_usuario, apellidoM_usuario):
+        return True
+    try:
+        id_rol = int(request.cookies.get("id_rol", 0))
+    except (TypeError, ValueError):
+        return False
+    return has_admin_permissions(db, id_rol)
+
+
+@router.get("/", response_class=HTMLResponse)
+async def bitacora_view(request: Request, db: Session = Depends(get_db)):
+    """Vista de consulta de la bitácora. Los registros se cargan por página desde /bitacora/registros."""
+    if not _tiene_acceso_bitacora(request, db):
+        return templates.TemplateResponse("error.html", {
+            "request": request,
+            "error_message": "Acceso denegado: Su rol no tiene permisos para consultar la bitácora.",
+            "redirect_url": "/mod_principal/"
+        })
+
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+    nombre_completo = " ".join(filter(None, [nombre_usuario, apellidoP_usuario, apellidoM_usuario]))
+
+    opciones = get_opciones_filtro_bitacora(get_resumen_bitacora(db))
+    return templates.TemplateResponse(
+        "bitacora.html",
+        {
+            "request": request,
+            "nombre_usuario": nombre_completo,
+            "rol": request.cookies.get("nombre_rol", ""),
+            "modulos": opciones["modulos"],
+            "periodos": opciones["periodos"],
+            "limite": BITACORA_LIMITE_DEFAULT,
+        },
+    )
+
+
+@router.get("/registros", response_class=JSONResponse)
+async def bitacora_registros(
+    request: Request,
+    cursor: Optional[str] = None,
+    limite: int = BITACORA_LIMITE_DEFAULT,
+    id_usuario: Optional[int] = None,
+    id_modulo: Optional[int] = None,
+    id_periodo: Optional[int] = None,
+    host: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Página de la bitácora (keyset). Enviar `siguiente_cursor` de la respuesta para continuar."""
+    if not _tiene_acceso_bitacora(request, db):
+        return JSONResponse(status_code=403, content={"detail": "No autorizado"})
+    try:
+        return get_bitacora_pagina(
+            db,
+            cursor=cursor,
+            limite=limite,
+            id_usuario=id_usuario,
+            id_modulo=id_modulo,
+            id_periodo=id_periodo,
+            host=(host or "").strip() or None,
+        )
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    except Exception as e:
+        print(f"❌ Error al consultar bitácora: {e}")
+        return JSONResponse(status_code=500, content={"detail": str(e)})
@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from backend.core.config import settings
+from backend.services.jobs_service import es_local, get_job, get_job_estado, list_jobs, job_events, EVENTOS_FINALES, ESTADOS_FINALES
+from backend.services.usuario_service import is_super_admin
+from backend.utils.sse import SSE_HEADERS, format_sse
+
+import asyncio
+
+router = APIRouter()
+
+
+def _id_usuario(request: Request) -> int:
+    try:
+        return int(request.cookies.get("id_usuario", 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _puede_ver(request: Request, job) -> bool:
+    """Sólo quien envió el trabajo (o el super admin) puede consultarlo."""
+    if job.id_usuario and job.id_usuario == _id_usuario(request):
+        return True
+    return is_super_admin(
+        request.cookies.get("nombre_usuario", ""),
+        request.cookies.get("apellidoP_usuario", ""),
+        request.cookies.get("apellidoM_usuario", ""),
+    )
+
+
+def _job_o_error(request: Request, job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        return None, JSONResponse(status_code=404, content={"detail": "Trabajo no encontrado o expirado"})
+    if not _puede_ver(request, job):
+        return None, JSONResponse(status_code=403, content={"detail": "No tiene acceso a este trabajo"})
+    return job, None
+
+
+@router.get("/", response_class=JSONResponse)
+def listar_jobs(request: Request):
+    """Trabajos recientes del usuario en sesión."""
+    return JSONResponse(content={"jobs": list_jobs(_id_usuario(request))})
+
+
+@router.get("/{job_id}", response_class=JSONResponse)
+def estado_job(job_id: str, request: Request):
+    """Estado del trabajo (polling)."""
+    job, error = _job_o_error(request, job_id)
+    if error:
+        return error
+    return JSONResponse(content=get_job_estado(job.id))
+
+
+@router.get("/{job_id}/eventos")
+def eventos_job(job_id: str, request: Request):
+    """Stream SSE con los cambios de estado del trabajo; se cierra al completarse o fallar."""
+    job, error = _job_o_error(request, job_id)
+    if error:
+        return error
+
+    if not es_local(job.id):
+        # Lo ejecuta otro worker: sus eventos no llegan a este proceso
+        return StreamingResponse(_sondear_job(job.id), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    def estado_inicial():
+        estado = get_job_estado(job.id)
+        return {"event": estado["estado"], "data": estado} if estado else None
+
+    return StreamingResponse(
+        job_events.stream(job.id, estado_inicial=estado_inicial, terminar_en=EVENTOS_FINALES),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.get("/{job_id}/resultado", response_class=JSONResponse)
+def resultado_job(job_id: str, request: Request):
+    """Resultado del trabajo terminado (se conserva JOBS_TTL_SEGUNDOS)."""
+    job, error = _job_o_error(request, job_id)
+    if error:
+        return error
+    estado = get_job_estado(job.id, incluir_resultado=True)
+    if estado["estado"] not in ESTADOS_FINALES:
+        return JSONResponse(status_code=202, content=estado)
+    return JSONResponse(content=estado)
+
+
+async def _sondear_job(job_id: str):
+    """Eventos SSE de un trabajo de otro worker, leyendo su estado de la tabla."""
+    anterior = None
+    while True:
+        estado = await asyncio.to_thread(get_job_estado, job_id)
+        if estado is None:
+            return
+        if estado != anterior:
+            yield format_sse(estado, event=estado["estado"])
+            anterior = estado
+        if estado["estado"] in EVENTOS_FINALES:
+            return
+        await asyncio.sleep(settings.JOBS_SONDEO_SEGUNDOS)
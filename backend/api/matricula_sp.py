@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Request, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from fastapi import HTTPException
 from datetime import datetime
 
@@ -20,27 +22,51 @@ from backend.database.models.CatGrupoEdad import CatGrupoEdad as Grupo_Edad
 from backend.database.models.CatTipoIngreso import TipoIngreso as Tipo_Ingreso
 from backend.database.models.CatRama import CatRama as Rama
 from backend.database.models.CatSemaforo import CatSemaforo
-from backend.database.models.SemaforoUnidadAcademica import SemaforoUnidadAcademica
 from backend.database.models.Validacion import Validacion
 from backend.services.matricula_service import (
     execute_matricula_sp_with_context,
     get_matricula_metadata_from_sp,
     execute_sp_actualiza_matricula_por_unidad_academica,
-    execute_sp_actualiza_matricula_por_semestre_au,
-    get_estado_semaforo_desde_sp,
-    execute_sp_finaliza_captura_matricula,
     execute_sp_valida_matricula,
     execute_sp_rechaza_matricula,
     extract_unique_values_from_sp,
+    consolidar_semestre_matricula,
+    actualizar_matricula_unidad,
+    guardar_temp_matricula,
+    guardar_y_consolidar_matricula,
+    guardar_delta_matricula,
+    get_id_periodo,
+    mensaje_captura,
+    resolver_periodo_literal,
+    PERIODO_DEFAULT_ID,
+    PERIODO_DEFAULT_LITERAL,
 )
 from backend.utils.request import get_request_host
+from backend.services.roles_service import es_rol_capturista, es_rol_validador
+from backend.services.jobs_service import submit_job
+from backend.services.version_service import get_version, incrementar_version_periodo, resolver_id_periodo, VersionConflictError
+from backend.services.eventos_matricula_service import (
+    publicar_evento_matricula,
+    stream_eventos_matricula,
+    EVENTO_VALIDACION,
+    EVENTO_RECHAZO,
+)
+from backend.services.usuario_service import is_super_admin, has_admin_permissions
+from backend.services.comparativo_service import comparar_periodos
+from backend.services.consistencia_service import revisar_consistencia
+from backend.services.exportacion_service import (
+    cargar_catalogos_exportacion,
+    generar_csv,
+    generar_xlsx,
+    nombre_archivo_exportacion,
+    FORMATOS_EXPORTACION,
+    MEDIA_TYPES,
+)
+from backend.utils.sse import SSE_HEADERS
 from backend.database.models.Temp_Matricula import Temp_Matricula
 
 router = APIRouter()
 
-# Constantes globales
-PERIODO_DEFAULT_ID = 7
-PERIODO_DEFAULT_LITERAL = '2025-2026/1'
 
 
 @router.get('/consulta')
@@ -62,9 +88,10 @@ async def captura_matricula_sp_view(request: Request, db: Session = Depends(get_
     apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
     nombre_completo = " ".join(filter(None, [nombre_usuario, apellidoP_usuario, apellidoM_usuario]))
 
-    # Validar que el usuario tenga uno de los roles permitidos
-    roles_permitidos = [3, 4, 5, 6, 7, 8]  # 3=Capturista, 4-8=Roles de validación/rechazo
-    if id_rol not in roles_permitidos:
+    # Validar que el usuario tenga uno de los roles permitidos (capturista o validación/rechazo)
+    es_capturista = es_rol_capturista(db, id_rol)
+    es_validador = es_rol_validador(db, id_rol)
+    if not (es_capturista or es_validador):
         return templates.TemplateResponse("error.html", {
             "request": request,
             "error_message": f"Acceso denegado: Su rol ({nombre_rol}) no tiene permisos para acceder a esta funcionalidad.",
@@ -72,8 +99,6 @@ async def captura_matricula_sp_view(request: Request, db: Session = Depends(get_
         })
     
     # Determinar el modo de vista según el rol
-    es_capturista = (id_rol == 3)
-    es_validador = (id_rol in [4, 5, 6, 7, 8])  # Roles de validación/rechazo
     modo_vista = "captura" if es_capturista else "validacion"
 
     print(f"\n{'='*60}")
@@ -390,10 +415,13 @@ async def obtener_datos_existentes_sp(
         if "Error" in debug_msg:
             return {"error": debug_msg}
         else:
+            # Versión base para el guardado por deltas
+            id_periodo = get_id_periodo(db, resolver_periodo_literal(db, periodo))
             return {
                 "rows": rows_list,
                 "metadata": metadata,
-                "debug": debug_msg
+                "debug": debug_msg,
+                "version": get_version(db, id_unidad_academica, id_periodo) if id_periodo else 0
             }
 
     except Exception as e:
@@ -457,182 +485,34 @@ async def guardar_captura_completa(request: Request, db: Session = Depends(get_d
         data = await request.json()
         print(f"\n=== GUARDANDO CAPTURA COMPLETA ===")
         print(f"Datos recibidos: {data}")
-        
-        # Obtener datos del usuario desde cookies
-        nombre_usuario = request.cookies.get("nombre_usuario", "")
-        apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
-        apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
-        nombre_completo = " ".join(filter(None, [nombre_usuario, apellidoP_usuario, apellidoM_usuario]))
-        
-        # Obtener usuario y host
-        usuario_sp = nombre_completo or 'sistema'
-        host_sp = get_request_host(request)
-        
-        # Extraer información base
-        periodo_input = data.get('periodo')
-        programa = data.get('programa')
-        semestre = data.get('semestre')
-        modalidad = data.get('modalidad')
-        turno = data.get('turno')
-        total_grupos = data.get('total_grupos')
+
         datos_matricula = data.get('datos_matricula', {})
-        
-        # Convertir período de ID a formato literal para guardar en Temp_Matricula
-        if periodo_input:
-            if str(periodo_input).isdigit():
-                # Buscar el período por ID
-                periodo_obj = db.query(Periodo).filter(Periodo.Id_Periodo == int(periodo_input)).first()
-                if periodo_obj:
-                    periodo = periodo_obj.Periodo  # '2025-2026/1'
-                
-                    print(f"🔄 Período convertido de ID {periodo_input} → '{periodo}' para Temp_Matricula")
-                else:
-                    print(f"⚠️ ID de período {periodo_input} no encontrado, usando default")
-                    periodo = PERIODO_DEFAULT_LITERAL
-            else:
-                # Ya es formato literal
-                periodo = str(periodo_input)
-                print(f"✅ Período ya en formato literal: '{periodo}'")
-        else:
-            periodo = PERIODO_DEFAULT_LITERAL
-            print(f"📌 Usando período por defecto: '{periodo}'")
-        
         if not datos_matricula:
             return {"error": "No se encontraron datos de matrícula para guardar"}
-        
-        # Obtener campos válidos del modelo Temp_Matricula
-        valid_fields = set(Temp_Matricula.__annotations__.keys())
-        print(f"Campos válidos Temp_Matricula: {valid_fields}")
-        
-        # Obtener nombres desde la base de datos para mapear IDs
-        programa_obj = db.query(Programas).filter(Programas.Id_Programa == int(programa)).first()
-        modalidad_obj = db.query(Modalidad).filter(Modalidad.Id_Modalidad == int(modalidad)).first()
-        turno_obj = db.query(Turno).filter(Turno.Id_Turno == int(turno)).first()
-        semestre_obj = db.query(Semestre).filter(Semestre.Id_Semestre == int(semestre)).first()
-        
-        # Obtener Nombre_Rama desde el programa
-        rama_obj = None
-        if programa_obj and programa_obj.Id_Rama_Programa:
-            rama_obj = db.query(Rama).filter(Rama.Id_Rama == programa_obj.Id_Rama_Programa).first()
 
-        # Obtener sigla de la unidad académica y nivel desde cookies
+        # Obtener unidad académica y nivel desde cookies
         id_unidad_academica = int(request.cookies.get("id_unidad_academica", 0))
         id_nivel = int(request.cookies.get("id_nivel", 0))
-        
-        unidad_obj = db.query(Unidad_Academica).filter(
-            Unidad_Academica.Id_Unidad_Academica == id_unidad_academica
-        ).first()
-        
-        nivel_obj = db.query(Nivel).filter(Nivel.Id_Nivel == id_nivel).first()
-        
-        # Obtener mapeos de grupos de edad y tipos de ingreso para convertir a nombres
-        grupos_edad_db = db.query(Grupo_Edad).all()
-        grupos_edad_map = {str(g.Id_Grupo_Edad): g.Grupo_Edad for g in grupos_edad_db}
-        
-        tipos_ingreso_db = db.query(Tipo_Ingreso).all()
-        tipos_ingreso_map = {str(t.Id_Tipo_Ingreso): t.Tipo_de_Ingreso for t in tipos_ingreso_db}
-        
-        registros_insertados = 0
-        registros_rechazados = 0
-        
-        # Limpiar la sesión para evitar conflictos de identidad
-        db.expunge_all()
-        
-        # Obtener el semestre seleccionado como número
-        semestre_numero = None
-        if semestre_obj:
-            try:
-                # Extraer el número del semestre (ej: "1" de "Primer Semestre", "2" de "Segundo Semestre")
-                semestre_text = semestre_obj.Semestre.lower()
-                if "primer" in semestre_text or semestre_text == "1":
-                    semestre_numero = 1
-                elif "segundo" in semestre_text or semestre_text == "2":
-                    semestre_numero = 2
-                elif "tercer" in semestre_text or semestre_text == "3":
-                    semestre_numero = 3
-                # Agregar más semestres según sea necesario
-            except:
-                pass
-        
-        print(f"Semestre detectado: {semestre_numero} (de: {semestre_obj.Semestre if semestre_obj else 'N/A'})")
-        
-        # Procesar cada registro de matrícula
-        for key, dato in datos_matricula.items():
-            # Validación de reglas de semestre - SEGURIDAD BACKEND
-            tipo_ingreso_id = str(dato.get('tipo_ingreso', ''))
-            
-            # Aplicar reglas de validación por semestre
-            if semestre_numero is not None and tipo_ingreso_id:
-                # Regla 1: Semestre 1 no puede tener "Reingreso" (ID: 2)
-                if semestre_numero == 1 and tipo_ingreso_id == "2":
-                    print(f"VALIDACIÓN RECHAZADA: Semestre 1 no puede tener Reingreso (tipo_ingreso: {tipo_ingreso_id})")
-                    registros_rechazados += 1
-                    continue  # Saltar este registro
-                
-                # Regla 2: Semestres diferentes a 1 no pueden tener "Nuevo Ingreso" (ID: 1)
-                if semestre_numero != 1 and tipo_ingreso_id == "1":
-                    print(f"VALIDACIÓN RECHAZADA: Semestre {semestre_numero} no puede tener Nuevo Ingreso (tipo_ingreso: {tipo_ingreso_id})")
-                    registros_rechazados += 1
-                    continue  # Saltar este registro
-            
-            # Mapear grupo_edad ID a nombre completo
-            grupo_edad_id = str(dato.get('grupo_edad', ''))
-            grupo_edad_nombre = grupos_edad_map.get(grupo_edad_id, grupo_edad_id)
-            
-            # Mapear tipo_ingreso ID a nombre completo
-            tipo_ingreso_nombre = tipos_ingreso_map.get(tipo_ingreso_id, tipo_ingreso_id)
-            
-            # Convertir sexo de M/F a Hombre/Mujer
-            sexo_corto = dato.get('sexo', '')
-            if sexo_corto == 'M':
-                sexo_completo = 'Hombre'
-            elif sexo_corto == 'F':
-                sexo_completo = 'Mujer'
-            else:
-                sexo_completo = sexo_corto
-            
-            # Construir registro para Temp_Matricula
-            registro = {
-                'Periodo': periodo,
-                'Sigla': unidad_obj.Sigla if unidad_obj else 'UNK',
-                'Nombre_Programa': programa_obj.Nombre_Programa if programa_obj else '',
-                'Nombre_Rama': rama_obj.Nombre_Rama if rama_obj else 'NULL',
-                'Nivel': nivel_obj.Nivel if nivel_obj else '',
-                'Modalidad': modalidad_obj.Modalidad if modalidad_obj else '',
-                'Turno': turno_obj.Turno if turno_obj else '',
-                'Semestre': semestre_obj.Semestre if semestre_obj else '',
-                'Grupo_Edad': grupo_edad_nombre,
-                'Tipo_Ingreso': tipo_ingreso_nombre,
-                'Sexo': sexo_completo,
-                'Matricula': int(dato.get('matricula', 0)),
-                'Salones': int(dato.get('salones', total_grupos))
-            }
-            
-            # Filtrar solo campos válidos
-            filtered = {k: v for k, v in registro.items() if k in valid_fields}
-            
-            # Cambiar condición para incluir valores de 0 (>= 0 en lugar de > 0)
-            if filtered and filtered.get('Matricula', 0) >= 0:
-                # Usar merge() para manejar automáticamente INSERT/UPDATE
-                temp_matricula = Temp_Matricula(**filtered)
-                merged_obj = db.merge(temp_matricula)
-                
-                registros_insertados += 1
-                print(f"Registro procesado (merge): {filtered}")
-        
+
+        captura = guardar_temp_matricula(
+            db,
+            id_unidad_academica=id_unidad_academica,
+            id_nivel=id_nivel,
+            periodo=resolver_periodo_literal(db, data.get('periodo')),
+            programa=data.get('programa'),
+            modalidad=data.get('modalidad'),
+            semestre=data.get('semestre'),
+            turno=data.get('turno'),
+            total_grupos=data.get('total_grupos'),
+            datos_matricula=datos_matricula,
+        )
         db.commit()
-        
-        # Construir mensaje informativo
-        mensaje_base = f"Matrícula procesada. {registros_insertados} registros guardados"
-        if registros_rechazados > 0:
-            mensaje_base += f", {registros_rechazados} registros rechazados por validación de semestre"
-        mensaje_base += "."
-        
+
         return {
-            "mensaje": mensaje_base,
-            "registros_insertados": registros_insertados,
-            "registros_rechazados": registros_rechazados,
-            "validacion_aplicada": semestre_numero is not None
+            "mensaje": mensaje_captura(captura["registros_insertados"], captura["registros_rechazados"]),
+            "registros_insertados": captura["registros_insertados"],
+            "registros_rechazados": captura["registros_rechazados"],
+            "validacion_aplicada": captura["validacion_aplicada"]
         }
         
     except Exception as e:
@@ -642,6 +522,310 @@ async def guardar_captura_completa(request: Request, db: Session = Depends(get_d
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error al guardar la matrícula: {str(e)}")
 
+@router.post("/guardar_y_consolidar")
+async def guardar_y_consolidar(request: Request, db: Session = Depends(get_db)):
+    """
+    Guardar avance / validar turno en una sola petición.
+    Equivale a guardar_captura_completa + actualizar_matricula (+ preparar_turno si
+    validar_turno=true), pero en una única transacción, y regresa las filas ya
+    consolidadas del SP para refrescar la tabla sin recargar la página.
+    """
+    try:
+        data = await request.json()
+        print(f"\n=== GUARDAR Y CONSOLIDAR MATRÍCULA ===")
+
+        campos = ('periodo', 'programa', 'modalidad', 'semestre', 'turno')
+        faltantes = [c for c in campos if not data.get(c)]
+        if faltantes:
+            return {"error": f"Faltan parámetros obligatorios: {', '.join(faltantes)}"}
+
+        datos_matricula = data.get('datos_matricula', {})
+        if not datos_matricula:
+            return {"error": "No se encontraron datos de matrícula para guardar"}
+
+        # Obtener datos del usuario desde cookies
+        id_unidad_academica = int(request.cookies.get("id_unidad_academica", 0))
+        id_nivel = int(request.cookies.get("id_nivel", 0))
+        nombre_usuario = request.cookies.get("nombre_usuario", "")
+        apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+        apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+        nombre_completo = " ".join(filter(None, [nombre_usuario, apellidoP_usuario, apellidoM_usuario]))
+
+        return guardar_y_consolidar_matricula(
+            db,
+            id_unidad_academica=id_unidad_academica,
+            id_nivel=id_nivel,
+            periodo_input=data.get('periodo'),
+            programa=data.get('programa'),
+            modalidad=data.get('modalidad'),
+            semestre=data.get('semestre'),
+            turno=data.get('turno'),
+            total_grupos=data.get('total_grupos', 0),
+            datos_matricula=datos_matricula,
+            usuario_sp=nombre_completo or 'sistema',
+            host_sp=get_request_host(request),
+            validar_turno=bool(data.get('validar_turno')),
+        )
+
+    except Exception as e:
+        print(f"ERROR al guardar y consolidar matrícula: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error al guardar la matrícula: {str(e)}")
+
+@router.post("/guardar_delta")
+async def guardar_delta(request: Request, db: Session = Depends(get_db)):
+    """
+    Guardado por deltas ("Guardar avance"): recibe sólo las celdas modificadas en
+    `cambios` (mismo formato que datos_matricula) y la `version_base` sobre la que se
+    editó. Si la versión ya no es la vigente responde 409 con la versión actual.
+    """
+    try:
+        data = await request.json()
+        print(f"\n=== GUARDANDO DELTA DE MATRÍCULA ===")
+
+        campos = ('periodo', 'programa', 'modalidad', 'semestre', 'turno')
+        faltantes = [c for c in campos if not data.get(c)]
+        if faltantes:
+            return {"error": f"Faltan parámetros obligatorios: {', '.join(faltantes)}"}
+
+        cambios = data.get('cambios') or {}
+        if not cambios:
+            return {"warning": "No hay cambios por guardar", "version": data.get('version_base')}
+
+        try:
+            version_base = int(data.get('version_base'))
+        except (TypeError, ValueError):
+            return JSONResponse(status_code=400, content={"error": "version_base es requerida"})
+
+        # Obtener datos del usuario desde cookies
+        id_unidad_academica = int(request.cookies.get("id_unidad_academica", 0))
+        id_nivel = int(request.cookies.get("id_nivel", 0))
+        nombre_usuario = request.cookies.get("nombre_usuario", "")
+        apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+        apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+        nombre_completo = " ".join(filter(None, [nombre_usuario, apellidoP_usuario, apellidoM_usuario]))
+
+        print(f"Celdas modificadas: {len(cambios)} | Versión base: {version_base}")
+
+        return guardar_delta_matricula(
+            db,
+            id_unidad_academica=id_unidad_academica,
+            id_nivel=id_nivel,
+            periodo_input=data.get('periodo'),
+            programa=data.get('programa'),
+            modalidad=data.get('modalidad'),
+            semestre=data.get('semestre'),
+            turno=data.get('turno'),
+            total_grupos=data.get('total_grupos', 0),
+            cambios=cambios,
+            version_base=version_base,
+            usuario_sp=nombre_completo or 'sistema',
+            host_sp=get_request_host(request),
+        )
+
+    except VersionConflictError as e:
+        print(f"⚠️ Guardado rechazado por versión desactualizada: {e}")
+        return JSONResponse(status_code=409, content={
+            "error": str(e),
+            "version_actual": e.version_actual,
+        })
+    except Exception as e:
+        print(f"ERROR al guardar delta de matrícula: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error al guardar la matrícula: {str(e)}")
+
+@router.get("/eventos")
+async def eventos_matricula_sse(
+    request: Request,
+    periodo: str = str(PERIODO_DEFAULT_ID),
+    id_unidad_academica: int = 0,
+    db: Session = Depends(get_db),
+):
+    """
+    Stream SSE con los cambios de semáforo y las validaciones/rechazos de la UA en sesión
+    para el periodo. Al conectar envía 'conectado' con la versión vigente de los datos para
+    que el cliente detecte cambios ocurridos mientras estuvo desconectado.
+    Sólo el super admin puede escuchar otra UA con id_unidad_academica.
+    """
+    id_ua_sesion = int(request.cookies.get("id_unidad_academica", 0) or 0)
+    if id_unidad_academica and id_unidad_academica != id_ua_sesion:
+        if not is_super_admin(
+            request.cookies.get("nombre_usuario", ""),
+            request.cookies.get("apellidoP_usuario", ""),
+            request.cookies.get("apellidoM_usuario", ""),
+        ):
+            return JSONResponse(status_code=403, content={"detail": "No tiene acceso a esta Unidad Académica"})
+    else:
+        id_unidad_academica = id_ua_sesion
+
+    id_periodo = resolver_id_periodo(db, periodo)
+    if not id_unidad_academica or not id_periodo:
+        return JSONResponse(status_code=400, content={"detail": "Unidad Académica o período inválido"})
+
+    # Se lee antes de regresar: la sesión de la petición no vive durante el stream
+    version = get_version(db, id_unidad_academica, id_periodo)
+    conectado = {
+        "event": "conectado",
+        "data": {
+            "id_unidad_academica": id_unidad_academica,
+            "id_periodo": id_periodo,
+            "version": version,
+        },
+    }
+
+    return StreamingResponse(
+        # Incluye el vigilante de Version_Datos para escrituras atendidas por otros workers
+        stream_eventos_matricula(id_unidad_academica, id_periodo, version, estado_inicial=lambda: conectado),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+def _unidad_consultable(request: Request, db: Session, id_unidad_academica: int, permitir_validadores: bool = False):
+    """
+    UA que el usuario puede consultar en reportes. El super admin y los roles administrativos
+    (y los validadores, si se indica) pueden pedir cualquier UA (0 = toda la institución);
+    los demás sólo la propia. Regresa (id_unidad_academica, respuesta de error o None).
+    """
+    try:
+        id_rol = int(request.cookies.get("id_rol", 0) or 0)
+    except (TypeError, ValueError):
+        id_rol = 0
+    acceso_institucional = is_super_admin(
+        request.cookies.get("nombre_usuario", ""),
+        request.cookies.get("apellidoP_usuario", ""),
+        request.cookies.get("apellidoM_usuario", ""),
+    ) or has_admin_permissions(db, id_rol) or (permitir_validadores and es_rol_validador(db, id_rol))
+    if acceso_institucional:
+        return id_unidad_academica, None
+    id_ua_sesion = int(request.cookies.get("id_unidad_academica", 0) or 0)
+    if not id_ua_sesion or (id_unidad_academica and id_unidad_academica != id_ua_sesion):
+        return None, JSONResponse(status_code=403, content={"detail": "No tiene acceso a esta Unidad Académica"})
+    return id_ua_sesion, None
+
+
+@router.get("/exportar")
+def exportar_matricula(
+    request: Request,
+    formato: str = "csv",
+    periodo: str = str(PERIODO_DEFAULT_ID),
+    id_unidad_academica: int = 0,
+    id_nivel: int = 0,
+    id_programa: int = 0,
+    db: Session = Depends(get_db),
+):
+    """
+    Descarga la matrícula consolidada (tabla Matricula) en CSV o XLSX, generada por
+    streaming. Filtros opcionales: periodo (ID o literal), UA, nivel y programa (0 = todos).
+    El super admin y los roles administrativos pueden exportar cualquier UA o toda la
+    institución; los demás usuarios sólo su propia UA.
+    """
+    formato = formato.lower()
+    if formato not in FORMATOS_EXPORTACION:
+        return JSONResponse(status_code=400, content={"detail": f"Formato inválido: {formato}"})
+
+    id_unidad_academica, error = _unidad_consultable(request, db, id_unidad_academica)
+    if error:
+        return error
+
+    id_periodo = resolver_id_periodo(db, periodo) if periodo else None
+    if periodo and not id_periodo:
+        return JSONResponse(status_code=404, content={"detail": f"Período '{periodo}' no encontrado"})
+
+    filtros = {
+        "id_periodo": id_periodo,
+        "id_unidad_academica": id_unidad_academica or None,
+        "id_nivel": id_nivel or None,
+        "id_programa": id_programa or None,
+    }
+    catalogos = cargar_catalogos_exportacion(db)
+    nombre_archivo = nombre_archivo_exportacion(
+        formato,
+        catalogos["periodo"].get(id_periodo) if id_periodo else None,
+        catalogos["unidad_academica"].get(id_unidad_academica) if id_unidad_academica else None,
+    )
+    print(f"📤 Exportando matrícula ({formato}) con filtros {filtros}")
+
+    generador = generar_csv if formato == "csv" else generar_xlsx
+    return StreamingResponse(
+        generador(filtros, catalogos),
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre_archivo}"'},
+    )
+
+@router.get("/comparativo")
+def comparativo_matricula(
+    request: Request,
+    periodo: str = str(PERIODO_DEFAULT_ID),
+    periodo_anterior: str = "",
+    id_unidad_academica: int = 0,
+    id_nivel: int = 0,
+    umbral_pct: Optional[float] = None,
+    umbral_alumnos: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Compara la matrícula de la UA por programa/semestre/turno contra el periodo anterior
+    (o el indicado en periodo_anterior) y marca las celdas atípicas según los umbrales.
+    Pensado para revisar antes de validar_semestre_rol.
+    """
+    id_unidad_academica, error = _unidad_consultable(request, db, id_unidad_academica)
+    if error:
+        return error
+    if not id_unidad_academica:
+        id_unidad_academica = int(request.cookies.get("id_unidad_academica", 0) or 0)
+    if not id_unidad_academica:
+        return JSONResponse(status_code=400, content={"detail": "Unidad Académica requerida"})
+
+    id_periodo = resolver_id_periodo(db, periodo)
+    if not id_periodo:
+        return JSONResponse(status_code=404, content={"detail": f"Período '{periodo}' no encontrado"})
+    id_periodo_anterior = None
+    if periodo_anterior:
+        id_periodo_anterior = resolver_id_periodo(db, periodo_anterior)
+        if not id_periodo_anterior:
+            return JSONResponse(status_code=404, content={"detail": f"Período '{periodo_anterior}' no encontrado"})
+
+    try:
+        return comparar_periodos(
+            db,
+            id_unidad_academica,
+            id_periodo,
+            id_periodo_anterior=id_periodo_anterior,
+            id_nivel=id_nivel or None,
+            umbral_pct=umbral_pct,
+            umbral_alumnos=umbral_alumnos,
+        )
+    except Exception as e:
+        print(f"❌ Error en el comparativo de matrícula: {e}")
+        raise HTTPException(status_code=500, detail=f"Error al generar el comparativo: {str(e)}")
+
+@router.get("/consistencia")
+def consistencia_matricula_aprovechamiento(
+    request: Request,
+    periodo: str = str(PERIODO_DEFAULT_ID),
+    id_unidad_academica: int = 0,
+    limite: int = 5000,
+    db: Session = Depends(get_db),
+):
+    """
+    Revisa la consistencia entre matrícula y aprovechamiento por celda
+    (UA, programa, semestre, turno, sexo). id_unidad_academica=0 revisa toda la
+    institución (super admin, roles administrativos y validadores).
+    """
+    id_unidad_academica, error = _unidad_consultable(request, db, id_unidad_academica, permitir_validadores=True)
+    if error:
+        return error
+    id_periodo = resolver_id_periodo(db, periodo)
+    if not id_periodo:
+        return JSONResponse(status_code=404, content={"detail": f"Período '{periodo}' no encontrado"})
+    try:
+        return revisar_consistencia(db, id_periodo, id_unidad_academica or None, limite=max(0, limite))
+    except Exception as e:
+        print(f"❌ Error al revisar la consistencia: {e}")
+        raise HTTPException(status_code=500, detail=f"Error al revisar la consistencia: {str(e)}")
+
 @router.post("/guardar_progreso")
 def guardar_progreso(datos: List[Dict[str, Any]], db: Session = Depends(get_db)):
     """
@@ -686,6 +870,75 @@ def guardar_progreso(datos: List[Dict[str, Any]], db: Session = Depends(get_db))
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error al guardar el progreso: {str(e)}")
 
+def _resolver_parametros_actualizacion(request: Request, db: Session, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Resuelve desde cookies y body los parámetros de SP_Actualiza_Matricula_Por_Unidad_Academica."""
+    # Obtener datos del usuario desde cookies
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+    nombre_completo = " ".join(filter(None, [nombre_usuario, apellidoP_usuario, apellidoM_usuario]))
+    
+    # Obtener unidad académica desde cookies (si no está, resolver vía Id_Unidad_Academica)
+    unidad_sigla = request.cookies.get("unidad_sigla", "")
+    if not unidad_sigla:
+        try:
+            id_unidad_cookie = int(request.cookies.get("id_unidad_academica", 0))
+        except Exception:
+            id_unidad_cookie = 0
+        if id_unidad_cookie:
+            unidad_obj = db.query(Unidad_Academica).filter(Unidad_Academica.Id_Unidad_Academica == id_unidad_cookie).first()
+            if unidad_obj and unidad_obj.Sigla:
+                unidad_sigla = unidad_obj.Sigla
+                print(f"🛠️ Resuelta unidad_sigla desde Id_Unidad_Academica cookie: {unidad_sigla}")
+            else:
+                print("⚠️ No se pudo resolver unidad_sigla desde Id_Unidad_Academica")
+        else:
+            print("⚠️ Cookie unidad_sigla ausente y no hay Id_Unidad_Academica válido")
+
+    # Obtener usuario y host
+    usuario_sp = nombre_completo or 'sistema'
+    host_sp = get_request_host(request)
+    
+    # Obtener período y total_grupos desde el request o usar valores por defecto
+    periodo_input = data.get('periodo')
+    total_grupos = data.get('total_grupos', 0)
+    
+    # SIEMPRE convertir a formato literal para el SP
+    if periodo_input:
+        # Si es un ID numérico (como '7'), convertir a literal
+        if str(periodo_input).isdigit():
+            # Buscar el período por ID en la base de datos
+            periodo_obj = db.query(Periodo).filter(Periodo.Id_Periodo == int(periodo_input)).first()
+            if periodo_obj:
+                periodo = periodo_obj.Periodo  # '2025-2026/1'
+            
+                print(f"🔄 Convertido ID {periodo_input} → '{periodo}'")
+            else:
+                print(f"⚠️ ID de período {periodo_input} no encontrado, usando default")
+                periodo = PERIODO_DEFAULT_LITERAL
+        else:
+            # Ya es formato literal, usarlo directamente
+            periodo = str(periodo_input)
+            print(f"✅ Período ya en formato literal: '{periodo}'")
+    else:
+        # No viene período, usar el default literal
+        periodo = PERIODO_DEFAULT_LITERAL
+        print(f"📌 Usando período por defecto: '{periodo}'")
+        
+    nivel = request.cookies.get("nombre_nivel", "")  # Obtener el nombre del nivel desde cookies
+    
+    if not periodo:
+        raise HTTPException(status_code=400, detail="Período es requerido para actualizar la matrícula")
+
+    return {
+        "unidad_sigla": unidad_sigla,
+        "total_grupos": total_grupos,
+        "usuario_sp": usuario_sp,
+        "periodo": periodo,
+        "host_sp": host_sp,
+        "nivel": nivel,
+    }
+
 @router.post("/actualizar_matricula")
 async def actualizar_matricula(request: Request, db: Session = Depends(get_db)):
     """
@@ -693,65 +946,13 @@ async def actualizar_matricula(request: Request, db: Session = Depends(get_db)):
     la tabla Matricula con los datos de Temp_Matricula y luego limpiar la tabla temporal.
     """
     try:
-        # Obtener datos del usuario desde cookies
-        nombre_usuario = request.cookies.get("nombre_usuario", "")
-        apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
-        apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
-        nombre_completo = " ".join(filter(None, [nombre_usuario, apellidoP_usuario, apellidoM_usuario]))
-        
-        # Obtener unidad académica desde cookies (si no está, resolver vía Id_Unidad_Academica)
-        unidad_sigla = request.cookies.get("unidad_sigla", "")
-        if not unidad_sigla:
-            try:
-                id_unidad_cookie = int(request.cookies.get("id_unidad_academica", 0))
-            except Exception:
-                id_unidad_cookie = 0
-            if id_unidad_cookie:
-                unidad_obj = db.query(Unidad_Academica).filter(Unidad_Academica.Id_Unidad_Academica == id_unidad_cookie).first()
-                if unidad_obj and unidad_obj.Sigla:
-                    unidad_sigla = unidad_obj.Sigla
-                    print(f"🛠️ Resuelta unidad_sigla desde Id_Unidad_Academica cookie: {unidad_sigla}")
-                else:
-                    print("⚠️ No se pudo resolver unidad_sigla desde Id_Unidad_Academica")
-            else:
-                print("⚠️ Cookie unidad_sigla ausente y no hay Id_Unidad_Academica válido")
-
-        # Obtener usuario y host
-        usuario_sp = nombre_completo or 'sistema'
-        host_sp = get_request_host(request)
-        
-        # Obtener período y total_grupos desde el request o usar valores por defecto
         data = await request.json()
-        periodo_input = data.get('periodo')
-        total_grupos = data.get('total_grupos', 0)
-        
-        # SIEMPRE convertir a formato literal para el SP
-        if periodo_input:
-            # Si es un ID numérico (como '7'), convertir a literal
-            if str(periodo_input).isdigit():
-                # Buscar el período por ID en la base de datos
-                periodo_obj = db.query(Periodo).filter(Periodo.Id_Periodo == int(periodo_input)).first()
-                if periodo_obj:
-                    periodo = periodo_obj.Periodo  # '2025-2026/1'
-                
-                    print(f"🔄 Convertido ID {periodo_input} → '{periodo}'")
-                else:
-                    print(f"⚠️ ID de período {periodo_input} no encontrado, usando default")
-                    periodo = PERIODO_DEFAULT_LITERAL
-            else:
-                # Ya es formato literal, usarlo directamente
-                periodo = str(periodo_input)
-                print(f"✅ Período ya en formato literal: '{periodo}'")
-        else:
-            # No viene período, usar el default literal
-            periodo = PERIODO_DEFAULT_LITERAL
-            print(f"📌 Usando período por defecto: '{periodo}'")
-            
-        nivel = request.cookies.get("nombre_nivel", "")  # Obtener el nombre del nivel desde cookies
-        
-        if not periodo:
-            raise HTTPException(status_code=400, detail="Período es requerido para actualizar la matrícula")
-        
+        parametros = _resolver_parametros_actualizacion(request, db, data)
+        usuario_sp = parametros["usuario_sp"]
+        periodo = parametros["periodo"]
+        host_sp = parametros["host_sp"]
+        nivel = parametros["nivel"]
+
         print(f"\n=== ACTUALIZANDO MATRÍCULA ===")
         print(f"Usuario: {usuario_sp}")
         print(f"Período: {periodo}")
@@ -760,130 +961,9 @@ async def actualizar_matricula(request: Request, db: Session = Depends(get_db)):
         print(f"ID Nivel desde cookies: {request.cookies.get('id_nivel', 'No encontrado')}")
         print(f"Nombre Nivel desde cookies: {request.cookies.get('nombre_nivel', 'No encontrado')}")
         print(f"Cookies disponibles: {list(request.cookies.keys())}")
-        
-        # Verificar que hay datos en Temp_Matricula antes de actualizar
-        temp_count = db.query(Temp_Matricula).count()
-        if temp_count == 0:
-            return {
-                "warning": "No hay datos en Temp_Matricula para actualizar",
-                "registros_temp": 0,
-                "registros_actualizados": 0
-            }
-        
-        print(f"Registros en Temp_Matricula: {temp_count}")
-        
-        # DIAGNÓSTICO: Mostrar contenido de Temp_Matricula antes de actualizar
-        print(f"\n=== DIAGNÓSTICO TEMP_MATRICULA ===")
-        temp_records = db.query(Temp_Matricula).all()
-        for i, record in enumerate(temp_records, 1):
-            print(f"Registro {i}:")
-            print(f"  Periodo: '{record.Periodo}'")
-            print(f"  Sigla: '{record.Sigla}'")
-            print(f"  Nombre_Programa: '{record.Nombre_Programa}'")
-            print(f"  Nombre_Rama: '{record.Nombre_Rama}'")
-            print(f"  Nivel: '{record.Nivel}'")
-            print(f"  Modalidad: '{record.Modalidad}'")
-            print(f"  Turno: '{record.Turno}'")
-            print(f"  Semestre: '{record.Semestre}'")
-            print(f"  Grupo_Edad: '{record.Grupo_Edad}'")
-            print(f"  Tipo_Ingreso: '{record.Tipo_Ingreso}'")
-            print(f"  Sexo: '{record.Sexo}'")
-            print(f"  Matricula: {record.Matricula}")
-            print("-" * 40)
-        
-        # DIAGNÓSTICO: Verificar si existen registros en Matricula que coincidan
-        print(f"\n=== VERIFICANDO COINCIDENCIAS EN MATRICULA ===")
-        matricula_count = db.query(Matricula).count()
-        print(f"Total registros en Matricula: {matricula_count}")
-        
-        # Buscar un registro de ejemplo para ver si hay coincidencias
-        if temp_records:
-            temp_ejemplo = temp_records[0]
-            print(f"\nBuscando coincidencias para el primer registro de Temp_Matricula:")
-            
-            # Verificar periodo
-            periodo_match = db.query(Periodo).filter(Periodo.Periodo == temp_ejemplo.Periodo).first()
-            print(f"Periodo '{temp_ejemplo.Periodo}' encontrado: {periodo_match is not None}")
-            if periodo_match:
-                print(f"  ID Periodo: {periodo_match.Id_Periodo}")
-            
-            # Verificar unidad académica
-            unidad_match = db.query(Unidad_Academica).filter(Unidad_Academica.Sigla == temp_ejemplo.Sigla).first()
-            print(f"Unidad '{temp_ejemplo.Sigla}' encontrada: {unidad_match is not None}")
-            if unidad_match:
-                print(f"  ID Unidad: {unidad_match.Id_Unidad_Academica}")
-            
-            # Verificar programa
-            programa_match = db.query(Programas).filter(Programas.Nombre_Programa == temp_ejemplo.Nombre_Programa).first()
-            print(f"Programa '{temp_ejemplo.Nombre_Programa}' encontrado: {programa_match is not None}")
-            if programa_match:
-                print(f"  ID Programa: {programa_match.Id_Programa}")
-        
-        print(f"=================================")
-        
-        print(f"\n=== PARÁMETROS DEL SP ===")
-        print(f"@UUnidad_Academica = '{unidad_sigla}' (tipo: {type(unidad_sigla).__name__})")
-        print(f"@SSalones = '{total_grupos}' (tipo: {type(total_grupos).__name__})")
-        print(f"@UUsuario = '{usuario_sp}' (tipo: {type(usuario_sp).__name__})")
-        print(f"@PPeriodo = '{periodo}' (tipo: {type(periodo).__name__})")
-        print(f"@HHost = '{host_sp}' (tipo: {type(host_sp).__name__})")
-        print(f"@NNivel = '{nivel}' (tipo: {type(nivel).__name__})")
-        print(f"========================")
-        
-        # Ejecutar el stored procedure (centralizado en el servicio)
-        try:
-            execute_sp_actualiza_matricula_por_unidad_academica(
-                db,
-                unidad_sigla=unidad_sigla,
-                salones=total_grupos,
-                usuario=usuario_sp,
-                periodo=periodo,
-                host=host_sp,
-                nivel=nivel,
-            )
-            print("SP ejecutado exitosamente")
-            
-            # LIMPIAR VALIDACIONES PREVIAS cuando el capturista hace cambios
-            # Esto permite que los validadores vuelvan a validar/rechazar
-            print(f"\n🔄 Limpiando validaciones previas del periodo...")
-            id_unidad_academica = int(request.cookies.get("id_unidad_academica", 0))
-            
-            # Obtener el ID del periodo
-            periodo_obj = db.query(Periodo).filter(Periodo.Periodo == periodo).first()
-            if periodo_obj:
-                periodo_id = periodo_obj.Id_Periodo
-                
-                # Eliminar registros de validación anteriores para este periodo/formato
-                validaciones_eliminadas = db.query(Validacion).filter(
-                    Validacion.Id_Periodo == periodo_id,
-                    Validacion.Id_Formato == 1  # Formato de matrícula
-                ).delete()
-                
-                db.commit()
-                print(f"✅ {validaciones_eliminadas} validaciones previas eliminadas")
-                print(f"   Los validadores pueden volver a validar/rechazar")
-            else:
-                print(f"⚠️  No se pudo obtener ID del periodo para limpiar validaciones")
-                
-        except Exception as sp_error:
-            print(f"ERROR al ejecutar SP: {sp_error}")
-            raise
-        
-        # Verificar que Temp_Matricula quedó vacía (el SP hace TRUNCATE)
-        temp_count_after = db.query(Temp_Matricula).count()
-        
-        print(f"Registros en Temp_Matricula después: {temp_count_after}")
-        print("=== ACTUALIZACIÓN COMPLETADA ===")
-        
-        return {
-            "mensaje": "Matrícula actualizada exitosamente",
-            "registros_procesados": temp_count,
-            "temp_matricula_limpiada": temp_count_after == 0,
-            "usuario": usuario_sp,
-            "periodo": periodo,
-            "timestamp": datetime.now().isoformat()
-        }
-        
+
+        return actualizar_matricula_unidad(db, **parametros)
+
     except Exception as e:
         db.rollback()
         print(f"ERROR al actualizar matrícula: {str(e)}")
@@ -1138,7 +1218,8 @@ async def preparar_turno(request: Request, db: Session = Depends(get_db)):
         print(f"   Nivel: {nivel_nombre}")
         print(f"   Período: {periodo_literal}")
         
-        # Ejecutar SP de Unidad Académica (igual que Guardar Avance)
+        # Ejecutar SP de Unidad Académica (igual que Guardar Avance); la versión se confirma con el SP
+        incrementar_version_periodo(db, id_unidad_academica, periodo_literal)
         rows_list = execute_sp_actualiza_matricula_por_unidad_academica(
             db,
             unidad_sigla=unidad_sigla,
@@ -1178,6 +1259,29 @@ async def preparar_turno(request: Request, db: Session = Depends(get_db)):
         }
 
 
+def _resolver_parametros_consolidacion(request: Request, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Resuelve desde cookies y body los parámetros de la consolidación de un semestre."""
+    # Obtener datos del usuario desde cookies
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+
+    # Construir nombre completo del usuario
+    nombre_completo = f"{nombre_usuario} {apellidoP_usuario} {apellidoM_usuario}".strip()
+
+    return {
+        "id_unidad_academica": int(request.cookies.get("id_unidad_academica", 0)),
+        "id_nivel": int(request.cookies.get("id_nivel", 0)),
+        "periodo": data.get('periodo'),
+        "programa": data.get('programa'),
+        "modalidad": data.get('modalidad'),
+        "semestre": data.get('semestre'),
+        # Nota: El SP requiere @SSalones, lo obtenemos del request (Total Grupos)
+        "total_grupos": data.get('total_grupos', 0),
+        "usuario_sp": nombre_completo or 'sistema',
+        "host_sp": get_request_host(request),
+    }
+
 @router.post("/validar_captura_semestre")
 async def validar_captura_semestre(request: Request, db: Session = Depends(get_db)):
     """
@@ -1193,27 +1297,12 @@ async def validar_captura_semestre(request: Request, db: Session = Depends(get_d
     try:
         # Obtener datos del request
         data = await request.json()
-        
-        # Parámetros necesarios
-        periodo = data.get('periodo')
-        programa = data.get('programa')
-        modalidad = data.get('modalidad')
-        semestre = data.get('semestre')
-        
-        # Obtener datos del usuario desde cookies
-        id_unidad_academica = int(request.cookies.get("id_unidad_academica", 0))
-        id_nivel = int(request.cookies.get("id_nivel", 0))
-        nombre_usuario = request.cookies.get("nombre_usuario", "")
-        apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
-        apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
-        
-        # Construir nombre completo del usuario
-        nombre_completo = f"{nombre_usuario} {apellidoP_usuario} {apellidoM_usuario}".strip()
-        usuario_sp = nombre_completo or 'sistema'
-        
-        # Obtener host
-        host_sp = get_request_host(request)
-        
+        parametros = _resolver_parametros_consolidacion(request, data)
+        periodo = parametros["periodo"]
+        programa = parametros["programa"]
+        modalidad = parametros["modalidad"]
+        semestre = parametros["semestre"]
+
         print(f"\n{'='*60}")
         print(f"EJECUTANDO SP FINAL - CONSOLIDACIÓN DEL SEMESTRE COMPLETO")
         print(f"{'='*60}")
@@ -1222,9 +1311,9 @@ async def validar_captura_semestre(request: Request, db: Session = Depends(get_d
         print(f"Programa ID: {programa}")
         print(f"Modalidad ID: {modalidad}")
         print(f"Semestre ID: {semestre}")
-        print(f"Usuario: {usuario_sp}")
-        print(f"Host: {host_sp}")
-        
+        print(f"Usuario: {parametros['usuario_sp']}")
+        print(f"Host: {parametros['host_sp']}")
+
         # Validar parámetros obligatorios (sin turno)
         if not all([periodo, programa, modalidad, semestre]):
             return {
@@ -1237,238 +1326,8 @@ async def validar_captura_semestre(request: Request, db: Session = Depends(get_d
                 }
             }
 
-        # Convertir período a literal si viene como ID (el SP requiere literal ej: '2025-2026/1')
-        if str(periodo).isdigit():
-            periodo_obj = db.query(Periodo).filter(Periodo.Id_Periodo == int(periodo)).first()
-            periodo_literal = periodo_obj.Periodo if periodo_obj else PERIODO_DEFAULT_LITERAL
-            print(f"🔄 Período convertido de ID {periodo} → '{periodo_literal}'")
-        else:
-            periodo_literal = str(periodo)
-            print(f"✅ Período en literal: '{periodo_literal}'")
-        
-        # Obtener nombres literales desde la BD para el SP
-        # Unidad Académica
-        unidad = db.query(Unidad_Academica).filter(
-            Unidad_Academica.Id_Unidad_Academica == id_unidad_academica
-        ).first()
-        unidad_sigla = unidad.Sigla if unidad else ''
-        
-        # Programa
-        programa_obj = db.query(Programas).filter(
-            Programas.Id_Programa == int(programa)
-        ).first()
-        programa_nombre = programa_obj.Nombre_Programa if programa_obj else ''
-        
-        # Modalidad
-        modalidad_obj = db.query(Modalidad).filter(
-            Modalidad.Id_Modalidad == int(modalidad)
-        ).first()
-        modalidad_nombre = modalidad_obj.Modalidad if modalidad_obj else ''
-        
-        # Semestre
-        semestre_obj = db.query(Semestre).filter(
-            Semestre.Id_Semestre == int(semestre)
-        ).first()
-        semestre_nombre = semestre_obj.Semestre if semestre_obj else ''
-        
-        # Nivel
-        nivel_obj = db.query(Nivel).filter(
-            Nivel.Id_Nivel == id_nivel
-        ).first()
-        nivel_nombre = nivel_obj.Nivel if nivel_obj else ''
-        
-        print(f"\n📋 Valores literales para el SP:")
-        print(f"Unidad Académica: {unidad_sigla}")
-        print(f"Programa: {programa_nombre}")
-        print(f"Modalidad: {modalidad_nombre}")
-        print(f"Semestre: {semestre_nombre}")
-        print(f"Nivel: {nivel_nombre}")
-        print(f"Período (literal): {periodo_literal}")
-        
-        # Validar que se obtuvieron todos los valores
-        if not all([unidad_sigla, programa_nombre, modalidad_nombre, semestre_nombre, nivel_nombre]):
-            return {
-                "error": "No se pudieron obtener los nombres literales de los catálogos",
-                "detalles": {
-                    "unidad": unidad_sigla,
-                    "programa": programa_nombre,
-                    "modalidad": modalidad_nombre,
-                    "semestre": semestre_nombre,
-                    "nivel": nivel_nombre
-                }
-            }
-        
-        # Ejecutar el SP SP_Actualiza_Matricula_Por_Semestre_AU
-        # Nota: El SP requiere @SSalones, lo obtenemos del request (Total Grupos)
-        total_grupos = int(data.get('total_grupos', 0) or 0)
-        print(f"Total de Grupos (salones) para validación: {total_grupos}")
-        
-        # Ejecutar SP de validación por semestre
-        rows_list = execute_sp_actualiza_matricula_por_semestre_au(
-            db,
-            unidad_sigla=unidad_sigla,
-            programa_nombre=programa_nombre,
-            modalidad_nombre=modalidad_nombre,
-            semestre_nombre=semestre_nombre,
-            salones=total_grupos,
-            usuario=usuario_sp,
-            periodo=periodo_literal,
-            host=host_sp,
-            nivel=nivel_nombre,
-        )
-        
-        print(f"\n✅ SP_Actualiza_Matricula_Por_Semestre_AU ejecutado exitosamente")
-        print(f"Filas finales devueltas: {len(rows_list)}")
-        
-        # VERIFICAR SI SE DEBE EJECUTAR SP_Finaliza_Captura_Matricula
-        print(f"\n{'='*60}")
-        print(f"🔍 VERIFICANDO CONDICIONES PARA SP_Finaliza_Captura_Matricula")
-        print(f"{'='*60}")
-        
-        # Obtener el período como ID para consultar SemaforoUnidadAcademica
-        if str(periodo).isdigit():
-            periodo_id = int(periodo)
-        else:
-            periodo_obj = db.query(Periodo).filter(Periodo.Periodo == periodo_literal).first()
-            periodo_id = periodo_obj.Id_Periodo if periodo_obj else PERIODO_DEFAULT_ID
-        
-        # Verificar el estado del semáforo general en SemaforoUnidadAcademica
-        semaforo_unidad = db.query(SemaforoUnidadAcademica).filter(
-            SemaforoUnidadAcademica.Id_Periodo == periodo_id,
-            SemaforoUnidadAcademica.Id_Unidad_Academica == id_unidad_academica,
-            SemaforoUnidadAcademica.Id_Formato == 1  # Formato de matrícula
-        ).first()
-        
-        if not semaforo_unidad:
-            print(f"⚠️  No se encontró registro en SemaforoUnidadAcademica")
-            print(f"   Periodo: {periodo_id}, Unidad: {id_unidad_academica}, Formato: 1")
-            debe_ejecutar_sp_final = False
-        elif semaforo_unidad.Id_Semaforo == 3:
-            print(f"⏭️  SemaforoUnidadAcademica ya está en estado 3 (COMPLETADO)")
-            print(f"   SP_Finaliza_Captura_Matricula ya fue ejecutado previamente")
-            debe_ejecutar_sp_final = False
-        elif semaforo_unidad.Id_Semaforo == 2:
-            print(f"✅ SemaforoUnidadAcademica está en estado 2 (CAPTURA)")
-            print(f"🔍 Verificando que TODOS los semestres estén en estado 3...")
-            
-            # Verificar que TODOS los semestres tengan semáforo 3
-            # Obtenemos todos los semestres del SP
-            rows_metadata, metadata_filas, dbg, nota_rechazo_check = execute_matricula_sp_with_context(
-                db,
-                id_unidad_academica,
-                id_nivel,
-                periodo_literal,
-                periodo_literal,
-                usuario_sp,
-                host_sp,
-            )
-            
-            # Contar semestres y verificar sus estados
-            semestres_totales = set()
-            semestres_completados = set()
-            
-            for row in rows_metadata:
-                semestre_row = str(row.get('Semestre', ''))
-                id_semaforo_row = row.get('Id_Semaforo')
-                
-                if semestre_row:
-                    semestres_totales.add(semestre_row)
-                    if id_semaforo_row == 3:
-                        semestres_completados.add(semestre_row)
-            
-            print(f"   📊 Semestres totales: {len(semestres_totales)}")
-            print(f"   ✅ Semestres completados (estado 3): {len(semestres_completados)}")
-            print(f"   📋 Todos los semestres: {sorted(semestres_totales)}")
-            print(f"   ✅ Semestres con estado 3: {sorted(semestres_completados)}")
-            
-            if len(semestres_completados) == len(semestres_totales) and len(semestres_totales) > 0:
-                print(f"\n✅ CONDICIONES CUMPLIDAS:")
-                print(f"   ✅ Todos los semestres están en estado 3")
-                print(f"   ✅ SemaforoUnidadAcademica está en estado 2")
-                debe_ejecutar_sp_final = True
-            else:
-                print(f"\n⏭️  NO se ejecutará SP_Finaliza_Captura_Matricula:")
-                print(f"   Faltan {len(semestres_totales) - len(semestres_completados)} semestres por completar")
-                debe_ejecutar_sp_final = False
-        else:
-            print(f"⚠️  SemaforoUnidadAcademica en estado desconocido: {semaforo_unidad.Id_Semaforo}")
-            debe_ejecutar_sp_final = False
-        
-        # Ejecutar SP_Finaliza_Captura_Matricula solo si se cumplen las condiciones
-        sp_final_ejecutado = False
-        if debe_ejecutar_sp_final:
-            print(f"\n{'='*60}")
-            print(f"🚀 EJECUTANDO SP_Finaliza_Captura_Matricula")
-            print(f"{'='*60}")
-            
-            execute_sp_finaliza_captura_matricula(
-                db,
-                unidad_sigla=unidad_sigla,
-                programa_nombre=programa_nombre,
-                modalidad_nombre=modalidad_nombre,
-                semestre_nombre=semestre_nombre,
-                salones=total_grupos,
-                usuario=usuario_sp,
-                periodo=periodo_literal,
-                host=host_sp,
-                nivel=nivel_nombre,
-            )
-            
-            print(f"✅ SP_Finaliza_Captura_Matricula ejecutado exitosamente")
-            print(f"   SemaforoUnidadAcademica ahora debería estar en estado 3")
-            sp_final_ejecutado = True
-        else:
-            print(f"\n⏭️  SP_Finaliza_Captura_Matricula NO ejecutado (condiciones no cumplidas)")
-        
-        # Verificar semáforo sin SQL crudo: reconsultar SP y extraer estado
-        print(f"\n🔍 Consultando estado actualizado del semáforo vía SP...")
-        estado_semaforo_actualizado = get_estado_semaforo_desde_sp(
-            db,
-            id_unidad_academica=id_unidad_academica,
-            id_nivel=id_nivel,
-            periodo_input=periodo_literal,
-            usuario=usuario_sp,
-            host=host_sp,
-            programa_nombre=programa_nombre,
-            modalidad_nombre=modalidad_nombre,
-            semestre_nombre=semestre_nombre,
-        )
-        
-        # Construir lista de SPs ejecutados
-        sps_ejecutados = ["SP_Actualiza_Matricula_Por_Semestre_AU"]
-        if sp_final_ejecutado:
-            sps_ejecutados.append("SP_Finaliza_Captura_Matricula")
-        
-        # Mensaje apropiado según si se ejecutó el SP final
-        if sp_final_ejecutado:
-            mensaje = f"Semestre {semestre_nombre} consolidado. ¡TODA LA CAPTURA FINALIZADA!"
-        else:
-            mensaje = f"Semestre {semestre_nombre} consolidado (aún faltan semestres por completar)"
-        
-        return {
-            "success": True,
-            "mensaje": mensaje,
-            "rows": rows_list,
-            "semestre_validado": semestre_nombre,
-            "estado_semaforo": estado_semaforo_actualizado,
-            "sp_final_ejecutado": sp_final_ejecutado,
-            "fase": "sp_final_consolidado" if sp_final_ejecutado else "sp_semestre_actualizado",
-            "debug": {
-                "sp_ejecutados": sps_ejecutados,
-                "parametros": {
-                    "unidad": unidad_sigla,
-                    "programa": programa_nombre,
-                    "modalidad": modalidad_nombre,
-                    "semestre": semestre_nombre,
-                    "salones": total_grupos,
-                    "usuario": usuario_sp,
-                    "periodo": periodo_literal,
-                    "host": host_sp,
-                    "nivel": nivel_nombre
-                }
-            }
-        }
-        
+        return consolidar_semestre_matricula(db, **parametros)
+
     except Exception as e:
         db.rollback()
         print(f"\n❌ ERROR al validar captura: {str(e)}")
@@ -1481,6 +1340,56 @@ async def validar_captura_semestre(request: Request, db: Session = Depends(get_d
         }
 
 
+# =============================
+# Variantes en segundo plano (regresan un job id; estado en /jobs/{job_id})
+# =============================
+
+def _respuesta_job(job) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "estado": job.estado,
+        "url_estado": f"/jobs/{job.id}",
+        "url_eventos": f"/jobs/{job.id}/eventos",
+        "url_resultado": f"/jobs/{job.id}/resultado",
+    }
+
+@router.post("/jobs/actualizar_matricula")
+async def actualizar_matricula_job(request: Request, db: Session = Depends(get_db)):
+    """Encola SP_Actualiza_Matricula_Por_Unidad_Academica (+ limpieza de validaciones)."""
+    data = await request.json()
+    parametros = _resolver_parametros_actualizacion(request, db, data)
+    # submit_job escribe el estado en la BD: fuera del event loop
+    job = await run_in_threadpool(
+        submit_job,
+        "actualizar_matricula",
+        int(request.cookies.get("id_unidad_academica", 0)),
+        int(request.cookies.get("id_usuario", 0) or 0),
+        actualizar_matricula_unidad,
+        **parametros,
+    )
+    return _respuesta_job(job)
+
+@router.post("/jobs/validar_captura_semestre")
+async def validar_captura_semestre_job(request: Request):
+    """Encola la consolidación del semestre (SP_Actualiza_Matricula_Por_Semestre_AU y SP_Finaliza_Captura_Matricula)."""
+    data = await request.json()
+    parametros = _resolver_parametros_consolidacion(request, data)
+    if not all([parametros["periodo"], parametros["programa"], parametros["modalidad"], parametros["semestre"]]):
+        return {
+            "error": "Faltan parámetros obligatorios",
+            "detalles": {k: parametros[k] for k in ("periodo", "programa", "modalidad", "semestre")}
+        }
+    job = await run_in_threadpool(
+        submit_job,
+        "validar_captura_semestre",
+        parametros["id_unidad_academica"],
+        int(request.cookies.get("id_usuario", 0) or 0),
+        consolidar_semestre_matricula,
+        **parametros,
+    )
+    return _respuesta_job(job)
+
+
 @router.post("/validar_semestre_rol")
 async def validar_semestre_rol(request: Request, db: Session = Depends(get_db)):
     """
@@ -1504,7 +1413,7 @@ async def validar_semestre_rol(request: Request, db: Session = Depends(get_db)):
         usuario_sp = usuario or 'sistema'
         
         # Validar que sea un rol de validación
-        if id_rol not in [4, 5, 6, 7, 8]:
+        if not es_rol_validador(db, id_rol):
             return {
                 "success": False,
                 "error": "Solo los roles de validación pueden usar esta función"
@@ -1556,6 +1465,8 @@ async def validar_semestre_rol(request: Request, db: Session = Depends(get_db)):
         print(f"   @HHost = '{host_sp}'")
         print(f"   @semaforo = 3")
         
+        # La versión de datos se confirma junto con el SP (que hace commit)
+        version = incrementar_version_periodo(db, id_unidad_academica, periodo_literal)
         execute_sp_valida_matricula(
             db,
             periodo=periodo_literal,
@@ -1567,6 +1478,15 @@ async def validar_semestre_rol(request: Request, db: Session = Depends(get_db)):
         )
         
         print(f"✅ Matrícula validada exitosamente")
+
+        publicar_evento_matricula(id_unidad_academica, resolver_id_periodo(db, periodo_literal), EVENTO_VALIDACION, {
+            "mensaje": f"Matrícula validada por {nombre_completo}",
+            "validado_por": nombre_completo,
+            "id_rol": id_rol,
+            "nombre_rol": request.cookies.get("nombre_rol", ""),
+            "estado_semaforo": 3,
+            "version": version,
+        })
         
         return {
             "success": True,
@@ -1643,7 +1563,7 @@ async def rechazar_semestre_rol(request: Request, db: Session = Depends(get_db))
             print(f"   Esto causará que el SP falle en la validación de usuario/rol")
         
         # Validar que sea un rol de validación
-        if id_rol not in [4, 5, 6, 7, 8]:
+        if not es_rol_validador(db, id_rol):
             return {
                 "success": False,
                 "error": "Solo los roles de validación pueden usar esta función"
@@ -1708,6 +1628,8 @@ async def rechazar_semestre_rol(request: Request, db: Session = Depends(get_db))
         print(f"   @HHost = '{host_sp}'")
         print(f"   @NNota = '{nota_completa[:50]}...'")
         
+        # La versión de datos se confirma junto con el SP (que hace commit)
+        version = incrementar_version_periodo(db, id_unidad_academica, periodo_literal)
         execute_sp_rechaza_matricula(
             db,
             periodo=periodo_literal,
@@ -1718,6 +1640,15 @@ async def rechazar_semestre_rol(request: Request, db: Session = Depends(get_db))
         )
         
         print(f"✅ Matrícula rechazada exitosamente")
+
+        publicar_evento_matricula(id_unidad_academica, resolver_id_periodo(db, periodo_literal), EVENTO_RECHAZO, {
+            "mensaje": f"Matrícula rechazada por {nombre_completo}",
+            "rechazado_por": nombre_completo,
+            "id_rol": id_rol,
+            "nombre_rol": request.cookies.get("nombre_rol", ""),
+            "motivo": motivo,
+            "version": version,
+        })
         
         return {
             "success": True,
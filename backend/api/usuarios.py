@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request, Depends, Query, UploadFile, File, BackgroundTasks
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from backend.core.templates import templates
 from backend.database.connection import get_db
@@ -7,19 +7,20 @@ from backend.services.usuario_service import (
     get_usuario_by_id,
     update_usuario,
     set_usuario_estatus,
-    get_usuarios_by_unidad_con_rol,
-    get_all_usuarios_con_rol,
+    get_usuarios_pagina,
     get_unidad_academica_nombre,
     register_usuario,
     is_super_admin,
     has_admin_permissions
 )
 from backend.services.roles_service import get_all_roles, get_roles_for_user_group
+from backend.services.carga_usuarios_service import provisionar_usuarios_csv, enviar_correos_bienvenida
 from backend.services.bitacora_service import registrar_bitacora
 from backend.services.unidad_services import get_all_units
 from backend.services.nivel_service import get_all_niveles
 from backend.schemas.Usuario import UsuarioCreate, UsuarioResponse
 from sqlalchemy.orm import Session
+from typing import Optional
 import socket
 from backend.utils.request import get_request_host
 
@@ -47,18 +48,10 @@ async def usuarios_view(
     # Verificar si tiene permisos administrativos
     tiene_permisos_admin = has_admin_permissions(db, id_rol)
     
-    # Obtener usuarios según privilegios
+    # Los usuarios se cargan por páginas desde /usuarios/listado
     if es_super_admin:
-        usuarios_con_rol = get_all_usuarios_con_rol(db)
         nombre_ua = "Todas las Unidades Académicas"
     else:
-        usuarios_con_rol = get_usuarios_by_unidad_con_rol(db, id_unidad_academica)
-        # Filtrar para que no aparezca el superadmin 'admin admin admin'
-        usuarios_con_rol = [u for u in usuarios_con_rol if not (
-            getattr(u[0], 'Nombre', '').strip().lower() == 'admin' and
-            getattr(u[0], 'Paterno', '').strip().lower() == 'admin' and
-            getattr(u[0], 'Materno', '').strip().lower() == 'admin'
-        )]
         nombre_ua = get_unidad_academica_nombre(db, id_unidad_academica)
     
     # Filtrar roles según el grupo del rol del usuario logueado
@@ -72,9 +65,9 @@ async def usuarios_view(
         "usuarios.html",
         {
             "request": request,
-            "usuarios_con_rol": usuarios_con_rol,
             "id_rol": id_rol,
             "nombre_ua": nombre_ua,
+            "id_unidad_academica": id_unidad_academica,
             "nombre_usuario": nombre_completo,
             "roles": roles,
             "unidades_academicas": unidades_academicas,
@@ -86,6 +79,43 @@ async def usuarios_view(
     )
 
 
+# Listado paginado de usuarios (keyset) para la tabla de administración
+@router.get("/listado", response_class=JSONResponse)
+async def listado_usuarios(
+    request: Request,
+    cursor: Optional[str] = Query(None),
+    limite: int = Query(50, ge=1, le=200),
+    q: Optional[str] = Query(None, max_length=100),
+    orden: str = Query("nombre"),
+    desc: bool = Query(False),
+    id_unidad_academica: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+):
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+    es_super_admin = is_super_admin(nombre_usuario, apellidoP_usuario, apellidoM_usuario)
+
+    # Solo el super admin puede consultar otras unidades académicas
+    if not es_super_admin:
+        id_unidad_academica = int(request.cookies.get("id_unidad_academica", 1))
+
+    try:
+        pagina = get_usuarios_pagina(
+            db,
+            cursor=cursor,
+            limite=limite,
+            id_unidad_academica=id_unidad_academica,
+            busqueda=q,
+            orden=orden,
+            descendente=desc,
+            excluir_super_admin=not es_super_admin,
+        )
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    return JSONResponse(content=pagina)
+
+
 # Endpoint para registrar usuario desde la misma página
 @router.post("/registrar", response_class=JSONResponse)
 async def registrar_usuario_view(
@@ -135,6 +165,71 @@ async def registrar_usuario_view(
             return JSONResponse(status_code=400, content={"detail": "Email ya está registrado"})
         return JSONResponse(status_code=400, content={"detail": msg})
 
+# Alta masiva de usuarios desde CSV
+# Columnas: Nombre, Paterno, Materno, Email, Id_Rol, Id_Nivel [, Usuario, Id_Unidad_Academica]
+# Endpoint síncrono a propósito: FastAPI lo ejecuta en el threadpool y no bloquea el event loop
+@router.post("/carga_masiva", response_class=JSONResponse)
+def carga_masiva_usuarios(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    archivo: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
+    id_rol = int(request.cookies.get("id_rol", 2))
+    id_unidad_academica = int(request.cookies.get("id_unidad_academica", 1))
+    nombre_usuario = request.cookies.get("nombre_usuario", "")
+    apellidoP_usuario = request.cookies.get("apellidoP_usuario", "")
+    apellidoM_usuario = request.cookies.get("apellidoM_usuario", "")
+    es_super_admin = is_super_admin(nombre_usuario, apellidoP_usuario, apellidoM_usuario)
+
+    if not (es_super_admin or has_admin_permissions(db, id_rol)):
+        return JSONResponse(status_code=403, content={"detail": "No tiene permisos para dar de alta usuarios"})
+
+    # Mismas restricciones que el formulario: UA propia y roles del mismo grupo
+    if es_super_admin:
+        id_unidad_forzada = None
+        roles_permitidos = None
+    else:
+        id_unidad_forzada = id_unidad_academica
+        roles_permitidos = [r.Id_Rol for r in get_roles_for_user_group(db, id_rol)]
+
+    host = get_request_host(request)
+    try:
+        resultado = provisionar_usuarios_csv(
+            db,
+            archivo.file,
+            id_unidad_forzada=id_unidad_forzada,
+            roles_permitidos=roles_permitidos,
+            host=host,
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        return JSONResponse(status_code=400, content={"detail": f"Archivo inválido: {e}"})
+
+    # Los correos de bienvenida se envían después de responder
+    correos = resultado.pop("correos")
+    if correos:
+        background_tasks.add_task(enviar_correos_bienvenida, correos)
+
+    id_usuario_log = request.cookies.get("id_usuario")
+    try:
+        id_usuario_log = int(id_usuario_log) if id_usuario_log is not None else 0
+    except (TypeError, ValueError):
+        id_usuario_log = 0
+    if id_usuario_log > 0 and resultado["creados"]:
+        try:
+            registrar_bitacora(
+                db=db,
+                id_usuario=id_usuario_log,
+                id_modulo=1,
+                id_periodo=7,
+                accion=f"Alta masiva de {resultado['creados']} usuarios desde {archivo.filename}",
+                host=host
+            )
+        except Exception as bitacora_error:
+            print(f"❌ Error al registrar en bitácora: {bitacora_error}")
+
+    return JSONResponse(content=resultado)
+
 # Endpoint para editar usuario desde la misma página
 @router.post("/editar/{id_usuario}", response_class=JSONResponse)
 async def editar_usuario_ajax(
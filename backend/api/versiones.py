@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Request, Depends
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.orm import Session
+
+from backend.database.connection import get_db
+from backend.services.matricula_service import PERIODO_DEFAULT_ID
+from backend.services.usuario_service import is_super_admin
+from backend.services.version_service import (
+    get_version,
+    resolver_id_periodo,
+    etag_version,
+    FORMATO_MATRICULA,
+    FORMATOS,
+)
+
+router = APIRouter()
+
+
+@router.get("/", response_class=JSONResponse)
+def version_datos(
+    request: Request,
+    formato: int = FORMATO_MATRICULA,
+    periodo: str = str(PERIODO_DEFAULT_ID),
+    id_unidad_academica: int = 0,
+    db: Session = Depends(get_db),
+):
+    """
+    Versión vigente de los datos de la UA en sesión para un periodo/formato (una fila).
+    Responde con ETag; si el cliente envía If-None-Match con la misma versión regresa 304.
+    Sólo el super admin puede consultar otra UA con id_unidad_academica.
+    """
+    if formato not in FORMATOS:
+        return JSONResponse(status_code=400, content={"detail": f"Formato inválido: {formato}"})
+
+    id_ua_sesion = int(request.cookies.get("id_unidad_academica", 0) or 0)
+    if id_unidad_academica and id_unidad_academica != id_ua_sesion:
+        if not is_super_admin(
+            request.cookies.get("nombre_usuario", ""),
+            request.cookies.get("apellidoP_usuario", ""),
+            request.cookies.get("apellidoM_usuario", ""),
+        ):
+            return JSONResponse(status_code=403, content={"detail": "No tiene acceso a esta Unidad Académica"})
+    else:
+        id_unidad_academica = id_ua_sesion
+
+    id_periodo = resolver_id_periodo(db, periodo)
+    if not id_periodo:
+        return JSONResponse(status_code=404, content={"detail": f"Período '{periodo}' no encontrado"})
+
+    version = get_version(db, id_unidad_academica, id_periodo, formato)
+    etag = etag_version(id_unidad_academica, id_periodo, formato, version)
+    encabezados = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=encabezados)
+
+    return JSONResponse(
+        content={
+            "id_unidad_academica": id_unidad_academica,
+            "id_periodo": id_periodo,
+            "id_formato": formato,
+            "version": version,
+            "etag": etag,
+        },
+        headers=encabezados,
+    )
@@ -0,0 +1,199 @@
+"""
+Assets estáticos con huella de contenido (fingerprint) y variantes precomprimidas.
+
+- asset_url("js/matricula/carga.js") -> "/static/js/matricula/carga.3f9a1c2b4d.js"
+  (helper global de Jinja). La huella son los primeros 10 hex del SHA-256 del archivo;
+  se recalcula sólo si cambia su mtime/tamaño, así que editar un archivo cambia su URL.
+- StaticFilesConHuella sirve la ruta con huella desde el archivo original con
+  Cache-Control inmutable de un año y, si el cliente lo acepta, su variante .br o .gz.
+  Las variantes viven en frontend/.static_comprimidos/ con la huella en el nombre, por
+  lo que nunca quedan obsoletas; las que falten se generan al primer pedido.
+- Las rutas sin huella (o con una huella vieja) se sirven como antes, sin caché inmutable.
+
+Para generar todas las variantes en el despliegue:
+    python -m backend.core.assets
+"""
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STATIC_DIR = os.path.join(BASE_DIR, "frontend", "static")
+COMPRIMIDOS_DIR = os.path.join(BASE_DIR, "frontend", ".static_comprimidos")
+STATIC_URL = "/static"
+
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+LARGO_HUELLA = 10
+EXTENSIONES_COMPRIMIBLES = {".js", ".css", ".svg", ".json", ".html", ".txt"}
+TAMANO_MINIMO_COMPRESION = 1024
+
+_RE_HUELLA = re.compile(r"^(?P<base>.+)\.(?P<huella>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$" % LARGO_HUELLA)
+
+
+class ManifiestoAssets:
+    """Huellas por ruta relativa a STATIC_DIR, cacheadas por (mtime, tamaño)."""
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+        self._huellas: Dict[str, Tuple[float, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def huella(self, ruta: str) -> Optional[str]:
+        completa = os.path.join(self.directorio, ruta)
+        try:
+            info = os.stat(completa)
+        except OSError:
+            return None
+        cache = self._huellas.get(ruta)
+        if cache and cache[0] == info.st_mtime and cache[1] == info.st_size:
+            return cache[2]
+        with open(completa, "rb") as archivo:
+            huella = hashlib.sha256(archivo.read()).hexdigest()[:LARGO_HUELLA]
+        with self._lock:
+            self._huellas[ruta] = (info.st_mtime, info.st_size, huella)
+        return huella
+
+    def ruta_con_huella(self, ruta: str) -> Optional[str]:
+        huella = self.huella(ruta)
+        if huella is None:
+            return None
+        base, ext = os.path.splitext(ruta)
+        return f"{base}.{huella}{ext}"
+
+    def archivos(self) -> List[str]:
+        rutas = []
+        for raiz, _, nombres in os.walk(self.directorio):
+            for nombre in nombres:
+                rutas.append(os.path.relpath(os.path.join(raiz, nombre), self.directorio).replace(os.sep, "/"))
+        return sorted(rutas)
+
+
+manifiesto = ManifiestoAssets(STATIC_DIR)
+
+
+def asset_url(ruta: str) -> str:
+    """URL con huella de un archivo de frontend/static (o la URL normal si no existe)."""
+    ruta = ruta.lstrip("/")
+    return f"{STATIC_URL}/{manifiesto.ruta_con_huella(ruta) or ruta}"
+
+
+def separar_huella(ruta: str) -> Tuple[str, Optional[str]]:
+    """'js/a.0123456789.js' -> ('js/a.js', '0123456789'); sin huella regresa (ruta, None)."""
+    coincidencia = _RE_HUELLA.match(ruta)
+    if not coincidencia:
+        return ruta, None
+    return coincidencia["base"] + coincidencia["ext"], coincidencia["huella"]
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def codificaciones_disponibles() -> List[Tuple[str, str]]:
+    """(Content-Encoding, sufijo) en orden de preferencia; br sólo si está el paquete Brotli."""
+    codificaciones = [("gzip", ".gz")]
+    if _brotli() is not None:
+        codificaciones.insert(0, ("br", ".br"))
+    return codificaciones
+
+
+def es_comprimible(ruta: str, tamano: int) -> bool:
+    return os.path.splitext(ruta)[1].lower() in EXTENSIONES_COMPRIMIBLES and tamano >= TAMANO_MINIMO_COMPRESION
+
+
+def ruta_variante(ruta_con_huella: str, sufijo: str) -> str:
+    return os.path.join(COMPRIMIDOS_DIR, *ruta_con_huella.split("/")) + sufijo
+
+
+def generar_variante(origen: str, destino: str, codificacion: str) -> None:
+    """Comprime `origen` en `destino` (escritura atómica: archivo temporal + replace)."""
+    with open(origen, "rb") as archivo:
+        contenido = archivo.read()
+    if codificacion == "br":
+        comprimido = _brotli().compress(contenido, quality=11)
+    else:
+        comprimido = gzip.compress(contenido, compresslevel=9, mtime=0)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporal = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(comprimido)
+    os.replace(temporal, destino)
+
+
+def precomprimir_assets() -> int:
+    """Genera las variantes .br/.gz que falten para todos los assets; regresa cuántas creó."""
+    creadas = 0
+    for ruta in manifiesto.archivos():
+        origen = os.path.join(STATIC_DIR, ruta)
+        if not es_comprimible(ruta, os.path.getsize(origen)):
+            continue
+        con_huella = manifiesto.ruta_con_huella(ruta)
+        for codificacion, sufijo in codificaciones_disponibles():
+            destino = ruta_variante(con_huella, sufijo)
+            if not os.path.exists(destino):
+                generar_variante(origen, destino, codificacion)
+                creadas += 1
+    return creadas
+
+
+def codificaciones_aceptadas(accept_encoding: str) -> set:
+    aceptadas = set()
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = parametros.strip()
+        if calidad.startswith("q=") and calidad[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        aceptadas.add(nombre.strip().lower())
+    return aceptadas
+
+
+class StaticFilesConHuella(StaticFiles):
+    """StaticFiles que entiende las rutas con huella de asset_url()."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        ruta = path.replace(os.sep, "/")
+        original, huella = separar_huella(ruta)
+        if huella is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        completa, info = await anyio.to_thread.run_sync(self.lookup_path, original)
+        if info is None:
+            return await super().get_response(path, scope)
+        if huella != await anyio.to_thread.run_sync(manifiesto.huella, original):
+            # Huella vieja (p. ej. una página en caché tras un despliegue): contenido vigente, sin caché larga
+            respuesta = self.file_response(completa, info, scope)
+            respuesta.headers["Cache-Control"] = "no-cache"
+            return respuesta
+
+        media_type = mimetypes.guess_type(original)[0] or "text/plain"
+        encabezados = {"Cache-Control": CACHE_INMUTABLE, "Vary": "Accept-Encoding"}
+        if es_comprimible(original, info.st_size):
+            aceptadas = codificaciones_aceptadas(dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1"))
+            for codificacion, sufijo in codificaciones_disponibles():
+                if codificacion not in aceptadas:
+                    continue
+                variante = ruta_variante(ruta, sufijo)
+                if not os.path.exists(variante):
+                    await anyio.to_thread.run_sync(generar_variante, completa, variante, codificacion)
+                return FileResponse(
+                    variante, media_type=media_type,
+                    headers={**encabezados, "Content-Encoding": codificacion},
+                )
+        return FileResponse(completa, stat_result=info, media_type=media_type, headers=encabezados)
+
+
+if __name__ == "__main__":
+    print(f"Variantes comprimidas creadas: {precomprimir_assets()} (en {COMPRIMIDOS_DIR})")
@@ -19,6 +19,55 @@ class Settings(BaseSettings):
 	DB_NAME: str = ""
 	DB_DRIVER: str = "ODBC Driver 17 for SQL Server"
 
+	# Backend de Stored Procedures: "sqlserver" (EXEC real) o "emulado" (implementación en
+	# Python sobre las tablas ORM, para pruebas y benchmarks sin SQL Server, p. ej. con
+	# DATABASE_URL=sqlite:///sae_local.db)
+	SP_BACKEND: str = "sqlserver"
+
+	# Alta masiva de usuarios: procesos para el hash bcrypt (0 = número de CPUs)
+	CARGA_MASIVA_HASH_WORKERS: int = 0
+
+	# Trabajos en segundo plano (SPs largos): hilos del ejecutor y tiempo que se conserva el resultado
+	JOBS_MAX_WORKERS: int = 4
+	JOBS_TTL_SEGUNDOS: int = 3600
+	# Hilos aparte para procesos institucionales (carga INEGI, snapshots): no ocupan los de matrícula
+	JOBS_MANTENIMIENTO_WORKERS: int = 1
+	# Estado de los trabajos en Trabajos_Segundo_Plano para consultarlo desde cualquier worker;
+	# los workers que no ejecutan el trabajo sondean la tabla cada JOBS_SONDEO_SEGUNDOS (SSE)
+	JOBS_PERSISTIR: bool = True
+	JOBS_SONDEO_SEGUNDOS: float = 2.0
+	# Bloqueo de BD por cola (sp_getapplock en SQL Server) para serializar entre workers;
+	# un trabajo cuya cola tiene otro worker se reintenta cada JOBS_REINTENTO_BLOQUEO_SEGUNDOS
+	JOBS_BLOQUEO_BD: bool = True
+	JOBS_REINTENTO_BLOQUEO_SEGUNDOS: float = 5.0
+
+	# Eventos en vivo de matrícula (SSE): cada cuánto el vigilante de cada UA/periodo con
+	# streams abiertos revisa Version_Datos para detectar escrituras de otros workers
+	EVENTOS_REVISION_SEGUNDOS: float = 20.0
+
+	# Consultas de sólo lectura independientes que una vista ejecuta a la vez (cada una con su conexión)
+	CONSULTAS_PARALELAS_WORKERS: int = 8
+
+	# Snapshots columnares de Matricula (Parquet/Arrow) para analítica
+	SNAPSHOTS_DIR: str = "snapshots"
+	SNAPSHOTS_CONSERVAR: int = 12
+
+	# Comparativo contra el periodo anterior: una celda es atípica si cambia al menos
+	# este porcentaje Y al menos este número de alumnos
+	COMPARATIVO_UMBRAL_PCT: float = 30.0
+	COMPARATIVO_UMBRAL_ALUMNOS: int = 20
+
+	# Plantillas: bytecode de Jinja compartido entre workers y reinicios ("" = frontend/.jinja_cache)
+	# y caché de fragmentos derivados de catálogos ({% cache %}), por proceso
+	JINJA_BYTECODE_DIR: str = ""
+	FRAGMENTOS_CACHE_MAX: int = 256
+	FRAGMENTOS_CACHE_TTL_SEGUNDOS: int = 600
+	# Cada cuánto se vuelve a consultar la versión de los catálogos en la base
+	CATALOGOS_VERSION_TTL_SEGUNDOS: int = 30
+
+	# Índice en memoria de Entidades_Municipios (autocompletar localidades): cada cuánto se revisa la tabla
+	LOCALIDADES_REVISION_SEGUNDOS: int = 300
+
 	model_config = {
 		"env_file": ".env",
 		"case_sensitive": False,
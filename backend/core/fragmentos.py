@@ -0,0 +1,128 @@
+"""
+Caché de fragmentos de plantilla para bloques derivados de catálogos.
+
+    {% cache "opciones_rama", version_catalogos %}
+        ... HTML que sólo depende de los catálogos ...
+    {% endcache %}
+
+El primer argumento nombra el fragmento; el resto forma la llave junto con el nombre
+de la plantilla. Las vistas pasan `version_catalogos` (ver catalogos_service), así que
+editar un catálogo cambia la llave y el fragmento se vuelve a generar sin invalidar nada
+a mano.
+
+Sólo sirve si la llave se conoce antes de consultar: la vista revisa fragmento_en_cache()
+y omite el SP. Los bloques con filas de SPs que dependen de quien consulta (los SPs de
+catálogo reciben el usuario y algunos la unidad académica) no se cachean: su llave
+tendría que incluir las filas, y para entonces el SP ya se ejecutó.
+
+La caché vive en memoria de cada proceso, acotada a FRAGMENTOS_CACHE_MAX
+fragmentos (LRU) con vigencia de FRAGMENTOS_CACHE_TTL_SEGUNDOS.
+
+Perezoso permite pasar al contexto datos que sólo se consultan si el fragmento que los
+usa no está en caché.
+"""
+from collections import OrderedDict
+from collections.abc import Sequence
+from jinja2 import nodes
+from jinja2.ext import Extension
+from typing import Any, Callable, Optional, Tuple
+
+import hashlib
+import threading
+import time
+
+from backend.core.config import settings
+
+
+class CacheFragmentos:
+    """LRU con vigencia: llave -> (instante, HTML renderizado)."""
+
+    def __init__(self, maximo: int, ttl_segundos: float):
+        self.maximo = maximo
+        self.ttl_segundos = ttl_segundos
+        self._fragmentos: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, llave: str) -> Optional[str]:
+        with self._lock:
+            en_cache = self._fragmentos.get(llave)
+            if en_cache is None:
+                return None
+            if time.monotonic() - en_cache[0] >= self.ttl_segundos:
+                del self._fragmentos[llave]
+                return None
+            self._fragmentos.move_to_end(llave)
+            return en_cache[1]
+
+    def guardar(self, llave: str, html: str) -> None:
+        with self._lock:
+            self._fragmentos[llave] = (time.monotonic(), html)
+            self._fragmentos.move_to_end(llave)
+            while len(self._fragmentos) > self.maximo:
+                self._fragmentos.popitem(last=False)
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._fragmentos.clear()
+
+    def __len__(self) -> int:
+        return len(self._fragmentos)
+
+
+fragmentos = CacheFragmentos(settings.FRAGMENTOS_CACHE_MAX, settings.FRAGMENTOS_CACHE_TTL_SEGUNDOS)
+
+
+def llave_fragmento(plantilla: str, nombre: str, argumentos: Tuple[Any, ...]) -> str:
+    return hashlib.sha1(repr((plantilla, nombre, argumentos)).encode("utf-8")).hexdigest()
+
+
+def fragmento_en_cache(plantilla: str, nombre: str, *argumentos: Any) -> bool:
+    """True si {% cache nombre, *argumentos %} de `plantilla` está vigente (para omitir sus consultas)."""
+    return fragmentos.obtener(llave_fragmento(plantilla, nombre, argumentos)) is not None
+
+
+class CacheFragmentosExtension(Extension):
+    """Etiqueta {% cache "nombre", arg1, arg2 %}...{% endcache %}."""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        argumentos = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            argumentos.append(parser.parse_expression())
+        cuerpo = parser.parse_statements(("name:endcache",), drop_needle=True)
+        llamada = self.call_method("_renderizar", [nodes.Const(parser.name), nodes.List(argumentos)])
+        return nodes.CallBlock(llamada, [], [], cuerpo).set_lineno(lineno)
+
+    def _renderizar(self, plantilla: str, argumentos: list, caller: Callable[[], str]) -> str:
+        llave = llave_fragmento(plantilla, argumentos[0], tuple(argumentos[1:]))
+        html = fragmentos.obtener(llave)
+        if html is None:
+            html = caller()
+            fragmentos.guardar(llave, html)
+        return html
+
+
+class Perezoso(Sequence):
+    """Lista que llama a `funcion(*args)` la primera vez que se lee (p. ej. desde un fragmento)."""
+
+    def __init__(self, funcion: Callable[..., Any], *args: Any):
+        self._funcion = funcion
+        self._args = args
+        self._valores = None
+
+    @property
+    def valores(self):
+        if self._valores is None:
+            self._valores = self._funcion(*self._args)
+        return self._valores
+
+    def __getitem__(self, indice):
+        return self.valores[indice]
+
+    def __iter__(self):
+        return iter(self.valores)
+
+    def __len__(self) -> int:
+        return len(self.valores)
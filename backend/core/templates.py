@@ -1,11 +1,23 @@
 import os
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
+from jinja2 import FileSystemBytecodeCache
+from backend.core.assets import STATIC_DIR, StaticFilesConHuella, asset_url
+from backend.core.config import settings
+from backend.core.fragmentos import CacheFragmentosExtension
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Bytecode compilado de las plantillas, compartido entre workers y reinicios: Jinja lo
+# invalida por checksum del fuente y lo escribe de forma atómica (temporal + replace)
+BYTECODE_DIR = settings.JINJA_BYTECODE_DIR or os.path.join(BASE_DIR, "frontend", ".jinja_cache")
+os.makedirs(BYTECODE_DIR, exist_ok=True)
 
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "frontend", "Templates"))
-static = StaticFiles(directory=os.path.join(BASE_DIR, "frontend", "static"))
+templates.env.bytecode_cache = FileSystemBytecodeCache(BYTECODE_DIR)
+# {% cache "nombre", version_catalogos, ... %} para bloques derivados de catálogos (ver backend/core/fragmentos.py)
+templates.env.add_extension(CacheFragmentosExtension)
+# {{ asset_url('js/x.js') }} -> /static/js/x.<huella>.js (caché inmutable, ver backend/core/assets.py)
+templates.env.globals["asset_url"] = asset_url
+static = StaticFilesConHuella(directory=STATIC_DIR)
 
 if __name__ == "__main__":
-    print(BASE_DIR)
\ No newline at end of file
+    print(BASE_DIR)
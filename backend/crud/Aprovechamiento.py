@@ -0,0 +1,57 @@
+"""Este archivo contiene las funciones CRUD para el modelo Aprovechamiento."""
+
+from backend.database.models.Aprovechamiento import Aprovechamiento
+
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+
+
+############################__________________FUNCIONES READ____________________________############################
+def get_totales_aprovechamiento_celdas(
+    db: Session,
+    id_periodo: int,
+    id_unidad_academica: Optional[int] = None,
+) -> List[Any]:
+    """
+    Aprovechamiento del periodo agrupado por (UA, programa, semestre, turno, sexo):
+    suma de los conceptos, número de valores negativos y el mayor total de un solo
+    concepto (Id_Aprovechamiento). Sin UA, regresa toda la institución en la misma consulta.
+
+    La tabla separa cada concepto por modalidad (y rama/nivel), pero la celda no: primero
+    se suma cada concepto dentro de la celda y después se toma el máximo, igual que la
+    matrícula de la celda suma todas las modalidades.
+
+    Supone que SP_Actualiza_Aprovechamiento_Por_Unidad_Academica consolida en la tabla
+    Aprovechamiento con las columnas de Temp_Aprovechamiento (ver el modelo). No se sabe
+    si los conceptos son excluyentes, así que la suma no es comparable con la matrícula;
+    "Maximo" sí lo es si cada concepto cuenta alumnos inscritos en la celda.
+    """
+    celda = (
+        Aprovechamiento.Id_Unidad_Academica,
+        Aprovechamiento.Id_Programa,
+        Aprovechamiento.Id_Semestre,
+        Aprovechamiento.Id_Turno,
+        Aprovechamiento.Id_Sexo,
+    )
+    por_concepto = (
+        select(
+            *celda,
+            func.coalesce(func.sum(Aprovechamiento.Aprovechamiento), 0).label("Total"),
+            func.sum(case((Aprovechamiento.Aprovechamiento < 0, 1), else_=0)).label("Negativos"),
+        )
+        .where(Aprovechamiento.Id_Periodo == id_periodo)
+        .group_by(*celda, Aprovechamiento.Id_Aprovechamiento)
+    )
+    if id_unidad_academica is not None:
+        por_concepto = por_concepto.where(Aprovechamiento.Id_Unidad_Academica == id_unidad_academica)
+    conceptos = por_concepto.subquery()
+
+    llaves = [conceptos.c[c.key] for c in celda]
+    stmt = select(
+        *llaves,
+        func.sum(conceptos.c.Total).label("Total"),
+        func.sum(conceptos.c.Negativos).label("Negativos"),
+        func.max(conceptos.c.Total).label("Maximo"),
+    ).group_by(*llaves)
+    return db.execute(stmt).all()
@@ -0,0 +1,68 @@
+#Este archivo contiene las funciones CRUD para el modelo Bitacora.
+
+from backend.database.models.Bitacora import Bitacora
+
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.orm import Session
+
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+############################__________________FUNCIONES READ____________________________############################
+def _filtrar_bitacora(
+    stmt,
+    id_usuario: Optional[int] = None,
+    id_modulo: Optional[int] = None,
+    id_periodo: Optional[int] = None,
+    host: Optional[str] = None,
+):
+    """Aplica los filtros opcionales. Host se filtra por prefijo para que siga siendo sargable."""
+    if id_usuario is not None:
+        stmt = stmt.where(Bitacora.Id_Usuario == id_usuario)
+    if id_modulo is not None:
+        stmt = stmt.where(Bitacora.Id_Modulo == id_modulo)
+    if id_periodo is not None:
+        stmt = stmt.where(Bitacora.Id_Periodo == id_periodo)
+    if host:
+        stmt = stmt.where(Bitacora.Host.like(f"{host}%"))
+    return stmt
+
+def read_bitacora_page(
+    db: Session,
+    limit: int,
+    despues_de: Optional[Tuple[datetime, int]] = None,
+    id_usuario: Optional[int] = None,
+    id_modulo: Optional[int] = None,
+    id_periodo: Optional[int] = None,
+    host: Optional[str] = None,
+) -> Sequence[Bitacora]:
+    """Página de la bitácora ordenada por (Fecha DESC, Id_Bitacora DESC).
+
+    despues_de es la llave (Fecha, Id_Bitacora) del último registro de la página anterior;
+    la consulta continúa desde ahí sin OFFSET, apoyándose en los índices IX_Bitacora_*.
+    """
+    stmt = _filtrar_bitacora(select(Bitacora), id_usuario, id_modulo, id_periodo, host)
+    if despues_de is not None:
+        fecha, id_bitacora = despues_de
+        stmt = stmt.where(
+            or_(
+                Bitacora.Fecha < fecha,
+                and_(Bitacora.Fecha == fecha, Bitacora.Id_Bitacora < id_bitacora),
+            )
+        )
+    stmt = stmt.order_by(Bitacora.Fecha.desc(), Bitacora.Id_Bitacora.desc()).limit(limit)
+    return db.execute(stmt).scalars().all()
+
+def read_bitacora_resumen(db: Session) -> Sequence[Tuple[int, int, Optional[int], str, int]]:
+    """Conteo de registros agrupado por (Id_Usuario, Id_Modulo, Id_Periodo, Host)."""
+    stmt = (
+        select(
+            Bitacora.Id_Usuario,
+            Bitacora.Id_Modulo,
+            Bitacora.Id_Periodo,
+            Bitacora.Host,
+            func.count().label("Total"),
+        )
+        .group_by(Bitacora.Id_Usuario, Bitacora.Id_Modulo, Bitacora.Id_Periodo, Bitacora.Host)
+    )
+    return db.execute(stmt).all()
@@ -4,10 +4,11 @@ from backend.database.models.Matricula import Matricula
 from backend.database.models.CatPeriodo import CatPeriodo as Periodo
 from backend.database.models.CatUnidadAcademica import CatUnidadAcademica as Unidad_Academica
 from backend.database.models.CatNivel import CatNivel as Nivel
+from backend.database.sp import ejecutar_sp
 
-from sqlalchemy import select, text
+from sqlalchemy import select, func, case
 from sqlalchemy.orm import Session
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 
 
 ############################__________________FUNCIONES CREATE____________________________############################
@@ -66,6 +67,109 @@ def get_distinct_grupo_edad_ids_by_unidad_nivel(db: Session, id_unidad_academica
     return [g.Id_Grupo_Edad for g in result]
 
 
+def stream_matricula(
+    db: Session,
+    id_periodo: Optional[int] = None,
+    id_unidad_academica: Optional[int] = None,
+    id_nivel: Optional[int] = None,
+    id_programa: Optional[int] = None,
+    lote: int = 5000,
+) -> Iterator[Any]:
+    """
+    Recorre la tabla Matricula con filtros opcionales sin materializar el resultado:
+    el cursor se consume por lotes de `lote` filas (stream_results + yield_per).
+    Regresa filas (Row) con las columnas de ID y Matricula.
+    """
+    stmt = select(
+        Matricula.Id_Periodo,
+        Matricula.Id_Unidad_Academica,
+        Matricula.Id_Nivel,
+        Matricula.Id_Programa,
+        Matricula.Id_Rama,
+        Matricula.Id_Modalidad,
+        Matricula.Id_Turno,
+        Matricula.Id_Semestre,
+        Matricula.Id_Grupo_Edad,
+        Matricula.Id_Tipo_Ingreso,
+        Matricula.Id_Sexo,
+        Matricula.Matricula,
+    )
+    if id_periodo is not None:
+        stmt = stmt.where(Matricula.Id_Periodo == id_periodo)
+    if id_unidad_academica is not None:
+        stmt = stmt.where(Matricula.Id_Unidad_Academica == id_unidad_academica)
+    if id_nivel is not None:
+        stmt = stmt.where(Matricula.Id_Nivel == id_nivel)
+    if id_programa is not None:
+        stmt = stmt.where(Matricula.Id_Programa == id_programa)
+    stmt = stmt.order_by(
+        Matricula.Id_Periodo,
+        Matricula.Id_Unidad_Academica,
+        Matricula.Id_Programa,
+        Matricula.Id_Semestre,
+    ).execution_options(stream_results=True, yield_per=lote)
+
+    yield from db.execute(stmt)
+
+
+def get_totales_matricula_ua(
+    db: Session,
+    id_periodo: int,
+    id_unidad_academica: int,
+    id_nivel: Optional[int] = None,
+) -> List[Any]:
+    """Matrícula total de la UA en el periodo agrupada por (programa, semestre, turno)."""
+    stmt = (
+        select(
+            Matricula.Id_Programa,
+            Matricula.Id_Semestre,
+            Matricula.Id_Turno,
+            func.sum(Matricula.Matricula).label("Total"),
+        )
+        .where(
+            Matricula.Id_Periodo == id_periodo,
+            Matricula.Id_Unidad_Academica == id_unidad_academica,
+        )
+        .group_by(Matricula.Id_Programa, Matricula.Id_Semestre, Matricula.Id_Turno)
+    )
+    if id_nivel is not None:
+        stmt = stmt.where(Matricula.Id_Nivel == id_nivel)
+    return db.execute(stmt).all()
+
+
+def get_totales_matricula_celdas(
+    db: Session,
+    id_periodo: int,
+    id_unidad_academica: Optional[int] = None,
+) -> List[Any]:
+    """
+    Matrícula del periodo agrupada por (UA, programa, semestre, turno, sexo): suma y
+    número de valores negativos. Sin UA, regresa toda la institución en la misma consulta.
+    """
+    stmt = (
+        select(
+            Matricula.Id_Unidad_Academica,
+            Matricula.Id_Programa,
+            Matricula.Id_Semestre,
+            Matricula.Id_Turno,
+            Matricula.Id_Sexo,
+            func.sum(Matricula.Matricula).label("Total"),
+            func.sum(case((Matricula.Matricula < 0, 1), else_=0)).label("Negativos"),
+        )
+        .where(Matricula.Id_Periodo == id_periodo)
+        .group_by(
+            Matricula.Id_Unidad_Academica,
+            Matricula.Id_Programa,
+            Matricula.Id_Semestre,
+            Matricula.Id_Turno,
+            Matricula.Id_Sexo,
+        )
+    )
+    if id_unidad_academica is not None:
+        stmt = stmt.where(Matricula.Id_Unidad_Academica == id_unidad_academica)
+    return db.execute(stmt).all()
+
+
 ############################__________________STORED PROCEDURES____________________________############################
 def safe_row_to_dict(row, cols=None) -> Dict[str, Any]:
     """Convertir fila de resultado de SP a diccionario de forma segura."""
@@ -124,25 +228,13 @@ def execute_sp_consulta_matricula(
         Tuple[List[Dict], List[str], Optional[str]]: (filas como dicts, nombres de columnas, nota de rechazo)
     """
     try:
-        # Usar conexión raw para manejar múltiples result sets
-        connection = db.connection()
-        
-        # Ejecutar el SP con parámetros seguros (incluyendo @UUsuario y @HHost)
-        sql = text("""
-            EXEC SP_Consulta_Matricula_Unidad_Academica 
-                @UUnidad_Academica = :unidad, 
-                @PPeriodo = :periodo, 
-                @NNivel = :nivel, 
-                @UUsuario = :usuario, 
-                @HHost = :host
-        """)
-        
-        result = connection.execute(sql, {
-            'unidad': unidad_sigla, 
-            'periodo': periodo, 
-            'nivel': nivel,
-            'usuario': usuario,
-            'host': host
+        # El backend de SPs (SQL Server o emulado) regresa un resultado con varios result sets
+        result = ejecutar_sp(db, "SP_Consulta_Matricula_Unidad_Academica", {
+            'UUnidad_Academica': unidad_sigla,
+            'PPeriodo': periodo,
+            'NNivel': nivel,
+            'UUsuario': usuario,
+            'HHost': host,
         })
         
         # PRIMER RESULT SET: Datos de matrícula
@@ -0,0 +1,80 @@
+#Este archivo contiene las funciones CRUD para el modelo SemaforoUnidadAcademica.
+
+from backend.database.models.SemaforoUnidadAcademica import SemaforoUnidadAcademica
+from backend.database.models.CatUnidadAcademica import CatUnidadAcademica
+from backend.database.models.CatSemaforo import CatSemaforo
+from backend.database.models.Validacion import Validacion
+from backend.database.models.Usuario import Usuario
+
+from sqlalchemy import select, func, case, and_
+from sqlalchemy.orm import Session, aliased
+
+from typing import Sequence
+
+############################__________________FUNCIONES READ____________________________############################
+def _por_formato(columna, id_formato: int):
+    return case((SemaforoUnidadAcademica.Id_Formato == id_formato, columna))
+
+def _conteo_validacion(id_formato: int, validado: int):
+    return func.sum(case((and_(Validacion.Id_Formato == id_formato, Validacion.Validado == validado), 1), else_=0))
+
+def read_avance_unidades(db: Session, id_periodo: int, formatos: Sequence[int]) -> Sequence:
+    """
+    Avance de captura de TODAS las Unidades Académicas para un periodo en una sola consulta:
+    semáforo por formato (Semaforo_Unidad_Academica) y conteo de validaciones/rechazos por
+    formato (Validacion, ligada a la UA a través del usuario que validó).
+
+    Columnas por formato f: sem_{f}, fecha_{f}, val_{f}, rech_{f}; además ultima_validacion.
+    """
+    sem_cols = []
+    for f in formatos:
+        sem_cols.append(func.max(_por_formato(SemaforoUnidadAcademica.Id_Semaforo, f)).label(f"sem_{f}"))
+        sem_cols.append(func.max(_por_formato(SemaforoUnidadAcademica.Fecha_Modificacion, f)).label(f"fecha_{f}"))
+    semaforos = (
+        select(SemaforoUnidadAcademica.Id_Unidad_Academica, *sem_cols)
+        .where(SemaforoUnidadAcademica.Id_Periodo == id_periodo)
+        .group_by(SemaforoUnidadAcademica.Id_Unidad_Academica)
+        .subquery("semaforos")
+    )
+
+    val_cols = []
+    for f in formatos:
+        val_cols.append(_conteo_validacion(f, 1).label(f"val_{f}"))
+        val_cols.append(_conteo_validacion(f, 0).label(f"rech_{f}"))
+    validaciones = (
+        select(Usuario.Id_Unidad_Academica, *val_cols, func.max(Validacion.Fecha).label("ultima_validacion"))
+        .join(Usuario, Usuario.Id_Usuario == Validacion.Id_Usuario)
+        .where(Validacion.Id_Periodo == id_periodo)
+        .group_by(Usuario.Id_Unidad_Academica)
+        .subquery("validaciones")
+    )
+
+    columnas = [
+        CatUnidadAcademica.Id_Unidad_Academica,
+        CatUnidadAcademica.Sigla,
+        CatUnidadAcademica.Nombre,
+    ]
+    stmt_joins = []
+    for f in formatos:
+        cat = aliased(CatSemaforo, name=f"cat_semaforo_{f}")
+        columnas += [
+            semaforos.c[f"sem_{f}"],
+            semaforos.c[f"fecha_{f}"],
+            cat.Descripcion_Semaforo.label(f"desc_{f}"),
+            cat.Color_Semaforo.label(f"color_{f}"),
+            validaciones.c[f"val_{f}"],
+            validaciones.c[f"rech_{f}"],
+        ]
+        stmt_joins.append((cat, cat.Id_Semaforo == semaforos.c[f"sem_{f}"]))
+    columnas.append(validaciones.c.ultima_validacion)
+
+    stmt = (
+        select(*columnas)
+        .select_from(CatUnidadAcademica)
+        .outerjoin(semaforos, semaforos.c.Id_Unidad_Academica == CatUnidadAcademica.Id_Unidad_Academica)
+        .outerjoin(validaciones, validaciones.c.Id_Unidad_Academica == CatUnidadAcademica.Id_Unidad_Academica)
+    )
+    for cat, condicion in stmt_joins:
+        stmt = stmt.outerjoin(cat, condicion)
+    stmt = stmt.order_by(CatUnidadAcademica.Sigla)
+    return db.execute(stmt).all()
@@ -3,13 +3,14 @@
 from backend.crud import CatUnidadAcademica
 from backend.database.models.Usuario import Usuario
 from backend.database.models.CatUnidadAcademica import CatUnidadAcademica
+from backend.database.models.CatRoles import CatRoles
 from backend.schemas.Usuario import UsuarioCreate, UsuarioResponse
 
-from sqlalchemy import select
+from sqlalchemy import select, func, and_, or_, not_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from typing import Optional, Sequence
+from typing import Any, Optional, Sequence, Tuple
 
 ############################__________________FUNCIONES CREATE____________________________############################
 def create_usuario(db: Session, user_data: UsuarioCreate) -> Usuario:
@@ -101,4 +102,101 @@ def get_usuarios_by_unidad(db: Session, id_unidad_academica: int) -> Sequence[Us
     )
 
 def get_usuario_by_id(db: Session, id_usuario: int) -> Optional[Usuario]:
-    return db.query(Usuario).filter(Usuario.Id_Usuario == id_usuario).first()
\ No newline at end of file
+    return db.query(Usuario).filter(Usuario.Id_Usuario == id_usuario).first()
+
+def _campo_normalizado(columna):
+    return func.lower(func.ltrim(func.rtrim(func.coalesce(columna, ""))))
+
+def filtro_excluir_super_admin():
+    """Condición SQL que excluye la cuenta de super admin ('admin admin admin')."""
+    return not_(
+        and_(
+            _campo_normalizado(Usuario.Nombre) == "admin",
+            _campo_normalizado(Usuario.Paterno) == "admin",
+            _campo_normalizado(Usuario.Materno) == "admin",
+        )
+    )
+
+# Columnas por las que se puede ordenar el listado paginado (siempre con Id_Usuario como desempate)
+COLUMNAS_ORDEN_USUARIOS = {
+    "nombre": func.coalesce(Usuario.Nombre, ""),
+    "usuario": Usuario.Usuario,
+    "email": func.coalesce(Usuario.Email, ""),
+}
+
+def _escapar_like(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("[", "\\[")
+
+def read_usuarios_page(
+    db: Session,
+    limit: int,
+    id_unidad_academica: Optional[int] = None,
+    busqueda: Optional[str] = None,
+    orden: str = "nombre",
+    descendente: bool = False,
+    despues_de: Optional[Tuple[Any, int]] = None,
+    excluir_super_admin: bool = True,
+) -> Sequence[Tuple[Usuario, str, str]]:
+    """Página de usuarios activos con nombre de rol y sigla de UA, paginada por keyset.
+
+    - busqueda: prefijo sobre Nombre, Paterno, Materno, Usuario o Email (LIKE 'texto%').
+    - despues_de: (valor de la columna de orden, Id_Usuario) del último registro de la página anterior.
+    """
+    columna = COLUMNAS_ORDEN_USUARIOS.get(orden, COLUMNAS_ORDEN_USUARIOS["nombre"])
+    stmt = (
+        select(Usuario, CatRoles.Rol.label("NombreRol"), CatUnidadAcademica.Sigla.label("SiglaUA"))
+        .join(CatRoles, Usuario.Id_Rol == CatRoles.Id_Rol)
+        .join(CatUnidadAcademica, Usuario.Id_Unidad_Academica == CatUnidadAcademica.Id_Unidad_Academica)
+        .where(Usuario.Id_Estatus != 3)
+    )
+    if id_unidad_academica is not None:
+        stmt = stmt.where(Usuario.Id_Unidad_Academica == id_unidad_academica)
+    if excluir_super_admin:
+        stmt = stmt.where(filtro_excluir_super_admin())
+    if busqueda:
+        patron = f"{_escapar_like(busqueda)}%"
+        stmt = stmt.where(
+            or_(
+                Usuario.Nombre.like(patron, escape="\\"),
+                Usuario.Paterno.like(patron, escape="\\"),
+                Usuario.Materno.like(patron, escape="\\"),
+                Usuario.Usuario.like(patron, escape="\\"),
+                Usuario.Email.like(patron, escape="\\"),
+            )
+        )
+    if despues_de is not None:
+        valor, id_usuario = despues_de
+        if descendente:
+            stmt = stmt.where(or_(columna < valor, and_(columna == valor, Usuario.Id_Usuario < id_usuario)))
+        else:
+            stmt = stmt.where(or_(columna > valor, and_(columna == valor, Usuario.Id_Usuario > id_usuario)))
+    if descendente:
+        stmt = stmt.order_by(columna.desc(), Usuario.Id_Usuario.desc())
+    else:
+        stmt = stmt.order_by(columna.asc(), Usuario.Id_Usuario.asc())
+    return db.execute(stmt.limit(limit)).all()
+
+def read_usuarios_coincidentes(
+    db: Session,
+    usuarios: Sequence[str],
+    emails: Sequence[str],
+    nombres: Sequence[str],
+) -> Sequence[Tuple[str, str, Optional[str], Optional[str], Optional[str], int]]:
+    """Usuarios existentes cuyo Usuario, Email o Nombre coincide con alguno de los valores dados.
+
+    Devuelve tuplas (Usuario, Email, Nombre, Paterno, Materno, Id_Estatus) en una sola consulta;
+    la comparación fina (persona completa, estatus) se hace en el servicio.
+    """
+    condiciones = []
+    if usuarios:
+        condiciones.append(Usuario.Usuario.in_(list(usuarios)))
+    if emails:
+        condiciones.append(Usuario.Email.in_(list(emails)))
+    if nombres:
+        condiciones.append(Usuario.Nombre.in_(list(nombres)))
+    if not condiciones:
+        return []
+    stmt = select(
+        Usuario.Usuario, Usuario.Email, Usuario.Nombre, Usuario.Paterno, Usuario.Materno, Usuario.Id_Estatus
+    ).where(or_(*condiciones))
+    return db.execute(stmt).all()
@@ -0,0 +1,71 @@
+"""
+Ejecución simultánea de consultas de sólo lectura independientes (p. ej. los SPs de
+catálogos de una vista), cada una en su propia sesión y, por tanto, en su propia
+conexión del pool. La latencia de la página pasa a ser la de la consulta más lenta en
+lugar de la suma de todas.
+
+    resultados = ejecutar_en_paralelo({
+        "rama": consultaRama,          # cada función recibe su Session
+        "entidad": consultaEntidad,
+    })
+
+Las consultas no deben depender entre sí ni escribir: no comparten transacción con la
+sesión de la petición. El ejecutor está acotado a CONSULTAS_PARALELAS_WORKERS hilos, lo
+que también limita las conexiones extra que toma del pool.
+"""
+from backend.core.config import settings
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+import threading
+import time
+
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.CONSULTAS_PARALELAS_WORKERS),
+                thread_name_prefix="sae-consulta",
+            )
+        return _executor
+
+
+def _default_session_factory():
+    from backend.database.db_config import SessionLocal
+    return SessionLocal()
+
+
+def _ejecutar(nombre: str, fn: Callable[[Any], Any], session_factory: Callable[[], Any]) -> Any:
+    inicio = time.perf_counter()
+    db = session_factory()
+    try:
+        return fn(db)
+    finally:
+        db.close()
+        print(f"⏱️ Consulta paralela '{nombre}': {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+
+def ejecutar_en_paralelo(
+    consultas: Dict[str, Callable[[Any], Any]],
+    session_factory: Callable[[], Any] = None,
+) -> Dict[str, Any]:
+    """
+    Ejecuta cada `consultas[nombre](db)` al mismo tiempo y regresa {nombre: resultado}.
+    Espera a que terminen todas; si alguna falló, relanza la primera excepción.
+    """
+    if not consultas:
+        return {}
+    session_factory = session_factory or _default_session_factory
+    executor = _get_executor()
+    futuros = {
+        nombre: executor.submit(_ejecutar, nombre, fn, session_factory)
+        for nombre, fn in consultas.items()
+    }
+    wait(futuros.values())
+    return {nombre: futuro.result() for nombre, futuro in futuros.items()}
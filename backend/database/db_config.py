@@ -15,9 +15,13 @@ DB_PORT = os.getenv('DB_PORT')
 DB_NAME = os.getenv('DB_NAME')
 DB_DRIVER = os.getenv('DB_DRIVER')
 
-DATABASE_URL = f"mssql+pyodbc://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?driver={DB_DRIVER.replace(' ', '+')}"
+# DATABASE_URL permite apuntar a otra BD (p. ej. SQLite con SP_BACKEND=emulado)
+DATABASE_URL = os.getenv('DATABASE_URL') or f"mssql+pyodbc://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?driver={(DB_DRIVER or '').replace(' ', '+')}"
 
-engine = create_engine(DATABASE_URL, echo=False)
+# SQLite: la sesión de un trabajo en segundo plano puede usarse desde otro hilo
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+
+engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+"""
+Esquema de los modelos ORM en una BD local (SQLite) para pruebas y benchmarks.
+
+Base.metadata no se puede crear tal cual fuera de SQL Server: hay llaves foráneas a
+nombres de tabla que no coinciden con los modelos, llaves compuestas con autoincremento
+y Matricula declara como llave sólo (periodo, UA) aunque en producción no tiene llave.
+crear_esquema_local() copia cada tabla sin llaves foráneas, conserva los índices y
+relaja lo que SQLite no acepta. Junto con SP_BACKEND=emulado permite correr los flujos
+sin el servidor de producción.
+"""
+from backend.database.db_base import Base
+
+from sqlalchemy import Column, Index, Integer, MetaData, Table
+from sqlalchemy.engine import Engine
+from typing import List
+
+import importlib
+import pkgutil
+
+# Tablas que en producción no tienen llave primaria (su llave ORM es sólo para el mapeo)
+TABLAS_SIN_LLAVE = {"Matricula"}
+
+
+def cargar_modelos() -> None:
+    """Importa todos los módulos de backend/database/models para registrar sus tablas."""
+    import backend.database.models as modelos
+    for modulo in pkgutil.iter_modules(modelos.__path__):
+        importlib.import_module(f"{modelos.__name__}.{modulo.name}")
+
+
+def metadata_local() -> MetaData:
+    """Copia de Base.metadata apta para SQLite (sin FKs, llaves y autoincremento ajustados)."""
+    cargar_modelos()
+    metadata = MetaData()
+    for tabla in Base.metadata.tables.values():
+        sin_llave = tabla.name in TABLAS_SIN_LLAVE
+        llaves = [c for c in tabla.columns if c.primary_key]
+        columnas = []
+        for c in tabla.columns:
+            es_llave = c.primary_key and not sin_llave
+            columnas.append(Column(
+                c.name,
+                c.type,
+                primary_key=es_llave,
+                autoincrement=es_llave and len(llaves) == 1 and isinstance(c.type, Integer),
+                nullable=not es_llave,
+                server_default=c.server_default.arg if c.server_default is not None else None,
+            ))
+        copia = Table(tabla.name, metadata, *columnas)
+        for indice in tabla.indexes:
+            Index(indice.name, *(copia.c[c.name] for c in indice.columns), unique=indice.unique)
+    return metadata
+
+
+def crear_esquema_local(engine: Engine) -> List[str]:
+    """Crea (si no existen) todas las tablas de los modelos y regresa sus nombres."""
+    metadata = metadata_local()
+    metadata.create_all(engine, checkfirst=True)
+    return sorted(metadata.tables)
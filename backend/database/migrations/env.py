@@ -0,0 +1,48 @@
+"""
+Entorno de Alembic para SAE.
+
+El esquema base lo administran los scripts/SPs de la base; las migraciones de este
+directorio se escriben a mano (índices y objetos auxiliares), por eso no hay
+target_metadata ni autogenerate.
+
+URL de conexión, en orden de prioridad:
+1. alembic -x url=...
+2. sqlalchemy.url en alembic.ini (o config.set_main_option desde código)
+3. DATABASE_URL de backend/database/db_config.py (variables DB_* del .env)
+"""
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+config = context.config
+target_metadata = None
+
+
+def _url() -> str:
+    url = context.get_x_argument(as_dictionary=True).get("url") or config.get_main_option("sqlalchemy.url")
+    if url:
+        return url
+    from backend.database.db_config import DATABASE_URL
+    return DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """Genera el SQL sin conectarse (alembic upgrade head --sql)."""
+    context.configure(url=_url(), target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    seccion = config.get_section(config.config_ini_section, {})
+    seccion["sqlalchemy.url"] = _url()
+    conectable = engine_from_config(seccion, prefix="sqlalchemy.", poolclass=pool.NullPool)
+    with conectable.connect() as conexion:
+        context.configure(connection=conexion, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
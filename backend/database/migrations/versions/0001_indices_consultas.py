@@ -0,0 +1,112 @@
+"""Índices para las consultas más frecuentes
+
+Cubre los filtros calientes que hoy recorren la tabla completa:
+- Validacion por (Id_Periodo, Id_Formato, Validado, Fecha): validaciones/rechazos por periodo
+  y formato, y el tablero de avance.
+- Bitacora por (Id_Usuario, Fecha): bitácora filtrada por usuario (ya puede existir por
+  backend/database/sql/indices_bitacora.sql).
+- Usuarios por Email, Usuario e Id_Estatus: login, recuperación y listados.
+- Matricula por las columnas de get_matricula_by_filters y por (periodo, UA), que usan
+  la exportación, el comparativo y la revisión de consistencia.
+- Semaforo_Unidad_Academica por su llave (Id_Periodo, Id_Unidad_Academica, Id_Formato).
+
+Cada índice se crea sólo si no existe ya uno con el mismo nombre o un índice/llave que
+empiece con las mismas columnas, así que es seguro correrla en bases donde el DBA ya
+creó algunos a mano. El downgrade elimina los índices de esta migración excepto los que
+también declara el modelo (Bitacora), que pudieron existir antes.
+
+Revision ID: 0001_indices_consultas
+Revises:
+Create Date: 2025-10-20
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_indices_consultas"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas, columnas incluidas [sólo SQL Server], único)
+INDICES = (
+    ("IX_Validacion_Periodo_Formato_Validado_Fecha", "Validacion",
+     ("Id_Periodo", "Id_Formato", "Validado", "Fecha"), ("Id_Usuario",), False),
+    ("IX_Bitacora_Usuario_Fecha", "Bitacora",
+     ("Id_Usuario", "Fecha", "Id_Bitacora"), (), False),
+    ("IX_Usuarios_Email", "Usuarios", ("Email",), (), False),
+    ("IX_Usuarios_Usuario", "Usuarios", ("Usuario",), (), False),
+    ("IX_Usuarios_Estatus", "Usuarios", ("Id_Estatus",), (), False),
+    ("IX_Matricula_UA_Nivel_Programa", "Matricula",
+     ("Id_Unidad_Academica", "Id_Nivel", "Id_Programa", "Id_Modalidad", "Id_Semestre", "Id_Turno"),
+     ("Matricula",), False),
+    ("IX_Matricula_Periodo_UA", "Matricula",
+     ("Id_Periodo", "Id_Unidad_Academica", "Id_Programa", "Id_Semestre", "Id_Turno"),
+     ("Id_Sexo", "Matricula"), False),
+    ("IX_Semaforo_UA_Periodo_Formato", "Semaforo_Unidad_Academica",
+     ("Id_Periodo", "Id_Unidad_Academica", "Id_Formato"), ("Id_Semaforo", "Fecha_Modificacion"), False),
+)
+
+# Índices declarados también en los modelos / scripts SQL: el downgrade no los elimina
+INDICES_DEL_MODELO = {"IX_Bitacora_Usuario_Fecha"}
+
+
+def _indices_existentes(inspector, tabla: str):
+    """Nombres y listas de columnas de índices, llaves únicas y llave primaria de la tabla."""
+    nombres = set()
+    columnas = []
+    for indice in inspector.get_indexes(tabla):
+        nombres.add(indice["name"])
+        columnas.append(tuple(indice["column_names"]))
+    for unica in inspector.get_unique_constraints(tabla):
+        nombres.add(unica["name"])
+        columnas.append(tuple(unica["column_names"]))
+    pk = inspector.get_pk_constraint(tabla)
+    if pk and pk.get("constrained_columns"):
+        columnas.append(tuple(pk["constrained_columns"]))
+    return nombres, columnas
+
+
+def _ya_cubierto(nombre, columnas, nombres_existentes, columnas_existentes) -> bool:
+    if nombre in nombres_existentes:
+        return True
+    return any(tuple(existente[: len(columnas)]) == tuple(columnas) for existente in columnas_existentes)
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        # Modo offline (--sql): no hay conexión para inspeccionar; se emiten todos los CREATE INDEX
+        for nombre, tabla, columnas, incluidas, unico in INDICES:
+            op.create_index(nombre, tabla, list(columnas), unique=unico, mssql_include=list(incluidas))
+        return
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tablas = set(inspector.get_table_names())
+    for nombre, tabla, columnas, incluidas, unico in INDICES:
+        if tabla not in tablas:
+            print(f"⚠️ Tabla {tabla} no existe; se omite {nombre}")
+            continue
+        nombres_existentes, columnas_existentes = _indices_existentes(inspector, tabla)
+        if _ya_cubierto(nombre, columnas, nombres_existentes, columnas_existentes):
+            print(f"ℹ️ {nombre}: ya existe un índice equivalente en {tabla}")
+            continue
+        op.create_index(nombre, tabla, list(columnas), unique=unico, mssql_include=list(incluidas))
+        print(f"✅ Índice {nombre} creado en {tabla}")
+
+
+def downgrade() -> None:
+    if op.get_context().as_sql:
+        for nombre, tabla, _, _, _ in reversed(INDICES):
+            if nombre not in INDICES_DEL_MODELO:
+                op.drop_index(nombre, table_name=tabla)
+        return
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tablas = set(inspector.get_table_names())
+    for nombre, tabla, _, _, _ in reversed(INDICES):
+        if tabla not in tablas or nombre in INDICES_DEL_MODELO:
+            continue
+        if nombre in {i["name"] for i in inspector.get_indexes(tabla)}:
+            op.drop_index(nombre, table_name=tabla)
+            print(f"🗑️ Índice {nombre} eliminado de {tabla}")
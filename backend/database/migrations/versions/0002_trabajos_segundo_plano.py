@@ -0,0 +1,69 @@
+"""Tabla de estado de los trabajos en segundo plano
+
+jobs_service guarda en Trabajos_Segundo_Plano el estado y el resultado de cada trabajo
+para que /jobs/{id} responda desde cualquier worker de uvicorn, no sólo desde el proceso
+que lo ejecuta. Las filas se purgan JOBS_TTL_SEGUNDOS después de terminar.
+
+Si la tabla ya existe (p. ej. creada con el esquema local) no se toca, y el downgrade sólo
+la elimina si la creó esta migración: se reconoce por su comentario de tabla. En motores
+sin comentarios de tabla (SQLite) sólo se elimina si está vacía. En modo offline (--sql) no
+se pone el comentario (el dialecto de SQL Server necesita la conexión para el esquema), así
+que una tabla creada desde ese script se conserva en un downgrade en línea.
+
+Revision ID: 0002_trabajos_segundo_plano
+Revises: 0001_indices_consultas
+Create Date: 2025-10-27
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_trabajos_segundo_plano"
+down_revision = "0001_indices_consultas"
+branch_labels = None
+depends_on = None
+
+TABLA = "Trabajos_Segundo_Plano"
+COMENTARIO = "Creada por la migración 0002_trabajos_segundo_plano"
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    if not offline and TABLA in sa.inspect(op.get_bind()).get_table_names():
+        print(f"ℹ️ La tabla {TABLA} ya existe")
+        return
+    op.create_table(
+        TABLA,
+        sa.Column("Id_Trabajo", sa.String(32), primary_key=True),
+        sa.Column("Tipo", sa.String(50), nullable=False),
+        sa.Column("Id_Unidad_Academica", sa.Integer, nullable=False),
+        sa.Column("Id_Usuario", sa.Integer, nullable=False),
+        sa.Column("Estado", sa.String(20), nullable=False),
+        sa.Column("Mensaje", sa.String(255), nullable=False),
+        sa.Column("Fecha_Creacion", sa.DateTime, nullable=False),
+        sa.Column("Fecha_Inicio", sa.DateTime, nullable=True),
+        sa.Column("Fecha_Termino", sa.DateTime, nullable=True),
+        sa.Column("Resultado", sa.Text, nullable=True),
+        sa.Column("Error", sa.Text, nullable=True),
+        comment=None if offline else COMENTARIO,
+    )
+    op.create_index("IX_Trabajos_Usuario_Creacion", TABLA, ["Id_Usuario", "Fecha_Creacion"])
+    op.create_index("IX_Trabajos_Termino", TABLA, ["Fecha_Termino"])
+    print(f"✅ Tabla {TABLA} creada")
+
+
+def _creada_por_esta_migracion(bind) -> bool:
+    inspector = sa.inspect(bind)
+    if TABLA not in inspector.get_table_names():
+        return False
+    if bind.dialect.supports_comments:
+        return inspector.get_table_comment(TABLA).get("text") == COMENTARIO
+    return bind.execute(sa.select(sa.func.count()).select_from(sa.table(TABLA))).scalar() == 0
+
+
+def downgrade() -> None:
+    if not op.get_context().as_sql and not _creada_por_esta_migracion(op.get_bind()):
+        print(f"ℹ️ La tabla {TABLA} no la creó esta migración (o, sin comentarios de tabla, tiene datos); se conserva")
+        return
+    op.drop_index("IX_Trabajos_Termino", table_name=TABLA)
+    op.drop_index("IX_Trabajos_Usuario_Creacion", table_name=TABLA)
+    op.drop_table(TABLA)
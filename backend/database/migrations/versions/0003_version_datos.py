@@ -0,0 +1,59 @@
+"""Tabla Version_Datos (versión de los datos capturados)
+
+Contador de versión por (Unidad Académica, Periodo, Formato). Lo incrementa cada escritura
+de matrícula y aprovechamiento (version_service.incrementar_version); el guardado por
+deltas sólo aplica los cambios si la versión sobre la que editó el cliente sigue vigente
+y, si no, responde 409. Sin esta tabla fallan todos los guardados de captura.
+
+Reemplaza a backend/database/sql/version_datos.sql. Si la tabla ya existe (creada con ese
+script o con el esquema local) no se toca, y el downgrade sólo la elimina si la creó esta
+migración, igual que 0002_trabajos_segundo_plano.
+
+Revision ID: 0003_version_datos
+Revises: 0002_trabajos_segundo_plano
+Create Date: 2025-10-28
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_version_datos"
+down_revision = "0002_trabajos_segundo_plano"
+branch_labels = None
+depends_on = None
+
+TABLA = "Version_Datos"
+COMENTARIO = "Creada por la migración 0003_version_datos"
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    if not offline and TABLA in sa.inspect(op.get_bind()).get_table_names():
+        print(f"ℹ️ La tabla {TABLA} ya existe")
+        return
+    op.create_table(
+        TABLA,
+        sa.Column("Id_Unidad_Academica", sa.Integer, nullable=False),
+        sa.Column("Id_Periodo", sa.Integer, nullable=False),
+        sa.Column("Id_Formato", sa.Integer, nullable=False),
+        sa.Column("Version", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("Fecha_Modificacion", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("Id_Unidad_Academica", "Id_Periodo", "Id_Formato", name="PK_Version_Datos"),
+        comment=None if offline else COMENTARIO,
+    )
+    print(f"✅ Tabla {TABLA} creada")
+
+
+def _creada_por_esta_migracion(bind) -> bool:
+    inspector = sa.inspect(bind)
+    if TABLA not in inspector.get_table_names():
+        return False
+    if bind.dialect.supports_comments:
+        return inspector.get_table_comment(TABLA).get("text") == COMENTARIO
+    return bind.execute(sa.select(sa.func.count()).select_from(sa.table(TABLA))).scalar() == 0
+
+
+def downgrade() -> None:
+    if not op.get_context().as_sql and not _creada_por_esta_migracion(op.get_bind()):
+        print(f"ℹ️ La tabla {TABLA} no la creó esta migración (o, sin comentarios de tabla, tiene datos); se conserva")
+        return
+    op.drop_table(TABLA)
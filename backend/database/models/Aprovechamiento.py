@@ -0,0 +1,22 @@
+from ..db_base import Base
+from sqlalchemy import Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+class Aprovechamiento(Base):
+    __tablename__ = 'Aprovechamiento'
+    __table_args__ = {'extend_existing': True}
+
+    # Tabla consolidada por SP_Actualiza_Aprovechamiento_Por_Unidad_Academica.
+    # SUPUESTO: el repositorio no trae su DDL; se asumen las columnas de Temp_Aprovechamiento
+    # (lo que el SP copia) y la celda completa como llave. Verificar contra el esquema real.
+    Id_Periodo: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Id_Unidad_Academica: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Id_Programa: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Id_Rama: Mapped[int] = mapped_column(Integer, nullable=False)
+    Id_Nivel: Mapped[int] = mapped_column(Integer, nullable=False)
+    Id_Modalidad: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Id_Turno: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Id_Semestre: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Id_Sexo: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Id_Aprovechamiento: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Aprovechamiento: Mapped[int] = mapped_column(Integer, default=0, nullable=True)
@@ -1,11 +1,20 @@
 from ..db_base import Base
 
-from sqlalchemy import String, DateTime, func
+from sqlalchemy import String, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 
 class Bitacora(Base):
     __tablename__ = "Bitacora"
+    # Índices para la consulta paginada por keyset (Fecha DESC, Id_Bitacora DESC).
+    # Cada filtro lleva Fecha e Id_Bitacora al final para que el orden salga del índice.
+    __table_args__ = (
+        Index("IX_Bitacora_Fecha_Id", "Fecha", "Id_Bitacora"),
+        Index("IX_Bitacora_Usuario_Fecha", "Id_Usuario", "Fecha", "Id_Bitacora"),
+        Index("IX_Bitacora_Modulo_Fecha", "Id_Modulo", "Fecha", "Id_Bitacora"),
+        Index("IX_Bitacora_Periodo_Fecha", "Id_Periodo", "Fecha", "Id_Bitacora"),
+        Index("IX_Bitacora_Host_Fecha", "Host", "Fecha", "Id_Bitacora"),
+    )
 
     Id_Bitacora: Mapped[int] = mapped_column(primary_key=True, index=True)
     Id_Usuario: Mapped[int] = mapped_column(nullable=False)
@@ -13,4 +22,4 @@ class Bitacora(Base):
     Id_Periodo: Mapped[int] = mapped_column(nullable=True)
     Acciones: Mapped[str] = mapped_column(String(256), nullable=False)
     Host: Mapped[str] = mapped_column(String(50), nullable=False)
-    Fecha: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(),  nullable=False)
\ No newline at end of file
+    Fecha: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(),  nullable=False)
@@ -6,17 +6,19 @@ from datetime import datetime, timezone
 class Temp_Matricula(Base):
     __tablename__ = "Temp_Matricula"
 
+    # La llave de identidad es la celda completa (periodo, UA, programa, modalidad, turno,
+    # semestre, grupo de edad, tipo de ingreso y sexo) para que merge() haga upsert por celda
     Periodo: Mapped[str] = mapped_column(String(50), primary_key=True, index=True, nullable=True)
     Sigla: Mapped[str] = mapped_column(String(50), primary_key=True, index=True, nullable=True)
-    Nombre_Programa: Mapped[str] = mapped_column(String(100), nullable=True)
+    Nombre_Programa: Mapped[str] = mapped_column(String(100), primary_key=True, nullable=True)
     Nombre_Rama: Mapped[str] = mapped_column(String(50), nullable=True)
     Nivel: Mapped[str] = mapped_column(String(50), nullable=True)
-    Modalidad: Mapped[str] = mapped_column(String(50), nullable=True)
-    Turno: Mapped[str] = mapped_column(String(50), nullable=True)
-    Semestre: Mapped[str] = mapped_column(String(50), nullable=True)
-    Grupo_Edad: Mapped[str] = mapped_column(String(50), nullable=True)
-    Tipo_Ingreso: Mapped[str] = mapped_column(String(50), nullable=True)
-    Sexo: Mapped[str] = mapped_column(String(50), nullable=True)
+    Modalidad: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=True)
+    Turno: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=True)
+    Semestre: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=True)
+    Grupo_Edad: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=True)
+    Tipo_Ingreso: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=True)
+    Sexo: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=True)
     Matricula: Mapped[int] = mapped_column(nullable=True)
     id_semafoto: Mapped[int] = mapped_column(nullable=True)
     Salones: Mapped[int] = mapped_column(nullable=True)
\ No newline at end of file
@@ -0,0 +1,25 @@
+from ..db_base import Base
+
+from sqlalchemy import Integer, String, DateTime, Text, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+
+class TrabajoSegundoPlano(Base):
+    """Estado de los trabajos de jobs_service, compartido entre los workers de uvicorn."""
+    __tablename__ = 'Trabajos_Segundo_Plano'
+    __table_args__ = (
+        Index("IX_Trabajos_Usuario_Creacion", "Id_Usuario", "Fecha_Creacion"),
+        Index("IX_Trabajos_Termino", "Fecha_Termino"),
+    )
+
+    Id_Trabajo: Mapped[str] = mapped_column(String(32), primary_key=True)
+    Tipo: Mapped[str] = mapped_column(String(50), nullable=False)
+    Id_Unidad_Academica: Mapped[int] = mapped_column(Integer, nullable=False)
+    Id_Usuario: Mapped[int] = mapped_column(Integer, nullable=False)
+    Estado: Mapped[str] = mapped_column(String(20), nullable=False)
+    Mensaje: Mapped[str] = mapped_column(String(255), nullable=False)
+    Fecha_Creacion: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    Fecha_Inicio: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    Fecha_Termino: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    Resultado: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON
+    Error: Mapped[str | None] = mapped_column(Text, nullable=True)
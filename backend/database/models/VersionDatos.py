@@ -0,0 +1,14 @@
+from ..db_base import Base
+from sqlalchemy import Integer, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+
+class VersionDatos(Base):
+    __tablename__ = 'Version_Datos'
+
+    Id_Unidad_Academica: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Id_Periodo: Mapped[int] = mapped_column(Integer, primary_key=True)
+    Id_Formato: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Contador monotónico: se incrementa en cada escritura de los datos del formato
+    Version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    Fecha_Modificacion: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,51 @@
+"""
+Ejecución de Stored Procedures con backend intercambiable (settings.SP_BACKEND).
+
+- "sqlserver" (default): arma el mismo EXEC [dbo].[SP] @Param = :Param que se usaba
+  en cada helper y lo ejecuta en la sesión; el resultado es el CursorResult del driver.
+- "emulado": ejecuta la implementación en Python de backend/database/sp/emulado.py
+  sobre las tablas ORM (sirve con SQLite para pruebas y benchmarks sin SQL Server).
+  Regresa un ResultadoSP con la misma interfaz que usan los helpers: fetchall(),
+  keys() y .cursor con fetchall()/description/nextset() para result sets múltiples.
+
+Los parámetros se pasan sin la arroba: {"UUnidad_Academica": "ESCOM", "PPeriodo": ...}.
+"""
+from backend.core.config import settings
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import Any, Dict
+
+import re
+
+SP_BACKEND_SQLSERVER = "sqlserver"
+SP_BACKEND_EMULADO = "emulado"
+SP_BACKENDS = (SP_BACKEND_SQLSERVER, SP_BACKEND_EMULADO)
+
+_NOMBRE_VALIDO = re.compile(r"^\w+$")
+
+
+def sp_emulado_activo() -> bool:
+    return settings.SP_BACKEND == SP_BACKEND_EMULADO
+
+
+def ejecutar_sp(db: Session, nombre: str, parametros: Dict[str, Any]):
+    """
+    Ejecuta el SP `nombre` con `parametros` en el backend configurado. NO hace commit.
+    Antes de ejecutar hace flush de la sesión para que el SP vea lo pendiente
+    (p. ej. los merge() sobre Temp_Matricula).
+    """
+    if settings.SP_BACKEND not in SP_BACKENDS:
+        raise ValueError(f"SP_BACKEND desconocido: {settings.SP_BACKEND} (use {', '.join(SP_BACKENDS)})")
+    if not _NOMBRE_VALIDO.match(nombre) or not all(_NOMBRE_VALIDO.match(k) for k in parametros):
+        raise ValueError(f"Nombre de SP o parámetro inválido: {nombre}")
+
+    if isinstance(db, Session):
+        db.flush()
+
+    if sp_emulado_activo():
+        from backend.database.sp.emulado import ejecutar_sp_emulado
+        return ejecutar_sp_emulado(db, nombre, parametros)
+
+    asignaciones = ", ".join(f"@{k} = :{k}" for k in parametros)
+    return db.execute(text(f"EXEC [dbo].[{nombre}] {asignaciones}"), parametros)
@@ -0,0 +1,556 @@
+"""
+Emulación en Python de los Stored Procedures de matrícula y aprovechamiento.
+
+Reproduce el contrato que usa la aplicación (parámetros, result sets y efectos sobre
+las tablas ORM) para correr flujos completos y benchmarks contra SQLite u otra BD sin
+los SPs de producción. No pretende replicar la lógica interna de SQL Server:
+
+- Los SPs reciben literales (sigla, periodo, nivel, programa...) y aquí se traducen a
+  IDs con los catálogos, igual que lo hacen los SPs reales.
+- El semáforo por semestre y el total de grupos (salones) no tienen modelo ORM; se
+  guardan en la tabla auxiliar SP_Emulado_Semaforo_Semestre, que se crea sola la primera
+  vez y no forma parte de Base.metadata.
+- La consulta de matrícula sólo regresa celdas capturadas (no arma la rejilla vacía).
+- No se escribe en Bitacora (@UUsuario y @HHost sólo se usan para resolver la validación).
+"""
+from backend.database.models.Matricula import Matricula
+from backend.database.models.Temp_Matricula import Temp_Matricula
+from backend.database.models.Aprovechamiento import Aprovechamiento
+from backend.database.models.Temp_Aprovechamiento import Temp_Aprovechamiento
+from backend.database.models.SemaforoUnidadAcademica import SemaforoUnidadAcademica
+from backend.database.models.Validacion import Validacion
+from backend.database.models.Usuario import Usuario
+from backend.database.models.CatPeriodo import CatPeriodo
+from backend.database.models.CatUnidadAcademica import CatUnidadAcademica
+from backend.database.models.CatNivel import CatNivel
+from backend.database.models.CatProgramas import CatProgramas
+from backend.database.models.CatRama import CatRama
+from backend.database.models.CatModalidad import CatModalidad
+from backend.database.models.CatTurno import CatTurno
+from backend.database.models.CatSemestre import CatSemestre
+from backend.database.models.CatGrupoEdad import CatGrupoEdad
+from backend.database.models.CatTipoIngreso import TipoIngreso
+from backend.database.models.CatSexo import CatSexo
+
+from sqlalchemy import Column, Integer, MetaData, Table, and_, bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import threading
+import weakref
+
+FORMATO_MATRICULA = 1
+FORMATO_APROVECHAMIENTO = 2
+
+SEMAFORO_PENDIENTE = 1
+SEMAFORO_CAPTURA = 2
+SEMAFORO_COMPLETADO = 3
+
+# Un result set: (nombres de columnas, filas como tuplas)
+ResultSet = Tuple[Sequence[str], List[tuple]]
+
+COLUMNAS_CONSULTA_MATRICULA = (
+    "Periodo", "Sigla", "Nombre_Programa", "Nombre_Rama", "Nivel", "Modalidad", "Turno", "Semestre",
+    "Grupo_Edad", "Tipo_de_Ingreso", "Sexo", "Matricula", "Id_Semaforo", "Salones",
+)
+COLUMNAS_CONSULTA_APROVECHAMIENTO = (
+    "Id_Programa", "Nombre_Programa", "Id_Rama", "Id_Nivel", "Id_Modalidad", "Modalidad", "Id_Turno", "Turno",
+    "Id_Semestre", "Semestre", "Id_Sexo", "Sexo", "Id_Aprovechamiento", "Aprovechamiento", "Matricula", "Id_Semaforo",
+)
+
+# Llaves de celda (todas las columnas de ID) de las tablas consolidadas
+CELDA_MATRICULA = (
+    "Id_Periodo", "Id_Unidad_Academica", "Id_Programa", "Id_Rama", "Id_Nivel", "Id_Modalidad",
+    "Id_Turno", "Id_Semestre", "Id_Grupo_Edad", "Id_Tipo_Ingreso", "Id_Sexo",
+)
+CELDA_APROVECHAMIENTO = (
+    "Id_Periodo", "Id_Unidad_Academica", "Id_Programa", "Id_Modalidad", "Id_Turno",
+    "Id_Semestre", "Id_Sexo", "Id_Aprovechamiento",
+)
+
+_metadata = MetaData()
+
+semaforo_semestre = Table(
+    "SP_Emulado_Semaforo_Semestre",
+    _metadata,
+    Column("Id_Periodo", Integer, primary_key=True),
+    Column("Id_Unidad_Academica", Integer, primary_key=True),
+    Column("Id_Formato", Integer, primary_key=True),
+    Column("Id_Programa", Integer, primary_key=True),
+    Column("Id_Modalidad", Integer, primary_key=True),
+    Column("Id_Semestre", Integer, primary_key=True),
+    Column("Id_Semaforo", Integer, nullable=False),
+    Column("Salones", Integer, nullable=True),
+)
+
+_tablas_lock = threading.Lock()
+_engines_preparados: "weakref.WeakSet" = weakref.WeakSet()
+
+
+class CursorEmulado:
+    """Imita el cursor DBAPI de pyodbc para SPs con varios result sets."""
+
+    def __init__(self, result_sets: List[ResultSet]):
+        self._result_sets = result_sets or [((), [])]
+        self._indice = 0
+        self._consumido = False
+
+    @property
+    def description(self):
+        columnas, _filas = self._result_sets[self._indice]
+        return [(c, None, None, None, None, None, None) for c in columnas]
+
+    def fetchall(self) -> List[tuple]:
+        if self._consumido:
+            return []
+        self._consumido = True
+        return list(self._result_sets[self._indice][1])
+
+    def nextset(self) -> Optional[bool]:
+        if self._indice + 1 >= len(self._result_sets):
+            return None
+        self._indice += 1
+        self._consumido = False
+        return True
+
+
+class ResultadoSP:
+    """Interfaz mínima de CursorResult que usan los helpers de SPs."""
+
+    def __init__(self, result_sets: List[ResultSet]):
+        self.cursor = CursorEmulado(result_sets)
+
+    def keys(self) -> List[str]:
+        return [d[0] for d in self.cursor.description]
+
+    def fetchall(self) -> List[tuple]:
+        return self.cursor.fetchall()
+
+    def first(self):
+        filas = self.fetchall()
+        return filas[0] if filas else None
+
+
+# =============================
+# Auxiliares
+# =============================
+
+def _asegurar_tablas(db: Session) -> None:
+    """Crea la tabla auxiliar del semáforo por semestre una sola vez por engine."""
+    engine = db.get_bind()
+    with _tablas_lock:
+        if engine in _engines_preparados:
+            return
+        semaforo_semestre.create(db.connection(), checkfirst=True)
+        _engines_preparados.add(engine)
+
+
+def _etiquetas(db: Session, columna_id, columna_desc) -> Dict[int, str]:
+    return {id_: desc for id_, desc in db.query(columna_id, columna_desc).all()}
+
+
+def _id_por_etiqueta(db: Session, columna_id, columna_desc, valor: Any) -> Optional[int]:
+    if valor is None or valor == "":
+        return None
+    return db.query(columna_id).filter(columna_desc == str(valor)).limit(1).scalar()
+
+
+def _contexto(db: Session, p: Dict[str, Any]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """(Id_Periodo, Id_Unidad_Academica, Id_Nivel) a partir de los literales del SP."""
+    return (
+        _id_por_etiqueta(db, CatPeriodo.Id_Periodo, CatPeriodo.Periodo, p.get("PPeriodo")),
+        _id_por_etiqueta(db, CatUnidadAcademica.Id_Unidad_Academica, CatUnidadAcademica.Sigla, p.get("UUnidad_Academica")),
+        _id_por_etiqueta(db, CatNivel.Id_Nivel, CatNivel.Nivel, p.get("NNivel")),
+    )
+
+
+def _id_programa(db: Session, nombre: Any, id_nivel: Optional[int]) -> Optional[int]:
+    """El nombre del programa puede repetirse entre niveles: se prefiere el del nivel del SP."""
+    query = db.query(CatProgramas.Id_Programa).filter(CatProgramas.Nombre_Programa == str(nombre))
+    if id_nivel is not None:
+        id_programa = query.filter(CatProgramas.Id_Nivel == id_nivel).limit(1).scalar()
+        if id_programa is not None:
+            return id_programa
+    return query.limit(1).scalar()
+
+
+def _semestre_ids(db: Session, p: Dict[str, Any], id_nivel: Optional[int]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """(Id_Programa, Id_Modalidad, Id_Semestre) de @PPrograma, @MModalidad y @SSemestre."""
+    return (
+        _id_programa(db, p.get("PPrograma"), id_nivel),
+        _id_por_etiqueta(db, CatModalidad.Id_Modalidad, CatModalidad.Modalidad, p.get("MModalidad")),
+        _id_por_etiqueta(db, CatSemestre.Id_Semestre, CatSemestre.Semestre, p.get("SSemestre")),
+    )
+
+
+def _estados_semestre(db: Session, id_periodo: int, id_ua: int, id_formato: int) -> Dict[Tuple[int, int, int], Tuple[int, Optional[int]]]:
+    """{(programa, modalidad, semestre): (Id_Semaforo, Salones)} de la UA/periodo/formato."""
+    t = semaforo_semestre.c
+    filas = db.execute(
+        select(t.Id_Programa, t.Id_Modalidad, t.Id_Semestre, t.Id_Semaforo, t.Salones).where(
+            t.Id_Periodo == id_periodo, t.Id_Unidad_Academica == id_ua, t.Id_Formato == id_formato,
+        )
+    ).all()
+    return {(f[0], f[1], f[2]): (f[3], f[4]) for f in filas}
+
+
+def _guardar_estado_semestre(
+    db: Session,
+    id_periodo: int,
+    id_ua: int,
+    id_formato: int,
+    llave: Tuple[int, int, int],
+    id_semaforo: int,
+    salones: Optional[int] = None,
+) -> None:
+    """Upsert del semáforo (y salones, si se indican) de un semestre."""
+    t = semaforo_semestre.c
+    filtro = and_(
+        t.Id_Periodo == id_periodo, t.Id_Unidad_Academica == id_ua, t.Id_Formato == id_formato,
+        t.Id_Programa == llave[0], t.Id_Modalidad == llave[1], t.Id_Semestre == llave[2],
+    )
+    valores: Dict[str, Any] = {"Id_Semaforo": id_semaforo}
+    if salones is not None:
+        valores["Salones"] = int(salones)
+    if db.execute(update(semaforo_semestre).where(filtro).values(**valores)).rowcount:
+        return
+    db.execute(insert(semaforo_semestre).values(
+        Id_Periodo=id_periodo, Id_Unidad_Academica=id_ua, Id_Formato=id_formato,
+        Id_Programa=llave[0], Id_Modalidad=llave[1], Id_Semestre=llave[2],
+        Id_Semaforo=id_semaforo, Salones=int(salones) if salones is not None else None,
+    ))
+
+
+def _guardar_semaforo_unidad(
+    db: Session,
+    id_periodo: int,
+    id_ua: int,
+    id_formato: int,
+    id_semaforo: int,
+    finalizar: bool = False,
+) -> None:
+    ahora = datetime.now()
+    semaforo = db.query(SemaforoUnidadAcademica).filter(
+        SemaforoUnidadAcademica.Id_Periodo == id_periodo,
+        SemaforoUnidadAcademica.Id_Unidad_Academica == id_ua,
+        SemaforoUnidadAcademica.Id_Formato == id_formato,
+    ).first()
+    if semaforo is None:
+        semaforo = SemaforoUnidadAcademica(
+            Id_Periodo=id_periodo, Id_Unidad_Academica=id_ua, Id_Formato=id_formato,
+            Fecha_Inicio=ahora,
+        )
+        db.add(semaforo)
+    semaforo.Id_Semaforo = id_semaforo
+    semaforo.Fecha_Modificacion = ahora
+    semaforo.Fecha_Final = ahora if finalizar else None
+    db.flush()
+
+
+def _reemplazar_celdas(db: Session, tabla: Table, llave: Sequence[str], filas: List[Dict[str, Any]]) -> None:
+    """Upsert por celda: borra las celdas recibidas y las vuelve a insertar (executemany)."""
+    if not filas:
+        return
+    condicion = and_(*(tabla.c[c] == bindparam(f"b_{c}") for c in llave))
+    db.execute(delete(tabla).where(condicion), [{f"b_{c}": f[c] for c in llave} for f in filas])
+    db.execute(insert(tabla), filas)
+
+
+def _registrar_validacion(db: Session, id_periodo: int, usuario: Any, validado: int, nota: str) -> None:
+    id_usuario = db.query(Usuario.Id_Usuario).filter(Usuario.Usuario == str(usuario or "")).scalar() or 0
+    validacion = db.get(Validacion, (id_periodo, id_usuario, FORMATO_MATRICULA))
+    if validacion is None:
+        validacion = Validacion(Id_Periodo=id_periodo, Id_Usuario=id_usuario, Id_Formato=FORMATO_MATRICULA)
+        db.add(validacion)
+    validacion.Validado = validado
+    validacion.Nota = nota or None
+    validacion.Fecha = datetime.now()
+    db.flush()
+
+
+def _error_contexto(nombre: str, p: Dict[str, Any]) -> ValueError:
+    return ValueError(
+        f"{nombre}: no se encontró la UA/periodo/nivel "
+        f"({p.get('UUnidad_Academica')!r}, {p.get('PPeriodo')!r}, {p.get('NNivel')!r})"
+    )
+
+
+# =============================
+# Matrícula
+# =============================
+
+def _filas_consulta_matricula(
+    db: Session,
+    id_periodo: int,
+    id_ua: int,
+    id_nivel: Optional[int],
+    semestre: Optional[Tuple[int, int, int]] = None,
+) -> List[tuple]:
+    # Select de columnas: la llave ORM de Matricula es sólo (periodo, UA) y db.query(Matricula)
+    # colapsaría todas las celdas en una identidad
+    m = Matricula.__table__.c
+    stmt = select(Matricula.__table__).where(m.Id_Periodo == id_periodo, m.Id_Unidad_Academica == id_ua)
+    if id_nivel is not None:
+        stmt = stmt.where(m.Id_Nivel == id_nivel)
+    if semestre is not None:
+        stmt = stmt.where(m.Id_Programa == semestre[0], m.Id_Modalidad == semestre[1], m.Id_Semestre == semestre[2])
+    registros = db.execute(stmt.order_by(
+        m.Id_Programa, m.Id_Modalidad, m.Id_Semestre, m.Id_Turno, m.Id_Grupo_Edad, m.Id_Tipo_Ingreso, m.Id_Sexo,
+    )).all()
+    if not registros:
+        return []
+
+    periodo = db.query(CatPeriodo.Periodo).filter(CatPeriodo.Id_Periodo == id_periodo).scalar()
+    sigla = db.query(CatUnidadAcademica.Sigla).filter(CatUnidadAcademica.Id_Unidad_Academica == id_ua).scalar()
+    programas = _etiquetas(db, CatProgramas.Id_Programa, CatProgramas.Nombre_Programa)
+    ramas = _etiquetas(db, CatRama.Id_Rama, CatRama.Nombre_Rama)
+    niveles = _etiquetas(db, CatNivel.Id_Nivel, CatNivel.Nivel)
+    modalidades = _etiquetas(db, CatModalidad.Id_Modalidad, CatModalidad.Modalidad)
+    turnos = _etiquetas(db, CatTurno.Id_Turno, CatTurno.Turno)
+    semestres = _etiquetas(db, CatSemestre.Id_Semestre, CatSemestre.Semestre)
+    grupos = _etiquetas(db, CatGrupoEdad.Id_Grupo_Edad, CatGrupoEdad.Grupo_Edad)
+    tipos = _etiquetas(db, TipoIngreso.Id_Tipo_Ingreso, TipoIngreso.Tipo_de_Ingreso)
+    sexos = _etiquetas(db, CatSexo.Id_Sexo, CatSexo.Sexo)
+    estados = _estados_semestre(db, id_periodo, id_ua, FORMATO_MATRICULA)
+
+    filas = []
+    for r in registros:
+        id_semaforo, salones = estados.get((r.Id_Programa, r.Id_Modalidad, r.Id_Semestre), (SEMAFORO_CAPTURA, None))
+        filas.append((
+            periodo, sigla, programas.get(r.Id_Programa), ramas.get(r.Id_Rama), niveles.get(r.Id_Nivel),
+            modalidades.get(r.Id_Modalidad), turnos.get(r.Id_Turno), semestres.get(r.Id_Semestre),
+            grupos.get(r.Id_Grupo_Edad), tipos.get(r.Id_Tipo_Ingreso), sexos.get(r.Id_Sexo),
+            r.Matricula, id_semaforo, salones,
+        ))
+    return filas
+
+
+def sp_consulta_matricula(db: Session, p: Dict[str, Any]) -> List[ResultSet]:
+    """
+    SP_Consulta_Matricula_Unidad_Academica: celdas de la UA/periodo/nivel con etiquetas,
+    y un segundo result set (Nota) con el motivo del último rechazo vigente.
+    """
+    id_periodo, id_ua, id_nivel = _contexto(db, p)
+    if id_periodo is None or id_ua is None:
+        return [(COLUMNAS_CONSULTA_MATRICULA, []), (("Nota",), [])]
+
+    filas = _filas_consulta_matricula(db, id_periodo, id_ua, id_nivel)
+    ultima = db.query(Validacion).filter(
+        Validacion.Id_Periodo == id_periodo,
+        Validacion.Id_Formato == FORMATO_MATRICULA,
+    ).order_by(Validacion.Fecha.desc()).first()
+    notas = [(ultima.Nota,)] if ultima is not None and not ultima.Validado and ultima.Nota else []
+    return [(COLUMNAS_CONSULTA_MATRICULA, filas), (("Nota",), notas)]
+
+
+def sp_actualiza_matricula_por_unidad_academica(db: Session, p: Dict[str, Any]) -> List[ResultSet]:
+    """
+    SP_Actualiza_Matricula_Por_Unidad_Academica: consolida Temp_Matricula en Matricula
+    (upsert por celda), deja en captura los semestres tocados y la UA, y vacía la temporal.
+    """
+    id_periodo, id_ua, id_nivel = _contexto(db, p)
+    if id_periodo is None or id_ua is None:
+        raise _error_contexto("SP_Actualiza_Matricula_Por_Unidad_Academica", p)
+
+    temporales = db.query(Temp_Matricula).filter(
+        Temp_Matricula.Periodo == p.get("PPeriodo"),
+        Temp_Matricula.Sigla == p.get("UUnidad_Academica"),
+    ).all()
+
+    modalidades = {v: k for k, v in _etiquetas(db, CatModalidad.Id_Modalidad, CatModalidad.Modalidad).items()}
+    turnos = {v: k for k, v in _etiquetas(db, CatTurno.Id_Turno, CatTurno.Turno).items()}
+    semestres = {v: k for k, v in _etiquetas(db, CatSemestre.Id_Semestre, CatSemestre.Semestre).items()}
+    grupos = {v: k for k, v in _etiquetas(db, CatGrupoEdad.Id_Grupo_Edad, CatGrupoEdad.Grupo_Edad).items()}
+    tipos = {v: k for k, v in _etiquetas(db, TipoIngreso.Id_Tipo_Ingreso, TipoIngreso.Tipo_de_Ingreso).items()}
+    sexos = {v: k for k, v in _etiquetas(db, CatSexo.Id_Sexo, CatSexo.Sexo).items()}
+    programas: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+
+    celdas: Dict[tuple, Dict[str, Any]] = {}
+    salones_semestre: Dict[Tuple[int, int, int], int] = {}
+    omitidas = 0
+    for t in temporales:
+        if t.Nombre_Programa not in programas:
+            id_programa = _id_programa(db, t.Nombre_Programa, id_nivel)
+            id_rama = db.query(CatProgramas.Id_Rama_Programa).filter(CatProgramas.Id_Programa == id_programa).scalar()
+            programas[t.Nombre_Programa] = (id_programa, id_rama)
+        id_programa, id_rama = programas[t.Nombre_Programa]
+        fila = {
+            "Id_Periodo": id_periodo,
+            "Id_Unidad_Academica": id_ua,
+            "Id_Programa": id_programa,
+            "Id_Rama": id_rama,
+            "Id_Nivel": id_nivel,
+            "Id_Modalidad": modalidades.get(t.Modalidad),
+            "Id_Turno": turnos.get(t.Turno),
+            "Id_Semestre": semestres.get(t.Semestre),
+            "Id_Grupo_Edad": grupos.get(t.Grupo_Edad),
+            "Id_Tipo_Ingreso": tipos.get(t.Tipo_Ingreso),
+            "Id_Sexo": sexos.get(t.Sexo),
+            "Matricula": int(t.Matricula or 0),
+        }
+        if any(fila[c] is None for c in CELDA_MATRICULA):
+            omitidas += 1
+            continue
+        celdas[tuple(fila[c] for c in CELDA_MATRICULA)] = fila
+        llave = (fila["Id_Programa"], fila["Id_Modalidad"], fila["Id_Semestre"])
+        salones_semestre[llave] = max(salones_semestre.get(llave, 0), int(t.Salones or 0))
+
+    _reemplazar_celdas(db, Matricula.__table__, CELDA_MATRICULA, list(celdas.values()))
+    for llave, salones in salones_semestre.items():
+        _guardar_estado_semestre(
+            db, id_periodo, id_ua, FORMATO_MATRICULA, llave, SEMAFORO_CAPTURA,
+            salones or int(p.get("SSalones") or 0),
+        )
+    if celdas:
+        _guardar_semaforo_unidad(db, id_periodo, id_ua, FORMATO_MATRICULA, SEMAFORO_CAPTURA)
+
+    # Equivalente al TRUNCATE TABLE Temp_Matricula del SP
+    db.query(Temp_Matricula).delete(synchronize_session=False)
+    if omitidas:
+        print(f"⚠️ SP emulado: {omitidas} filas de Temp_Matricula con catálogos no resueltos")
+    return []
+
+
+def sp_actualiza_matricula_por_semestre_au(db: Session, p: Dict[str, Any]) -> List[ResultSet]:
+    """SP_Actualiza_Matricula_Por_Semestre_AU: marca el semestre como completado y regresa sus filas."""
+    id_periodo, id_ua, id_nivel = _contexto(db, p)
+    llave = _semestre_ids(db, p, id_nivel)
+    if id_periodo is None or id_ua is None or None in llave:
+        raise _error_contexto("SP_Actualiza_Matricula_Por_Semestre_AU", p)
+
+    _guardar_estado_semestre(db, id_periodo, id_ua, FORMATO_MATRICULA, llave, SEMAFORO_COMPLETADO, p.get("SSalones"))
+    return [(COLUMNAS_CONSULTA_MATRICULA, _filas_consulta_matricula(db, id_periodo, id_ua, id_nivel, llave))]
+
+
+def sp_finaliza_captura_matricula(db: Session, p: Dict[str, Any]) -> List[ResultSet]:
+    """SP_Finaliza_Captura_Matricula: la UA queda con la captura completa (semáforo 3)."""
+    id_periodo, id_ua, _id_nivel = _contexto(db, p)
+    if id_periodo is None or id_ua is None:
+        raise _error_contexto("SP_Finaliza_Captura_Matricula", p)
+    _guardar_semaforo_unidad(db, id_periodo, id_ua, FORMATO_MATRICULA, SEMAFORO_COMPLETADO, finalizar=True)
+    return []
+
+
+def sp_valida_matricula(db: Session, p: Dict[str, Any]) -> List[ResultSet]:
+    """SP_Valida_Matricula: registra la validación del usuario y pone la UA en @semaforo."""
+    id_periodo, id_ua, _id_nivel = _contexto(db, p)
+    if id_periodo is None or id_ua is None:
+        raise _error_contexto("SP_Valida_Matricula", p)
+    _registrar_validacion(db, id_periodo, p.get("UUsuario"), 1, p.get("NNota"))
+    _guardar_semaforo_unidad(
+        db, id_periodo, id_ua, FORMATO_MATRICULA, int(p.get("semaforo") or SEMAFORO_COMPLETADO), finalizar=True,
+    )
+    return []
+
+
+def sp_rechaza_matricula(db: Session, p: Dict[str, Any]) -> List[ResultSet]:
+    """SP_Rechaza_Matricula: registra el rechazo y regresa la UA y sus semestres a captura."""
+    id_periodo, id_ua, _id_nivel = _contexto(db, p)
+    if id_periodo is None or id_ua is None:
+        raise _error_contexto("SP_Rechaza_Matricula", p)
+    _registrar_validacion(db, id_periodo, p.get("UUsuario"), 0, p.get("NNota"))
+    _guardar_semaforo_unidad(db, id_periodo, id_ua, FORMATO_MATRICULA, SEMAFORO_CAPTURA)
+    t = semaforo_semestre.c
+    db.execute(update(semaforo_semestre).where(
+        t.Id_Periodo == id_periodo, t.Id_Unidad_Academica == id_ua, t.Id_Formato == FORMATO_MATRICULA,
+    ).values(Id_Semaforo=SEMAFORO_CAPTURA))
+    return []
+
+
+# =============================
+# Aprovechamiento
+# =============================
+
+def sp_consulta_aprovechamiento(db: Session, p: Dict[str, Any]) -> List[ResultSet]:
+    """
+    SP_Consulta_Aprovechamiento_Unidad_Academica: celdas de Aprovechamiento con IDs y
+    etiquetas. No hay catálogo de indicadores en los modelos: Aprovechamiento lleva el ID.
+    """
+    id_periodo, id_ua, id_nivel = _contexto(db, p)
+    if id_periodo is None or id_ua is None:
+        return [(COLUMNAS_CONSULTA_APROVECHAMIENTO, [])]
+
+    query = db.query(Aprovechamiento).filter(
+        Aprovechamiento.Id_Periodo == id_periodo,
+        Aprovechamiento.Id_Unidad_Academica == id_ua,
+    )
+    if id_nivel is not None:
+        query = query.filter(Aprovechamiento.Id_Nivel == id_nivel)
+    registros = query.order_by(
+        Aprovechamiento.Id_Programa, Aprovechamiento.Id_Modalidad, Aprovechamiento.Id_Semestre,
+        Aprovechamiento.Id_Turno, Aprovechamiento.Id_Aprovechamiento, Aprovechamiento.Id_Sexo,
+    ).all()
+
+    programas = _etiquetas(db, CatProgramas.Id_Programa, CatProgramas.Nombre_Programa)
+    modalidades = _etiquetas(db, CatModalidad.Id_Modalidad, CatModalidad.Modalidad)
+    turnos = _etiquetas(db, CatTurno.Id_Turno, CatTurno.Turno)
+    semestres = _etiquetas(db, CatSemestre.Id_Semestre, CatSemestre.Semestre)
+    sexos = _etiquetas(db, CatSexo.Id_Sexo, CatSexo.Sexo)
+    estados = _estados_semestre(db, id_periodo, id_ua, FORMATO_APROVECHAMIENTO)
+
+    filas = []
+    for a in registros:
+        id_semaforo, _salones = estados.get((a.Id_Programa, a.Id_Modalidad, a.Id_Semestre), (SEMAFORO_CAPTURA, None))
+        filas.append((
+            a.Id_Programa, programas.get(a.Id_Programa), a.Id_Rama, a.Id_Nivel,
+            a.Id_Modalidad, modalidades.get(a.Id_Modalidad), a.Id_Turno, turnos.get(a.Id_Turno),
+            a.Id_Semestre, semestres.get(a.Id_Semestre), a.Id_Sexo, sexos.get(a.Id_Sexo),
+            a.Id_Aprovechamiento, str(a.Id_Aprovechamiento), a.Aprovechamiento, id_semaforo,
+        ))
+    return [(COLUMNAS_CONSULTA_APROVECHAMIENTO, filas)]
+
+
+def sp_actualiza_aprovechamiento_por_unidad_academica(db: Session, p: Dict[str, Any]) -> List[ResultSet]:
+    """SP_Actualiza_Aprovechamiento_Por_Unidad_Academica: Temp_Aprovechamiento -> Aprovechamiento."""
+    id_periodo, id_ua, _id_nivel = _contexto(db, p)
+    if id_periodo is None or id_ua is None:
+        raise _error_contexto("SP_Actualiza_Aprovechamiento_Por_Unidad_Academica", p)
+
+    columnas = [c.name for c in Aprovechamiento.__table__.columns]
+    temporales = db.query(Temp_Aprovechamiento).filter(
+        Temp_Aprovechamiento.Id_Periodo == id_periodo,
+        Temp_Aprovechamiento.Id_Unidad_Academica == id_ua,
+    ).all()
+    filas = [{c: getattr(t, c) for c in columnas} for t in temporales]
+
+    _reemplazar_celdas(db, Aprovechamiento.__table__, CELDA_APROVECHAMIENTO, filas)
+    for llave in {(f["Id_Programa"], f["Id_Modalidad"], f["Id_Semestre"]) for f in filas}:
+        _guardar_estado_semestre(db, id_periodo, id_ua, FORMATO_APROVECHAMIENTO, llave, SEMAFORO_CAPTURA)
+    if filas:
+        _guardar_semaforo_unidad(db, id_periodo, id_ua, FORMATO_APROVECHAMIENTO, SEMAFORO_CAPTURA)
+
+    db.query(Temp_Aprovechamiento).delete(synchronize_session=False)
+    return []
+
+
+def sp_actualiza_aprovechamiento_por_semestre_au(db: Session, p: Dict[str, Any]) -> List[ResultSet]:
+    """SP_Actualiza_Aprovechamiento_Por_Semestre_AU: marca el semestre como completado."""
+    id_periodo, id_ua, id_nivel = _contexto(db, p)
+    llave = _semestre_ids(db, p, id_nivel)
+    if id_periodo is None or id_ua is None or None in llave:
+        raise _error_contexto("SP_Actualiza_Aprovechamiento_Por_Semestre_AU", p)
+    _guardar_estado_semestre(db, id_periodo, id_ua, FORMATO_APROVECHAMIENTO, llave, SEMAFORO_COMPLETADO)
+    return []
+
+
+SPS_EMULADOS: Dict[str, Callable[[Session, Dict[str, Any]], List[ResultSet]]] = {
+    "SP_Consulta_Matricula_Unidad_Academica": sp_consulta_matricula,
+    "SP_Actualiza_Matricula_Por_Unidad_Academica": sp_actualiza_matricula_por_unidad_academica,
+    "SP_Actualiza_Matricula_Por_Semestre_AU": sp_actualiza_matricula_por_semestre_au,
+    "SP_Finaliza_Captura_Matricula": sp_finaliza_captura_matricula,
+    "SP_Valida_Matricula": sp_valida_matricula,
+    "SP_Rechaza_Matricula": sp_rechaza_matricula,
+    "SP_Consulta_Aprovechamiento_Unidad_Academica": sp_consulta_aprovechamiento,
+    "SP_Actualiza_Aprovechamiento_Por_Unidad_Academica": sp_actualiza_aprovechamiento_por_unidad_academica,
+    "SP_Actualiza_Aprovechamiento_Por_Semestre_AU": sp_actualiza_aprovechamiento_por_semestre_au,
+}
+
+
+def ejecutar_sp_emulado(db: Session, nombre: str, parametros: Dict[str, Any]) -> ResultadoSP:
+    """Ejecuta la emulación del SP dentro de la transacción de la sesión (NO hace commit)."""
+    sp = SPS_EMULADOS.get(nombre)
+    if sp is None:
+        raise ValueError(f"SP sin emulación: {nombre}")
+    _asegurar_tablas(db)
+    return ResultadoSP(sp(db, parametros))
@@ -0,0 +1,30 @@
+-- Índices de la tabla Bitacora usados por la consulta paginada (/bitacora).
+-- La paginación es por keyset sobre (Fecha DESC, Id_Bitacora DESC), por lo que
+-- cada índice termina en (Fecha, Id_Bitacora): SQL Server lo recorre en orden
+-- inverso y se detiene en el tamaño de página, sin ordenar ni contar la tabla.
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Bitacora_Fecha_Id' AND object_id = OBJECT_ID('dbo.Bitacora'))
+    CREATE NONCLUSTERED INDEX IX_Bitacora_Fecha_Id
+        ON dbo.Bitacora (Fecha DESC, Id_Bitacora DESC)
+        INCLUDE (Id_Usuario, Id_Modulo, Id_Periodo, Host, Acciones);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Bitacora_Usuario_Fecha' AND object_id = OBJECT_ID('dbo.Bitacora'))
+    CREATE NONCLUSTERED INDEX IX_Bitacora_Usuario_Fecha
+        ON dbo.Bitacora (Id_Usuario, Fecha DESC, Id_Bitacora DESC);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Bitacora_Modulo_Fecha' AND object_id = OBJECT_ID('dbo.Bitacora'))
+    CREATE NONCLUSTERED INDEX IX_Bitacora_Modulo_Fecha
+        ON dbo.Bitacora (Id_Modulo, Fecha DESC, Id_Bitacora DESC);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Bitacora_Periodo_Fecha' AND object_id = OBJECT_ID('dbo.Bitacora'))
+    CREATE NONCLUSTERED INDEX IX_Bitacora_Periodo_Fecha
+        ON dbo.Bitacora (Id_Periodo, Fecha DESC, Id_Bitacora DESC);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Bitacora_Host_Fecha' AND object_id = OBJECT_ID('dbo.Bitacora'))
+    CREATE NONCLUSTERED INDEX IX_Bitacora_Host_Fecha
+        ON dbo.Bitacora (Host, Fecha DESC, Id_Bitacora DESC);
+GO
@@ -7,7 +7,12 @@ from backend.api import unidad_academica
 from backend.api import matricula_sp
 from backend.api import aprovechamiento_sp
 from backend.api import recuperacion
-from backend.api.catalogos import domicilios, estatus, periodos, programas, roles, semaforo, modulos, objetos
+from backend.api import bitacora
+from backend.api import jobs
+from backend.api import versiones
+from backend.api import avance
+from backend.api import analitica
+from backend.api.catalogos import domicilios, estatus, periodos, programas, roles, semaforo, modulos, objetos, localidades
 from backend.core.templates import static
 
 from fastapi import FastAPI
@@ -22,6 +27,11 @@ app.include_router(mod_principal.router , prefix="/mod_principal")
 app.include_router(unidad_academica.router , prefix="/unidad_academica")
 app.include_router(matricula_sp.router , prefix="/matricula")
 app.include_router(aprovechamiento_sp.router , prefix="/aprovechamiento")
+app.include_router(bitacora.router , prefix="/bitacora")
+app.include_router(jobs.router , prefix="/jobs")
+app.include_router(versiones.router , prefix="/versiones")
+app.include_router(avance.router , prefix="/avance")
+app.include_router(analitica.router , prefix="/analitica")
 app.include_router(domicilios.router)
 app.include_router(periodos.router)
 app.include_router(programas.router)
@@ -29,6 +39,7 @@ app.include_router(semaforo.router)
 app.include_router(estatus.router)
 app.include_router(modulos.router)
 app.include_router(objetos.router)
+app.include_router(localidades.router)
 
 app.include_router(roles.router)
 
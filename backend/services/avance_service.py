@@ -0,0 +1,114 @@
+"""
+Tablero institucional de avance de captura (matrícula y aprovechamiento) por UA.
+
+Se arma con una sola consulta agregada (read_avance_unidades) y se cachea por periodo
+contra la firma de Version_Datos: mientras ninguna UA escriba, el tablero se sirve
+de memoria con una lectura de Version_Datos. El TTL cubre cambios hechos fuera del
+sistema (p. ej. SPs ejecutados directamente en la BD).
+
+La `huella` de la respuesta (para el ETag) es el hash de lo que se sirve (unidades y
+resumen), no de la firma: si el recálculo por TTL trae cambios hechos fuera del sistema,
+el ETag cambia aunque Version_Datos siga igual.
+"""
+from backend.crud.SemaforoUnidadAcademica import read_avance_unidades
+from backend.services.version_service import get_firma_periodo, FORMATO_MATRICULA, FORMATO_APROVECHAMIENTO
+
+from datetime import datetime
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Tuple
+
+import hashlib
+import json
+import threading
+import time
+
+# Formatos que muestra el tablero: clave en la respuesta -> Id_Formato
+FORMATOS_AVANCE = {
+    "matricula": FORMATO_MATRICULA,
+    "aprovechamiento": FORMATO_APROVECHAMIENTO,
+}
+
+# Semáforo de captura completada (Cat_Semaforo)
+SEMAFORO_COMPLETADO = 3
+
+# Aunque la firma no cambie, el tablero se recalcula como máximo cada 5 minutos
+AVANCE_CACHE_TTL_SEGUNDOS = 300
+
+_avance_lock = threading.Lock()
+_avance_cache: Dict[int, Tuple[Tuple[int, int], float, Dict[str, Any]]] = {}
+
+
+def _fecha(valor) -> Any:
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+
+def _serializar_fila(fila) -> Dict[str, Any]:
+    datos = fila._mapping
+    unidad = {
+        "id_unidad_academica": datos["Id_Unidad_Academica"],
+        "sigla": datos["Sigla"],
+        "nombre": datos["Nombre"],
+        "ultima_validacion": _fecha(datos["ultima_validacion"]),
+    }
+    for clave, f in FORMATOS_AVANCE.items():
+        id_semaforo = datos[f"sem_{f}"]
+        unidad[clave] = {
+            "id_semaforo": id_semaforo,
+            "semaforo": datos[f"desc_{f}"] or ("Sin iniciar" if id_semaforo is None else str(id_semaforo)),
+            "color": datos[f"color_{f}"],
+            "completado": id_semaforo == SEMAFORO_COMPLETADO,
+            "fecha_modificacion": _fecha(datos[f"fecha_{f}"]),
+            "validaciones": int(datos[f"val_{f}"] or 0),
+            "rechazos": int(datos[f"rech_{f}"] or 0),
+        }
+    return unidad
+
+
+def _calcular_avance(db: Session, id_periodo: int) -> Dict[str, Any]:
+    inicio = time.perf_counter()
+    filas = read_avance_unidades(db, id_periodo, list(FORMATOS_AVANCE.values()))
+    unidades: List[Dict[str, Any]] = [_serializar_fila(f) for f in filas]
+    resumen = {"total_unidades": len(unidades)}
+    for clave in FORMATOS_AVANCE:
+        resumen[f"{clave}_completadas"] = sum(1 for u in unidades if u[clave]["completado"])
+    huella = hashlib.sha1(
+        json.dumps({"unidades": unidades, "resumen": resumen}, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+    print(f"📊 Avance institucional del periodo {id_periodo}: {len(unidades)} UAs en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    return {
+        "id_periodo": id_periodo,
+        "unidades": unidades,
+        "resumen": resumen,
+        "huella": huella,
+        "generado": datetime.now().isoformat(),
+    }
+
+
+def get_avance_institucional(db: Session, id_periodo: int, forzar: bool = False) -> Dict[str, Any]:
+    """
+    Avance de todas las UAs del periodo. Regresa además `huella` (para ETag), `firma` y `desde_cache`.
+    """
+    firma = get_firma_periodo(db, id_periodo)
+    ahora = time.monotonic()
+    with _avance_lock:
+        en_cache = _avance_cache.get(id_periodo)
+    if (
+        not forzar
+        and en_cache is not None
+        and en_cache[0] == firma
+        and ahora - en_cache[1] < AVANCE_CACHE_TTL_SEGUNDOS
+    ):
+        return dict(en_cache[2], firma=list(firma), desde_cache=True)
+
+    avance = _calcular_avance(db, id_periodo)
+    with _avance_lock:
+        _avance_cache[id_periodo] = (firma, ahora, avance)
+    return dict(avance, firma=list(firma), desde_cache=False)
+
+
+def invalidar_avance(id_periodo: int = None) -> None:
+    with _avance_lock:
+        if id_periodo is None:
+            _avance_cache.clear()
+        else:
+            _avance_cache.pop(id_periodo, None)
@@ -1,6 +1,20 @@
 from backend.database.models.Bitacora import Bitacora
+from backend.database.models.Usuario import Usuario
+from backend.crud.Bitacora import read_bitacora_page, read_bitacora_resumen
+from backend.utils.pagination import encode_cursor, decode_cursor
 from datetime import datetime
 from sqlalchemy.orm import Session
+from typing import Optional, Dict, Any, List, Tuple
+
+import threading
+import time
+
+# Tamaño de página de la consulta de bitácora
+BITACORA_LIMITE_DEFAULT = 50
+BITACORA_LIMITE_MAX = 200
+
+# El resumen de conteos se recalcula como máximo cada 5 minutos
+RESUMEN_BITACORA_TTL_SEGUNDOS = 300
 
 def registrar_bitacora(
     db: Session,
@@ -37,4 +51,157 @@ def log_accion(db: Session, id_usuario: int, accion: str, host: str):
         )
     except Exception as e:
         print(f"Error registrando en bitácora: {e}")
-        # No lanzar excepción para no interrumpir el flujo principal
\ No newline at end of file
+        # No lanzar excepción para no interrumpir el flujo principal
+
+# =============================
+# Consulta paginada de bitácora
+# =============================
+
+_resumen_lock = threading.Lock()
+# Sólo una petición recalcula el resumen a la vez (single-flight)
+_resumen_refresco_lock = threading.Lock()
+_resumen_cache: Dict[str, Any] = {"filas": None, "generado": None, "cargado_en": 0.0}
+
+def encode_cursor_bitacora(fecha: datetime, id_bitacora: int) -> str:
+    """Codifica la llave (Fecha, Id_Bitacora) del último registro como cursor opaco."""
+    return encode_cursor(fecha.isoformat(), id_bitacora)
+
+def decode_cursor_bitacora(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Decodifica un cursor generado por encode_cursor_bitacora. Lanza ValueError si es inválido."""
+    valores = decode_cursor(cursor, 2)
+    if valores is None:
+        return None
+    try:
+        return datetime.fromisoformat(valores[0]), int(valores[1])
+    except (TypeError, ValueError):
+        raise ValueError("Cursor de bitácora inválido")
+
+def get_resumen_bitacora(db: Session, forzar: bool = False) -> Dict[str, Any]:
+    """Resumen de conteos agrupado por usuario/módulo/periodo/host, cacheado en memoria.
+
+    Los conteos de cualquier combinación de filtros se calculan sobre este resumen,
+    así que la tabla completa sólo se agrega una vez por TTL y no en cada página.
+    Al vencer el TTL sólo una petición recalcula; las demás siguen con el resumen
+    anterior en lugar de repetir el GROUP BY (sólo esperan si aún no hay resumen).
+    """
+    solicitado = time.monotonic()
+    with _resumen_lock:
+        hay_filas = _resumen_cache["filas"] is not None
+        vigente = hay_filas and solicitado - _resumen_cache["cargado_en"] < RESUMEN_BITACORA_TTL_SEGUNDOS
+        if vigente and not forzar:
+            return {"filas": _resumen_cache["filas"], "generado": _resumen_cache["generado"]}
+        anterior = {"filas": _resumen_cache["filas"], "generado": _resumen_cache["generado"]}
+
+    if not _resumen_refresco_lock.acquire(blocking=forzar or not hay_filas):
+        return anterior
+    try:
+        with _resumen_lock:
+            # Otra petición lo recalculó mientras se esperaba el lock
+            if _resumen_cache["filas"] is not None and _resumen_cache["cargado_en"] >= solicitado:
+                return {"filas": _resumen_cache["filas"], "generado": _resumen_cache["generado"]}
+
+        filas = [
+            {
+                "Id_Usuario": r.Id_Usuario,
+                "Id_Modulo": r.Id_Modulo,
+                "Id_Periodo": r.Id_Periodo,
+                "Host": r.Host or "",
+                "Total": int(r.Total),
+            }
+            for r in read_bitacora_resumen(db)
+        ]
+        generado = datetime.now()
+        with _resumen_lock:
+            _resumen_cache["filas"] = filas
+            _resumen_cache["generado"] = generado
+            _resumen_cache["cargado_en"] = time.monotonic()
+        return {"filas": filas, "generado": generado}
+    finally:
+        _resumen_refresco_lock.release()
+
+def contar_bitacora(
+    resumen: Dict[str, Any],
+    id_usuario: Optional[int] = None,
+    id_modulo: Optional[int] = None,
+    id_periodo: Optional[int] = None,
+    host: Optional[str] = None,
+) -> int:
+    """Total de registros que cumplen los filtros, calculado sobre el resumen cacheado."""
+    total = 0
+    for fila in resumen["filas"]:
+        if id_usuario is not None and fila["Id_Usuario"] != id_usuario:
+            continue
+        if id_modulo is not None and fila["Id_Modulo"] != id_modulo:
+            continue
+        if id_periodo is not None and fila["Id_Periodo"] != id_periodo:
+            continue
+        if host and not fila["Host"].startswith(host):
+            continue
+        total += fila["Total"]
+    return total
+
+def get_opciones_filtro_bitacora(resumen: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Valores distintos de módulo y periodo presentes en la bitácora (para los combos de la vista)."""
+    modulos = sorted({f["Id_Modulo"] for f in resumen["filas"]})
+    periodos = sorted({f["Id_Periodo"] for f in resumen["filas"] if f["Id_Periodo"] is not None})
+    return {"modulos": modulos, "periodos": periodos}
+
+def get_bitacora_pagina(
+    db: Session,
+    cursor: Optional[str] = None,
+    limite: int = BITACORA_LIMITE_DEFAULT,
+    id_usuario: Optional[int] = None,
+    id_modulo: Optional[int] = None,
+    id_periodo: Optional[int] = None,
+    host: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Devuelve una página de la bitácora, el cursor de la siguiente y el total (del resumen cacheado)."""
+    limite = max(1, min(int(limite or BITACORA_LIMITE_DEFAULT), BITACORA_LIMITE_MAX))
+    despues_de = decode_cursor_bitacora(cursor)
+
+    # Se pide un registro extra para saber si hay más páginas sin contar
+    registros = read_bitacora_page(
+        db,
+        limit=limite + 1,
+        despues_de=despues_de,
+        id_usuario=id_usuario,
+        id_modulo=id_modulo,
+        id_periodo=id_periodo,
+        host=host,
+    )
+    hay_mas = len(registros) > limite
+    registros = list(registros[:limite])
+
+    # Logins de los usuarios de la página (una sola consulta por página)
+    ids_usuario = {r.Id_Usuario for r in registros}
+    logins: Dict[int, str] = {}
+    if ids_usuario:
+        logins = {
+            u.Id_Usuario: u.Usuario
+            for u in db.query(Usuario.Id_Usuario, Usuario.Usuario).filter(Usuario.Id_Usuario.in_(ids_usuario)).all()
+        }
+
+    siguiente_cursor = None
+    if hay_mas and registros:
+        ultimo = registros[-1]
+        siguiente_cursor = encode_cursor_bitacora(ultimo.Fecha, ultimo.Id_Bitacora)
+
+    resumen = get_resumen_bitacora(db)
+    return {
+        "registros": [
+            {
+                "Id_Bitacora": r.Id_Bitacora,
+                "Id_Usuario": r.Id_Usuario,
+                "Usuario": logins.get(r.Id_Usuario, ""),
+                "Id_Modulo": r.Id_Modulo,
+                "Id_Periodo": r.Id_Periodo,
+                "Acciones": r.Acciones,
+                "Host": r.Host,
+                "Fecha": r.Fecha.isoformat() if r.Fecha else None,
+            }
+            for r in registros
+        ],
+        "siguiente_cursor": siguiente_cursor,
+        "total": contar_bitacora(resumen, id_usuario, id_modulo, id_periodo, host),
+        "total_generado": resumen["generado"].isoformat() if resumen["generado"] else None,
+    }
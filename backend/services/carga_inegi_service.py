@@ -0,0 +1,327 @@
+"""
+Actualización de Entidades_Municipios desde el catálogo de localidades del INEGI (AGEEML).
+
+Flujo:
+1. Lectura en streaming del CSV. Cada línea se decodifica como UTF-8 y, si falla, como
+   Windows-1252 (el INEGI ha publicado el archivo en ambas). Los textos doblemente
+   codificados ("MÃ©xico") se reparan y todo se normaliza a NFC.
+2. Estado actual de la tabla como hashes de 8 bytes: llave (entidad, municipio, localidad)
+   y valores (nombres y abreviatura), en dos array('Q') ordenados por llave. Son 16 bytes
+   por localidad: los textos de la tabla nunca se cargan completos en memoria.
+3. Cada fila del archivo se busca por su llave (bisect): si no existe es inserción; si sus
+   valores cambiaron, actualización. Una segunda pasada por la tabla aplica las
+   actualizaciones por Id_Entidad_Municipio (la tabla puede guardar las claves sin ceros)
+   y encuentra las bajas: las filas que no aparecieron en el archivo de las mismas entidades (así un archivo de una sola entidad no afecta a las
+   demás), salvo las que usa Cat_Domicilios, que se conservan y se reportan.
+4. Los cambios se aplican por lotes de `lote` filas en una sola transacción. Sin
+   aplicar=True sólo se reporta el resultado (con una muestra de cada tipo de cambio).
+
+Las claves se comparan con el relleno de ceros del INEGI (entidad 2, municipio 3,
+localidad 4 dígitos); las localidades nuevas usan la CVEGEO como Id_Entidad_Municipio.
+
+Desde la línea de comandos:
+    python -m backend.services.carga_inegi_service AGEEML.csv            # sólo reporta
+    python -m backend.services.carga_inegi_service AGEEML.csv --aplicar
+"""
+from backend.database.models.CatDomicilios import CatDomicilios
+from backend.database.models.Temporal_Entidades_Municipios import temporal_Entidades_Municipios
+
+from array import array
+from sqlalchemy import bindparam, column, delete, insert, select, table, update
+from sqlalchemy.orm import Session
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import argparse
+import bisect
+import csv
+import hashlib
+import time
+import unicodedata
+
+CARGA_INEGI_LOTE = 1000
+CARGA_INEGI_MUESTRA = 20
+ID_PAIS_MEXICO = 1
+
+# Encabezado normalizado -> campo; se aceptan los nombres del INEGI y los de la tabla
+COLUMNAS = {
+    "cve_ent": "ent", "id_entidad": "ent",
+    "nom_ent": "nom_ent", "nombre_entidad": "nom_ent",
+    "nom_abr": "abr", "abreviatura_entidad": "abr",
+    "cve_mun": "mun", "id_municipio": "mun",
+    "nom_mun": "nom_mun", "nombre_municipio": "nom_mun",
+    "cve_loc": "loc", "id_localidad": "loc",
+    "nom_loc": "nom_loc", "nombre_localidad": "nom_loc",
+}
+CAMPOS_OBLIGATORIOS = ("ent", "nom_ent", "mun", "nom_mun", "loc", "nom_loc")
+RELLENO_CLAVES = {"ent": 2, "mun": 3, "loc": 4}
+
+# Sin el modelo ORM: Id_Entidad_Municipio está declarado autoincrement siendo VARCHAR
+_t = temporal_Entidades_Municipios.__table__
+TABLA = table(_t.name, *[column(c.name) for c in _t.c])
+
+
+def _reparar(texto: str) -> str:
+    try:
+        return texto.encode("cp1252").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return texto
+
+
+def normalizar_texto(valor: Optional[str]) -> str:
+    """Quita espacios sobrantes, repara UTF-8 leído como Windows-1252 y compone acentos (NFC)."""
+    texto = (valor or "").strip()
+    if "Ã" in texto or "Â" in texto:
+        reparado = _reparar(texto)
+        # Si el texto completo no se puede reparar, se intenta palabra por palabra
+        texto = reparado if reparado != texto else " ".join(_reparar(p) for p in texto.split())
+    return " ".join(unicodedata.normalize("NFC", texto).split())
+
+
+def normalizar_clave(valor: Any, campo: str) -> str:
+    clave = str(valor or "").strip()
+    return clave.zfill(RELLENO_CLAVES[campo]) if clave.isdigit() else clave
+
+
+def _hash(*partes: str) -> int:
+    return int.from_bytes(hashlib.blake2b("\x1f".join(partes).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def hash_llave(ent: str, mun: str, loc: str) -> int:
+    return _hash(normalizar_clave(ent, "ent"), normalizar_clave(mun, "mun"), normalizar_clave(loc, "loc"))
+
+
+def hash_valores(nom_ent: str, abr: str, nom_mun: str, nom_loc: str) -> int:
+    return _hash(*(normalizar_texto(v) for v in (nom_ent, abr, nom_mun, nom_loc)))
+
+
+def _lineas(archivo: BinaryIO) -> Iterator[str]:
+    """Líneas del archivo binario como texto, decodificando cada una por separado."""
+    for numero, crudo in enumerate(archivo):
+        if numero == 0 and crudo.startswith(b"\xef\xbb\xbf"):
+            crudo = crudo[3:]
+        try:
+            yield crudo.decode("utf-8")
+        except UnicodeDecodeError:
+            yield crudo.decode("cp1252", errors="replace")
+
+
+def leer_csv_inegi(archivo: BinaryIO) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Itera (número de línea, fila normalizada) del CSV. Lanza ValueError si faltan columnas."""
+    lineas = _lineas(archivo)
+    encabezado = next(lineas, "")
+    if not encabezado.strip():
+        raise ValueError("El archivo CSV está vacío")
+    delimitador = max(",;\t|", key=encabezado.count)
+    lector = csv.reader(lineas, delimiter=delimitador)
+    campos = [COLUMNAS.get(h.strip().strip('"').lower()) for h in next(csv.reader([encabezado], delimiter=delimitador))]
+    faltantes = [c for c in CAMPOS_OBLIGATORIOS if c not in campos]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+
+    for numero, valores in enumerate(lector, start=2):
+        if not any(v.strip() for v in valores):
+            continue
+        fila = {campo: valor for campo, valor in zip(campos, valores) if campo}
+        for campo in RELLENO_CLAVES:
+            fila[campo] = normalizar_clave(fila.get(campo), campo)
+        for campo in ("nom_ent", "abr", "nom_mun", "nom_loc"):
+            fila[campo] = normalizar_texto(fila.get(campo))
+        yield numero, fila
+
+
+def _estado_actual(db: Session, lote: int) -> Tuple[array, array]:
+    """(hashes de llave ordenados, hashes de valores alineados) de toda la tabla."""
+    t = TABLA.c
+    pares = []
+    resultado = db.execute(
+        select(t.Id_Entidad, t.Id_Municipio, t.Id_Localidad, t.Nombre_Entidad, t.Abreviatura_Entidad,
+               t.Nombre_Municipio, t.Nombre_Localidad).execution_options(stream_results=True, yield_per=lote)
+    )
+    for ent, mun, loc, nom_ent, abr, nom_mun, nom_loc in resultado:
+        # Un solo entero de 128 bits por fila: ordenar por llave y separar después
+        pares.append(hash_llave(ent, mun, loc) << 64 | hash_valores(nom_ent, abr, nom_mun, nom_loc))
+    pares.sort()
+    mascara = (1 << 64) - 1
+    return array("Q", (p >> 64 for p in pares)), array("Q", (p & mascara for p in pares))
+
+
+class _Lotes:
+    """Acumula inserciones/actualizaciones/bajas y las ejecuta cada `lote` filas."""
+
+    def __init__(self, db: Session, lote: int, aplicar: bool):
+        self.db = db
+        self.lote = lote
+        self.aplicar = aplicar
+        self.pendientes: Dict[str, List[Dict[str, Any]]] = {"insertar": [], "actualizar": [], "retirar": []}
+        t = TABLA.c
+        self.sentencias = {
+            "insertar": insert(TABLA),
+            "actualizar": update(TABLA).where(t.Id_Entidad_Municipio == bindparam("b_id")).values(
+                Id_Entidad=bindparam("b_ent"),
+                Id_Municipio=bindparam("b_mun"),
+                Id_Localidad=bindparam("b_loc"),
+                Nombre_Entidad=bindparam("b_nom_ent"),
+                Abreviatura_Entidad=bindparam("b_abr"),
+                Nombre_Municipio=bindparam("b_nom_mun"),
+                Nombre_Localidad=bindparam("b_nom_loc"),
+            ),
+            "retirar": delete(TABLA).where(t.Id_Entidad_Municipio == bindparam("b_id")),
+        }
+
+    def agregar(self, tipo: str, parametros: Dict[str, Any]) -> None:
+        if not self.aplicar:
+            return
+        self.pendientes[tipo].append(parametros)
+        if len(self.pendientes[tipo]) >= self.lote:
+            self.vaciar(tipo)
+
+    def vaciar(self, tipo: str = None) -> None:
+        for nombre in ([tipo] if tipo else list(self.pendientes)):
+            if self.pendientes[nombre]:
+                self.db.execute(self.sentencias[nombre], self.pendientes[nombre])
+                self.pendientes[nombre] = []
+
+
+def cargar_localidades_inegi(
+    db: Session,
+    archivo: BinaryIO,
+    aplicar: bool = False,
+    lote: int = CARGA_INEGI_LOTE,
+    id_pais: int = ID_PAIS_MEXICO,
+) -> Dict[str, Any]:
+    """
+    Compara el CSV del INEGI contra Entidades_Municipios y, con aplicar=True, aplica sólo
+    las diferencias. Regresa los conteos y una muestra de cada tipo de cambio.
+    """
+    inicio = time.perf_counter()
+    llaves, valores = _estado_actual(db, lote)
+    vistas = bytearray(len(llaves))
+    nuevas = set()
+    # Índice en `llaves` -> valores nuevos; se aplican en la segunda pasada, ya con el Id
+    cambios: Dict[int, Dict[str, Any]] = {}
+    entidades_archivo = set()
+    lotes = _Lotes(db, lote, aplicar)
+    conteos = {"leidas": 0, "insertadas": 0, "actualizadas": 0, "sin_cambios": 0, "retiradas": 0,
+               "conservadas_en_uso": 0, "duplicadas": 0, "invalidas": 0}
+    muestras: Dict[str, List[Any]] = {"insertadas": [], "actualizadas": [], "retiradas": [], "invalidas": []}
+
+    def muestrear(tipo: str, valor: Any) -> None:
+        if len(muestras[tipo]) < CARGA_INEGI_MUESTRA:
+            muestras[tipo].append(valor)
+
+    print(f"🗺️ Carga INEGI: {len(llaves)} localidades actuales")
+    try:
+        for numero, fila in leer_csv_inegi(archivo):
+            conteos["leidas"] += 1
+            if not (fila["ent"] and fila["mun"] and fila["nom_ent"] and fila["nom_mun"]):
+                conteos["invalidas"] += 1
+                muestrear("invalidas", numero)
+                continue
+            entidades_archivo.add(fila["ent"])
+            llave = hash_llave(fila["ent"], fila["mun"], fila["loc"])
+            clave = f"{fila['ent']}{fila['mun']}{fila['loc']}"
+            i = bisect.bisect_left(llaves, llave)
+            if i < len(llaves) and llaves[i] == llave:
+                if vistas[i]:
+                    conteos["duplicadas"] += 1
+                    continue
+                vistas[i] = 1
+                if valores[i] == hash_valores(fila["nom_ent"], fila["abr"], fila["nom_mun"], fila["nom_loc"]):
+                    conteos["sin_cambios"] += 1
+                    continue
+                conteos["actualizadas"] += 1
+                muestrear("actualizadas", clave)
+                cambios[i] = {
+                    "b_ent": fila["ent"], "b_mun": fila["mun"], "b_loc": fila["loc"], "b_nom_ent": fila["nom_ent"],
+                    "b_abr": fila["abr"], "b_nom_mun": fila["nom_mun"], "b_nom_loc": fila["nom_loc"],
+                }
+            elif llave in nuevas:
+                conteos["duplicadas"] += 1
+            else:
+                nuevas.add(llave)
+                conteos["insertadas"] += 1
+                muestrear("insertadas", clave)
+                lotes.agregar("insertar", {
+                    "Id_Entidad_Municipio": clave, "Id_Entidad": fila["ent"], "Id_Pais": id_pais,
+                    "Nombre_Entidad": fila["nom_ent"], "Abreviatura_Entidad": fila["abr"],
+                    "Id_Municipio": fila["mun"], "Nombre_Municipio": fila["nom_mun"],
+                    "Id_Localidad": fila["loc"], "Nombre_Localidad": fila["nom_loc"],
+                })
+            if conteos["leidas"] % 100000 == 0:
+                print(f"   ... {conteos['leidas']} filas leídas")
+
+        # Segunda pasada por la tabla: actualizaciones y llaves que el archivo no trajo
+        if cambios or (conteos["leidas"] and not all(vistas)):
+            en_uso = {str(i) for (i,) in db.execute(select(CatDomicilios.Id_Entidad_Municipio).distinct())}
+            t = TABLA.c
+            resultado = db.execute(
+                select(t.Id_Entidad_Municipio, t.Id_Entidad, t.Id_Municipio, t.Id_Localidad)
+                .execution_options(stream_results=True, yield_per=lote)
+            )
+            actualizar, retirar = [], []
+            for id_, ent, mun, loc in resultado:
+                # Un archivo por entidad no da de baja las localidades de las demás
+                if normalizar_clave(ent, "ent") not in entidades_archivo:
+                    continue
+                llave = hash_llave(ent, mun, loc)
+                i = bisect.bisect_left(llaves, llave)
+                if i < len(llaves) and llaves[i] == llave:
+                    if i in cambios:
+                        actualizar.append({**cambios.pop(i), "b_id": id_})
+                    if vistas[i]:
+                        continue
+                elif llave in nuevas:
+                    # Insertada en esta misma carga (los lotes ya se pudieron ejecutar)
+                    continue
+                if str(id_) in en_uso:
+                    conteos["conservadas_en_uso"] += 1
+                    continue
+                conteos["retiradas"] += 1
+                muestrear("retiradas", id_)
+                retirar.append(id_)
+            # Se escriben después de leer: el cursor en streaming sigue abierto durante el recorrido
+            for parametros in actualizar:
+                lotes.agregar("actualizar", parametros)
+            for id_ in retirar:
+                lotes.agregar("retirar", {"b_id": id_})
+
+        if aplicar:
+            lotes.vaciar()
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if aplicar and (conteos["insertadas"] or conteos["actualizadas"] or conteos["retiradas"]):
+        from backend.services.catalogos_service import invalidar_catalogos
+        from backend.services.localidades_service import invalidar_indice_localidades
+        invalidar_catalogos()
+        invalidar_indice_localidades()
+
+    segundos = round(time.perf_counter() - inicio, 2)
+    print(f"✅ Carga INEGI {'aplicada' if aplicar else '(sólo reporte)'} en {segundos} s: {conteos}")
+    return {**conteos, "aplicado": aplicar, "segundos": segundos, "muestras": muestras}
+
+
+def cargar_archivo_inegi(db: Session, ruta: str, **opciones) -> Dict[str, Any]:
+    with open(ruta, "rb") as archivo:
+        return cargar_localidades_inegi(db, archivo, **opciones)
+
+
+if __name__ == "__main__":
+    import json
+    from backend.database.db_config import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Actualiza Entidades_Municipios desde el CSV de localidades del INEGI")
+    parser.add_argument("archivo", help="CSV del catálogo AGEEML (CVE_ENT, NOM_ENT, CVE_MUN, NOM_MUN, CVE_LOC, NOM_LOC)")
+    parser.add_argument("--aplicar", action="store_true", help="aplica los cambios (sin esta opción sólo los reporta)")
+    parser.add_argument("--lote", type=int, default=CARGA_INEGI_LOTE, help="filas por sentencia")
+    parser.add_argument("--id-pais", type=int, default=ID_PAIS_MEXICO, help="Id_Pais de las localidades nuevas")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        resultado = cargar_archivo_inegi(db, args.archivo, aplicar=args.aplicar, lote=args.lote, id_pais=args.id_pais)
+    finally:
+        db.close()
+    print(json.dumps(resultado, ensure_ascii=False, indent=2, default=str))
@@ -0,0 +1,313 @@
+"""
+Alta masiva de usuarios a partir de un archivo CSV.
+
+Flujo:
+1. Lectura en streaming del CSV (fila por fila, sin cargar el archivo completo).
+2. Validación de cada fila y de unicidad contra la BD en una sola consulta por bloque.
+3. Generación de contraseñas temporales y hash bcrypt en un pool de procesos.
+4. Inserción por lotes.
+5. Los correos de bienvenida se devuelven para encolarse como tarea en segundo plano.
+"""
+from backend.crud.Usuario import read_usuarios_coincidentes
+from backend.database.models.Usuario import Usuario
+from backend.database.models.Bitacora import Bitacora
+from backend.schemas.Usuario import UsuarioCreate
+from backend.utils.security import hash_password, generate_random_password
+from backend.utils.email import send_email, EmailSendError
+from backend.core.config import settings
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import csv
+import io
+import os
+import threading
+
+# Límite de filas por archivo y tamaño de los bloques de consulta/inserción
+CARGA_MASIVA_MAX_FILAS = 5000
+CARGA_MASIVA_LOTE_INSERCION = 100
+# SQL Server admite ~2100 parámetros por sentencia: bloques de 500 valores por lista IN
+CARGA_MASIVA_LOTE_CONSULTA = 500
+
+# Columnas aceptadas en el CSV (encabezados sin distinguir mayúsculas)
+COLUMNAS_OBLIGATORIAS = ("nombre", "paterno", "materno", "email", "id_rol", "id_nivel")
+COLUMNAS_OPCIONALES = ("usuario", "id_unidad_academica")
+
+ESTATUS_ACTIVO = 1
+ESTATUS_BAJA = 3
+
+_pool_lock = threading.Lock()
+_pool_hash: Optional[ProcessPoolExecutor] = None
+_pool_workers = 1
+
+
+def _get_pool_hash() -> ProcessPoolExecutor:
+    """Pool de procesos compartido para bcrypt (se crea una sola vez por proceso del servidor)."""
+    global _pool_hash, _pool_workers
+    with _pool_lock:
+        if _pool_hash is None:
+            _pool_workers = settings.CARGA_MASIVA_HASH_WORKERS or os.cpu_count() or 2
+            _pool_hash = ProcessPoolExecutor(max_workers=_pool_workers)
+        return _pool_hash
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hashea una lista de contraseñas en paralelo. Con pocas contraseñas no vale la pena el pool."""
+    if len(passwords) < 4:
+        return [hash_password(p) for p in passwords]
+    pool = _get_pool_hash()
+    chunksize = max(1, len(passwords) // (_pool_workers * 4))
+    return list(pool.map(hash_password, passwords, chunksize=chunksize))
+
+
+def _leer_csv(archivo) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Itera las filas del CSV como diccionarios con encabezados normalizados.
+
+    Lanza ValueError si faltan columnas obligatorias o el archivo excede el límite de filas.
+    """
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    try:
+        muestra = texto.read(4096)
+        dialecto = csv.excel
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+        except csv.Error:
+            pass
+        texto.seek(0)
+
+        lector = csv.reader(texto, dialecto)
+        encabezados = next(lector, None)
+        if not encabezados:
+            raise ValueError("El archivo CSV está vacío")
+        encabezados = [h.strip().lower() for h in encabezados]
+        faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in encabezados]
+        if faltantes:
+            raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+
+        for numero, valores in enumerate(lector, start=2):
+            if not any(v.strip() for v in valores):
+                continue
+            if numero - 1 > CARGA_MASIVA_MAX_FILAS:
+                raise ValueError(f"El archivo excede el máximo de {CARGA_MASIVA_MAX_FILAS} filas")
+            yield numero, {h: (v.strip() if v is not None else "") for h, v in zip(encabezados, valores)}
+    finally:
+        # No cerrar el archivo subyacente (lo administra FastAPI)
+        texto.detach()
+
+
+def _construir_usuario(
+    fila: Dict[str, str],
+    id_unidad_forzada: Optional[int],
+    roles_permitidos: Optional[Set[int]],
+) -> UsuarioCreate:
+    """Valida una fila y la convierte en UsuarioCreate (sin contraseña aún). Lanza ValueError."""
+    try:
+        id_rol = int(fila.get("id_rol") or 0)
+        id_nivel = int(fila.get("id_nivel") or 0)
+        id_unidad = id_unidad_forzada if id_unidad_forzada is not None else int(fila.get("id_unidad_academica") or 0)
+    except ValueError:
+        raise ValueError("Id_Rol, Id_Nivel e Id_Unidad_Academica deben ser numéricos")
+    if not id_unidad:
+        raise ValueError("Falta Id_Unidad_Academica")
+    if roles_permitidos is not None and id_rol not in roles_permitidos:
+        raise ValueError(f"No tiene permisos para asignar el rol {id_rol}")
+
+    email = fila.get("email", "")
+    # Igual que en el formulario: el usuario se deriva del email si no se indica
+    usuario = fila.get("usuario") or email.split("@")[0]
+    try:
+        return UsuarioCreate(
+            Usuario=usuario,
+            Email=email,
+            Id_Unidad_Academica=id_unidad,
+            Id_Rol=id_rol,
+            Password="",
+            Id_Estatus=ESTATUS_ACTIVO,
+            Nombre=fila.get("nombre", ""),
+            Paterno=fila.get("paterno", ""),
+            Materno=fila.get("materno", ""),
+            Id_Nivel=id_nivel,
+        )
+    except ValidationError as e:
+        campos = ", ".join(str(err["loc"][0]) for err in e.errors())
+        raise ValueError(f"Datos inválidos en: {campos}")
+
+
+def _detectar_conflictos(db: Session, candidatos: List[Tuple[int, UsuarioCreate]]) -> Dict[int, str]:
+    """Aplica las mismas reglas que register_usuario, pero con una consulta por bloque en lugar de 3 por fila."""
+    conflictos: Dict[int, str] = {}
+    personas_activas: Set[Tuple[str, str, str]] = set()
+    usuarios_activos: Set[str] = set()
+    emails_activos: Set[str] = set()
+
+    for i in range(0, len(candidatos), CARGA_MASIVA_LOTE_CONSULTA):
+        bloque = [u for _, u in candidatos[i:i + CARGA_MASIVA_LOTE_CONSULTA]]
+        existentes = read_usuarios_coincidentes(
+            db,
+            usuarios={u.Usuario for u in bloque},
+            emails={u.Email for u in bloque},
+            nombres={u.Nombre for u in bloque},
+        )
+        for usuario, email, nombre, paterno, materno, id_estatus in existentes:
+            if id_estatus == ESTATUS_BAJA:
+                continue
+            usuarios_activos.add(usuario.lower())
+            if email:
+                emails_activos.add(email.lower())
+            personas_activas.add(((nombre or "").lower(), (paterno or "").lower(), (materno or "").lower()))
+
+    # Duplicados dentro del mismo archivo cuentan igual que los existentes
+    for numero, u in candidatos:
+        persona = (u.Nombre.lower(), u.Paterno.lower(), u.Materno.lower())
+        if persona in personas_activas:
+            conflictos[numero] = "La persona ya está registrada"
+        elif u.Usuario.lower() in usuarios_activos:
+            conflictos[numero] = "El nombre de usuario ya está registrado y activo."
+        elif u.Email.lower() in emails_activos:
+            conflictos[numero] = "Email ya está registrado"
+        else:
+            personas_activas.add(persona)
+            usuarios_activos.add(u.Usuario.lower())
+            emails_activos.add(u.Email.lower())
+    return conflictos
+
+
+def _insertar_lote(
+    db: Session,
+    lote: List[Tuple[int, UsuarioCreate]],
+    host: str,
+    id_periodo: int,
+) -> Tuple[List[Tuple[int, Usuario]], Dict[int, str]]:
+    """Inserta un lote en una transacción. Si falla por integridad, reintenta fila por fila."""
+    def _insertar(filas):
+        nuevos = [(numero, Usuario(**u.model_dump())) for numero, u in filas]
+        db.add_all([n for _, n in nuevos])
+        db.flush()
+        ahora = datetime.now()
+        # Marca de contraseña temporal: obliga al cambio en el primer inicio de sesión
+        db.add_all([
+            Bitacora(
+                Id_Usuario=n.Id_Usuario,
+                Id_Modulo=1,
+                Id_Periodo=id_periodo,
+                Acciones=f"Nueva contraseña temporal generada para {n.Usuario}",
+                Host=host,
+                Fecha=ahora,
+            )
+            for _, n in nuevos
+        ])
+        db.commit()
+        return nuevos
+
+    try:
+        return _insertar(lote), {}
+    except IntegrityError:
+        db.rollback()
+
+    creados: List[Tuple[int, Usuario]] = []
+    errores: Dict[int, str] = {}
+    for fila in lote:
+        try:
+            creados.extend(_insertar([fila]))
+        except IntegrityError as e:
+            db.rollback()
+            print(f"❌ Error de integridad en carga masiva (fila {fila[0]}): {e.orig}")
+            errores[fila[0]] = "Email ya está registrado"
+    return creados, errores
+
+
+def provisionar_usuarios_csv(
+    db: Session,
+    archivo,
+    id_unidad_forzada: Optional[int] = None,
+    roles_permitidos: Optional[Iterable[int]] = None,
+    host: str = "",
+    id_periodo: int = 7,
+) -> Dict[str, Any]:
+    """
+    Da de alta los usuarios del CSV y devuelve el reporte por fila:
+    {"creados": n, "errores": n, "filas": [{fila, usuario, email, estado, detalle}], "correos": [...]}
+
+    - id_unidad_forzada: si se indica, todos los usuarios se crean en esa UA (admins de UA).
+    - roles_permitidos: ids de rol que el usuario que carga puede asignar (None = todos).
+    Los correos de bienvenida se devuelven en "correos" para enviarse fuera de la petición.
+    """
+    roles = set(roles_permitidos) if roles_permitidos is not None else None
+    reporte: Dict[int, Dict[str, Any]] = {}
+    candidatos: List[Tuple[int, UsuarioCreate]] = []
+
+    for numero, fila in _leer_csv(archivo):
+        try:
+            candidatos.append((numero, _construir_usuario(fila, id_unidad_forzada, roles)))
+        except ValueError as e:
+            reporte[numero] = {
+                "fila": numero,
+                "usuario": fila.get("usuario") or fila.get("email", "").split("@")[0],
+                "email": fila.get("email", ""),
+                "estado": "error",
+                "detalle": str(e),
+            }
+
+    conflictos = _detectar_conflictos(db, candidatos)
+    validos = [(n, u) for n, u in candidatos if n not in conflictos]
+    for numero, u in candidatos:
+        if numero in conflictos:
+            reporte[numero] = {"fila": numero, "usuario": u.Usuario, "email": u.Email, "estado": "error", "detalle": conflictos[numero]}
+
+    # Contraseñas temporales: bcrypt es lo costoso, se reparte en el pool de procesos
+    temporales = [generate_random_password() for _ in validos]
+    for (_, u), hashed in zip(validos, hash_passwords(temporales)):
+        u.Password = hashed
+    temporal_por_fila = {numero: pwd for (numero, _), pwd in zip(validos, temporales)}
+
+    validos_por_fila = dict(validos)
+    correos: List[Dict[str, str]] = []
+    for i in range(0, len(validos), CARGA_MASIVA_LOTE_INSERCION):
+        creados, errores = _insertar_lote(db, validos[i:i + CARGA_MASIVA_LOTE_INSERCION], host, id_periodo)
+        for numero, nuevo in creados:
+            reporte[numero] = {
+                "fila": numero,
+                "usuario": nuevo.Usuario,
+                "email": nuevo.Email,
+                "estado": "creado",
+                "detalle": f"Id_Usuario {nuevo.Id_Usuario}",
+            }
+            correos.append({"email": nuevo.Email, "nombre": nuevo.Nombre or "", "usuario": nuevo.Usuario, "password": temporal_por_fila[numero]})
+        for numero, detalle in errores.items():
+            u = validos_por_fila[numero]
+            reporte[numero] = {"fila": numero, "usuario": u.Usuario, "email": u.Email, "estado": "error", "detalle": detalle}
+
+    filas = [reporte[n] for n in sorted(reporte)]
+    creados_total = sum(1 for f in filas if f["estado"] == "creado")
+    print(f"✅ Carga masiva: {creados_total} usuarios creados, {len(filas) - creados_total} con error")
+    return {
+        "creados": creados_total,
+        "errores": len(filas) - creados_total,
+        "filas": filas,
+        "correos": correos,
+    }
+
+
+def enviar_correos_bienvenida(correos: List[Dict[str, str]]) -> None:
+    """Envía los correos de bienvenida con la contraseña temporal (se ejecuta en segundo plano)."""
+    enviados = 0
+    for c in correos:
+        cuerpo = f"""
+        <p>Hola {c['nombre']},</p>
+        <p>Se ha creado tu cuenta en el Sistema SAE.</p>
+        <p>Usuario: <strong>{c['usuario']}</strong></p>
+        <p>Contraseña temporal: <strong>{c['password']}</strong></p>
+        <p>Por seguridad, cámbiela después de Iniciar Sesión.</p>
+        <p>-- Sistema SAE</p>
+        """
+        try:
+            send_email(c["email"], "Bienvenido al Sistema SAE", cuerpo)
+            enviados += 1
+        except EmailSendError as e:
+            print(f"❌ No se pudo enviar correo de bienvenida a {c['email']}: {e}")
+    print(f"✅ Correos de bienvenida enviados: {enviados}/{len(correos)}")
@@ -0,0 +1,123 @@
+"""
+Catálogos en memoria para decodificar IDs (Id_Programa -> Nombre_Programa, etc.).
+
+Los catálogos cambian muy poco y son pequeños; se cargan completos la primera vez que
+se piden y se conservan CATALOGOS_CACHE_TTL_SEGUNDOS. Las exportaciones y reportes los
+usan para traducir IDs fila por fila sin hacer JOINs contra cada catálogo.
+
+version_catalogos() resume el estado de todas las tablas de catálogo (filas y última
+Fecha_Modificacion) en una firma corta; las plantillas la usan como llave de la caché de
+fragmentos ({% cache %}, ver backend/core/fragmentos.py). Como los catálogos también se
+editan fuera de la aplicación, la firma se vuelve a consultar cada
+CATALOGOS_VERSION_TTL_SEGUNDOS.
+"""
+from backend.database.models.CatPeriodo import CatPeriodo
+from backend.database.models.CatUnidadAcademica import CatUnidadAcademica
+from backend.database.models.CatNivel import CatNivel
+from backend.database.models.CatProgramas import CatProgramas
+from backend.database.models.CatRama import CatRama
+from backend.database.models.CatModalidad import CatModalidad
+from backend.database.models.CatTurno import CatTurno
+from backend.database.models.CatSemestre import CatSemestre
+from backend.database.models.CatGrupoEdad import CatGrupoEdad
+from backend.database.models.CatTipoIngreso import TipoIngreso
+from backend.database.models.CatSexo import CatSexo
+from backend.database.models.CatEstatus import CatEstatus
+from backend.database.models.CatRoles import CatRoles
+from backend.database.models.CatSemaforo import CatSemaforo
+from backend.database.models.CatDomicilios import CatDomicilios
+from backend.database.models.ProgramaModalidad import ProgramaModalidad
+from backend.database.models.UnidadProgramaModalidad import CatUnidadProgramaModalidad
+from backend.database.models.Temporal_Entidades_Municipios import temporal_Entidades_Municipios
+from backend.core.config import settings
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Tuple
+
+import hashlib
+import threading
+import time
+
+CATALOGOS_CACHE_TTL_SEGUNDOS = 600
+
+# nombre -> (columna id, columna descripción)
+CATALOGOS = {
+    "periodo": (CatPeriodo.Id_Periodo, CatPeriodo.Periodo),
+    "unidad_academica": (CatUnidadAcademica.Id_Unidad_Academica, CatUnidadAcademica.Sigla),
+    "nivel": (CatNivel.Id_Nivel, CatNivel.Nivel),
+    "programa": (CatProgramas.Id_Programa, CatProgramas.Nombre_Programa),
+    "rama": (CatRama.Id_Rama, CatRama.Nombre_Rama),
+    "modalidad": (CatModalidad.Id_Modalidad, CatModalidad.Modalidad),
+    "turno": (CatTurno.Id_Turno, CatTurno.Turno),
+    "semestre": (CatSemestre.Id_Semestre, CatSemestre.Semestre),
+    "grupo_edad": (CatGrupoEdad.Id_Grupo_Edad, CatGrupoEdad.Grupo_Edad),
+    "tipo_ingreso": (TipoIngreso.Id_Tipo_Ingreso, TipoIngreso.Tipo_de_Ingreso),
+    "sexo": (CatSexo.Id_Sexo, CatSexo.Sexo),
+}
+
+# Tablas que determinan el contenido de las vistas y selectores derivados de catálogos
+CATALOGOS_VERSIONADOS = [
+    CatPeriodo, CatUnidadAcademica, CatNivel, CatProgramas, CatRama, CatModalidad, CatTurno,
+    CatSemestre, CatGrupoEdad, TipoIngreso, CatSexo, CatEstatus, CatRoles, CatSemaforo,
+    CatDomicilios, ProgramaModalidad, CatUnidadProgramaModalidad, temporal_Entidades_Municipios,
+]
+
+_catalogos_lock = threading.Lock()
+_catalogos_cache: Dict[str, Tuple[float, Dict[int, str]]] = {}
+_version_cache: Optional[Tuple[float, str]] = None
+
+
+def get_catalogo(db: Session, nombre: str) -> Dict[int, str]:
+    """Diccionario {id: descripción} del catálogo, desde caché si está vigente."""
+    if nombre not in CATALOGOS:
+        raise ValueError(f"Catálogo desconocido: {nombre}")
+    ahora = time.monotonic()
+    with _catalogos_lock:
+        en_cache = _catalogos_cache.get(nombre)
+    if en_cache is not None and ahora - en_cache[0] < CATALOGOS_CACHE_TTL_SEGUNDOS:
+        return en_cache[1]
+
+    columna_id, columna_desc = CATALOGOS[nombre]
+    valores = {id_: desc for id_, desc in db.query(columna_id, columna_desc).all()}
+    with _catalogos_lock:
+        _catalogos_cache[nombre] = (ahora, valores)
+    return valores
+
+
+def get_catalogos(db: Session, *nombres: str) -> Dict[str, Dict[int, str]]:
+    return {nombre: get_catalogo(db, nombre) for nombre in nombres}
+
+
+def version_catalogos(db: Session) -> str:
+    """Firma del estado de CATALOGOS_VERSIONADOS; cambia al insertar, borrar o modificar filas."""
+    global _version_cache
+    ahora = time.monotonic()
+    with _catalogos_lock:
+        en_cache = _version_cache
+    if en_cache is not None and ahora - en_cache[0] < settings.CATALOGOS_VERSION_TTL_SEGUNDOS:
+        return en_cache[1]
+
+    # Una sola consulta: (COUNT, MAX(Fecha_Modificacion)) de cada tabla como subconsultas escalares
+    columnas = []
+    for modelo in CATALOGOS_VERSIONADOS:
+        tabla = modelo.__table__
+        columnas.append(select(func.count()).select_from(tabla).scalar_subquery())
+        if "Fecha_Modificacion" in tabla.c:
+            columnas.append(select(func.max(tabla.c.Fecha_Modificacion)).scalar_subquery())
+    fila = db.execute(select(*columnas)).one()
+    version = hashlib.sha1(repr(tuple(fila)).encode("utf-8")).hexdigest()[:12]
+    with _catalogos_lock:
+        _version_cache = (ahora, version)
+    return version
+
+
+def invalidar_catalogos(nombre: str = None) -> None:
+    """Descarta la caché (p. ej. después de editar un catálogo); la versión se vuelve a consultar."""
+    global _version_cache
+    with _catalogos_lock:
+        if nombre is None:
+            _catalogos_cache.clear()
+        else:
+            _catalogos_cache.pop(nombre, None)
+        _version_cache = None
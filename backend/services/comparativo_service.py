@@ -0,0 +1,157 @@
+"""
+Comparativo de matrícula de una UA contra el periodo anterior (apoyo para validar).
+
+- Cada periodo se lee con UNA consulta agregada por (programa, semestre, turno).
+- Las dos series se alinean con NumPy: cada combinación de dimensiones se convierte en
+  una llave entera (ravel_multi_index), se obtiene la unión de llaves y los totales se
+  colocan con searchsorted. Celdas que sólo existen en un periodo quedan en 0 del otro.
+- Por celda se calcula delta, % de cambio y si es atípica según los umbrales
+  (porcentaje Y número de alumnos; configurables por settings o por petición).
+"""
+from backend.core.config import settings
+from backend.crud.Matricula import get_totales_matricula_ua
+from backend.database.models.CatPeriodo import CatPeriodo as Periodo
+from backend.services.catalogos_service import get_catalogos
+
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+DIMENSIONES_COMPARATIVO = (
+    ("Id_Programa", "programa"),
+    ("Id_Semestre", "semestre"),
+    ("Id_Turno", "turno"),
+)
+
+
+def get_periodo_anterior(db: Session, id_periodo: int) -> Optional[int]:
+    """Periodo inmediato anterior (por Fecha_Inicio)."""
+    actual = db.query(Periodo.Fecha_Inicio).filter(Periodo.Id_Periodo == id_periodo).scalar()
+    if actual is None:
+        return None
+    return (
+        db.query(Periodo.Id_Periodo)
+        .filter(Periodo.Fecha_Inicio < actual, Periodo.Id_Periodo != id_periodo)
+        .order_by(Periodo.Fecha_Inicio.desc())
+        .limit(1)
+        .scalar()
+    )
+
+
+def _a_arreglos(filas) -> Tuple[np.ndarray, np.ndarray]:
+    """Filas (programa, semestre, turno, total) -> (claves n×3, totales n)."""
+    if not filas:
+        return np.empty((0, len(DIMENSIONES_COMPARATIVO)), dtype=np.int64), np.empty(0, dtype=np.int64)
+    datos = np.asarray([tuple(f) for f in filas], dtype=np.int64)
+    return datos[:, :-1], datos[:, -1]
+
+
+def alinear_periodos(
+    claves_actual: np.ndarray,
+    totales_actual: np.ndarray,
+    claves_anterior: np.ndarray,
+    totales_anterior: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Une dos series (claves n×d, totales n o n×k) sobre sus claves. Regresa
+    (claves de la unión m×d, totales actuales m[×k], totales anteriores m[×k]), ordenadas por clave.
+    """
+    todas = np.vstack([claves_actual, claves_anterior])
+    if len(todas) == 0:
+        return (
+            todas,
+            np.empty((0,) + totales_actual.shape[1:], dtype=np.int64),
+            np.empty((0,) + totales_anterior.shape[1:], dtype=np.int64),
+        )
+    forma = tuple(int(m) + 1 for m in todas.max(axis=0))
+    llaves_actual = np.ravel_multi_index(claves_actual.T, forma)
+    llaves_anterior = np.ravel_multi_index(claves_anterior.T, forma)
+    union = np.union1d(llaves_actual, llaves_anterior)
+
+    actual = np.zeros((len(union),) + totales_actual.shape[1:], dtype=np.int64)
+    anterior = np.zeros((len(union),) + totales_anterior.shape[1:], dtype=np.int64)
+    # Si una serie trae la misma clave más de una vez, se suman
+    np.add.at(actual, np.searchsorted(union, llaves_actual), totales_actual)
+    np.add.at(anterior, np.searchsorted(union, llaves_anterior), totales_anterior)
+    claves = np.stack(np.unravel_index(union, forma), axis=1)
+    return claves, actual, anterior
+
+
+def calcular_deltas(
+    actual: np.ndarray,
+    anterior: np.ndarray,
+    umbral_pct: float,
+    umbral_alumnos: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    delta, % de cambio (NaN si el periodo anterior es 0) y marca de atípico.
+    Atípico: |delta| >= umbral_alumnos y (|%| >= umbral_pct o la celda es nueva).
+    """
+    delta = actual - anterior
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(anterior != 0, delta * 100.0 / anterior, np.nan)
+    cambio_relevante = np.where(np.isnan(pct), actual != 0, np.abs(pct) >= umbral_pct)
+    atipico = (np.abs(delta) >= umbral_alumnos) & cambio_relevante
+    return delta, pct, atipico
+
+
+def comparar_periodos(
+    db: Session,
+    id_unidad_academica: int,
+    id_periodo: int,
+    id_periodo_anterior: Optional[int] = None,
+    id_nivel: Optional[int] = None,
+    umbral_pct: Optional[float] = None,
+    umbral_alumnos: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Comparativo por programa/semestre/turno entre el periodo y el anterior."""
+    if id_periodo_anterior is None:
+        id_periodo_anterior = get_periodo_anterior(db, id_periodo)
+    umbral_pct = settings.COMPARATIVO_UMBRAL_PCT if umbral_pct is None else umbral_pct
+    umbral_alumnos = settings.COMPARATIVO_UMBRAL_ALUMNOS if umbral_alumnos is None else umbral_alumnos
+
+    claves_act, tot_act = _a_arreglos(get_totales_matricula_ua(db, id_periodo, id_unidad_academica, id_nivel))
+    if id_periodo_anterior:
+        claves_ant, tot_ant = _a_arreglos(get_totales_matricula_ua(db, id_periodo_anterior, id_unidad_academica, id_nivel))
+    else:
+        claves_ant, tot_ant = _a_arreglos([])
+
+    claves, actual, anterior = alinear_periodos(claves_act, tot_act, claves_ant, tot_ant)
+    delta, pct, atipico = calcular_deltas(actual, anterior, umbral_pct, umbral_alumnos)
+
+    catalogos = get_catalogos(db, "periodo", *(c for _, c in DIMENSIONES_COMPARATIVO))
+    filas = []
+    for i in range(len(claves)):
+        fila = {}
+        for j, (_, catalogo) in enumerate(DIMENSIONES_COMPARATIVO):
+            id_ = int(claves[i, j])
+            fila[catalogo] = {"id": id_, "nombre": catalogos[catalogo].get(id_, str(id_))}
+        fila.update({
+            "actual": int(actual[i]),
+            "anterior": int(anterior[i]),
+            "delta": int(delta[i]),
+            "porcentaje": None if np.isnan(pct[i]) else round(float(pct[i]), 2),
+            "atipico": bool(atipico[i]),
+        })
+        filas.append(fila)
+
+    total_actual, total_anterior = int(actual.sum()), int(anterior.sum())
+    return {
+        "id_unidad_academica": id_unidad_academica,
+        "periodo": {"id": id_periodo, "nombre": catalogos["periodo"].get(id_periodo)},
+        "periodo_anterior": {
+            "id": id_periodo_anterior,
+            "nombre": catalogos["periodo"].get(id_periodo_anterior) if id_periodo_anterior else None,
+        },
+        "umbrales": {"porcentaje": umbral_pct, "alumnos": umbral_alumnos},
+        "filas": filas,
+        "resumen": {
+            "total_actual": total_actual,
+            "total_anterior": total_anterior,
+            "delta": total_actual - total_anterior,
+            "porcentaje": round((total_actual - total_anterior) * 100.0 / total_anterior, 2) if total_anterior else None,
+            "celdas": len(filas),
+            "atipicas": int(atipico.sum()),
+        },
+    }
@@ -0,0 +1,197 @@
+"""
+Reglas de consistencia entre formatos (matrícula vs aprovechamiento).
+
+Ambos formatos se cargan con una consulta agregada cada uno, por celda
+(UA, programa, semestre, turno, sexo), para una UA o para toda la institución.
+Las series se alinean con alinear_periodos (llaves enteras + searchsorted) y cada
+regla se evalúa como una operación sobre arreglos que regresa la máscara de celdas
+que la violan; no hay ciclos por celda salvo al serializar las violaciones.
+
+Agregar una regla = agregar una ReglaConsistencia a REGLAS_CONSISTENCIA.
+
+No hay catálogo de conceptos de aprovechamiento ni garantía de que sean excluyentes,
+así que la suma de conceptos no se compara con la matrícula: la regla de exceso usa el
+mayor concepto de la celda. Si la tabla Aprovechamiento no existe (ver el modelo), sólo
+se evalúa la matrícula y la respuesta lo indica con aprovechamiento_disponible=False.
+"""
+from backend.crud.Aprovechamiento import get_totales_aprovechamiento_celdas
+from backend.crud.Matricula import get_totales_matricula_celdas
+from backend.services.catalogos_service import get_catalogos
+from backend.services.comparativo_service import alinear_periodos
+
+from dataclasses import dataclass
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional
+
+import time
+
+import numpy as np
+
+SEVERIDAD_ERROR = "error"
+SEVERIDAD_AVISO = "aviso"
+
+# Columnas de llave de cada celda (mismo orden que las consultas agregadas)
+DIMENSIONES_CONSISTENCIA = (
+    ("Id_Unidad_Academica", "unidad_academica"),
+    ("Id_Programa", "programa"),
+    ("Id_Semestre", "semestre"),
+    ("Id_Turno", "turno"),
+    ("Id_Sexo", "sexo"),
+)
+
+
+@dataclass
+class CeldasConsistencia:
+    """Ambos formatos alineados por celda (arreglos de la misma longitud)."""
+    claves: np.ndarray                    # m × 5
+    matricula: np.ndarray                 # suma de matrícula
+    aprovechamiento: np.ndarray           # suma de todos los conceptos de aprovechamiento
+    aprovechamiento_maximo: np.ndarray    # mayor valor de un solo concepto
+    negativos_matricula: np.ndarray
+    negativos_aprovechamiento: np.ndarray
+    ua_con_aprovechamiento: np.ndarray    # la UA de la celda ya capturó aprovechamiento
+    aprovechamiento_disponible: bool = True
+
+
+@dataclass(frozen=True)
+class ReglaConsistencia:
+    codigo: str
+    descripcion: str
+    severidad: str
+    evaluar: Callable[[CeldasConsistencia], np.ndarray]
+
+
+REGLAS_CONSISTENCIA = (
+    ReglaConsistencia(
+        "aprovechamiento_excede_matricula",
+        "Un concepto de aprovechamiento supera la matrícula de la celda",
+        SEVERIDAD_ERROR,
+        lambda c: (c.matricula > 0) & (c.aprovechamiento_maximo > c.matricula),
+    ),
+    ReglaConsistencia(
+        "aprovechamiento_sin_matricula",
+        "Hay aprovechamiento en una celda sin matrícula",
+        SEVERIDAD_ERROR,
+        lambda c: (c.matricula == 0) & (c.aprovechamiento > 0),
+    ),
+    ReglaConsistencia(
+        "valores_negativos",
+        "La celda tiene valores negativos en matrícula o aprovechamiento",
+        SEVERIDAD_ERROR,
+        lambda c: (c.negativos_matricula > 0) | (c.negativos_aprovechamiento > 0),
+    ),
+    ReglaConsistencia(
+        "matricula_sin_aprovechamiento",
+        "La UA ya capturó aprovechamiento pero esta celda con matrícula no tiene",
+        SEVERIDAD_AVISO,
+        lambda c: c.ua_con_aprovechamiento & (c.matricula > 0) & (c.aprovechamiento == 0),
+    ),
+)
+
+
+def _a_arreglos(filas, columnas_valor: int = 2) -> tuple:
+    """Filas (5 llaves, valores...) -> (claves n×5, valores n×columnas_valor)."""
+    columnas_llave = len(DIMENSIONES_CONSISTENCIA)
+    if not filas:
+        return np.empty((0, columnas_llave), dtype=np.int64), np.empty((0, columnas_valor), dtype=np.int64)
+    datos = np.asarray([tuple(f) for f in filas], dtype=np.int64)
+    return datos[:, :columnas_llave], datos[:, columnas_llave:]
+
+
+def cargar_celdas(db: Session, id_periodo: int, id_unidad_academica: Optional[int] = None) -> CeldasConsistencia:
+    claves_mat, valores_mat = _a_arreglos(get_totales_matricula_celdas(db, id_periodo, id_unidad_academica))
+    disponible = True
+    try:
+        filas_apr = get_totales_aprovechamiento_celdas(db, id_periodo, id_unidad_academica)
+    except DBAPIError as e:
+        db.rollback()
+        print(f"⚠️ No se pudo leer la tabla Aprovechamiento; se revisa sólo matrícula: {e.orig}")
+        filas_apr, disponible = [], False
+    claves_apr, valores_apr = _a_arreglos(filas_apr, columnas_valor=3)
+    claves, matricula, aprovechamiento = alinear_periodos(claves_mat, valores_mat, claves_apr, valores_apr)
+
+    uas_con_aprovechamiento = np.unique(claves_apr[:, 0])
+    return CeldasConsistencia(
+        claves=claves,
+        matricula=matricula[:, 0],
+        aprovechamiento=aprovechamiento[:, 0],
+        negativos_matricula=matricula[:, 1],
+        negativos_aprovechamiento=aprovechamiento[:, 1],
+        aprovechamiento_maximo=aprovechamiento[:, 2],
+        ua_con_aprovechamiento=np.isin(claves[:, 0], uas_con_aprovechamiento),
+        aprovechamiento_disponible=disponible,
+    )
+
+
+def evaluar_reglas(celdas: CeldasConsistencia, reglas=REGLAS_CONSISTENCIA) -> Dict[str, np.ndarray]:
+    """Máscara de violaciones por regla."""
+    return {regla.codigo: np.asarray(regla.evaluar(celdas), dtype=bool) for regla in reglas}
+
+
+def revisar_consistencia(
+    db: Session,
+    id_periodo: int,
+    id_unidad_academica: Optional[int] = None,
+    limite: int = 5000,
+) -> Dict[str, Any]:
+    """
+    Evalúa todas las reglas para una UA (o toda la institución) y regresa las
+    violaciones por celda (hasta `limite`) y el conteo por regla y por UA.
+    """
+    inicio = time.perf_counter()
+    celdas = cargar_celdas(db, id_periodo, id_unidad_academica)
+    carga_ms = (time.perf_counter() - inicio) * 1000
+    mascaras = evaluar_reglas(celdas)
+    reglas = {r.codigo: r for r in REGLAS_CONSISTENCIA}
+
+    catalogos = get_catalogos(db, *(c for _, c in DIMENSIONES_CONSISTENCIA))
+    violaciones: List[Dict[str, Any]] = []
+    por_ua: Dict[int, Dict[str, int]] = {}
+    for codigo, mascara in mascaras.items():
+        indices = np.flatnonzero(mascara)
+        uas, conteos = np.unique(celdas.claves[indices, 0], return_counts=True)
+        for ua, conteo in zip(uas.tolist(), conteos.tolist()):
+            por_ua.setdefault(ua, {})[codigo] = conteo
+        for i in indices[: max(0, limite - len(violaciones))]:
+            celda = {}
+            for j, (_, catalogo) in enumerate(DIMENSIONES_CONSISTENCIA):
+                id_ = int(celdas.claves[i, j])
+                celda[catalogo] = {"id": id_, "nombre": catalogos[catalogo].get(id_, str(id_))}
+            violaciones.append({
+                "regla": codigo,
+                "severidad": reglas[codigo].severidad,
+                "celda": celda,
+                "matricula": int(celdas.matricula[i]),
+                "aprovechamiento": int(celdas.aprovechamiento[i]),
+                "aprovechamiento_maximo": int(celdas.aprovechamiento_maximo[i]),
+            })
+
+    total = int(sum(int(m.sum()) for m in mascaras.values()))
+    resultado = {
+        "id_periodo": id_periodo,
+        "id_unidad_academica": id_unidad_academica,
+        "celdas_revisadas": int(len(celdas.claves)),
+        "aprovechamiento_disponible": celdas.aprovechamiento_disponible,
+        "reglas": [
+            {
+                "codigo": r.codigo,
+                "descripcion": r.descripcion,
+                "severidad": r.severidad,
+                "violaciones": int(mascaras[r.codigo].sum()),
+            }
+            for r in REGLAS_CONSISTENCIA
+        ],
+        "por_unidad": [
+            {"id_unidad_academica": ua, "sigla": catalogos["unidad_academica"].get(ua), "violaciones": conteos}
+            for ua, conteos in sorted(por_ua.items())
+        ],
+        "violaciones": violaciones,
+        "total_violaciones": total,
+        "truncado": total > len(violaciones),
+        "carga_ms": round(carga_ms, 1),
+        "ms": round((time.perf_counter() - inicio) * 1000, 1),
+    }
+    print(f"🔎 Consistencia periodo {id_periodo} UA={id_unidad_academica or 'todas'}: "
+          f"{resultado['celdas_revisadas']} celdas, {total} violaciones en {resultado['ms']} ms")
+    return resultado
@@ -0,0 +1,215 @@
+"""
+Cubo de agregación en memoria sobre los snapshots columnares de Matricula.
+
+El snapshot (Parquet/Arrow, ver snapshot_service) se carga una vez en arreglos NumPy:
+por cada dimensión se guarda el código denso de cada fila (0..k-1) y los IDs/etiquetas
+distintos. Una consulta (subconjunto de dimensiones + filtros) se resuelve así:
+
+1. Máscara booleana con los filtros (np.isin sobre los códigos).
+2. Llave combinada de grupo con np.ravel_multi_index sobre los códigos.
+3. Suma de Matricula por llave:
+   - np.bincount(ponderado) si el producto de cardinalidades es pequeño (denso);
+   - si no, ordenar llaves y sumar tramos con np.add.reduceat.
+
+No toca SQL Server: las consultas típicas responden en milisegundos. El cubo se
+recarga solo cuando aparece un snapshot más reciente.
+
+Sin snapshot explícito se usa el más reciente que contenga los periodos consultados
+(el del periodo o uno de todos los periodos), nunca el más reciente sin importar el
+periodo: si no, los totales podrían sumar varios periodos.
+"""
+from backend.services.snapshot_service import (
+    ETIQUETA_TODOS_PERIODOS,
+    LLAVES_SNAPSHOT,
+    describir_snapshot,
+    listar_snapshots,
+    get_ruta_snapshot,
+)
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import threading
+import time
+
+import numpy as np
+
+DIMENSIONES_CUBO = tuple(catalogo for _, catalogo in LLAVES_SNAPSHOT)
+
+# Arriba de este número de celdas posibles se usa sort + reduceat en lugar de bincount
+MAX_CELDAS_BINCOUNT = 2_000_000
+
+
+@dataclass
+class Dimension:
+    nombre: str
+    codigos: np.ndarray      # código denso por fila (int32)
+    ids: np.ndarray          # ID de catálogo por código
+    etiquetas: List[str]     # descripción por código
+
+    def codigos_de(self, ids: Sequence[int]) -> np.ndarray:
+        return np.flatnonzero(np.isin(self.ids, np.asarray(ids, dtype=self.ids.dtype)))
+
+
+class CuboMatricula:
+    """Arreglos columnares de un snapshot listos para agregaciones vectorizadas."""
+
+    def __init__(self, nombre_snapshot: str, dimensiones: Dict[str, Dimension], matricula: np.ndarray):
+        self.nombre_snapshot = nombre_snapshot
+        self.dimensiones = dimensiones
+        self.matricula = matricula
+        self.filas = len(matricula)
+
+    @classmethod
+    def desde_snapshot(cls, nombre: str) -> "CuboMatricula":
+        import pyarrow as pa
+
+        ruta = get_ruta_snapshot(nombre)
+        if ruta is None:
+            raise FileNotFoundError(f"Snapshot no encontrado: {nombre}")
+        inicio = time.perf_counter()
+        if nombre.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            tabla = pq.read_table(ruta)
+        else:
+            with pa.memory_map(ruta, "r") as fuente:
+                tabla = pa.ipc.open_file(fuente).read_all()
+
+        dimensiones = {}
+        for columna_id, catalogo in LLAVES_SNAPSHOT:
+            ids_fila = tabla.column(columna_id).to_numpy()
+            ids, primeras, codigos = np.unique(ids_fila, return_index=True, return_inverse=True)
+            # Todas las filas del mismo ID comparten etiqueta: basta la de la primera
+            etiquetas_fila = tabla.column(catalogo).take(pa.array(primeras)).to_pylist()
+            etiquetas = [e if e is not None else str(i) for e, i in zip(etiquetas_fila, ids.tolist())]
+            dimensiones[catalogo] = Dimension(catalogo, codigos.astype(np.int32), ids, etiquetas)
+
+        matricula = tabla.column("Matricula").to_numpy().astype(np.int64)
+        cubo = cls(nombre, dimensiones, matricula)
+        print(f"🧮 Cubo cargado desde {nombre}: {cubo.filas} filas en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        return cubo
+
+    def _mascara(self, filtros: Dict[str, Sequence[int]]) -> Optional[np.ndarray]:
+        mascara = None
+        for nombre, ids in filtros.items():
+            dimension = self.dimensiones[nombre]
+            condicion = np.isin(dimension.codigos, dimension.codigos_de(ids))
+            mascara = condicion if mascara is None else (mascara & condicion)
+        return mascara
+
+    def agregar(self, dimensiones: Sequence[str], filtros: Optional[Dict[str, Sequence[int]]] = None) -> Dict[str, Any]:
+        """
+        Total de Matricula agrupado por `dimensiones` (puede ser vacío: gran total),
+        considerando sólo las filas cuyos IDs estén en `filtros[dimension]`.
+        """
+        for nombre in list(dimensiones) + list((filtros or {}).keys()):
+            if nombre not in self.dimensiones:
+                raise ValueError(f"Dimensión desconocida: {nombre}")
+
+        inicio = time.perf_counter()
+        mascara = self._mascara(filtros or {})
+        valores = self.matricula if mascara is None else self.matricula[mascara]
+        dims = [self.dimensiones[d] for d in dimensiones]
+
+        if not dims:
+            grupos = [{"total": int(valores.sum())}] if len(valores) else []
+        else:
+            forma = tuple(len(d.ids) for d in dims)
+            codigos = [d.codigos if mascara is None else d.codigos[mascara] for d in dims]
+            llaves = np.ravel_multi_index(codigos, forma)
+            celdas = int(np.prod(forma, dtype=np.int64))
+
+            if celdas <= MAX_CELDAS_BINCOUNT:
+                totales = np.bincount(llaves, weights=valores, minlength=celdas)
+                conteos = np.bincount(llaves, minlength=celdas)
+                presentes = np.flatnonzero(conteos)
+                totales = totales[presentes]
+            else:
+                orden = np.argsort(llaves, kind="stable")
+                llaves_ordenadas = llaves[orden]
+                inicios = np.flatnonzero(np.r_[True, llaves_ordenadas[1:] != llaves_ordenadas[:-1]])
+                presentes = llaves_ordenadas[inicios]
+                totales = np.add.reduceat(valores[orden], inicios) if len(inicios) else np.array([])
+
+            indices = np.unravel_index(presentes, forma)
+            grupos = []
+            for posicion, total in enumerate(totales.tolist()):
+                grupo = {}
+                for d, codigos_d in zip(dims, indices):
+                    codigo = int(codigos_d[posicion])
+                    grupo[d.nombre] = {"id": int(d.ids[codigo]), "nombre": d.etiquetas[codigo]}
+                grupo["total"] = int(total)
+                grupos.append(grupo)
+
+        return {
+            "snapshot": self.nombre_snapshot,
+            "dimensiones": list(dimensiones),
+            "filtros": {k: list(v) for k, v in (filtros or {}).items()},
+            "grupos": grupos,
+            "total": int(valores.sum()),
+            "filas_consideradas": int(len(valores)),
+            "ms": round((time.perf_counter() - inicio) * 1000, 3),
+        }
+
+    def miembros(self, dimension: str) -> List[Dict[str, Any]]:
+        d = self.dimensiones[dimension]
+        return [{"id": int(i), "nombre": e} for i, e in zip(d.ids.tolist(), d.etiquetas)]
+
+
+# _cubo_lock sólo protege los diccionarios; la lectura del snapshot se hace fuera de él
+# con el candado de carga del nombre, así que hay un solo lector por snapshot y las
+# consultas a cubos ya cargados no esperan
+_cubo_lock = threading.Lock()
+_cubos: Dict[str, CuboMatricula] = {}
+_cargas: Dict[str, threading.Lock] = {}
+
+
+def snapshot_para_periodos(etiquetas_periodo: Sequence[str]) -> str:
+    """
+    Nombre del snapshot más reciente que contiene los periodos indicados (etiquetas como
+    en el nombre del archivo): el del propio periodo si es uno solo, o uno de todos los periodos.
+    """
+    aceptados = {ETIQUETA_TODOS_PERIODOS}
+    if len(set(etiquetas_periodo)) == 1:
+        aceptados.add(etiquetas_periodo[0])
+    for snapshot in listar_snapshots():
+        if snapshot["periodo"] in aceptados:
+            return snapshot["nombre"]
+    raise FileNotFoundError(
+        f"No hay snapshots de matrícula del periodo {', '.join(etiquetas_periodo) or ETIQUETA_TODOS_PERIODOS}; "
+        "genere uno en /analitica/snapshots"
+    )
+
+
+def get_cubo(nombre_snapshot: Optional[str] = None, etiquetas_periodo: Sequence[str] = ()) -> CuboMatricula:
+    """
+    Cubo del snapshot indicado o, si no se indica, del más reciente que contiene
+    `etiquetas_periodo` (sin periodos: el más reciente de todos los periodos).
+    Los cubos se conservan en memoria; al cargar un snapshot se descartan los anteriores
+    del mismo periodo y los que ya no existen.
+    """
+    if nombre_snapshot is None:
+        nombre_snapshot = snapshot_para_periodos(etiquetas_periodo)
+
+    with _cubo_lock:
+        cubo = _cubos.get(nombre_snapshot)
+        if cubo is not None:
+            return cubo
+        carga = _cargas.setdefault(nombre_snapshot, threading.Lock())
+
+    with carga:
+        # Quien esperaba la carga de otro hilo encuentra el cubo ya publicado
+        with _cubo_lock:
+            cubo = _cubos.get(nombre_snapshot)
+        if cubo is not None:
+            return cubo
+        cubo = CuboMatricula.desde_snapshot(nombre_snapshot)
+        periodo = describir_snapshot(nombre_snapshot)["periodo"]
+        vigentes = {s["nombre"]: s["periodo"] for s in listar_snapshots()}
+        with _cubo_lock:
+            for nombre in list(_cubos):
+                if vigentes.get(nombre, periodo) == periodo:
+                    del _cubos[nombre]
+            _cubos[nombre_snapshot] = cubo
+            _cargas.pop(nombre_snapshot, None)
+        return cubo
@@ -0,0 +1,134 @@
+"""
+Eventos en vivo de matrícula por (Unidad Académica, Periodo).
+
+Los flujos que cambian el semáforo o el estado de validación publican aquí DESPUÉS
+de su commit; el endpoint SSE /matricula/eventos los entrega a las páginas abiertas
+de esa UA/periodo, que sólo vuelven a consultar el SP cuando llega un evento.
+
+El canal vive en memoria del proceso: con varios workers, cada uno entrega los
+eventos que él mismo generó. Para no perder los de otros workers, cada proceso tiene un
+vigilante por UA/periodo con streams abiertos: revisa Version_Datos cada
+EVENTOS_REVISION_SEGUNDOS (todas esas escrituras incrementan la versión) y, si cambió,
+publica 'version' en el canal; el cliente vuelve a consultar el SP. El vigilante arranca
+con el primer stream de la clave y se detiene con el último, así que N páginas abiertas
+de la misma UA cuestan una consulta por intervalo, no N.
+Al reconectar, 'conectado' trae la versión vigente para el mismo fin.
+"""
+from backend.core.config import settings
+from backend.utils.sse import EventChannel
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+import asyncio
+
+EVENTO_SEMAFORO = "semaforo"
+EVENTO_VALIDACION = "validacion"
+EVENTO_RECHAZO = "rechazo"
+EVENTO_VERSION = "version"
+
+eventos_matricula = EventChannel()
+
+
+def clave_canal(id_unidad_academica: int, id_periodo: int) -> Tuple[int, int]:
+    return (int(id_unidad_academica), int(id_periodo))
+
+
+def publicar_evento_matricula(
+    id_unidad_academica: int,
+    id_periodo: Optional[int],
+    evento: str,
+    datos: Dict[str, Any],
+) -> None:
+    """Publica un evento ya confirmado en BD. Seguro desde cualquier hilo (p. ej. un job)."""
+    if not id_unidad_academica or not id_periodo:
+        return
+    clave = clave_canal(id_unidad_academica, id_periodo)
+    payload = dict(datos, id_unidad_academica=clave[0], id_periodo=clave[1], fecha=datetime.now().isoformat())
+    eventos_matricula.publish(clave, evento, payload)
+    print(f"📣 Evento '{evento}' publicado para UA {clave[0]} / periodo {clave[1]} "
+          f"({eventos_matricula.subscriber_count(clave)} suscriptores)")
+
+
+def _leer_version(id_unidad_academica: int, id_periodo: int) -> int:
+    from backend.database.db_config import SessionLocal
+    from backend.services.version_service import get_version
+
+    with SessionLocal() as db:
+        return get_version(db, id_unidad_academica, id_periodo)
+
+
+class _Vigilante:
+    """Tarea que revisa la versión de una clave mientras tenga streams abiertos."""
+
+    def __init__(self, clave: Tuple[int, int], version: int):
+        self.clave = clave
+        self.version = version
+        self.streams = 0
+        self.tarea: Optional[asyncio.Task] = None
+
+    async def ejecutar(self) -> None:
+        id_unidad_academica, id_periodo = self.clave
+        while True:
+            await asyncio.sleep(settings.EVENTOS_REVISION_SEGUNDOS)
+            try:
+                version = await asyncio.to_thread(_leer_version, id_unidad_academica, id_periodo)
+            except Exception as e:
+                print(f"⚠️ No se pudo revisar la versión de UA {id_unidad_academica} / periodo {id_periodo}: {e}")
+                continue
+            if version == self.version:
+                continue
+            self.version = version
+            eventos_matricula.publish(self.clave, EVENTO_VERSION, {
+                "id_unidad_academica": id_unidad_academica,
+                "id_periodo": id_periodo,
+                "version": version,
+                "fecha": datetime.now().isoformat(),
+            })
+
+
+# Sólo se usa desde el event loop: no necesita candado
+_vigilantes: Dict[Tuple[int, int], _Vigilante] = {}
+
+
+def _registrar_stream(clave: Tuple[int, int], version: int) -> None:
+    vigilante = _vigilantes.get(clave)
+    if vigilante is None:
+        vigilante = _vigilantes[clave] = _Vigilante(clave, version)
+        vigilante.tarea = asyncio.get_running_loop().create_task(vigilante.ejecutar())
+    else:
+        vigilante.version = max(vigilante.version, version)
+    vigilante.streams += 1
+
+
+def _liberar_stream(clave: Tuple[int, int]) -> None:
+    vigilante = _vigilantes.get(clave)
+    if vigilante is None:
+        return
+    vigilante.streams -= 1
+    if vigilante.streams <= 0:
+        del _vigilantes[clave]
+        vigilante.tarea.cancel()
+
+
+def vigilantes_activos() -> int:
+    return len(_vigilantes)
+
+
+async def stream_eventos_matricula(
+    id_unidad_academica: int,
+    id_periodo: int,
+    version: int,
+    estado_inicial: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream SSE de la UA/periodo (EventChannel.stream) con el vigilante de versión de la
+    clave activo mientras dure. `version` es la que el cliente recibió al conectar.
+    """
+    clave = clave_canal(id_unidad_academica, id_periodo)
+    _registrar_stream(clave, version)
+    try:
+        async for trozo in eventos_matricula.stream(clave, estado_inicial=estado_inicial):
+            yield trozo
+    finally:
+        _liberar_stream(clave)
@@ -0,0 +1,151 @@
+"""
+Exportación de la matrícula consolidada (tabla Matricula) a CSV o XLSX.
+
+Ambos formatos se generan fila por fila a partir de stream_matricula (cursor por lotes),
+así que un periodo completo de toda la institución no se carga en memoria:
+- CSV: cada bloque de filas se envía al cliente en cuanto se escribe.
+- XLSX: openpyxl en modo write_only (memoria constante) escribe a un archivo temporal
+  que después se envía por bloques y se borra. Una hoja de Excel admite 1,048,576 filas;
+  al llenarse se abre otra hoja (Matricula 2, 3, ...) con el mismo encabezado.
+
+Los IDs se traducen con los catálogos en caché (catalogos_service).
+Los generadores abren su propia sesión: la sesión de la petición se cierra antes de
+que StreamingResponse empiece a enviar el cuerpo.
+"""
+from backend.crud.Matricula import stream_matricula
+from backend.services.catalogos_service import get_catalogos
+
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import csv
+import io
+import os
+import tempfile
+
+FORMATOS_EXPORTACION = ("csv", "xlsx")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# (encabezado, catálogo para decodificar o None, posición en la fila de stream_matricula)
+COLUMNAS_EXPORTACION = (
+    ("Periodo", "periodo", 0),
+    ("Unidad Académica", "unidad_academica", 1),
+    ("Nivel", "nivel", 2),
+    ("Programa", "programa", 3),
+    ("Rama", "rama", 4),
+    ("Modalidad", "modalidad", 5),
+    ("Turno", "turno", 6),
+    ("Semestre", "semestre", 7),
+    ("Grupo de Edad", "grupo_edad", 8),
+    ("Tipo de Ingreso", "tipo_ingreso", 9),
+    ("Sexo", "sexo", 10),
+    ("Matrícula", None, 11),
+)
+
+# Filas que se acumulan antes de enviar un bloque CSV al cliente
+FILAS_POR_BLOQUE_CSV = 1000
+BYTES_POR_BLOQUE_XLSX = 64 * 1024
+# Límite de filas por hoja de Excel (incluye el encabezado)
+FILAS_MAXIMAS_HOJA_XLSX = 1_048_576
+
+
+def cargar_catalogos_exportacion(db: Session) -> Dict[str, Dict[int, str]]:
+    return get_catalogos(db, *(cat for _, cat, _ in COLUMNAS_EXPORTACION if cat))
+
+
+def _decodificar(fila, catalogos: Dict[str, Dict[int, str]]) -> list:
+    valores = []
+    for _, catalogo, posicion in COLUMNAS_EXPORTACION:
+        valor = fila[posicion]
+        if catalogo:
+            valor = catalogos[catalogo].get(valor, valor)
+        valores.append(valor)
+    return valores
+
+
+def _default_session_factory() -> Session:
+    from backend.database.db_config import SessionLocal
+    return SessionLocal()
+
+
+def _filas_decodificadas(filtros: Dict[str, Any], catalogos, session_factory: Optional[Callable[[], Session]]) -> Iterator[list]:
+    db = (session_factory or _default_session_factory)()
+    try:
+        for fila in stream_matricula(db, **filtros):
+            yield _decodificar(fila, catalogos)
+    finally:
+        db.close()
+
+
+def generar_csv(
+    filtros: Dict[str, Any],
+    catalogos: Dict[str, Dict[int, str]],
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> Iterator[bytes]:
+    """CSV UTF-8 (con BOM para que Excel respete los acentos), enviado por bloques."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write("﻿")
+    escritor.writerow([encabezado for encabezado, _, _ in COLUMNAS_EXPORTACION])
+    total = 0
+    for valores in _filas_decodificadas(filtros, catalogos, session_factory):
+        escritor.writerow(valores)
+        total += 1
+        if total % FILAS_POR_BLOQUE_CSV == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue().encode("utf-8")
+    print(f"📤 Exportación CSV de matrícula: {total} filas")
+
+
+def generar_xlsx(
+    filtros: Dict[str, Any],
+    catalogos: Dict[str, Dict[int, str]],
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> Iterator[bytes]:
+    """
+    XLSX en modo write_only escrito a un archivo temporal y enviado por bloques.
+    Cada hoja lleva a lo más FILAS_MAXIMAS_HOJA_XLSX filas; el resto sigue en hojas nuevas.
+    """
+    from openpyxl import Workbook
+
+    encabezados = [encabezado for encabezado, _, _ in COLUMNAS_EXPORTACION]
+    filas_por_hoja = FILAS_MAXIMAS_HOJA_XLSX - 1
+    libro = Workbook(write_only=True)
+    hoja = None
+    hojas = 0
+    total = 0
+    for valores in _filas_decodificadas(filtros, catalogos, session_factory):
+        if total % filas_por_hoja == 0:
+            hojas += 1
+            hoja = libro.create_sheet("Matricula" if hojas == 1 else f"Matricula {hojas}")
+            hoja.append(encabezados)
+        hoja.append(valores)
+        total += 1
+    if hoja is None:
+        hojas = 1
+        libro.create_sheet("Matricula").append(encabezados)
+
+    descriptor, ruta = tempfile.mkstemp(suffix=".xlsx")
+    os.close(descriptor)
+    try:
+        libro.save(ruta)
+        print(f"📤 Exportación XLSX de matrícula: {total} filas en {hojas} hoja(s)")
+        with open(ruta, "rb") as archivo:
+            while True:
+                bloque = archivo.read(BYTES_POR_BLOQUE_XLSX)
+                if not bloque:
+                    break
+                yield bloque
+    finally:
+        os.remove(ruta)
+
+
+def nombre_archivo_exportacion(formato: str, periodo: Optional[str], sigla: Optional[str]) -> str:
+    partes = ["matricula", (periodo or "todos").replace("/", "-"), sigla or "institucional"]
+    return "_".join(partes) + f".{formato}"
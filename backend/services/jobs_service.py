@@ -0,0 +1,479 @@
+"""
+Ejecutor de trabajos en segundo plano para procesos largos (SPs de matrícula).
+
+- submit_job() registra el trabajo y regresa de inmediato con su id.
+- Un ThreadPoolExecutor acotado (JOBS_MAX_WORKERS) ejecuta los trabajos.
+- Los trabajos de una misma Unidad Académica se serializan con una cola por UA: sólo
+  el primero de cada cola ocupa un hilo; los demás esperan en la cola y se envían al
+  ejecutor cuando termina el anterior, así una UA ocupada no acapara los hilos.
+- Los procesos institucionales (carga INEGI, snapshots) se envían con `cola=` propia
+  (COLA_*) en lugar de un Id de UA: no bloquean a ninguna UA y corren en un ejecutor
+  aparte de JOBS_MANTENIMIENTO_WORKERS hilos, sin ocupar los de matrícula.
+- Cada trabajo abre su propia sesión de BD (no usa la de la petición HTTP).
+- El estado se consulta por polling o por SSE (canal job_events); el resultado
+  queda guardado JOBS_TTL_SEGUNDOS después de terminar.
+- Con JOBS_PERSISTIR el estado también se escribe en Trabajos_Segundo_Plano, así que
+  /jobs/{id} responde desde cualquier worker de uvicorn. Los eventos SSE son del proceso
+  que ejecuta el trabajo; los demás workers sondean la tabla.
+- La cola en memoria sólo ordena los trabajos de un proceso. Con varios workers, cada
+  trabajo toma además un bloqueo de BD por cola (sp_getapplock en SQL Server, JOBS_BLOQUEO_BD)
+  antes de ejecutar; si otro worker lo tiene, el trabajo libera el hilo y se reintenta
+  cada JOBS_REINTENTO_BLOQUEO_SEGUNDOS. El bloqueo es de la conexión: si el proceso muere,
+  SQL Server lo libera. En otros motores (SQLite local) sólo hay serialización por proceso.
+- submit_job escribe en la BD: desde endpoints async se llama con run_in_threadpool.
+"""
+from backend.core.config import settings
+from backend.utils.sse import EventChannel
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Set
+
+import json
+import threading
+import time
+import traceback
+import uuid
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_EJECUTANDO = "ejecutando"
+ESTADO_COMPLETADO = "completado"
+ESTADO_ERROR = "error"
+ESTADOS_FINALES = (ESTADO_COMPLETADO, ESTADO_ERROR)
+
+# Eventos SSE que cierran el stream de un trabajo
+EVENTOS_FINALES = ESTADOS_FINALES
+
+# Colas de procesos institucionales (submit_job(..., cola=COLA_*)); las de UA son su Id
+COLA_CARGA_INEGI = "carga_inegi"
+COLA_SNAPSHOTS = "snapshots"
+
+
+@dataclass
+class Job:
+    id: str
+    tipo: str
+    id_unidad_academica: int
+    id_usuario: int
+    estado: str = ESTADO_PENDIENTE
+    mensaje: str = "En cola"
+    creado: datetime = field(default_factory=datetime.now)
+    iniciado: Optional[datetime] = None
+    terminado: Optional[datetime] = None
+    resultado: Any = None
+    error: Optional[str] = None
+    terminado_mono: Optional[float] = None
+
+    def to_dict(self, incluir_resultado: bool = False) -> Dict[str, Any]:
+        datos = {
+            "job_id": self.id,
+            "tipo": self.tipo,
+            "estado": self.estado,
+            "mensaje": self.mensaje,
+            "id_unidad_academica": self.id_unidad_academica,
+            "creado": self.creado.isoformat(),
+            "iniciado": self.iniciado.isoformat() if self.iniciado else None,
+            "terminado": self.terminado.isoformat() if self.terminado else None,
+            "error": self.error,
+        }
+        if incluir_resultado:
+            datos["resultado"] = self.resultado
+        return datos
+
+
+# Canal de eventos por job id (lo consume el endpoint SSE)
+job_events = EventChannel()
+
+_jobs_lock = threading.Lock()
+_jobs: Dict[str, Job] = {}
+
+# Trabajos en espera por UA; una UA está en _colas_activas mientras uno de sus trabajos
+# está en el ejecutor
+_colas_lock = threading.Lock()
+_colas: Dict[Hashable, Deque[tuple]] = {}
+_colas_activas: Set[Hashable] = set()
+
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_mantenimiento: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor(clave: Hashable = None) -> ThreadPoolExecutor:
+    """Ejecutor de matrícula para las colas por UA (int); el de mantenimiento para las COLA_*."""
+    global _executor, _executor_mantenimiento
+    with _executor_lock:
+        if isinstance(clave, str):
+            if _executor_mantenimiento is None:
+                _executor_mantenimiento = ThreadPoolExecutor(
+                    max_workers=max(1, settings.JOBS_MANTENIMIENTO_WORKERS),
+                    thread_name_prefix="sae-job-mant",
+                )
+            return _executor_mantenimiento
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.JOBS_MAX_WORKERS),
+                thread_name_prefix="sae-job",
+            )
+        return _executor
+
+
+def _default_session_factory():
+    from backend.database.db_config import SessionLocal
+    return SessionLocal()
+
+
+# =============================
+# Estado compartido entre workers (Trabajos_Segundo_Plano)
+# =============================
+
+_aviso_persistencia = False
+
+
+def _columnas_persistidas(job: Job) -> Dict[str, Any]:
+    """Copia del estado para Trabajos_Segundo_Plano; se toma con _jobs_lock y se escribe sin él."""
+    return {
+        "Id_Trabajo": job.id,
+        "Tipo": job.tipo,
+        "Id_Unidad_Academica": job.id_unidad_academica,
+        "Id_Usuario": job.id_usuario,
+        "Estado": job.estado,
+        "Mensaje": job.mensaje[:255],
+        "Fecha_Creacion": job.creado,
+        "Fecha_Inicio": job.iniciado,
+        "Fecha_Termino": job.terminado,
+        "Resultado": json.dumps(job.resultado, default=str) if job.resultado is not None else None,
+        "Error": job.error,
+    }
+
+
+def _persistir(columnas: Dict[str, Any]) -> None:
+    """Escribe el estado del trabajo en la tabla; si falla sólo se avisa (el estado local sigue)."""
+    global _aviso_persistencia
+    if not settings.JOBS_PERSISTIR:
+        return
+    from backend.database.models.TrabajoSegundoPlano import TrabajoSegundoPlano
+
+    db = _default_session_factory()
+    try:
+        db.merge(TrabajoSegundoPlano(**columnas))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        if not _aviso_persistencia:
+            _aviso_persistencia = True
+            print(f"⚠️ No se pudo guardar el estado de los trabajos en Trabajos_Segundo_Plano: {e}")
+    finally:
+        db.close()
+
+
+def _job_persistido(fila) -> Job:
+    return Job(
+        id=fila.Id_Trabajo,
+        tipo=fila.Tipo,
+        id_unidad_academica=fila.Id_Unidad_Academica,
+        id_usuario=fila.Id_Usuario,
+        estado=fila.Estado,
+        mensaje=fila.Mensaje,
+        creado=fila.Fecha_Creacion,
+        iniciado=fila.Fecha_Inicio,
+        terminado=fila.Fecha_Termino,
+        resultado=json.loads(fila.Resultado) if fila.Resultado else None,
+        error=fila.Error,
+    )
+
+
+def _limite_persistidos() -> datetime:
+    return datetime.now() - timedelta(seconds=settings.JOBS_TTL_SEGUNDOS)
+
+
+def _cargar_persistido(job_id: str) -> Optional[Job]:
+    """Trabajo de otro worker (o de antes de un reinicio), si sigue vigente."""
+    if not settings.JOBS_PERSISTIR:
+        return None
+    from backend.database.models.TrabajoSegundoPlano import TrabajoSegundoPlano
+
+    db = _default_session_factory()
+    try:
+        fila = db.get(TrabajoSegundoPlano, job_id)
+        if fila is None or (fila.Fecha_Termino is not None and fila.Fecha_Termino < _limite_persistidos()):
+            return None
+        return _job_persistido(fila)
+    except Exception as e:
+        print(f"⚠️ No se pudo consultar Trabajos_Segundo_Plano: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def _listar_persistidos(id_usuario: Optional[int]) -> List[Job]:
+    if not settings.JOBS_PERSISTIR:
+        return []
+    from backend.database.models.TrabajoSegundoPlano import TrabajoSegundoPlano as T
+
+    db = _default_session_factory()
+    try:
+        consulta = db.query(T).filter((T.Fecha_Termino == None) | (T.Fecha_Termino >= _limite_persistidos()))  # noqa: E711
+        if id_usuario is not None:
+            consulta = consulta.filter(T.Id_Usuario == id_usuario)
+        return [_job_persistido(f) for f in consulta.order_by(T.Fecha_Creacion.desc()).limit(100)]
+    except Exception as e:
+        print(f"⚠️ No se pudo consultar Trabajos_Segundo_Plano: {e}")
+        return []
+    finally:
+        db.close()
+
+
+def _purgar_persistidos() -> None:
+    if not settings.JOBS_PERSISTIR:
+        return
+    from backend.database.models.TrabajoSegundoPlano import TrabajoSegundoPlano as T
+
+    db = _default_session_factory()
+    try:
+        db.query(T).filter(T.Fecha_Termino < _limite_persistidos()).delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _purgar_expirados() -> None:
+    """Elimina trabajos terminados hace más de JOBS_TTL_SEGUNDOS."""
+    limite = time.monotonic() - settings.JOBS_TTL_SEGUNDOS
+    with _jobs_lock:
+        expirados = [jid for jid, j in _jobs.items() if j.terminado_mono is not None and j.terminado_mono < limite]
+        for jid in expirados:
+            del _jobs[jid]
+
+
+def _actualizar(job: Job, **cambios) -> None:
+    with _jobs_lock:
+        for k, v in cambios.items():
+            setattr(job, k, v)
+        estado = job.to_dict()
+        columnas = _columnas_persistidas(job)
+    _persistir(columnas)
+    job_events.publish(job.id, estado["estado"], estado)
+
+
+# =============================
+# Bloqueo entre workers (sp_getapplock)
+# =============================
+
+class _BloqueoBD:
+    """Bloqueo de aplicación de sesión sobre una conexión propia, tomado sin espera."""
+
+    def __init__(self, conexion, recurso: str):
+        self.conexion = conexion
+        self.recurso = recurso
+
+    def liberar(self) -> None:
+        try:
+            self.conexion.execute(
+                text("EXEC sp_releaseapplock @Resource = :recurso, @LockOwner = 'Session'"),
+                {"recurso": self.recurso},
+            )
+            self.conexion.commit()
+        except Exception as e:
+            # Una conexión que conserva el bloqueo no debe volver al pool
+            print(f"⚠️ No se pudo liberar el bloqueo {self.recurso}: {e}")
+            self.conexion.invalidate()
+        finally:
+            self.conexion.close()
+
+
+class _SinBloqueo:
+    def liberar(self) -> None:
+        pass
+
+
+_SIN_BLOQUEO = _SinBloqueo()
+
+
+def _tomar_bloqueo(clave: Hashable):
+    """
+    Bloqueo de BD de la cola `clave`: el bloqueo tomado, None si lo tiene otro worker,
+    o _SIN_BLOQUEO si el motor no lo soporta o JOBS_BLOQUEO_BD está apagado.
+    """
+    if not settings.JOBS_BLOQUEO_BD:
+        return _SIN_BLOQUEO
+    from backend.database.db_config import engine
+
+    if engine.dialect.name != "mssql":
+        return _SIN_BLOQUEO
+    recurso = f"SAE_Jobs_{clave}"
+    conexion = engine.connect()
+    try:
+        codigo = conexion.execute(
+            text(
+                "SET NOCOUNT ON; DECLARE @r INT; "
+                "EXEC @r = sp_getapplock @Resource = :recurso, @LockMode = 'Exclusive', "
+                "@LockOwner = 'Session', @LockTimeout = 0; SELECT @r"
+            ),
+            {"recurso": recurso},
+        ).scalar()
+        conexion.commit()
+    except Exception:
+        conexion.close()
+        raise
+    if codigo is not None and codigo >= 0:
+        return _BloqueoBD(conexion, recurso)
+    conexion.close()
+    if codigo == -1:
+        return None
+    raise RuntimeError(f"sp_getapplock regresó {codigo} para {recurso}")
+
+
+def _siguiente(clave: Hashable) -> None:
+    """Envía al ejecutor el siguiente trabajo en espera de la cola (o la libera)."""
+    with _colas_lock:
+        cola = _colas.get(clave)
+        tarea = cola.popleft() if cola else None
+        if tarea is None:
+            _colas.pop(clave, None)
+            _colas_activas.discard(clave)
+    if tarea is not None:
+        _get_executor(tarea[0]).submit(_ejecutar, *tarea)
+
+
+def _ejecutar(
+    clave: Hashable,
+    job: Job,
+    fn: Callable[..., Any],
+    args: tuple,
+    kwargs: dict,
+    session_factory: Callable[[], Any],
+) -> None:
+    bloqueo = db = None
+    reintentar = False
+    try:
+        bloqueo = _tomar_bloqueo(clave)
+        if bloqueo is None:
+            reintentar = True
+            mensaje = "Esperando a que termine otro proceso de la misma cola en otro worker"
+            if job.mensaje != mensaje:
+                _actualizar(job, mensaje=mensaje)
+            return
+        _actualizar(job, estado=ESTADO_EJECUTANDO, mensaje="En ejecución", iniciado=datetime.now())
+        print(f"🚀 Job {job.id} ({job.tipo}) iniciado para UA {job.id_unidad_academica}")
+        db = session_factory()
+        resultado = fn(db, *args, **kwargs)
+        _actualizar(
+            job,
+            estado=ESTADO_COMPLETADO,
+            mensaje="Completado",
+            resultado=resultado,
+            terminado=datetime.now(),
+            terminado_mono=time.monotonic(),
+        )
+        print(f"✅ Job {job.id} ({job.tipo}) completado")
+    except Exception as e:
+        # También cubre fallas al tomar el bloqueo o abrir la sesión: el trabajo no queda "ejecutando"
+        if db is not None:
+            try:
+                db.rollback()
+            except Exception:
+                pass
+        traceback.print_exc()
+        _actualizar(
+            job,
+            estado=ESTADO_ERROR,
+            mensaje="Error",
+            error=str(e),
+            terminado=datetime.now(),
+            terminado_mono=time.monotonic(),
+        )
+        print(f"❌ Job {job.id} ({job.tipo}) falló: {e}")
+    finally:
+        if db is not None:
+            db.close()
+        if bloqueo is not None:
+            bloqueo.liberar()
+        if reintentar:
+            # La cola local sigue ocupada; el trabajo vuelve al ejecutor sin ocupar un hilo mientras espera
+            temporizador = threading.Timer(
+                settings.JOBS_REINTENTO_BLOQUEO_SEGUNDOS,
+                _get_executor(clave).submit,
+                args=(_ejecutar, clave, job, fn, args, kwargs, session_factory),
+            )
+            temporizador.daemon = True
+            temporizador.start()
+        else:
+            # El siguiente trabajo de la UA entra al ejecutor hasta que éste termina
+            _siguiente(clave)
+
+
+def submit_job(
+    tipo: str,
+    id_unidad_academica: int,
+    id_usuario: int,
+    fn: Callable[..., Any],
+    *args,
+    session_factory: Optional[Callable[[], Any]] = None,
+    cola: Optional[str] = None,
+    **kwargs,
+) -> Job:
+    """
+    Encola fn(db, *args, **kwargs) y regresa el Job. fn recibe una sesión propia
+    que se cierra al terminar; el valor que regrese se guarda como resultado.
+    Sin `cola` se serializa con los demás trabajos de la UA; con una COLA_* sólo con
+    los de esa cola (id_unidad_academica queda como dato informativo).
+    """
+    _purgar_expirados()
+    _purgar_persistidos()
+    clave = cola if cola is not None else id_unidad_academica
+    job = Job(id=uuid.uuid4().hex, tipo=tipo, id_unidad_academica=id_unidad_academica, id_usuario=id_usuario)
+    tarea = (clave, job, fn, args, kwargs, session_factory or _default_session_factory)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        columnas = _columnas_persistidas(job)
+    with _colas_lock:
+        en_espera = clave in _colas_activas
+        if en_espera:
+            _colas.setdefault(clave, deque()).append(tarea)
+        else:
+            _colas_activas.add(clave)
+    if en_espera:
+        _actualizar(job, mensaje="Esperando a que termine otro proceso de la misma Unidad Académica" if cola is None
+                    else "Esperando a que termine otro proceso de la misma cola")
+    else:
+        _persistir(columnas)
+        _get_executor(tarea[0]).submit(_ejecutar, *tarea)
+    print(f"📥 Job {job.id} ({job.tipo}) encolado en {f'la cola {cola}' if cola else f'UA {id_unidad_academica}'}")
+    return job
+
+
+def es_local(job_id: str) -> bool:
+    """True si el trabajo se ejecuta (o ejecutó) en este proceso: sus eventos SSE llegan aquí."""
+    with _jobs_lock:
+        return job_id in _jobs
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    _purgar_expirados()
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    return job if job is not None else _cargar_persistido(job_id)
+
+
+def get_job_estado(job_id: str, incluir_resultado: bool = False) -> Optional[Dict[str, Any]]:
+    """Instantánea del estado del trabajo (segura entre hilos)."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            return job.to_dict(incluir_resultado=incluir_resultado)
+    job = _cargar_persistido(job_id)
+    return job.to_dict(incluir_resultado=incluir_resultado) if job else None
+
+
+def list_jobs(id_usuario: Optional[int] = None) -> List[Dict[str, Any]]:
+    _purgar_expirados()
+    persistidos = {j.id: j for j in _listar_persistidos(id_usuario)}
+    with _jobs_lock:
+        locales = {j.id: j for j in _jobs.values() if id_usuario is None or j.id_usuario == id_usuario}
+        jobs = {**persistidos, **locales}
+        return [j.to_dict() for j in sorted(jobs.values(), key=lambda j: j.creado, reverse=True)]
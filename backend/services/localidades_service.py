@@ -0,0 +1,231 @@
+"""
+Índice en memoria de Entidades_Municipios para autocompletar entidad/municipio/localidad.
+
+Las formas ya no reciben el catálogo completo: consultan /catalogos/localidades/search.
+El índice se carga una vez por proceso y se comparte entre peticiones:
+
+- Las filas se ordenan por (entidad, municipio, localidad) normalizados; cada municipio
+  y cada entidad ocupa un rango contiguo, así que filtrar por ellos es un slice.
+- Búsqueda por tokens sin acentos ni mayúsculas ("san juan oax" encuentra "San Juan
+  Bautista..., Oaxaca"): cada token de la consulta es un prefijo. Los tokens del índice
+  viven en un arreglo ordenado (bisect) con la lista de filas que los contienen
+  (array('I')); un prefijo es un rango contiguo de ese arreglo.
+- Cada LOCALIDADES_REVISION_SEGUNDOS se compara la firma de la tabla (filas, Id máximo y,
+  en SQL Server, CHECKSUM_AGG); si cambió, la petición que lo detecta reconstruye el
+  índice y las demás siguen usando el anterior hasta el intercambio.
+  invalidar_indice_localidades() fuerza la recarga (p. ej. después de una carga INEGI).
+"""
+from backend.core.config import settings
+from backend.database.models.Temporal_Entidades_Municipios import temporal_Entidades_Municipios
+
+from array import array
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import bisect
+import re
+import threading
+import time
+import unicodedata
+
+MIN_CARACTERES = 2
+_RE_SEPARADORES = re.compile(r"[^0-9a-z]+")
+# Mayor que cualquier carácter de un token normalizado ([0-9a-z])
+_FIN_PREFIJO = "\x7f"
+
+
+def normalizar(texto: Any) -> str:
+    """'Tlaquepaque, JALISCO' -> 'tlaquepaque jalisco' (sin acentos, minúsculas, sin signos)."""
+    if not texto:
+        return ""
+    sin_acentos = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(token for token in _RE_SEPARADORES.split(sin_acentos.lower()) if token)
+
+
+class IndiceLocalidades:
+    """Filas de Entidades_Municipios ordenadas más un índice de tokens por prefijo."""
+
+    def __init__(self, filas: Iterable[Sequence[Any]], firma: Any = None):
+        """`filas`: (Id_Entidad_Municipio, Nombre_Entidad, Nombre_Municipio, Nombre_Localidad)."""
+        self.firma = firma
+        self.cargado = time.time()
+        # Entidades y municipios se repiten en miles de filas: una sola copia (y una sola
+        # normalización) de cada cadena
+        internas: Dict[str, Tuple[str, str]] = {}
+
+        def interna(texto: Any) -> Tuple[str, str]:
+            texto = "" if texto is None else str(texto).strip()
+            par = internas.get(texto)
+            if par is None:
+                par = internas[texto] = (texto, normalizar(texto))
+            return par
+
+        ordenadas = []
+        for id_, entidad, municipio, localidad in filas:
+            (ent, ent_norm), (mun, mun_norm) = interna(entidad), interna(municipio)
+            loc = "" if localidad is None else str(localidad).strip()
+            ordenadas.append((ent_norm, mun_norm, normalizar(loc), str(id_), ent, mun, loc))
+        ordenadas.sort()
+
+        self._ids = [f[3] for f in ordenadas]
+        self._entidades = [f[4] for f in ordenadas]
+        self._municipios = [f[5] for f in ordenadas]
+        self._localidades = [f[6] for f in ordenadas]
+        self._localidades_norm = [f[2] for f in ordenadas]
+
+        self._rango_entidad: Dict[str, Tuple[int, int]] = {}
+        self._rango_municipio: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._municipios_por_entidad: Dict[str, List[str]] = {}
+        postings: Dict[str, array] = {}
+
+        for i, (ent_norm, mun_norm, loc_norm, _, _, municipio, _) in enumerate(ordenadas):
+            inicio = self._rango_entidad.get(ent_norm, (i, i))[0]
+            self._rango_entidad[ent_norm] = (inicio, i + 1)
+            llave = (ent_norm, mun_norm)
+            if llave not in self._rango_municipio:
+                self._municipios_por_entidad.setdefault(ent_norm, []).append(municipio)
+            inicio = self._rango_municipio.get(llave, (i, i))[0]
+            self._rango_municipio[llave] = (inicio, i + 1)
+
+            for token in set(f"{loc_norm} {mun_norm} {ent_norm}".split()):
+                lista = postings.get(token)
+                if lista is None:
+                    lista = postings[token] = array("I")
+                lista.append(i)
+
+        self._tokens = sorted(postings)
+        self._postings = [postings[token] for token in self._tokens]
+        # Nombres de localidad normalizados en orden alfabético (con su fila): las que empiezan
+        # con la consulta completa forman un rango contiguo y van primero en los resultados
+        por_nombre = sorted(range(len(ordenadas)), key=self._localidades_norm.__getitem__)
+        self._nombres_ordenados = [self._localidades_norm[i] for i in por_nombre]
+        self._filas_por_nombre = array("I", por_nombre)
+        self._entidades_orden = [self._entidades[inicio] for inicio, _ in sorted(self._rango_entidad.values())]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def entidades(self) -> List[str]:
+        return list(self._entidades_orden)
+
+    def municipios(self, entidad: str) -> List[str]:
+        return list(self._municipios_por_entidad.get(normalizar(entidad), []))
+
+    def _filas_con_prefijo(self, prefijo: str, inicio_filas: int, fin_filas: int) -> set:
+        """Filas en [inicio_filas, fin_filas) con algún token que empieza con `prefijo`."""
+        inicio = bisect.bisect_left(self._tokens, prefijo)
+        fin = bisect.bisect_left(self._tokens, prefijo + _FIN_PREFIJO, inicio)
+        completo = (inicio_filas, fin_filas) == (0, len(self._ids))
+        filas = set()
+        for lista in self._postings[inicio:fin]:
+            if completo:
+                filas.update(lista)
+            else:
+                # Las listas están ordenadas por fila: el rango de una entidad/municipio es un slice
+                filas.update(lista[bisect.bisect_left(lista, inicio_filas):bisect.bisect_left(lista, fin_filas)])
+        return filas
+
+    def _rango(self, entidad: Optional[str], municipio: Optional[str]) -> Optional[Tuple[int, int]]:
+        if municipio:
+            return self._rango_municipio.get((normalizar(entidad), normalizar(municipio)))
+        if entidad:
+            return self._rango_entidad.get(normalizar(entidad))
+        return (0, len(self._ids))
+
+    def buscar(
+        self,
+        q: str = "",
+        entidad: Optional[str] = None,
+        municipio: Optional[str] = None,
+        limite: int = 20,
+        desplazamiento: int = 0,
+    ) -> Tuple[int, List[Dict[str, str]]]:
+        """
+        (total, página) de las localidades cuyos tokens empiezan con los de `q`, dentro de la
+        entidad/municipio indicados. Primero las que empiezan con `q` completa; después, en
+        orden de entidad, municipio y localidad. Sin `q` sólo lista un municipio.
+        """
+        consulta = normalizar(q)
+        rango = self._rango(entidad, municipio)
+        if rango is None:
+            return 0, []
+        inicio, fin = rango
+
+        if not consulta:
+            if not municipio:
+                return 0, []
+            candidatas = list(range(inicio, fin))
+        elif len(consulta) < MIN_CARACTERES and not municipio:
+            return 0, []
+        else:
+            conjuntos = sorted((self._filas_con_prefijo(token, inicio, fin) for token in set(consulta.split())), key=len)
+            coincidencias = conjuntos[0].intersection(*conjuntos[1:])
+            desde = bisect.bisect_left(self._nombres_ordenados, consulta)
+            hasta = bisect.bisect_left(self._nombres_ordenados, consulta + _FIN_PREFIJO, desde)
+            primeras = coincidencias.intersection(self._filas_por_nombre[desde:hasta])
+            candidatas = sorted(primeras) + sorted(coincidencias - primeras)
+
+        pagina = candidatas[desplazamiento:desplazamiento + limite]
+        return len(candidatas), [
+            {
+                "id": self._ids[i],
+                "entidad": self._entidades[i],
+                "municipio": self._municipios[i],
+                "localidad": self._localidades[i],
+            }
+            for i in pagina
+        ]
+
+
+_indice_lock = threading.Lock()
+_indice: Optional[IndiceLocalidades] = None
+_revisado: Optional[float] = None
+_forzar_recarga = False
+
+
+def firma_localidades(db: Session) -> tuple:
+    """Cambia cuando se insertan, borran o (en SQL Server) modifican filas de Entidades_Municipios."""
+    tabla = temporal_Entidades_Municipios.__table__
+    columnas = [func.count(), func.max(tabla.c.Id_Entidad_Municipio)]
+    if db.bind.dialect.name == "mssql":
+        columnas.append(func.checksum_agg(func.binary_checksum(*tabla.c)))
+    return tuple(db.execute(select(*columnas).select_from(tabla)).one())
+
+
+def cargar_indice(db: Session, firma: Any = None) -> IndiceLocalidades:
+    m = temporal_Entidades_Municipios
+    inicio = time.perf_counter()
+    filas = db.execute(select(m.Id_Entidad_Municipio, m.Nombre_Entidad, m.Nombre_Municipio, m.Nombre_Localidad)).all()
+    indice = IndiceLocalidades(filas, firma if firma is not None else firma_localidades(db))
+    print(f"🗺️ Índice de localidades: {len(indice)} filas en {time.perf_counter() - inicio:.2f} s")
+    return indice
+
+
+def obtener_indice(db: Session) -> IndiceLocalidades:
+    """El índice vigente; revisa la firma de la tabla cada LOCALIDADES_REVISION_SEGUNDOS."""
+    global _indice, _revisado, _forzar_recarga
+    ahora = time.monotonic()
+    indice = _indice
+    if indice is not None and not _forzar_recarga and ahora - (_revisado or 0) < settings.LOCALIDADES_REVISION_SEGUNDOS:
+        return indice
+    # Sólo una petición revisa/reconstruye; si ya hay índice, las demás no esperan
+    if not _indice_lock.acquire(blocking=indice is None):
+        return indice
+    try:
+        if _indice is not None and not _forzar_recarga and ahora - (_revisado or 0) < settings.LOCALIDADES_REVISION_SEGUNDOS:
+            return _indice
+        firma = firma_localidades(db)
+        if _indice is None or _forzar_recarga or firma != _indice.firma:
+            _forzar_recarga = False
+            _indice = cargar_indice(db, firma)
+        _revisado = time.monotonic()
+        return _indice
+    finally:
+        _indice_lock.release()
+
+
+def invalidar_indice_localidades() -> None:
+    """La siguiente petición reconstruye el índice aunque la firma no haya cambiado."""
+    global _forzar_recarga
+    _forzar_recarga = True
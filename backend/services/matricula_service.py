@@ -6,11 +6,31 @@ from backend.crud.Matricula import (
     get_unidad_and_nivel_info,
 )
 
+from backend.database.models.CatPeriodo import CatPeriodo as Periodo
+from backend.database.models.CatUnidadAcademica import CatUnidadAcademica as Unidad_Academica
+from backend.database.models.CatNivel import CatNivel as Nivel
+from backend.database.models.CatSemestre import CatSemestre as Semestre
+from backend.database.models.CatProgramas import CatProgramas as Programas
+from backend.database.models.CatModalidad import CatModalidad as Modalidad
+from backend.database.models.CatTurno import CatTurno as Turno
+from backend.database.models.CatGrupoEdad import CatGrupoEdad as Grupo_Edad
+from backend.database.models.CatTipoIngreso import TipoIngreso as Tipo_Ingreso
+from backend.database.models.CatRama import CatRama as Rama
+from backend.database.models.SemaforoUnidadAcademica import SemaforoUnidadAcademica
+from backend.database.models.Validacion import Validacion
+from backend.database.models.Temp_Matricula import Temp_Matricula
+from backend.database.sp import ejecutar_sp
+from backend.services.version_service import incrementar_version, incrementar_version_periodo, FORMATO_MATRICULA
+from backend.services.eventos_matricula_service import publicar_evento_matricula, EVENTO_SEMAFORO
+
 from sqlalchemy.orm import Session
 from typing import Dict, List, Any, Optional, Tuple
-from sqlalchemy import text
 from datetime import datetime
 
+# Constantes globales
+PERIODO_DEFAULT_ID = 7
+PERIODO_DEFAULT_LITERAL = '2025-2026/1'
+
 
 def extract_unique_values_from_sp(rows_list: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
@@ -272,28 +292,22 @@ def execute_sp_actualiza_matricula_por_unidad_academica(
     periodo: str,
     host: str,
     nivel: str,
+    commit: bool = True,
 ) -> None:
-    """Ejecuta SP_Actualiza_Matricula_Por_Unidad_Academica. Centraliza SQL crudo aquí."""
-    sql = text(
-        """
-        EXEC [dbo].[SP_Actualiza_Matricula_Por_Unidad_Academica]
-            @UUnidad_Academica = :unidad_sigla,
-            @SSalones = :salones,
-            @UUsuario = :usuario,
-            @PPeriodo = :periodo,
-            @HHost   = :host,
-            @NNivel  = :nivel
-        """
-    )
-    db.execute(sql, {
-        'unidad_sigla': unidad_sigla,
-        'salones': salones,
-        'usuario': usuario,
-        'periodo': periodo,
-        'host': host,
-        'nivel': nivel,
+    """
+    Ejecuta SP_Actualiza_Matricula_Por_Unidad_Academica. Centraliza SQL crudo aquí.
+    Con commit=False el SP queda dentro de la transacción del llamador.
+    """
+    ejecutar_sp(db, "SP_Actualiza_Matricula_Por_Unidad_Academica", {
+        'UUnidad_Academica': unidad_sigla,
+        'SSalones': salones,
+        'UUsuario': usuario,
+        'PPeriodo': periodo,
+        'HHost': host,
+        'NNivel': nivel,
     })
-    db.commit()
+    if commit:
+        db.commit()
 
 
 def execute_sp_actualiza_matricula_por_semestre_au(
@@ -309,30 +323,16 @@ def execute_sp_actualiza_matricula_por_semestre_au(
     nivel: str,
 ) -> List[Dict[str, Any]]:
     """Ejecuta SP_Actualiza_Matricula_Por_Semestre_AU y devuelve el último result set como lista de dicts."""
-    sql = text(
-        """
-        EXEC [dbo].[SP_Actualiza_Matricula_Por_Semestre_AU]
-            @UUnidad_Academica = :unidad,
-            @PPrograma = :programa,
-            @MModalidad = :modalidad,
-            @SSemestre = :semestre,
-            @SSalones = :salones,
-            @UUsuario = :usuario,
-            @PPeriodo = :periodo,
-            @HHost = :host,
-            @NNivel = :nivel
-        """
-    )
-    result = db.execute(sql, {
-        'unidad': unidad_sigla,
-        'programa': programa_nombre,
-        'modalidad': modalidad_nombre,
-        'semestre': semestre_nombre,
-        'salones': int(salones) if salones is not None else 0,
-        'usuario': usuario,
-        'periodo': periodo,
-        'host': host,
-        'nivel': nivel,
+    result = ejecutar_sp(db, "SP_Actualiza_Matricula_Por_Semestre_AU", {
+        'UUnidad_Academica': unidad_sigla,
+        'PPrograma': programa_nombre,
+        'MModalidad': modalidad_nombre,
+        'SSemestre': semestre_nombre,
+        'SSalones': int(salones) if salones is not None else 0,
+        'UUsuario': usuario,
+        'PPeriodo': periodo,
+        'HHost': host,
+        'NNivel': nivel,
     })
     db.commit()
 
@@ -443,32 +443,17 @@ def execute_sp_finaliza_captura_matricula(
     Este SP se ejecuta automáticamente después de SP_Actualiza_Matricula_Por_Semestre_AU
     para finalizar completamente la captura del semestre.
     """
-    sql = text(
-        """
-        EXEC [dbo].[SP_Finaliza_Captura_Matricula]
-            @UUnidad_Academica = :unidad,
-            @PPrograma = :programa,
-            @MModalidad = :modalidad,
-            @SSemestre = :semestre,
-            @SSalones = :salones,
-            @UUsuario = :usuario,
-            @PPeriodo = :periodo,
-            @HHost = :host,
-            @NNivel = :nivel
-        """
-    )
-    
     try:
-        db.execute(sql, {
-            'unidad': unidad_sigla,
-            'programa': programa_nombre,
-            'modalidad': modalidad_nombre,
-            'semestre': semestre_nombre,
-            'salones': int(salones) if salones is not None else 0,
-            'usuario': usuario,
-            'periodo': periodo,
-            'host': host,
-            'nivel': nivel,
+        ejecutar_sp(db, "SP_Finaliza_Captura_Matricula", {
+            'UUnidad_Academica': unidad_sigla,
+            'PPrograma': programa_nombre,
+            'MModalidad': modalidad_nombre,
+            'SSemestre': semestre_nombre,
+            'SSalones': int(salones) if salones is not None else 0,
+            'UUsuario': usuario,
+            'PPeriodo': periodo,
+            'HHost': host,
+            'NNivel': nivel,
         })
         db.commit()
         print(f"✅ SP_Finaliza_Captura_Matricula ejecutado exitosamente")
@@ -491,26 +476,14 @@ def execute_sp_valida_matricula(
     Ejecuta SP_Valida_Matricula.
     Este SP se ejecuta cuando un rol de validación (4 o 5) aprueba la matrícula.
     """
-    sql = text(
-        """
-        EXEC [dbo].[SP_Valida_Matricula]
-            @PPeriodo = :periodo,
-            @UUnidad_Academica = :unidad,
-            @UUsuario = :usuario,
-            @HHost = :host,
-            @semaforo = :semaforo,
-            @NNota = :nota
-        """
-    )
-    
     try:
-        db.execute(sql, {
-            'periodo': periodo,
-            'unidad': unidad_sigla,
-            'usuario': usuario,
-            'host': host,
+        ejecutar_sp(db, "SP_Valida_Matricula", {
+            'PPeriodo': periodo,
+            'UUnidad_Academica': unidad_sigla,
+            'UUsuario': usuario,
+            'HHost': host,
             'semaforo': int(semaforo),
-            'nota': nota or '',
+            'NNota': nota or '',
         })
         db.commit()
         print(f"✅ SP_Valida_Matricula ejecutado exitosamente")
@@ -532,24 +505,13 @@ def execute_sp_rechaza_matricula(
     Ejecuta SP_Rechaza_Matricula.
     Este SP se ejecuta cuando un rol de validación (4 o 5) rechaza la matrícula.
     """
-    sql = text(
-        """
-        EXEC [dbo].[SP_Rechaza_Matricula]
-            @PPeriodo = :periodo,
-            @UUnidad_Academica = :unidad,
-            @UUsuario = :usuario,
-            @HHost = :host,
-            @NNota = :nota
-        """
-    )
-    
     try:
-        db.execute(sql, {
-            'periodo': periodo,
-            'unidad': unidad_sigla,
-            'usuario': usuario,
-            'host': host,
-            'nota': nota or '',
+        ejecutar_sp(db, "SP_Rechaza_Matricula", {
+            'PPeriodo': periodo,
+            'UUnidad_Academica': unidad_sigla,
+            'UUsuario': usuario,
+            'HHost': host,
+            'NNota': nota or '',
         })
         db.commit()
         print(f"✅ SP_Rechaza_Matricula ejecutado exitosamente")
@@ -558,3 +520,708 @@ def execute_sp_rechaza_matricula(
         db.rollback()
         raise
 
+
+# =============================
+# Procesos de matrícula (reutilizados por endpoints y trabajos en segundo plano)
+# =============================
+
+def consolidar_semestre_matricula(
+    db: Session,
+    id_unidad_academica: int,
+    id_nivel: int,
+    periodo: Any,
+    programa: Any,
+    modalidad: Any,
+    semestre: Any,
+    total_grupos: Any,
+    usuario_sp: str,
+    host_sp: str,
+) -> Dict[str, Any]:
+    """
+    Consolida un semestre completo (todos los turnos):
+    1. Ejecuta SP_Actualiza_Matricula_Por_Semestre_AU
+    2. Ejecuta SP_Finaliza_Captura_Matricula si todos los semestres quedaron completos
+    3. Devuelve el estado del semáforo y las filas actualizadas
+    Regresa un dict con "error" si faltan catálogos; lanza la excepción si falla un SP.
+    """
+    # Convertir período a literal si viene como ID (el SP requiere literal ej: '2025-2026/1')
+    if str(periodo).isdigit():
+        periodo_obj = db.query(Periodo).filter(Periodo.Id_Periodo == int(periodo)).first()
+        periodo_literal = periodo_obj.Periodo if periodo_obj else PERIODO_DEFAULT_LITERAL
+        print(f"🔄 Período convertido de ID {periodo} → '{periodo_literal}'")
+    else:
+        periodo_literal = str(periodo)
+        print(f"✅ Período en literal: '{periodo_literal}'")
+    
+    # Obtener nombres literales desde la BD para el SP
+    # Unidad Académica
+    unidad = db.query(Unidad_Academica).filter(
+        Unidad_Academica.Id_Unidad_Academica == id_unidad_academica
+    ).first()
+    unidad_sigla = unidad.Sigla if unidad else ''
+    
+    # Programa
+    programa_obj = db.query(Programas).filter(
+        Programas.Id_Programa == int(programa)
+    ).first()
+    programa_nombre = programa_obj.Nombre_Programa if programa_obj else ''
+    
+    # Modalidad
+    modalidad_obj = db.query(Modalidad).filter(
+        Modalidad.Id_Modalidad == int(modalidad)
+    ).first()
+    modalidad_nombre = modalidad_obj.Modalidad if modalidad_obj else ''
+    
+    # Semestre
+    semestre_obj = db.query(Semestre).filter(
+        Semestre.Id_Semestre == int(semestre)
+    ).first()
+    semestre_nombre = semestre_obj.Semestre if semestre_obj else ''
+    
+    # Nivel
+    nivel_obj = db.query(Nivel).filter(
+        Nivel.Id_Nivel == id_nivel
+    ).first()
+    nivel_nombre = nivel_obj.Nivel if nivel_obj else ''
+    
+    print(f"\n📋 Valores literales para el SP:")
+    print(f"Unidad Académica: {unidad_sigla}")
+    print(f"Programa: {programa_nombre}")
+    print(f"Modalidad: {modalidad_nombre}")
+    print(f"Semestre: {semestre_nombre}")
+    print(f"Nivel: {nivel_nombre}")
+    print(f"Período (literal): {periodo_literal}")
+    
+    # Validar que se obtuvieron todos los valores
+    if not all([unidad_sigla, programa_nombre, modalidad_nombre, semestre_nombre, nivel_nombre]):
+        return {
+            "error": "No se pudieron obtener los nombres literales de los catálogos",
+            "detalles": {
+                "unidad": unidad_sigla,
+                "programa": programa_nombre,
+                "modalidad": modalidad_nombre,
+                "semestre": semestre_nombre,
+                "nivel": nivel_nombre
+            }
+        }
+    
+    # Ejecutar el SP SP_Actualiza_Matricula_Por_Semestre_AU
+    # Nota: El SP requiere @SSalones, lo obtenemos del request (Total Grupos)
+    total_grupos = int(total_grupos or 0)
+    print(f"Total de Grupos (salones) para validación: {total_grupos}")
+    
+    # Ejecutar SP de validación por semestre (la versión se confirma junto con el SP)
+    version = incrementar_version_periodo(db, id_unidad_academica, periodo_literal)
+    rows_list = execute_sp_actualiza_matricula_por_semestre_au(
+        db,
+        unidad_sigla=unidad_sigla,
+        programa_nombre=programa_nombre,
+        modalidad_nombre=modalidad_nombre,
+        semestre_nombre=semestre_nombre,
+        salones=total_grupos,
+        usuario=usuario_sp,
+        periodo=periodo_literal,
+        host=host_sp,
+        nivel=nivel_nombre,
+    )
+    
+    print(f"\n✅ SP_Actualiza_Matricula_Por_Semestre_AU ejecutado exitosamente")
+    print(f"Filas finales devueltas: {len(rows_list)}")
+    
+    # VERIFICAR SI SE DEBE EJECUTAR SP_Finaliza_Captura_Matricula
+    print(f"\n{'='*60}")
+    print(f"🔍 VERIFICANDO CONDICIONES PARA SP_Finaliza_Captura_Matricula")
+    print(f"{'='*60}")
+    
+    # Obtener el período como ID para consultar SemaforoUnidadAcademica
+    if str(periodo).isdigit():
+        periodo_id = int(periodo)
+    else:
+        periodo_obj = db.query(Periodo).filter(Periodo.Periodo == periodo_literal).first()
+        periodo_id = periodo_obj.Id_Periodo if periodo_obj else PERIODO_DEFAULT_ID
+    
+    # Verificar el estado del semáforo general en SemaforoUnidadAcademica
+    semaforo_unidad = db.query(SemaforoUnidadAcademica).filter(
+        SemaforoUnidadAcademica.Id_Periodo == periodo_id,
+        SemaforoUnidadAcademica.Id_Unidad_Academica == id_unidad_academica,
+        SemaforoUnidadAcademica.Id_Formato == 1  # Formato de matrícula
+    ).first()
+    
+    if not semaforo_unidad:
+        print(f"⚠️  No se encontró registro en SemaforoUnidadAcademica")
+        print(f"   Periodo: {periodo_id}, Unidad: {id_unidad_academica}, Formato: 1")
+        debe_ejecutar_sp_final = False
+    elif semaforo_unidad.Id_Semaforo == 3:
+        print(f"⏭️  SemaforoUnidadAcademica ya está en estado 3 (COMPLETADO)")
+        print(f"   SP_Finaliza_Captura_Matricula ya fue ejecutado previamente")
+        debe_ejecutar_sp_final = False
+    elif semaforo_unidad.Id_Semaforo == 2:
+        print(f"✅ SemaforoUnidadAcademica está en estado 2 (CAPTURA)")
+        print(f"🔍 Verificando que TODOS los semestres estén en estado 3...")
+        
+        # Verificar que TODOS los semestres tengan semáforo 3
+        # Obtenemos todos los semestres del SP
+        rows_metadata, metadata_filas, dbg, nota_rechazo_check = execute_matricula_sp_with_context(
+            db,
+            id_unidad_academica,
+            id_nivel,
+            periodo_literal,
+            periodo_literal,
+            usuario_sp,
+            host_sp,
+        )
+        
+        # Contar semestres y verificar sus estados
+        semestres_totales = set()
+        semestres_completados = set()
+        
+        for row in rows_metadata:
+            semestre_row = str(row.get('Semestre', ''))
+            id_semaforo_row = row.get('Id_Semaforo')
+            
+            if semestre_row:
+                semestres_totales.add(semestre_row)
+                if id_semaforo_row == 3:
+                    semestres_completados.add(semestre_row)
+        
+        print(f"   📊 Semestres totales: {len(semestres_totales)}")
+        print(f"   ✅ Semestres completados (estado 3): {len(semestres_completados)}")
+        print(f"   📋 Todos los semestres: {sorted(semestres_totales)}")
+        print(f"   ✅ Semestres con estado 3: {sorted(semestres_completados)}")
+        
+        if len(semestres_completados) == len(semestres_totales) and len(semestres_totales) > 0:
+            print(f"\n✅ CONDICIONES CUMPLIDAS:")
+            print(f"   ✅ Todos los semestres están en estado 3")
+            print(f"   ✅ SemaforoUnidadAcademica está en estado 2")
+            debe_ejecutar_sp_final = True
+        else:
+            print(f"\n⏭️  NO se ejecutará SP_Finaliza_Captura_Matricula:")
+            print(f"   Faltan {len(semestres_totales) - len(semestres_completados)} semestres por completar")
+            debe_ejecutar_sp_final = False
+    else:
+        print(f"⚠️  SemaforoUnidadAcademica en estado desconocido: {semaforo_unidad.Id_Semaforo}")
+        debe_ejecutar_sp_final = False
+    
+    # Ejecutar SP_Finaliza_Captura_Matricula solo si se cumplen las condiciones
+    sp_final_ejecutado = False
+    if debe_ejecutar_sp_final:
+        print(f"\n{'='*60}")
+        print(f"🚀 EJECUTANDO SP_Finaliza_Captura_Matricula")
+        print(f"{'='*60}")
+        
+        version = incrementar_version_periodo(db, id_unidad_academica, periodo_literal)
+        execute_sp_finaliza_captura_matricula(
+            db,
+            unidad_sigla=unidad_sigla,
+            programa_nombre=programa_nombre,
+            modalidad_nombre=modalidad_nombre,
+            semestre_nombre=semestre_nombre,
+            salones=total_grupos,
+            usuario=usuario_sp,
+            periodo=periodo_literal,
+            host=host_sp,
+            nivel=nivel_nombre,
+        )
+        
+        print(f"✅ SP_Finaliza_Captura_Matricula ejecutado exitosamente")
+        print(f"   SemaforoUnidadAcademica ahora debería estar en estado 3")
+        sp_final_ejecutado = True
+    else:
+        print(f"\n⏭️  SP_Finaliza_Captura_Matricula NO ejecutado (condiciones no cumplidas)")
+    
+    # Verificar semáforo sin SQL crudo: reconsultar SP y extraer estado
+    print(f"\n🔍 Consultando estado actualizado del semáforo vía SP...")
+    estado_semaforo_actualizado = get_estado_semaforo_desde_sp(
+        db,
+        id_unidad_academica=id_unidad_academica,
+        id_nivel=id_nivel,
+        periodo_input=periodo_literal,
+        usuario=usuario_sp,
+        host=host_sp,
+        programa_nombre=programa_nombre,
+        modalidad_nombre=modalidad_nombre,
+        semestre_nombre=semestre_nombre,
+    )
+    
+    # Construir lista de SPs ejecutados
+    sps_ejecutados = ["SP_Actualiza_Matricula_Por_Semestre_AU"]
+    if sp_final_ejecutado:
+        sps_ejecutados.append("SP_Finaliza_Captura_Matricula")
+    
+    # Mensaje apropiado según si se ejecutó el SP final
+    if sp_final_ejecutado:
+        mensaje = f"Semestre {semestre_nombre} consolidado. ¡TODA LA CAPTURA FINALIZADA!"
+    else:
+        mensaje = f"Semestre {semestre_nombre} consolidado (aún faltan semestres por completar)"
+
+    # Avisar a las páginas abiertas de la UA/periodo (los SPs ya hicieron commit)
+    publicar_evento_matricula(id_unidad_academica, periodo_id, EVENTO_SEMAFORO, {
+        "mensaje": mensaje,
+        "programa": programa_nombre,
+        "modalidad": modalidad_nombre,
+        "semestre": semestre_nombre,
+        "estado_semaforo": estado_semaforo_actualizado,
+        "captura_finalizada": sp_final_ejecutado,
+        "usuario": usuario_sp,
+        "version": version,
+    })
+    
+    return {
+        "success": True,
+        "mensaje": mensaje,
+        "rows": rows_list,
+        "semestre_validado": semestre_nombre,
+        "estado_semaforo": estado_semaforo_actualizado,
+        "sp_final_ejecutado": sp_final_ejecutado,
+        "fase": "sp_final_consolidado" if sp_final_ejecutado else "sp_semestre_actualizado",
+        "debug": {
+            "sp_ejecutados": sps_ejecutados,
+            "parametros": {
+                "unidad": unidad_sigla,
+                "programa": programa_nombre,
+                "modalidad": modalidad_nombre,
+                "semestre": semestre_nombre,
+                "salones": total_grupos,
+                "usuario": usuario_sp,
+                "periodo": periodo_literal,
+                "host": host_sp,
+                "nivel": nivel_nombre
+            }
+        }
+    }
+
+
+def actualizar_matricula_unidad(
+    db: Session,
+    unidad_sigla: str,
+    total_grupos: Any,
+    usuario_sp: str,
+    periodo: str,
+    host_sp: str,
+    nivel: str,
+    commit: bool = True,
+    id_unidad_academica: Optional[int] = None,
+    versionar: bool = True,
+) -> Dict[str, Any]:
+    """
+    Pasa lo capturado en Temp_Matricula a Matricula (SP_Actualiza_Matricula_Por_Unidad_Academica)
+    y limpia las validaciones previas del periodo para que los validadores vuelvan a revisar.
+    Con commit=False no confirma la transacción (la confirma el llamador).
+    Con versionar=True incrementa la versión de datos de la UA/periodo en la misma transacción
+    (versionar=False cuando el llamador ya la incrementó, p. ej. el guardado por deltas).
+    """
+    # Verificar que hay datos en Temp_Matricula antes de actualizar (la sesión no hace
+    # autoflush: los merge() de guardar_temp_matricula siguen pendientes)
+    db.flush()
+    temp_count = db.query(Temp_Matricula).count()
+    if temp_count == 0:
+        return {
+            "warning": "No hay datos en Temp_Matricula para actualizar",
+            "registros_temp": 0,
+            "registros_actualizados": 0
+        }
+    print(f"Registros en Temp_Matricula: {temp_count}")
+
+    version = None
+    if versionar:
+        if id_unidad_academica is None:
+            id_unidad_academica = db.query(Unidad_Academica.Id_Unidad_Academica).filter(
+                Unidad_Academica.Sigla == unidad_sigla
+            ).scalar()
+        version = incrementar_version_periodo(db, id_unidad_academica, periodo)
+
+    execute_sp_actualiza_matricula_por_unidad_academica(
+        db,
+        unidad_sigla=unidad_sigla,
+        salones=total_grupos,
+        usuario=usuario_sp,
+        periodo=periodo,
+        host=host_sp,
+        nivel=nivel,
+        commit=commit,
+    )
+    print("SP ejecutado exitosamente")
+
+    # LIMPIAR VALIDACIONES PREVIAS cuando el capturista hace cambios
+    # Esto permite que los validadores vuelvan a validar/rechazar
+    print(f"\n🔄 Limpiando validaciones previas del periodo...")
+    periodo_obj = db.query(Periodo).filter(Periodo.Periodo == periodo).first()
+    if periodo_obj:
+        validaciones_eliminadas = db.query(Validacion).filter(
+            Validacion.Id_Periodo == periodo_obj.Id_Periodo,
+            Validacion.Id_Formato == 1  # Formato de matrícula
+        ).delete()
+        if commit:
+            db.commit()
+        print(f"✅ {validaciones_eliminadas} validaciones previas eliminadas")
+    else:
+        print(f"⚠️  No se pudo obtener ID del periodo para limpiar validaciones")
+
+    # Verificar que Temp_Matricula quedó vacía (el SP hace TRUNCATE)
+    temp_count_after = db.query(Temp_Matricula).count()
+    print(f"Registros en Temp_Matricula después: {temp_count_after}")
+    print("=== ACTUALIZACIÓN COMPLETADA ===")
+
+    return {
+        "mensaje": "Matrícula actualizada exitosamente",
+        "registros_procesados": temp_count,
+        "temp_matricula_limpiada": temp_count_after == 0,
+        "version": version,
+        "usuario": usuario_sp,
+        "periodo": periodo,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def resolver_periodo_literal(db: Session, periodo_input: Any) -> str:
+    """Convierte el periodo recibido (ID o literal) al literal que usan Temp_Matricula y los SPs."""
+    if not periodo_input:
+        print(f"📌 Usando período por defecto: '{PERIODO_DEFAULT_LITERAL}'")
+        return PERIODO_DEFAULT_LITERAL
+    if str(periodo_input).isdigit():
+        periodo_obj = db.query(Periodo).filter(Periodo.Id_Periodo == int(periodo_input)).first()
+        if periodo_obj:
+            print(f"🔄 Período convertido de ID {periodo_input} → '{periodo_obj.Periodo}'")
+            return periodo_obj.Periodo
+        print(f"⚠️ ID de período {periodo_input} no encontrado, usando default")
+        return PERIODO_DEFAULT_LITERAL
+    return str(periodo_input)
+
+
+def get_id_periodo(db: Session, periodo_literal: str) -> Optional[int]:
+    """Id_Periodo a partir del literal ('2025-2026/1')."""
+    return db.query(Periodo.Id_Periodo).filter(Periodo.Periodo == periodo_literal).scalar()
+
+
+def _numero_semestre(semestre_obj) -> Optional[int]:
+    """Extrae el número del semestre (ej: 1 de "Primer Semestre") para las reglas de tipo de ingreso."""
+    if not semestre_obj:
+        return None
+    semestre_text = (semestre_obj.Semestre or "").lower()
+    if "primer" in semestre_text or semestre_text == "1":
+        return 1
+    if "segundo" in semestre_text or semestre_text == "2":
+        return 2
+    if "tercer" in semestre_text or semestre_text == "3":
+        return 3
+    # Agregar más semestres según sea necesario
+    return None
+
+
+def guardar_temp_matricula(
+    db: Session,
+    id_unidad_academica: int,
+    id_nivel: int,
+    periodo: str,
+    programa: Any,
+    modalidad: Any,
+    semestre: Any,
+    turno: Any,
+    total_grupos: Any,
+    datos_matricula: Dict[str, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Convierte la captura del frontend (IDs por celda) al modelo Temp_Matricula y la deja
+    en la sesión con merge(). NO hace commit: lo decide el llamador.
+
+    Args:
+        periodo: Periodo ya en formato literal (ver resolver_periodo_literal)
+        datos_matricula: {clave: {tipo_ingreso, grupo_edad, sexo, matricula, salones}}
+
+    Returns:
+        Dict con registros_insertados, registros_rechazados, validacion_aplicada y los
+        nombres de catálogo resueltos (unidad_sigla, nivel, semestre, turno).
+    """
+    valid_fields = set(Temp_Matricula.__annotations__.keys())
+
+    # Obtener nombres desde la base de datos para mapear IDs
+    programa_obj = db.query(Programas).filter(Programas.Id_Programa == int(programa)).first()
+    modalidad_obj = db.query(Modalidad).filter(Modalidad.Id_Modalidad == int(modalidad)).first()
+    turno_obj = db.query(Turno).filter(Turno.Id_Turno == int(turno)).first()
+    semestre_obj = db.query(Semestre).filter(Semestre.Id_Semestre == int(semestre)).first()
+
+    # Obtener Nombre_Rama desde el programa
+    rama_obj = None
+    if programa_obj and programa_obj.Id_Rama_Programa:
+        rama_obj = db.query(Rama).filter(Rama.Id_Rama == programa_obj.Id_Rama_Programa).first()
+
+    unidad_obj = db.query(Unidad_Academica).filter(
+        Unidad_Academica.Id_Unidad_Academica == id_unidad_academica
+    ).first()
+    nivel_obj = db.query(Nivel).filter(Nivel.Id_Nivel == id_nivel).first()
+
+    # Mapeos de grupos de edad y tipos de ingreso para convertir a nombres
+    grupos_edad_map = {str(g.Id_Grupo_Edad): g.Grupo_Edad for g in db.query(Grupo_Edad).all()}
+    tipos_ingreso_map = {str(t.Id_Tipo_Ingreso): t.Tipo_de_Ingreso for t in db.query(Tipo_Ingreso).all()}
+
+    # Capturar nombres antes de limpiar la sesión (expunge_all desasocia los objetos)
+    resumen = {
+        "unidad_sigla": unidad_obj.Sigla if unidad_obj else '',
+        "nivel": nivel_obj.Nivel if nivel_obj else '',
+        "semestre": semestre_obj.Semestre if semestre_obj else f"Semestre {semestre}",
+        "turno": turno_obj.Turno if turno_obj else f"Turno {turno}",
+    }
+    base = {
+        'Periodo': periodo,
+        'Sigla': unidad_obj.Sigla if unidad_obj else 'UNK',
+        'Nombre_Programa': programa_obj.Nombre_Programa if programa_obj else '',
+        'Nombre_Rama': rama_obj.Nombre_Rama if rama_obj else 'NULL',
+        'Nivel': nivel_obj.Nivel if nivel_obj else '',
+        'Modalidad': modalidad_obj.Modalidad if modalidad_obj else '',
+        'Turno': turno_obj.Turno if turno_obj else '',
+        'Semestre': semestre_obj.Semestre if semestre_obj else '',
+    }
+    semestre_numero = _numero_semestre(semestre_obj)
+    print(f"Semestre detectado: {semestre_numero} (de: {base['Semestre'] or 'N/A'})")
+
+    # Limpiar la sesión para evitar conflictos de identidad
+    db.expunge_all()
+
+    registros_insertados = 0
+    registros_rechazados = 0
+    for dato in datos_matricula.values():
+        # Validación de reglas de semestre - SEGURIDAD BACKEND
+        tipo_ingreso_id = str(dato.get('tipo_ingreso', ''))
+        if semestre_numero is not None and tipo_ingreso_id:
+            # Regla 1: Semestre 1 no puede tener "Reingreso" (ID: 2)
+            if semestre_numero == 1 and tipo_ingreso_id == "2":
+                print(f"VALIDACIÓN RECHAZADA: Semestre 1 no puede tener Reingreso (tipo_ingreso: {tipo_ingreso_id})")
+                registros_rechazados += 1
+                continue
+            # Regla 2: Semestres diferentes a 1 no pueden tener "Nuevo Ingreso" (ID: 1)
+            if semestre_numero != 1 and tipo_ingreso_id == "1":
+                print(f"VALIDACIÓN RECHAZADA: Semestre {semestre_numero} no puede tener Nuevo Ingreso (tipo_ingreso: {tipo_ingreso_id})")
+                registros_rechazados += 1
+                continue
+
+        grupo_edad_id = str(dato.get('grupo_edad', ''))
+
+        # Convertir sexo de M/F a Hombre/Mujer
+        sexo_corto = dato.get('sexo', '')
+        sexo_completo = {'M': 'Hombre', 'F': 'Mujer'}.get(sexo_corto, sexo_corto)
+
+        registro = dict(
+            base,
+            Grupo_Edad=grupos_edad_map.get(grupo_edad_id, grupo_edad_id),
+            Tipo_Ingreso=tipos_ingreso_map.get(tipo_ingreso_id, tipo_ingreso_id),
+            Sexo=sexo_completo,
+            Matricula=int(dato.get('matricula', 0)),
+            Salones=int(dato.get('salones', total_grupos)),
+        )
+        filtered = {k: v for k, v in registro.items() if k in valid_fields}
+
+        # Se incluyen valores de 0 (>= 0)
+        if filtered and filtered.get('Matricula', 0) >= 0:
+            # merge() maneja automáticamente INSERT/UPDATE
+            db.merge(Temp_Matricula(**filtered))
+            registros_insertados += 1
+
+    print(f"Registros preparados en Temp_Matricula: {registros_insertados} (rechazados: {registros_rechazados})")
+
+    resumen.update({
+        "registros_insertados": registros_insertados,
+        "registros_rechazados": registros_rechazados,
+        "validacion_aplicada": semestre_numero is not None,
+    })
+    return resumen
+
+
+def mensaje_captura(registros_insertados: int, registros_rechazados: int) -> str:
+    """Mensaje informativo del resultado de guardar la captura."""
+    mensaje = f"Matrícula procesada. {registros_insertados} registros guardados"
+    if registros_rechazados > 0:
+        mensaje += f", {registros_rechazados} registros rechazados por validación de semestre"
+    return mensaje + "."
+
+
+def guardar_y_consolidar_matricula(
+    db: Session,
+    id_unidad_academica: int,
+    id_nivel: int,
+    periodo_input: Any,
+    programa: Any,
+    modalidad: Any,
+    semestre: Any,
+    turno: Any,
+    total_grupos: Any,
+    datos_matricula: Dict[str, Dict[str, Any]],
+    usuario_sp: str,
+    host_sp: str,
+    validar_turno: bool = False,
+) -> Dict[str, Any]:
+    """
+    Guarda la captura en Temp_Matricula, ejecuta SP_Actualiza_Matricula_Por_Unidad_Academica y
+    limpia las validaciones del periodo en UNA sola transacción. Si algo falla se hace rollback
+    y Temp_Matricula/Matricula quedan como estaban.
+
+    Después del commit vuelve a consultar el SP de matrícula para regresar las filas ya
+    oficiales, de modo que el frontend no necesita recargar la página.
+
+    Args:
+        validar_turno: Marca la respuesta como validación de turno (sustituye a /preparar_turno)
+    """
+    periodo = resolver_periodo_literal(db, periodo_input)
+
+    try:
+        captura = guardar_temp_matricula(
+            db,
+            id_unidad_academica=id_unidad_academica,
+            id_nivel=id_nivel,
+            periodo=periodo,
+            programa=programa,
+            modalidad=modalidad,
+            semestre=semestre,
+            turno=turno,
+            total_grupos=total_grupos,
+            datos_matricula=datos_matricula,
+        )
+        if captura["registros_insertados"] == 0:
+            db.rollback()
+            return {
+                "warning": "No hay registros válidos para guardar",
+                "registros_insertados": 0,
+                "registros_rechazados": captura["registros_rechazados"],
+            }
+        # La sesión no hace autoflush: el conteo y el SP deben ver los merge() de la captura
+        db.flush()
+
+        actualizacion = actualizar_matricula_unidad(
+            db,
+            unidad_sigla=captura["unidad_sigla"],
+            total_grupos=total_grupos,
+            usuario_sp=usuario_sp,
+            periodo=periodo,
+            host_sp=host_sp,
+            nivel=captura["nivel"],
+            commit=False,
+            id_unidad_academica=id_unidad_academica,
+        )
+        db.commit()
+        print(f"✅ Captura guardada y consolidada en una sola transacción ({captura['registros_insertados']} registros)")
+    except Exception:
+        db.rollback()
+        raise
+
+    # Filas oficiales ya consolidadas (lectura fuera de la transacción de escritura)
+    rows_list, metadata, debug_msg, nota_rechazo = execute_matricula_sp_with_context(
+        db=db,
+        id_unidad_academica=id_unidad_academica,
+        id_nivel=id_nivel,
+        periodo_input=periodo,
+        default_periodo=PERIODO_DEFAULT_LITERAL,
+        usuario=usuario_sp,
+        host=host_sp,
+    )
+
+    resultado = {
+        "mensaje": mensaje_captura(captura["registros_insertados"], captura["registros_rechazados"]),
+        "registros_insertados": captura["registros_insertados"],
+        "registros_rechazados": captura["registros_rechazados"],
+        "validacion_aplicada": captura["validacion_aplicada"],
+        "registros_procesados": actualizacion.get("registros_procesados", 0),
+        "usuario": usuario_sp,
+        "periodo": periodo,
+        "timestamp": actualizacion.get("timestamp", datetime.now().isoformat()),
+        "version": actualizacion.get("version"),
+        "rows": rows_list,
+        "metadata": metadata,
+        "nota_rechazo": nota_rechazo,
+    }
+    if "Error" in debug_msg:
+        # La escritura ya se confirmó; sólo falló la relectura
+        resultado["rows_error"] = debug_msg
+    if validar_turno:
+        resultado.update({
+            "success": True,
+            "turno_validado": captura["turno"],
+            "semestre": captura["semestre"],
+            "fase": "turno_individual",
+            "sp_ejecutado": "SP_Actualiza_Matricula_Por_Unidad_Academica",
+        })
+    return resultado
+
+
+def guardar_delta_matricula(
+    db: Session,
+    id_unidad_academica: int,
+    id_nivel: int,
+    periodo_input: Any,
+    programa: Any,
+    modalidad: Any,
+    semestre: Any,
+    turno: Any,
+    total_grupos: Any,
+    cambios: Dict[str, Dict[str, Any]],
+    version_base: int,
+    usuario_sp: str,
+    host_sp: str,
+) -> Dict[str, Any]:
+    """
+    Guardado por deltas: aplica sólo las celdas modificadas (cambios) sobre Temp_Matricula
+    y las consolida, siempre que version_base siga siendo la versión vigente de la UA/periodo.
+
+    El compare-and-swap de la versión va primero y en la misma transacción que la
+    escritura: si otro guardado ganó, se lanza VersionConflictError sin tocar datos.
+
+    Returns:
+        Dict con mensaje, registros_insertados/rechazados y la nueva version.
+    """
+    periodo = resolver_periodo_literal(db, periodo_input)
+    id_periodo = get_id_periodo(db, periodo)
+    if id_periodo is None:
+        raise ValueError(f"Período '{periodo}' no encontrado")
+
+    try:
+        version = incrementar_version(db, id_unidad_academica, id_periodo, FORMATO_MATRICULA, version_base=version_base)
+
+        captura = guardar_temp_matricula(
+            db,
+            id_unidad_academica=id_unidad_academica,
+            id_nivel=id_nivel,
+            periodo=periodo,
+            programa=programa,
+            modalidad=modalidad,
+            semestre=semestre,
+            turno=turno,
+            total_grupos=total_grupos,
+            datos_matricula=cambios,
+        )
+        if captura["registros_insertados"] == 0:
+            # Nada válido que escribir: no se consume una versión
+            db.rollback()
+            return {
+                "warning": "No hay registros válidos para guardar",
+                "registros_insertados": 0,
+                "registros_rechazados": captura["registros_rechazados"],
+                "version": version_base,
+            }
+        # Sin autoflush: las celdas del delta deben llegar a Temp_Matricula antes de consolidar
+        db.flush()
+
+        actualizar_matricula_unidad(
+            db,
+            unidad_sigla=captura["unidad_sigla"],
+            total_grupos=total_grupos,
+            usuario_sp=usuario_sp,
+            periodo=periodo,
+            host_sp=host_sp,
+            nivel=captura["nivel"],
+            commit=False,
+            versionar=False,
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    print(f"✅ Delta de matrícula aplicado: {captura['registros_insertados']} celdas, versión {version_base} → {version}")
+    return {
+        "mensaje": mensaje_captura(captura["registros_insertados"], captura["registros_rechazados"]),
+        "registros_insertados": captura["registros_insertados"],
+        "registros_rechazados": captura["registros_rechazados"],
+        "validacion_aplicada": captura["validacion_aplicada"],
+        "usuario": usuario_sp,
+        "periodo": periodo,
+        "version": version,
+        "timestamp": datetime.now().isoformat(),
+    }
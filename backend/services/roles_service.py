@@ -3,10 +3,30 @@ from backend.crud.CatRoles import create_rol, read_role_by_name, read_all_names_
 from sqlalchemy.orm import Session
 import unicodedata
 import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 from backend.schemas.Roles import RolesCreate, RolesResponse
 
 from sqlalchemy.orm import Session
 
+# Roles de captura y validación de formatos (Cat_Roles)
+ROLES_CAPTURISTA = frozenset({3})
+ROLES_VALIDADORES = frozenset({4, 5, 6, 7, 8})
+
+# Palabras clave (normalizadas) de los roles con permisos administrativos
+ROLES_ADMIN_KEYWORDS = (
+    "administrador",
+    "titular",
+    "jefe a de division",
+    "jefe a de departamento",
+    "ceget",
+)
+
+# El registro de políticas se recarga como máximo cada 10 minutos (cambios hechos por otros procesos)
+ROLES_POLITICAS_TTL_SEGUNDOS = 600
+
 def role_already_exists(db: Session, role_name: str) -> bool:
     role = read_role_by_name(db,role_name)
     validation = role is not None
@@ -17,6 +37,7 @@ def register_role(db: Session,role_dict: RolesCreate) -> CatRoles:
         if role_already_exists(db=db, role_name=role_dict.Rol):
             raise ValueError("role already exist")
         role = create_rol(db, role_dict)
+        invalidar_politicas_roles()
         return role
     finally:
         db.close()
@@ -64,16 +85,87 @@ def get_roles_for_user_group(db: Session, current_role_id: int) -> list[RolesRes
     - Si pertenece a 'CIIDII' => solo roles 'CIIDII'.
     - Si pertenece a 'UAS' => solo roles 'UAS'.
     """
+    registro = _get_registro(db)
+    politica = registro.politicas.get(current_role_id)
+    # Si no se encuentra, regresar todos por seguridad; Admin/Operador => sin restricción
+    if politica is None or politica.grupo is None:
+        return list(registro.todos)
+    return list(registro.por_grupo.get(politica.grupo, []))
+
+# --- Registro de políticas por rol ---
+
+@dataclass(frozen=True)
+class RolePolicy:
+    """Clasificación de un rol calculada una sola vez al cargar Cat_Roles."""
+    id_rol: int
+    nombre: str
+    grupo: Optional[str]
+    es_admin: bool
+    es_validador: bool
+    es_capturista: bool
+
+@dataclass
+class _RegistroRoles:
+    politicas: Dict[int, RolePolicy]
+    todos: List[RolesResponse]
+    por_grupo: Dict[str, List[RolesResponse]]
+    cargado_en: float
+
+_registro_lock = threading.Lock()
+_registro: Optional[_RegistroRoles] = None
+
+def _clasificar_rol(id_rol: int, nombre: str) -> RolePolicy:
+    normalizado = _normalize(nombre)
+    return RolePolicy(
+        id_rol=id_rol,
+        nombre=nombre,
+        grupo=_detect_group(nombre),
+        es_admin=any(k in normalizado for k in ROLES_ADMIN_KEYWORDS),
+        es_validador=id_rol in ROLES_VALIDADORES,
+        es_capturista=id_rol in ROLES_CAPTURISTA,
+    )
+
+def _cargar_registro(db: Session) -> _RegistroRoles:
     roles = read_all_roles(db)
-    # Buscar el rol actual
-    current_role = next((r for r in roles if r.Id_Rol == current_role_id), None)
-    if not current_role:
-        # Si no se encuentra, regresar todos por seguridad
-        return [RolesResponse.model_validate(r) for r in roles]
-    current_group = _detect_group(current_role.Rol)
-    # Admin/Operador => sin restricción
-    if current_group is None:
-        return [RolesResponse.model_validate(r) for r in roles]
-    # Filtrar por grupo
-    filtered = [r for r in roles if _detect_group(r.Rol) == current_group]
-    return [RolesResponse.model_validate(r) for r in filtered]
+    politicas = {r.Id_Rol: _clasificar_rol(r.Id_Rol, r.Rol) for r in roles}
+    todos = [RolesResponse.model_validate(r) for r in roles]
+    por_grupo: Dict[str, List[RolesResponse]] = {}
+    for r in todos:
+        grupo = politicas[r.Id_Rol].grupo
+        if grupo is not None:
+            por_grupo.setdefault(grupo, []).append(r)
+    print(f"✅ Políticas de roles cargadas: {len(politicas)} roles")
+    return _RegistroRoles(politicas=politicas, todos=todos, por_grupo=por_grupo, cargado_en=time.monotonic())
+
+def _get_registro(db: Session) -> _RegistroRoles:
+    """Devuelve el registro vigente; solo consulta la BD si no existe o expiró."""
+    global _registro
+    registro = _registro
+    if registro is not None and time.monotonic() - registro.cargado_en < ROLES_POLITICAS_TTL_SEGUNDOS:
+        return registro
+    with _registro_lock:
+        if _registro is None or time.monotonic() - _registro.cargado_en >= ROLES_POLITICAS_TTL_SEGUNDOS:
+            _registro = _cargar_registro(db)
+        return _registro
+
+def invalidar_politicas_roles() -> None:
+    """Fuerza la recarga del registro en la siguiente consulta (llamar al modificar Cat_Roles)."""
+    global _registro
+    with _registro_lock:
+        _registro = None
+
+def get_role_policy(db: Session, id_rol: int) -> Optional[RolePolicy]:
+    """Política del rol; None si el rol no existe en Cat_Roles."""
+    return _get_registro(db).politicas.get(id_rol)
+
+def es_rol_admin(db: Session, id_rol: int) -> bool:
+    politica = get_role_policy(db, id_rol)
+    return politica.es_admin if politica else False
+
+def es_rol_capturista(db: Session, id_rol: int) -> bool:
+    politica = get_role_policy(db, id_rol)
+    return politica.es_capturista if politica else id_rol in ROLES_CAPTURISTA
+
+def es_rol_validador(db: Session, id_rol: int) -> bool:
+    politica = get_role_policy(db, id_rol)
+    return politica.es_validador if politica else id_rol in ROLES_VALIDADORES
@@ -0,0 +1,211 @@
+"""
+Snapshots columnares de la tabla Matricula (Parquet o Arrow IPC) para analítica.
+
+El snapshot conserva las 11 llaves de catálogo como enteros y agrega, por cada
+dimensión, una columna decodificada con tipo dictionary (índices + valores únicos),
+así que las etiquetas ocupan prácticamente lo mismo que los IDs. Los análisis
+históricos leen estos archivos locales en lugar de consultar SQL Server.
+
+- La lectura usa stream_matricula (cursor por lotes) y se escribe lote por lote,
+  por lo que la memoria no crece con el tamaño del periodo.
+- El archivo se escribe con nombre temporal y se renombra al terminar: un snapshot
+  a medias nunca aparece en el listado.
+- Se conservan los últimos SNAPSHOTS_CONSERVAR archivos por periodo y formato.
+
+Para generarlos periódicamente (p. ej. cada noche desde el programador de tareas):
+    python -m backend.services.snapshot_service --periodo 2025-2026/1 --formato parquet
+"""
+from backend.core.config import settings
+from backend.crud.Matricula import stream_matricula
+from backend.services.catalogos_service import get_catalogos
+
+from datetime import datetime
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+
+import os
+import re
+
+FORMATOS_SNAPSHOT = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Filas por lote (RecordBatch / row group)
+FILAS_POR_LOTE_SNAPSHOT = 50000
+
+# Columnas de ID en el mismo orden que las filas de stream_matricula
+LLAVES_SNAPSHOT = (
+    ("Id_Periodo", "periodo"),
+    ("Id_Unidad_Academica", "unidad_academica"),
+    ("Id_Nivel", "nivel"),
+    ("Id_Programa", "programa"),
+    ("Id_Rama", "rama"),
+    ("Id_Modalidad", "modalidad"),
+    ("Id_Turno", "turno"),
+    ("Id_Semestre", "semestre"),
+    ("Id_Grupo_Edad", "grupo_edad"),
+    ("Id_Tipo_Ingreso", "tipo_ingreso"),
+    ("Id_Sexo", "sexo"),
+)
+
+# Etiqueta de periodo de los snapshots que contienen todos los periodos
+ETIQUETA_TODOS_PERIODOS = "todos"
+
+_PATRON_NOMBRE = re.compile(r"^matricula_(?P<periodo>[\w-]+)_(?P<fecha>\d{8}T\d{6})\.(?P<ext>parquet|arrow)$")
+
+
+def get_directorio_snapshots() -> str:
+    directorio = os.path.abspath(settings.SNAPSHOTS_DIR)
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def _esquema(pa):
+    campos = []
+    for columna_id, _ in LLAVES_SNAPSHOT:
+        campos.append(pa.field(columna_id, pa.int32(), nullable=False))
+    for _, catalogo in LLAVES_SNAPSHOT:
+        campos.append(pa.field(catalogo, pa.dictionary(pa.int32(), pa.string())))
+    campos.append(pa.field("Matricula", pa.int32(), nullable=False))
+    return pa.schema(campos)
+
+
+def _lote_a_record_batch(pa, esquema, filas: List[Any], diccionarios: Dict[str, Any], posiciones: Dict[str, Dict[int, int]]):
+    """Convierte filas de stream_matricula a un RecordBatch con dimensiones dictionary."""
+    columnas = []
+    for i, _ in enumerate(LLAVES_SNAPSHOT):
+        columnas.append(pa.array([f[i] for f in filas], type=pa.int32()))
+    for i, (_, catalogo) in enumerate(LLAVES_SNAPSHOT):
+        # Índice dentro del diccionario del catálogo; IDs sin descripción quedan nulos
+        indices = pa.array([posiciones[catalogo].get(f[i]) for f in filas], type=pa.int32())
+        columnas.append(pa.DictionaryArray.from_arrays(indices, diccionarios[catalogo]))
+    columnas.append(pa.array([f[len(LLAVES_SNAPSHOT)] or 0 for f in filas], type=pa.int32()))
+    return pa.RecordBatch.from_arrays(columnas, schema=esquema)
+
+
+def etiqueta_periodo_snapshot(periodos: Dict[int, str], id_periodo: Optional[int]) -> str:
+    """Etiqueta del periodo en el nombre del snapshot (catálogo de periodos -> '2025-2026-1')."""
+    if not id_periodo:
+        return ETIQUETA_TODOS_PERIODOS
+    return periodos.get(id_periodo, str(id_periodo)).replace("/", "-")
+
+
+def generar_snapshot_matricula(
+    db: Session,
+    id_periodo: Optional[int] = None,
+    formato: str = "parquet",
+) -> Dict[str, Any]:
+    """
+    Escribe el snapshot de Matricula (un periodo o todos) y regresa sus metadatos.
+    Firma compatible con jobs_service.submit_job (recibe la sesión como primer argumento).
+    """
+    import pyarrow as pa
+
+    if formato not in FORMATOS_SNAPSHOT:
+        raise ValueError(f"Formato de snapshot inválido: {formato}")
+
+    catalogos = get_catalogos(db, *(c for _, c in LLAVES_SNAPSHOT))
+    diccionarios = {}
+    posiciones = {}
+    for catalogo, valores in catalogos.items():
+        ids = sorted(valores)
+        diccionarios[catalogo] = pa.array([str(valores[i]) for i in ids], type=pa.string())
+        posiciones[catalogo] = {id_: pos for pos, id_ in enumerate(ids)}
+
+    esquema = _esquema(pa).with_metadata({
+        "generado": datetime.now().isoformat(),
+        "id_periodo": str(id_periodo or ""),
+        "origen": "Matricula",
+    })
+    etiqueta_periodo = etiqueta_periodo_snapshot(catalogos["periodo"], id_periodo)
+    nombre = f"matricula_{etiqueta_periodo}_{datetime.now().strftime('%Y%m%dT%H%M%S')}{FORMATOS_SNAPSHOT[formato]}"
+    directorio = get_directorio_snapshots()
+    ruta = os.path.join(directorio, nombre)
+    ruta_temporal = ruta + ".tmp"
+
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+        escritor = pq.ParquetWriter(ruta_temporal, esquema, compression="zstd", use_dictionary=True)
+        escribir = escritor.write_batch
+    else:
+        sink = pa.OSFile(ruta_temporal, "wb")
+        escritor = pa.ipc.new_file(sink, esquema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+        escribir = escritor.write_batch
+
+    total = 0
+    try:
+        lote: List[Any] = []
+        for fila in stream_matricula(db, id_periodo=id_periodo, lote=FILAS_POR_LOTE_SNAPSHOT):
+            lote.append(fila)
+            if len(lote) >= FILAS_POR_LOTE_SNAPSHOT:
+                escribir(_lote_a_record_batch(pa, esquema, lote, diccionarios, posiciones))
+                total += len(lote)
+                lote = []
+        if lote:
+            escribir(_lote_a_record_batch(pa, esquema, lote, diccionarios, posiciones))
+            total += len(lote)
+        escritor.close()
+        if formato == "arrow":
+            sink.close()
+        os.replace(ruta_temporal, ruta)
+    except Exception:
+        try:
+            escritor.close()
+        except Exception:
+            pass
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+    print(f"🧊 Snapshot {nombre}: {total} filas, {os.path.getsize(ruta) / 1024:.0f} KB")
+    _purgar_snapshots(etiqueta_periodo, formato)
+    return describir_snapshot(nombre) | {"filas": total}
+
+
+def describir_snapshot(nombre: str) -> Dict[str, Any]:
+    coincidencia = _PATRON_NOMBRE.match(nombre)
+    ruta = os.path.join(get_directorio_snapshots(), nombre)
+    return {
+        "nombre": nombre,
+        "periodo": coincidencia.group("periodo"),
+        "formato": "parquet" if coincidencia.group("ext") == "parquet" else "arrow",
+        "generado": datetime.strptime(coincidencia.group("fecha"), "%Y%m%dT%H%M%S").isoformat(),
+        "tamano_bytes": os.path.getsize(ruta),
+    }
+
+
+def listar_snapshots() -> List[Dict[str, Any]]:
+    """Snapshots disponibles, del más reciente al más antiguo."""
+    nombres = [n for n in os.listdir(get_directorio_snapshots()) if _PATRON_NOMBRE.match(n)]
+    snapshots = [describir_snapshot(n) for n in nombres]
+    return sorted(snapshots, key=lambda s: s["generado"], reverse=True)
+
+
+def get_ruta_snapshot(nombre: str) -> Optional[str]:
+    """Ruta del snapshot sólo si el nombre es uno de los generados (evita rutas arbitrarias)."""
+    if not _PATRON_NOMBRE.match(nombre):
+        return None
+    ruta = os.path.join(get_directorio_snapshots(), nombre)
+    return ruta if os.path.isfile(ruta) else None
+
+
+def _purgar_snapshots(etiqueta_periodo: str, formato: str) -> None:
+    mismos = [s for s in listar_snapshots() if s["periodo"] == etiqueta_periodo and s["formato"] == formato]
+    for snapshot in mismos[max(1, settings.SNAPSHOTS_CONSERVAR):]:
+        os.remove(os.path.join(get_directorio_snapshots(), snapshot["nombre"]))
+        print(f"🗑️ Snapshot eliminado: {snapshot['nombre']}")
+
+
+if __name__ == "__main__":
+    import argparse
+    from backend.database.db_config import SessionLocal
+    from backend.services.version_service import resolver_id_periodo
+
+    parser = argparse.ArgumentParser(description="Genera un snapshot columnar de Matricula")
+    parser.add_argument("--periodo", default="", help="ID o literal del periodo (vacío = todos)")
+    parser.add_argument("--formato", default="parquet", choices=sorted(FORMATOS_SNAPSHOT))
+    args = parser.parse_args()
+
+    sesion = SessionLocal()
+    try:
+        generar_snapshot_matricula(sesion, resolver_id_periodo(sesion, args.periodo), args.formato)
+    finally:
+        sesion.close()
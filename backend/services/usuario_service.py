@@ -8,21 +8,30 @@ from backend.crud.Usuario import (
     set_usuario_estatus as crud_set_usuario_estatus,
     get_usuarios_by_unidad as crud_get_usuarios_by_unidad,
     get_usuario_by_id as crud_get_usuario_by_id,
+    read_usuarios_page,
+    filtro_excluir_super_admin,
+    COLUMNAS_ORDEN_USUARIOS,
 )
 from backend.services.bitacora_service import registrar_bitacora
+from backend.services.roles_service import es_rol_admin
 from backend.database.models.Usuario import Usuario
 from backend.utils.security import hash_password, generate_random_password
 from backend.utils.request import get_request_host
 from backend.utils.email import send_email, EmailSendError
+from backend.utils.pagination import encode_cursor, decode_cursor
 from backend.schemas.Usuario import UsuarioCreate, UsuarioResponse, UsuarioLogin
 
 
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import Optional, Dict
+from typing import Optional, Dict, Any
 
 import bcrypt
 
+# Tamaño de página del listado de usuarios
+USUARIOS_LIMITE_DEFAULT = 50
+USUARIOS_LIMITE_MAX = 200
+
 class UserAlreadyExistsError(Exception):
     """Excepción lanzada cuando un usuario ya existe."""
     pass
@@ -285,7 +294,8 @@ def get_usuarios_by_unidad_con_rol(db: Session, id_unidad_academica: int):
         .join(CatUnidadAcademica, Usuario.Id_Unidad_Academica == CatUnidadAcademica.Id_Unidad_Academica)
         .filter(
             Usuario.Id_Unidad_Academica == id_unidad_academica,
-            Usuario.Id_Estatus != 3
+            Usuario.Id_Estatus != 3,
+            filtro_excluir_super_admin()
         )
         .all()
     )
@@ -306,26 +316,11 @@ def is_super_admin(nombre: str, paterno: str, materno: str) -> bool:
 def has_admin_permissions(db: Session, id_rol: int) -> bool:
     """
     Determina si un rol tiene permisos administrativos basándose en el nombre del rol.
-    Roles con permisos: Titular, Jefe/a de División, Jefe/a de Departamento, CEGET
+    Roles con permisos: Administrador, Titular, Jefe/a de División, Jefe/a de Departamento, CEGET
+    La clasificación se precalcula en el registro de políticas de roles (sin consulta por petición).
     """
-    from backend.database.models.CatRoles import CatRoles
-    
     try:
-        rol = db.query(CatRoles).filter(CatRoles.Id_Rol == id_rol).first()
-        if not rol:
-            return False
-        
-        # Roles con permisos administrativos (normalizar a minúsculas para comparación)
-        rol_nombre = rol.Rol.lower()
-        roles_admin = [
-            'administrador',
-            'titular', 
-            'jefe/a de división',
-            'jefe/a de departamento',
-            'ceget'
-        ]
-        
-        return any(admin_role in rol_nombre for admin_role in roles_admin)
+        return es_rol_admin(db, id_rol)
     except Exception:
         return False
 
@@ -395,3 +390,76 @@ def has_temporary_password(db: Session, user_id: int) -> bool:
         # Si hay error (ej: tabla bitácora no existe), asumir que no tiene contraseña temporal
         print(f"Error detectando contraseña temporal: {e}")
         return False
+
+# =============================
+# Listado paginado de usuarios
+# =============================
+
+def _serializar_usuario(usuario: Usuario, nombre_rol: str, sigla_ua: str) -> Dict[str, Any]:
+    return {
+        "Id_Usuario": usuario.Id_Usuario,
+        "Nombre": usuario.Nombre or "",
+        "Paterno": usuario.Paterno or "",
+        "Materno": usuario.Materno or "",
+        "Usuario": usuario.Usuario,
+        "Email": usuario.Email or "",
+        "Id_Unidad_Academica": usuario.Id_Unidad_Academica,
+        "Id_Rol": usuario.Id_Rol,
+        "Id_Nivel": usuario.Id_Nivel,
+        "Rol": nombre_rol,
+        "Sigla_UA": sigla_ua,
+    }
+
+def _valor_orden(usuario: Usuario, orden: str):
+    if orden == "usuario":
+        return usuario.Usuario
+    if orden == "email":
+        return usuario.Email or ""
+    return usuario.Nombre or ""
+
+def get_usuarios_pagina(
+    db: Session,
+    cursor: Optional[str] = None,
+    limite: int = USUARIOS_LIMITE_DEFAULT,
+    id_unidad_academica: Optional[int] = None,
+    busqueda: Optional[str] = None,
+    orden: str = "nombre",
+    descendente: bool = False,
+    excluir_super_admin: bool = True,
+) -> Dict[str, Any]:
+    """
+    Página del listado de usuarios para la administración.
+    El cursor es opaco y codifica (valor de orden, Id_Usuario) del último registro entregado.
+    Lanza ValueError si el cursor no es válido.
+    """
+    limite = max(1, min(int(limite or USUARIOS_LIMITE_DEFAULT), USUARIOS_LIMITE_MAX))
+    if orden not in COLUMNAS_ORDEN_USUARIOS:
+        orden = "nombre"
+    busqueda = (busqueda or "").strip() or None
+
+    despues_de = decode_cursor(cursor, 2)
+    if despues_de is not None:
+        despues_de = (despues_de[0], int(despues_de[1]))
+
+    filas = read_usuarios_page(
+        db,
+        limit=limite + 1,
+        id_unidad_academica=id_unidad_academica,
+        busqueda=busqueda,
+        orden=orden,
+        descendente=descendente,
+        despues_de=despues_de,
+        excluir_super_admin=excluir_super_admin,
+    )
+
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+    siguiente_cursor = None
+    if hay_mas and filas:
+        ultimo = filas[-1][0]
+        siguiente_cursor = encode_cursor(_valor_orden(ultimo, orden), ultimo.Id_Usuario)
+
+    return {
+        "usuarios": [_serializar_usuario(u, rol, sigla) for u, rol, sigla in filas],
+        "siguiente_cursor": siguiente_cursor,
+    }
@@ -0,0 +1,151 @@
+"""
+Versiones de datos por (Unidad Académica, Periodo, Formato).
+
+Cada escritura sobre los datos de un formato (guardar/actualizar, preparar turno,
+validar, rechazar, aprovechamiento) incrementa Version_Datos.Version dentro de la
+misma transacción. Así, saber si algo cambió cuesta leer una fila en lugar de
+ejecutar el SP de consulta; la versión sirve como llave de caché y como ETag.
+
+El guardado por deltas usa incrementar_version(version_base=...) como
+compare-and-swap: si otro usuario guardó antes, la versión ya no coincide y se
+lanza VersionConflictError (el endpoint responde 409).
+"""
+from backend.database.models.VersionDatos import VersionDatos
+from backend.database.models.CatPeriodo import CatPeriodo as Periodo
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+FORMATO_MATRICULA = 1
+FORMATO_APROVECHAMIENTO = 2
+FORMATOS = (FORMATO_MATRICULA, FORMATO_APROVECHAMIENTO)
+
+
+class VersionConflictError(Exception):
+    """La versión base enviada por el cliente ya no es la vigente."""
+
+    def __init__(self, version_actual: int, version_base: Optional[int] = None):
+        self.version_actual = version_actual
+        self.version_base = version_base
+        super().__init__(
+            f"Los datos cambiaron desde la última consulta (versión {version_base} → {version_actual}). "
+            "Recargue la información antes de guardar."
+        )
+
+
+def get_version(db: Session, id_unidad_academica: int, id_periodo: int, id_formato: int = FORMATO_MATRICULA) -> int:
+    """Versión vigente; 0 si el formato nunca se ha guardado."""
+    version = db.query(VersionDatos.Version).filter(
+        VersionDatos.Id_Unidad_Academica == id_unidad_academica,
+        VersionDatos.Id_Periodo == id_periodo,
+        VersionDatos.Id_Formato == id_formato,
+    ).scalar()
+    return version or 0
+
+
+def incrementar_version(
+    db: Session,
+    id_unidad_academica: int,
+    id_periodo: int,
+    id_formato: int = FORMATO_MATRICULA,
+    version_base: Optional[int] = None,
+) -> int:
+    """
+    Incrementa la versión y regresa la nueva. NO hace commit: debe ir en la misma
+    transacción que la escritura de los datos para que ambas se confirmen juntas.
+
+    Si se indica version_base, el incremento sólo ocurre cuando la versión vigente es
+    exactamente esa (UPDATE ... WHERE Version = :base); si no, lanza VersionConflictError.
+    El UPDATE deja bloqueada la fila hasta el commit, serializando guardados concurrentes.
+    """
+    filtro = [
+        VersionDatos.Id_Unidad_Academica == id_unidad_academica,
+        VersionDatos.Id_Periodo == id_periodo,
+        VersionDatos.Id_Formato == id_formato,
+    ]
+    if version_base is not None:
+        filtro.append(VersionDatos.Version == version_base)
+
+    actualizadas = db.query(VersionDatos).filter(*filtro).update(
+        {VersionDatos.Version: VersionDatos.Version + 1, VersionDatos.Fecha_Modificacion: datetime.now()},
+        synchronize_session=False,
+    )
+    if actualizadas:
+        if version_base is not None:
+            return version_base + 1
+        return get_version(db, id_unidad_academica, id_periodo, id_formato)
+
+    version_actual = get_version(db, id_unidad_academica, id_periodo, id_formato)
+    if version_actual or (version_base not in (None, 0)):
+        # La fila existe con otra versión, o el cliente cree que existe y no es así
+        raise VersionConflictError(version_actual, version_base)
+
+    # Primera escritura del formato para esta UA/periodo
+    try:
+        with db.begin_nested():
+            db.add(VersionDatos(
+                Id_Unidad_Academica=id_unidad_academica,
+                Id_Periodo=id_periodo,
+                Id_Formato=id_formato,
+                Version=1,
+                Fecha_Modificacion=datetime.now(),
+            ))
+    except IntegrityError:
+        # Otro guardado creó la fila al mismo tiempo
+        if version_base is None:
+            return incrementar_version(db, id_unidad_academica, id_periodo, id_formato)
+        raise VersionConflictError(get_version(db, id_unidad_academica, id_periodo, id_formato), version_base)
+    return 1
+
+
+def resolver_id_periodo(db: Session, periodo: Any) -> Optional[int]:
+    """Id_Periodo a partir del ID o del literal ('2025-2026/1')."""
+    if periodo is None or periodo == "":
+        return None
+    if str(periodo).isdigit():
+        return int(periodo)
+    return db.query(Periodo.Id_Periodo).filter(Periodo.Periodo == str(periodo)).scalar()
+
+
+def incrementar_version_periodo(
+    db: Session,
+    id_unidad_academica: int,
+    periodo: Any,
+    id_formato: int = FORMATO_MATRICULA,
+) -> Optional[int]:
+    """
+    incrementar_version() recibiendo el periodo como ID o literal. Pensado para las
+    rutas de escritura que sólo conocen el literal. Regresa None (sin incrementar) si
+    no se puede resolver el periodo o la UA. NO hace commit.
+    """
+    id_periodo = resolver_id_periodo(db, periodo)
+    if not id_periodo or not id_unidad_academica:
+        print(f"⚠️ No se incrementó la versión: UA={id_unidad_academica}, periodo={periodo}")
+        return None
+    return incrementar_version(db, id_unidad_academica, id_periodo, id_formato)
+
+
+def clave_version(id_unidad_academica: int, id_periodo: int, id_formato: int, version: int) -> str:
+    """Llave estable para cachés derivadas de los datos de una UA/periodo/formato."""
+    return f"{id_unidad_academica}:{id_periodo}:{id_formato}:{version}"
+
+
+def etag_version(id_unidad_academica: int, id_periodo: int, id_formato: int, version: int) -> str:
+    """ETag débil para respuestas que dependen sólo de la versión de los datos."""
+    return f'W/"v{clave_version(id_unidad_academica, id_periodo, id_formato, version).replace(":", "-")}"'
+
+
+def get_firma_periodo(db: Session, id_periodo: int) -> Tuple[int, int]:
+    """
+    Firma de todas las versiones del periodo (número de filas, suma de versiones).
+    Cambia con cualquier escritura de cualquier UA, así que sirve para invalidar cachés
+    institucionales leyendo sólo Version_Datos.
+    """
+    filas, suma = db.query(
+        func.count(VersionDatos.Version),
+        func.coalesce(func.sum(VersionDatos.Version), 0),
+    ).filter(VersionDatos.Id_Periodo == id_periodo).one()
+    return int(filas or 0), int(suma or 0)
@@ -0,0 +1,93 @@
+"""
+Benchmark del comparativo entre periodos sobre una UA sintética grande.
+
+No usa la base de datos: genera dos periodos con N programas × semestres × turnos
+(con celdas que aparecen/desaparecen entre periodos) y mide la alineación vectorizada
+(alinear_periodos + calcular_deltas) contra un join con diccionarios en Python puro.
+
+Uso:
+    python backend/tests/benchmark_comparativo.py [--programas 300] [--repeticiones 20]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import time
+
+import numpy as np
+
+from backend.services.comparativo_service import alinear_periodos, calcular_deltas
+
+
+def generar_periodo(rng, programas: int, semestres: int, turnos: int, presencia: float):
+    """Claves (programa, semestre, turno) presentes con probabilidad `presencia` y su matrícula."""
+    p, s, t = np.meshgrid(
+        np.arange(1, programas + 1), np.arange(1, semestres + 1), np.arange(1, turnos + 1), indexing="ij"
+    )
+    claves = np.stack([p.ravel(), s.ravel(), t.ravel()], axis=1).astype(np.int64)
+    claves = claves[rng.random(len(claves)) < presencia]
+    totales = rng.integers(0, 400, size=len(claves)).astype(np.int64)
+    return claves, totales
+
+
+def comparativo_python(claves_act, tot_act, claves_ant, tot_ant, umbral_pct, umbral_alumnos):
+    """Versión de referencia con diccionarios (lo que se haría sin NumPy)."""
+    actual = {tuple(c): int(v) for c, v in zip(claves_act.tolist(), tot_act.tolist())}
+    anterior = {tuple(c): int(v) for c, v in zip(claves_ant.tolist(), tot_ant.tolist())}
+    filas = []
+    for clave in sorted(set(actual) | set(anterior)):
+        a, b = actual.get(clave, 0), anterior.get(clave, 0)
+        delta = a - b
+        pct = delta * 100.0 / b if b else None
+        relevante = (a != 0) if pct is None else abs(pct) >= umbral_pct
+        filas.append((clave, a, b, delta, pct, abs(delta) >= umbral_alumnos and relevante))
+    return filas
+
+
+def medir(funcion, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return float(np.median(tiempos)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--programas", type=int, default=300)
+    parser.add_argument("--semestres", type=int, default=12)
+    parser.add_argument("--turnos", type=int, default=4)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(2025)
+    claves_act, tot_act = generar_periodo(rng, args.programas, args.semestres, args.turnos, 0.9)
+    claves_ant, tot_ant = generar_periodo(rng, args.programas, args.semestres, args.turnos, 0.9)
+    print(f"UA sintética: {len(claves_act)} celdas en el periodo actual, {len(claves_ant)} en el anterior")
+
+    def vectorizado():
+        claves, actual, anterior = alinear_periodos(claves_act, tot_act, claves_ant, tot_ant)
+        return claves, actual, anterior, calcular_deltas(actual, anterior, 30.0, 20)
+
+    def python_puro():
+        return comparativo_python(claves_act, tot_act, claves_ant, tot_ant, 30.0, 20)
+
+    # Ambas versiones deben coincidir antes de medir
+    claves, actual, anterior, (delta, _, atipico) = vectorizado()
+    referencia = python_puro()
+    assert [f[0] for f in referencia] == [tuple(c) for c in claves.tolist()]
+    assert [f[3] for f in referencia] == delta.tolist()
+    assert [f[5] for f in referencia] == atipico.tolist()
+
+    ms_numpy = medir(vectorizado, args.repeticiones)
+    ms_python = medir(python_puro, args.repeticiones)
+    print(f"Celdas alineadas: {len(claves)} (atípicas: {int(atipico.sum())})")
+    print(f"NumPy (alinear + deltas): {ms_numpy:8.2f} ms")
+    print(f"Python con diccionarios:  {ms_python:8.2f} ms")
+    print(f"Aceleración: {ms_python / ms_numpy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Benchmark antes/después de los índices de la migración 0001_indices_consultas.
+
+Mide las consultas calientes contra una base LOCAL, aplica la migración de índices
+(`alembic upgrade 0001_indices_consultas`, no las posteriores) y las vuelve a medir.
+Con --revertir deshace sólo esa migración al final para poder repetirlo, y sólo si la
+base no la tenía aplicada antes de empezar.
+
+Uso:
+    # Copia local de SQL Server (toma la URL de las variables DB_* del .env)
+    python backend/tests/benchmark_indices.py
+
+    # Base SQLite desechable con datos sintéticos
+    python backend/tests/benchmark_indices.py --url sqlite:///bench_indices.db --sembrar 200000 --revertir
+
+No lo ejecute contra producción: crea índices y, con --sembrar, inserta datos.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import Column, MetaData, Table, create_engine, func, inspect, select
+
+from backend.database.models.Bitacora import Bitacora
+from backend.database.models.Matricula import Matricula
+from backend.database.models.SemaforoUnidadAcademica import SemaforoUnidadAcademica
+from backend.database.models.Usuario import Usuario
+from backend.database.models.Validacion import Validacion
+
+REVISION_INDICES = "0001_indices_consultas"
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODELOS = (Validacion, Bitacora, Usuario, Matricula, SemaforoUnidadAcademica)
+
+
+def _url_por_defecto() -> str:
+    from backend.database.db_config import DATABASE_URL
+    return DATABASE_URL
+
+
+def _alembic_config(url: str) -> Config:
+    config = Config(os.path.join(RAIZ, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(RAIZ, "backend", "database", "migrations"))
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    return config
+
+
+def _crear_tablas_sin_indices(engine) -> None:
+    """Crea las tablas de los modelos sin índices ni llaves foráneas (sólo para sembrar)."""
+    metadata = MetaData()
+    existentes = set(inspect(engine).get_table_names())
+    for modelo in MODELOS:
+        tabla = modelo.__table__
+        if tabla.name in existentes:
+            continue
+        Table(
+            tabla.name,
+            metadata,
+            *[Column(c.name, c.type, primary_key=c.primary_key and tabla.name == "Bitacora", nullable=True) for c in tabla.columns],
+        )
+    metadata.create_all(engine)
+
+
+def sembrar(engine, filas: int) -> None:
+    """Inserta datos sintéticos proporcionales a `filas` en las tablas vacías."""
+    _crear_tablas_sin_indices(engine)
+    rnd = random.Random(2025)
+    inicio = datetime(2024, 1, 1)
+    with engine.begin() as conexion:
+        def vacia(modelo):
+            return conexion.execute(select(func.count()).select_from(modelo.__table__)).scalar() == 0
+
+        if vacia(Usuario):
+            conexion.execute(Usuario.__table__.insert(), [
+                {"Id_Usuario": i, "Id_Unidad_Academica": i % 120, "Id_Rol": rnd.randint(1, 8), "Usuario": f"usuario{i}",
+                 "Contrasena": "x", "Email": f"usuario{i}@ipn.mx", "Id_Estatus": rnd.randint(1, 3), "Id_Nivel": 1,
+                 "Fecha_Inicio": inicio, "Fecha_Modificacion": inicio}
+                for i in range(1, filas // 20 + 2)
+            ])
+        if vacia(Bitacora):
+            conexion.execute(Bitacora.__table__.insert(), [
+                {"Id_Bitacora": i, "Id_Usuario": rnd.randint(1, filas // 20 + 1), "Id_Modulo": rnd.randint(1, 10),
+                 "Id_Periodo": rnd.randint(1, 6), "Acciones": "acción", "Host": f"10.0.0.{rnd.randint(1, 250)}",
+                 "Fecha": inicio + timedelta(minutes=i)}
+                for i in range(1, filas + 1)
+            ])
+        if vacia(Validacion):
+            conexion.execute(Validacion.__table__.insert(), [
+                {"Id_Periodo": rnd.randint(1, 6), "Id_Usuario": rnd.randint(1, filas // 20 + 1), "Id_Formato": rnd.randint(1, 2),
+                 "Validado": rnd.randint(0, 1), "Nota": None, "Fecha": inicio + timedelta(minutes=i)}
+                for i in range(filas // 4)
+            ])
+        if vacia(Matricula):
+            conexion.execute(Matricula.__table__.insert(), [
+                {"Id_Periodo": rnd.randint(1, 6), "Id_Unidad_Academica": rnd.randint(1, 120), "Id_Programa": rnd.randint(1, 300),
+                 "Id_Rama": rnd.randint(1, 3), "Id_Nivel": rnd.randint(1, 3), "Id_Modalidad": rnd.randint(1, 3),
+                 "Id_Turno": rnd.randint(1, 4), "Id_Semestre": rnd.randint(1, 12), "Id_Grupo_Edad": rnd.randint(1, 8),
+                 "Id_Tipo_Ingreso": rnd.randint(1, 3), "Id_Sexo": rnd.randint(1, 2), "Matricula": rnd.randint(0, 60)}
+                for _ in range(filas)
+            ])
+        if vacia(SemaforoUnidadAcademica):
+            conexion.execute(SemaforoUnidadAcademica.__table__.insert(), [
+                {"Id_Periodo": p, "Id_Unidad_Academica": ua, "Id_Formato": f, "Id_Semaforo": rnd.randint(1, 3),
+                 "Fecha_Inicio": inicio, "Fecha_Modificacion": inicio}
+                for p in range(1, 7) for ua in range(1, 121) for f in (1, 2)
+            ])
+    print(f"🌱 Datos sintéticos listos ({filas} filas base)")
+
+
+def consultas(conexion):
+    """Consultas calientes con parámetros tomados de datos existentes."""
+    val = conexion.execute(select(Validacion.Id_Periodo, Validacion.Id_Formato).limit(1)).first()
+    usuario = conexion.execute(select(Usuario.Email, Usuario.Usuario, Usuario.Id_Estatus).limit(1)).first()
+    bit = conexion.execute(select(Bitacora.Id_Usuario).limit(1)).scalar()
+    mat = conexion.execute(select(Matricula.Id_Periodo, Matricula.Id_Unidad_Academica, Matricula.Id_Nivel, Matricula.Id_Programa).limit(1)).first()
+    sem = conexion.execute(select(SemaforoUnidadAcademica.Id_Periodo, SemaforoUnidadAcademica.Id_Unidad_Academica, SemaforoUnidadAcademica.Id_Formato).limit(1)).first()
+
+    lista = {}
+    if val:
+        lista["Validacion por periodo/formato/validado (últimas 50)"] = (
+            select(Validacion.Id_Usuario, Validacion.Fecha)
+            .where(Validacion.Id_Periodo == val[0], Validacion.Id_Formato == val[1], Validacion.Validado == 1)
+            .order_by(Validacion.Fecha.desc()).limit(50)
+        )
+    if bit is not None:
+        lista["Bitacora por usuario (últimas 50)"] = (
+            select(Bitacora.Id_Bitacora, Bitacora.Fecha).where(Bitacora.Id_Usuario == bit)
+            .order_by(Bitacora.Fecha.desc()).limit(50)
+        )
+    if usuario:
+        lista["Usuarios por Email"] = select(Usuario.Id_Usuario).where(Usuario.Email == usuario[0])
+        lista["Usuarios por Usuario"] = select(Usuario.Id_Usuario).where(Usuario.Usuario == usuario[1])
+        lista["Usuarios por Id_Estatus (conteo)"] = select(func.count()).where(Usuario.Id_Estatus == usuario[2])
+    if mat:
+        lista["Matricula get_matricula_by_filters"] = (
+            select(Matricula.Matricula)
+            .where(Matricula.Id_Unidad_Academica == mat[1], Matricula.Id_Nivel == mat[2], Matricula.Id_Programa == mat[3])
+        )
+        lista["Matricula totales periodo/UA"] = (
+            select(Matricula.Id_Programa, Matricula.Id_Semestre, Matricula.Id_Turno, func.sum(Matricula.Matricula))
+            .where(Matricula.Id_Periodo == mat[0], Matricula.Id_Unidad_Academica == mat[1])
+            .group_by(Matricula.Id_Programa, Matricula.Id_Semestre, Matricula.Id_Turno)
+        )
+    if sem:
+        lista["Semaforo por llave"] = select(SemaforoUnidadAcademica.Id_Semaforo).where(
+            SemaforoUnidadAcademica.Id_Periodo == sem[0],
+            SemaforoUnidadAcademica.Id_Unidad_Academica == sem[1],
+            SemaforoUnidadAcademica.Id_Formato == sem[2],
+        )
+    return lista
+
+
+def medir(engine, repeticiones: int):
+    resultados = {}
+    with engine.connect() as conexion:
+        for nombre, stmt in consultas(conexion).items():
+            conexion.execute(stmt).fetchall()  # calentar caché de páginas y plan
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                conexion.execute(stmt).fetchall()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            resultados[nombre] = statistics.median(tiempos)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="URL de SQLAlchemy (por defecto la del .env)")
+    parser.add_argument("--sembrar", type=int, default=0, help="Filas sintéticas a insertar en tablas vacías")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--revertir", action="store_true", help="Hacer downgrade al terminar")
+    args = parser.parse_args()
+
+    url = args.url or _url_por_defecto()
+    engine = create_engine(url)
+    config = _alembic_config(url)
+    if args.sembrar:
+        sembrar(engine, args.sembrar)
+
+    with engine.connect() as conexion:
+        revision_inicial = MigrationContext.configure(conexion).get_current_revision()
+    if revision_inicial is not None:
+        print(f"⚠️ La base ya está en la revisión {revision_inicial}: la medición 'antes' ya incluye los índices")
+
+    antes = medir(engine, args.repeticiones)
+    command.upgrade(config, REVISION_INDICES)
+    despues = medir(engine, args.repeticiones)
+
+    ancho = max(len(n) for n in antes) if antes else 20
+    print(f"\n{'Consulta'.ljust(ancho)}  {'Antes (ms)':>10}  {'Después (ms)':>12}  {'Mejora':>7}")
+    for nombre, ms_antes in antes.items():
+        ms_despues = despues[nombre]
+        print(f"{nombre.ljust(ancho)}  {ms_antes:10.3f}  {ms_despues:12.3f}  {ms_antes / ms_despues if ms_despues else 0:6.1f}x")
+
+    if args.revertir:
+        if revision_inicial is None:
+            command.downgrade(config, "base")
+            print(f"\n↩️ Índices revertidos (alembic downgrade base desde {REVISION_INDICES})")
+        else:
+            print(f"\nℹ️ No se revierte: la base ya estaba en {revision_inicial} antes del benchmark")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Suite de benchmarks (pytest-benchmark) de las rutas críticas de captura.
+
+Corre contra una BD local en SQLite con los SPs emulados (SP_BACKEND=emulado), así que
+no necesita el servidor de producción. La BD se recrea y se siembra al iniciar la sesión.
+
+Dependencias (pytest, pytest-benchmark y httpx para TestClient):
+    pip install -r requirements-dev.txt
+
+Uso:
+    # Comparar contra la última línea base guardada
+    python -m pytest backend/tests/benchmarks --benchmark-compare --benchmark-compare-fail=mean:25%
+
+    # Guardar una nueva línea base (JSON en backend/tests/benchmarks/baselines/)
+    python -m pytest backend/tests/benchmarks --benchmark-save=base
+
+La BD de trabajo se puede cambiar con SAE_BENCH_DB (ruta del archivo SQLite).
+"""
+import os
+import tempfile
+
+# Debe configurarse antes de importar backend: db_config y settings leen el entorno al importarse
+BENCH_DB = os.environ.get("SAE_BENCH_DB") or os.path.join(tempfile.gettempdir(), "sae_benchmarks.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DB}"
+os.environ["SP_BACKEND"] = "emulado"
+
+import pytest
+
+from backend.tests.benchmarks.datos import ID_NIVEL, ID_UA, cargar_app, recrear_base
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Las líneas base viven en el repo para que las regresiones se vean en la revisión
+    if getattr(config.option, "benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{BASELINES_DIR}"
+
+
+@pytest.fixture(scope="session")
+def base_local():
+    """Recrea la BD SQLite de benchmarks con el esquema de los modelos y la siembra."""
+    from backend.database.db_config import engine
+
+    recrear_base(engine, BENCH_DB)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def app(base_local):
+    return cargar_app()
+
+
+def _cliente(app, **cookies):
+    from fastapi.testclient import TestClient
+    cliente = TestClient(app)
+    for nombre, valor in cookies.items():
+        cliente.cookies.set(nombre, str(valor))
+    return cliente
+
+
+@pytest.fixture(scope="session")
+def cliente_capturista(app):
+    return _cliente(
+        app, id_usuario=3, usuario="usuario3", id_rol=3, nombre_rol="Capturista",
+        id_unidad_academica=ID_UA, id_nivel=ID_NIVEL, nombre_usuario="Usuario", apellidoP_usuario="Bench3",
+    )
+
+
+@pytest.fixture(scope="session")
+def cliente_admin(app):
+    return _cliente(
+        app, id_usuario=1, usuario="usuario1", id_rol=1, nombre_rol="Administrador",
+        id_unidad_academica=ID_UA, id_nivel=ID_NIVEL, nombre_usuario="Usuario", apellidoP_usuario="Bench1",
+    )
+
+
+@pytest.fixture(scope="session")
+def cliente_anonimo(app):
+    return _cliente(app)
@@ -0,0 +1,163 @@
+"""
+Datos de prueba compartidos por los benchmarks (conftest.py) y la prueba de carga
+(backend/tests/carga_captura.py): catálogos, usuarios y matrícula vigente por UA.
+
+Los imports de backend van dentro de las funciones: quien use este módulo debe fijar
+DATABASE_URL y SP_BACKEND antes de importar cualquier cosa de backend.
+"""
+import os
+from typing import List, Tuple
+
+# Unidad Académica, periodo y nivel de los escenarios
+ID_UA = 1
+SIGLA_UA = "ESCOM"
+ID_PERIODO = 7
+PERIODO = "2025-2026/1"
+ID_NIVEL = 1
+
+# Volumen sembrado: matrícula existente de cada UA y catálogo de grupos de edad suficiente
+# para capturas de hasta 2,000 celdas en un semestre (grupos × sexo)
+PROGRAMAS = 5
+SEMESTRES = 10
+TURNOS = 2
+GRUPOS_EDAD_SEMBRADOS = 10
+GRUPOS_EDAD_CATALOGO = 1000
+USUARIOS = 300
+
+PASSWORD_BENCH = "Bench#2025"
+ROL_CAPTURISTA = 3
+ROL_VALIDADOR = 5
+ROLES = {1: "Administrador", ROL_CAPTURISTA: "Capturista", ROL_VALIDADOR: "Jefe de Departamento"}
+
+# Los usuarios por UA (prueba de carga) empiezan después de los del escenario base
+_ID_USUARIOS_UA = 1001
+
+
+def ordinal_semestre(n: int) -> str:
+    ordinales = ["Primer", "Segundo", "Tercer", "Cuarto", "Quinto", "Sexto", "Séptimo", "Octavo", "Noveno", "Décimo"]
+    return f"{ordinales[n - 1]} Semestre"
+
+
+def sigla_unidad(id_ua: int) -> str:
+    return SIGLA_UA if id_ua == ID_UA else f"UA{id_ua:03d}"
+
+
+def usuarios_por_unidad(unidades: int, capturistas: int, validadores: int) -> List[Tuple[str, int, int]]:
+    """(login, id_rol, id_unidad_academica) de los usuarios sembrados para cada UA."""
+    usuarios = []
+    for ua in range(1, unidades + 1):
+        usuarios += [(f"cap{ua:03d}_{k}", ROL_CAPTURISTA, ua) for k in range(1, capturistas + 1)]
+        usuarios += [(f"val{ua:03d}_{k}", ROL_VALIDADOR, ua) for k in range(1, validadores + 1)]
+    return usuarios
+
+
+def sembrar_base(engine, unidades: int = 1, capturistas_por_ua: int = 0, validadores_por_ua: int = 0) -> None:
+    """Catálogos, usuarios y la matrícula vigente de `unidades` UAs (la 1 es ESCOM)."""
+    from sqlalchemy import insert
+    from backend.database.models.CatEstatus import CatEstatus
+    from backend.database.models.CatPeriodo import CatPeriodo
+    from backend.database.models.CatUnidadAcademica import CatUnidadAcademica
+    from backend.database.models.CatNivel import CatNivel
+    from backend.database.models.CatRama import CatRama
+    from backend.database.models.CatProgramas import CatProgramas
+    from backend.database.models.CatModalidad import CatModalidad
+    from backend.database.models.CatTurno import CatTurno
+    from backend.database.models.CatSemestre import CatSemestre
+    from backend.database.models.CatGrupoEdad import CatGrupoEdad
+    from backend.database.models.CatTipoIngreso import TipoIngreso
+    from backend.database.models.CatSexo import CatSexo
+    from backend.database.models.CatSemaforo import CatSemaforo
+    from backend.database.models.CatRoles import CatRoles
+    from backend.database.models.Usuario import Usuario
+    from backend.database.models.Matricula import Matricula
+    from backend.database.models.SemaforoUnidadAcademica import SemaforoUnidadAcademica
+    from backend.utils.security import hash_password
+
+    password = hash_password(PASSWORD_BENCH)
+    usuarios = [
+        {
+            "Id_Usuario": i, "Id_Unidad_Academica": ID_UA, "Id_Rol": 3 if i > 2 else i * 2 - 1,
+            "Usuario": f"usuario{i}", "Password": password, "Email": f"usuario{i}@bench.local",
+            "Id_Estatus": 1, "Nombre": "Usuario", "Paterno": f"Bench{i}", "Materno": "", "Id_Nivel": ID_NIVEL,
+        }
+        for i in range(1, USUARIOS + 1)
+    ]
+    for i, (login, id_rol, ua) in enumerate(usuarios_por_unidad(unidades, capturistas_por_ua, validadores_por_ua)):
+        usuarios.append({
+            "Id_Usuario": _ID_USUARIOS_UA + i, "Id_Unidad_Academica": ua, "Id_Rol": id_rol,
+            "Usuario": login, "Password": password, "Email": f"{login}@bench.local",
+            "Id_Estatus": 1, "Nombre": ROLES[id_rol], "Paterno": sigla_unidad(ua), "Materno": "", "Id_Nivel": ID_NIVEL,
+        })
+
+    catalogos = [
+        (CatEstatus, [{"Id_Estatus": 1, "Descripcion": "Activo"}]),
+        (CatPeriodo, [{"Id_Periodo": 6, "Periodo": "2024-2025/2"}, {"Id_Periodo": ID_PERIODO, "Periodo": PERIODO}]),
+        (CatUnidadAcademica, [
+            {"Id_Unidad_Academica": ua, "Sigla": sigla_unidad(ua), "Nombre": f"Unidad Académica {sigla_unidad(ua)}", "Id_Rama_Unidad": 1}
+            for ua in range(1, unidades + 1)
+        ]),
+        (CatNivel, [{"Id_Nivel": ID_NIVEL, "Nivel": "Licenciatura"}, {"Id_Nivel": 2, "Nivel": "Posgrado"}]),
+        (CatRama, [{"Id_Rama": 1, "Nombre_Rama": "Ingeniería y Ciencias Físico Matemáticas", "Nombre_Sigla": "ICFM"}]),
+        (CatProgramas, [
+            {"Id_Programa": p, "Nombre_Programa": f"Programa {p}", "Id_Nivel": ID_NIVEL, "Id_Rama_Programa": 1, "Id_Semestre": SEMESTRES}
+            for p in range(1, PROGRAMAS + 1)
+        ]),
+        (CatModalidad, [{"Id_Modalidad": 1, "Modalidad": "Escolarizada"}, {"Id_Modalidad": 2, "Modalidad": "No Escolarizada"}]),
+        (CatTurno, [{"Id_Turno": 1, "Turno": "Matutino"}, {"Id_Turno": 2, "Turno": "Vespertino"}]),
+        (CatSemestre, [{"Id_Semestre": s, "Semestre": ordinal_semestre(s)} for s in range(1, SEMESTRES + 1)]),
+        (CatGrupoEdad, [{"Id_Grupo_Edad": g, "Grupo_Edad": f"{17 + g} años"} for g in range(1, GRUPOS_EDAD_CATALOGO + 1)]),
+        (TipoIngreso, [{"Id_Tipo_Ingreso": 1, "Tipo_de_Ingreso": "Nuevo Ingreso"}, {"Id_Tipo_Ingreso": 2, "Tipo_de_Ingreso": "Reingreso"}]),
+        (CatSexo, [{"Id_Sexo": 1, "Sexo": "Hombre"}, {"Id_Sexo": 2, "Sexo": "Mujer"}]),
+        (CatSemaforo, [
+            {"Id_Semaforo": 1, "Descripcion_Semaforo": "Pendiente", "Color_Semaforo": "#dc3545"},
+            {"Id_Semaforo": 2, "Descripcion_Semaforo": "En captura", "Color_Semaforo": "#ffc107"},
+            {"Id_Semaforo": 3, "Descripcion_Semaforo": "Completado", "Color_Semaforo": "#28a745"},
+        ]),
+        (CatRoles, [{"Id_Rol": i, "Rol": r, "Descripcion": r} for i, r in ROLES.items()]),
+        (Usuario, usuarios),
+    ]
+    matricula = [
+        {
+            "Id_Periodo": ID_PERIODO, "Id_Unidad_Academica": ua, "Id_Programa": p, "Id_Rama": 1,
+            "Id_Nivel": ID_NIVEL, "Id_Modalidad": 1, "Id_Turno": t, "Id_Semestre": s, "Id_Grupo_Edad": g,
+            "Id_Tipo_Ingreso": 1 if s == 1 else 2, "Id_Sexo": x, "Matricula": (p * s + g + x + ua) % 40,
+        }
+        for ua in range(1, unidades + 1)
+        for p in range(1, PROGRAMAS + 1)
+        for s in range(1, SEMESTRES + 1)
+        for t in range(1, TURNOS + 1)
+        for g in range(1, GRUPOS_EDAD_SEMBRADOS + 1)
+        for x in (1, 2)
+    ]
+    with engine.begin() as conexion:
+        for modelo, filas in catalogos:
+            # Las filas usan el nombre del atributo ORM (Usuario.Password -> columna Contrasena)
+            columnas = {attr.key: attr.columns[0].name for attr in modelo.__mapper__.column_attrs}
+            conexion.execute(insert(modelo.__table__), [{columnas[k]: v for k, v in f.items()} for f in filas])
+        conexion.execute(insert(Matricula.__table__), matricula)
+        conexion.execute(insert(SemaforoUnidadAcademica.__table__), [
+            {"Id_Periodo": ID_PERIODO, "Id_Unidad_Academica": ua, "Id_Formato": 1, "Id_Semaforo": 2}
+            for ua in range(1, unidades + 1)
+        ])
+
+
+def recrear_base(engine, ruta: str, **siembra) -> None:
+    """Borra el archivo SQLite `ruta`, crea el esquema local de los modelos y lo siembra."""
+    from backend.database.esquema_local import crear_esquema_local
+
+    engine.dispose()
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    crear_esquema_local(engine)
+    sembrar_base(engine, **siembra)
+
+
+def cargar_app():
+    """Importa la app FastAPI (backend.main) y la regresa."""
+    import backend.api.catalogos as catalogos
+    # En sistemas sensibles a mayúsculas (Linux) los routers viven en api/Catalogos
+    directorio = os.path.join(os.path.dirname(os.path.dirname(catalogos.__file__)), "Catalogos")
+    if os.path.isdir(directorio) and directorio not in catalogos.__path__:
+        catalogos.__path__.append(directorio)
+    from backend.main import app
+    return app
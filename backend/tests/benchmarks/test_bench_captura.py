@@ -0,0 +1,117 @@
+"""
+Benchmarks de las rutas críticas de captura de matrícula, login y administración de usuarios.
+Ver conftest.py para uso y líneas base.
+"""
+import pytest
+from sqlalchemy import delete, func, select
+
+from backend.tests.benchmarks.datos import (
+    GRUPOS_EDAD_SEMBRADOS, PASSWORD_BENCH, PERIODO, PROGRAMAS, SEMESTRES, TURNOS,
+)
+
+PROGRAMA = 1
+MODALIDAD = 1
+SEMESTRE = 3
+
+
+def _payload_captura(celdas: int) -> dict:
+    """Captura de un semestre de reingreso con `celdas` celdas (grupo de edad × sexo)."""
+    datos = {}
+    for i in range(celdas):
+        grupo, sexo = divmod(i, 2)
+        datos[f"2_{grupo + 1}_{sexo}"] = {
+            "tipo_ingreso": 2,
+            "grupo_edad": grupo + 1,
+            "sexo": "M" if sexo == 0 else "F",
+            "matricula": (i % 35) + 1,
+            "salones": 2,
+        }
+    return {
+        "periodo": PERIODO,
+        "programa": PROGRAMA,
+        "modalidad": MODALIDAD,
+        "semestre": SEMESTRE,
+        "turno": 1,
+        "total_grupos": 2,
+        "datos_matricula": datos,
+    }
+
+
+def _limpiar_temp_matricula(engine) -> None:
+    from backend.database.models.Temp_Matricula import Temp_Matricula
+    with engine.begin() as conexion:
+        conexion.execute(delete(Temp_Matricula.__table__))
+
+
+def test_captura_matricula_sp_view(benchmark, cliente_capturista):
+    respuesta = benchmark(cliente_capturista.get, "/matricula/consulta")
+    assert respuesta.status_code == 200
+
+
+def test_obtener_datos_existentes_sp(benchmark, cliente_capturista):
+    respuesta = benchmark(cliente_capturista.post, "/matricula/obtener_datos_existentes_sp", json={"periodo": PERIODO})
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    assert "error" not in datos
+    assert len(datos["rows"]) == PROGRAMAS * SEMESTRES * TURNOS * GRUPOS_EDAD_SEMBRADOS * 2
+
+
+@pytest.mark.parametrize("celdas", [100, 500, 2000])
+def test_guardar_captura_completa(benchmark, base_local, cliente_capturista, celdas):
+    from backend.database.models.Temp_Matricula import Temp_Matricula
+    payload = _payload_captura(celdas)
+
+    def enviar():
+        return cliente_capturista.post("/matricula/guardar_captura_completa", json=payload)
+
+    respuesta = benchmark.pedantic(
+        enviar, setup=lambda: _limpiar_temp_matricula(base_local), rounds=5, iterations=1, warmup_rounds=1,
+    )
+    assert respuesta.status_code == 200
+    assert respuesta.json()["registros_insertados"] == celdas
+    with base_local.connect() as conexion:
+        assert conexion.execute(select(func.count()).select_from(Temp_Matricula.__table__)).scalar() == celdas
+
+
+def test_validar_captura_semestre(benchmark, base_local, cliente_capturista):
+    payload = _payload_captura(100)
+
+    def preparar():
+        _limpiar_temp_matricula(base_local)
+        assert cliente_capturista.post("/matricula/guardar_captura_completa", json=payload).status_code == 200
+
+    def validar():
+        return cliente_capturista.post("/matricula/validar_captura_semestre", json={
+            key: payload[key] for key in ("periodo", "programa", "modalidad", "semestre", "total_grupos")
+        })
+
+    respuesta = benchmark.pedantic(validar, setup=preparar, rounds=5, iterations=1, warmup_rounds=1)
+    assert respuesta.status_code == 200
+    assert "error" not in respuesta.json()
+
+
+def test_login(benchmark, cliente_anonimo):
+    def entrar():
+        return cliente_anonimo.post(
+            "/login/", data={"usuario_email": "usuario3", "password": PASSWORD_BENCH}, follow_redirects=False,
+        )
+
+    # bcrypt domina el costo; pocas rondas bastan para detectar regresiones
+    respuesta = benchmark.pedantic(entrar, rounds=5, iterations=1, warmup_rounds=1)
+    assert respuesta.status_code == 303
+    cliente_anonimo.cookies.clear()
+
+
+def test_usuarios_view(benchmark, cliente_admin):
+    respuesta = benchmark(cliente_admin.get, "/usuarios/")
+    assert respuesta.status_code == 200
+    assert "Licenciatura" in respuesta.text
+
+
+def test_usuarios_listado(benchmark, cliente_admin):
+    # La vista carga la tabla de usuarios por páginas desde /usuarios/listado
+    respuesta = benchmark(cliente_admin.get, "/usuarios/listado", params={"limite": 50})
+    assert respuesta.status_code == 200
+    pagina = respuesta.json()
+    assert len(pagina["usuarios"]) == 50
+    assert pagina["siguiente_cursor"]
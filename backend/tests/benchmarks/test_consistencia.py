@@ -0,0 +1,65 @@
+"""
+Pruebas de las reglas de consistencia matrícula vs aprovechamiento (ver consistencia_service).
+"""
+import numpy as np
+from sqlalchemy import delete
+
+from backend.services.consistencia_service import CeldasConsistencia, cargar_celdas, evaluar_reglas
+from backend.tests.benchmarks.datos import ID_PERIODO, ID_UA
+
+
+def _celdas(matricula, aprovechamiento, maximo) -> CeldasConsistencia:
+    n = len(matricula)
+    return CeldasConsistencia(
+        claves=np.arange(n * 5, dtype=np.int64).reshape(n, 5),
+        matricula=np.asarray(matricula, dtype=np.int64),
+        aprovechamiento=np.asarray(aprovechamiento, dtype=np.int64),
+        aprovechamiento_maximo=np.asarray(maximo, dtype=np.int64),
+        negativos_matricula=np.zeros(n, dtype=np.int64),
+        negativos_aprovechamiento=np.zeros(n, dtype=np.int64),
+        ua_con_aprovechamiento=np.ones(n, dtype=bool),
+    )
+
+
+def test_exceso_compara_cada_concepto_no_la_suma():
+    # Celda 0: tres conceptos de 30 con 40 inscritos (la suma excede, ningún concepto).
+    # Celda 1: un concepto de 45 con 40 inscritos.
+    mascaras = evaluar_reglas(_celdas([40, 40], [90, 45], [30, 45]))
+    assert mascaras["aprovechamiento_excede_matricula"].tolist() == [False, True]
+
+
+def test_consistencia_institucional(cliente_admin):
+    respuesta = cliente_admin.get("/matricula/consistencia", params={"id_unidad_academica": 0})
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    assert datos["aprovechamiento_disponible"] is True
+    assert {r["codigo"] for r in datos["reglas"]} >= {"aprovechamiento_excede_matricula"}
+
+
+def test_exceso_suma_cada_concepto_entre_modalidades(base_local):
+    from backend.crud.Matricula import get_totales_matricula_celdas
+    from backend.database.db_config import SessionLocal
+    from backend.database.models.Aprovechamiento import Aprovechamiento
+
+    with SessionLocal() as db:
+        celda = next(f for f in get_totales_matricula_celdas(db, ID_PERIODO, ID_UA) if f[5] >= 3)
+        ua, programa, semestre, turno, sexo, matricula = tuple(celda)[:6]
+        # El concepto 1 no excede la matrícula en ninguna modalidad, pero sí sumando ambas
+        mitad = matricula // 2 + 1
+        db.add_all([
+            Aprovechamiento(
+                Id_Periodo=ID_PERIODO, Id_Unidad_Academica=ua, Id_Programa=programa, Id_Rama=1, Id_Nivel=1,
+                Id_Modalidad=modalidad, Id_Turno=turno, Id_Semestre=semestre, Id_Sexo=sexo,
+                Id_Aprovechamiento=1, Aprovechamiento=mitad,
+            )
+            for modalidad in (1, 2)
+        ])
+        db.commit()
+        try:
+            celdas = cargar_celdas(db, ID_PERIODO, ID_UA)
+            i = next(i for i, c in enumerate(celdas.claves.tolist()) if c == [ua, programa, semestre, turno, sexo])
+            assert celdas.aprovechamiento_maximo[i] == 2 * mitad
+            assert evaluar_reglas(celdas)["aprovechamiento_excede_matricula"][i]
+        finally:
+            db.execute(delete(Aprovechamiento).where(Aprovechamiento.Id_Periodo == ID_PERIODO))
+            db.commit()
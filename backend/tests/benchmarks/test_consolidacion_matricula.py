@@ -0,0 +1,93 @@
+"""
+Pruebas de regresión del guardado con consolidación: lo capturado debe llegar a Matricula
+y Temp_Matricula debe quedar vacía (ver conftest.py para la BD local y los SPs emulados).
+"""
+from sqlalchemy import delete, func, select
+
+from backend.tests.benchmarks.datos import ID_PERIODO, ID_UA, PERIODO
+
+PROGRAMA = 2
+MODALIDAD = 1
+SEMESTRE = 4
+TURNO = 1
+GRUPO_EDAD = 1
+TIPO_INGRESO = 2
+
+
+def _celdas(matricula: int) -> dict:
+    return {
+        f"{TIPO_INGRESO}_{GRUPO_EDAD}_{sexo}": {
+            "tipo_ingreso": TIPO_INGRESO,
+            "grupo_edad": GRUPO_EDAD,
+            "sexo": sexo,
+            "matricula": matricula,
+            "salones": 2,
+        }
+        for sexo in ("M", "F")
+    }
+
+
+def _payload(**extra) -> dict:
+    return {
+        "periodo": PERIODO,
+        "programa": PROGRAMA,
+        "modalidad": MODALIDAD,
+        "semestre": SEMESTRE,
+        "turno": TURNO,
+        "total_grupos": 2,
+        **extra,
+    }
+
+
+def _matricula_consolidada(engine) -> list:
+    from backend.database.models.Matricula import Matricula
+    with engine.connect() as conexion:
+        return sorted(conexion.execute(select(Matricula.Matricula).where(
+            Matricula.Id_Periodo == ID_PERIODO,
+            Matricula.Id_Unidad_Academica == ID_UA,
+            Matricula.Id_Programa == PROGRAMA,
+            Matricula.Id_Modalidad == MODALIDAD,
+            Matricula.Id_Semestre == SEMESTRE,
+            Matricula.Id_Turno == TURNO,
+            Matricula.Id_Grupo_Edad == GRUPO_EDAD,
+            Matricula.Id_Tipo_Ingreso == TIPO_INGRESO,
+        )).scalars())
+
+
+def _temp_matricula(engine) -> int:
+    from backend.database.models.Temp_Matricula import Temp_Matricula
+    with engine.connect() as conexion:
+        return conexion.execute(select(func.count()).select_from(Temp_Matricula.__table__)).scalar()
+
+
+def _limpiar_temp_matricula(engine) -> None:
+    from backend.database.models.Temp_Matricula import Temp_Matricula
+    with engine.begin() as conexion:
+        conexion.execute(delete(Temp_Matricula.__table__))
+
+
+def test_guardar_y_consolidar_actualiza_matricula(base_local, cliente_capturista):
+    _limpiar_temp_matricula(base_local)
+    respuesta = cliente_capturista.post("/matricula/guardar_y_consolidar", json=_payload(datos_matricula=_celdas(99)))
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    assert datos["registros_insertados"] == 2
+    assert datos["registros_procesados"] == 2
+    assert _matricula_consolidada(base_local) == [99, 99]
+    assert _temp_matricula(base_local) == 0
+
+
+def test_guardar_delta_actualiza_matricula(base_local, cliente_capturista):
+    from backend.database.db_config import SessionLocal
+    from backend.services.version_service import get_version
+
+    _limpiar_temp_matricula(base_local)
+    with SessionLocal() as db:
+        version_base = get_version(db, ID_UA, ID_PERIODO)
+    respuesta = cliente_capturista.post(
+        "/matricula/guardar_delta", json=_payload(cambios=_celdas(57), version_base=version_base),
+    )
+    assert respuesta.status_code == 200
+    assert respuesta.json()["version"] == version_base + 1
+    assert _matricula_consolidada(base_local) == [57, 57]
+    assert _temp_matricula(base_local) == 0
@@ -0,0 +1,66 @@
+"""
+Pruebas de la elección de snapshot del cubo: sin snapshot explícito se usa el más reciente
+del periodo consultado, no el más reciente de cualquier periodo; y la carga de un snapshot
+no detiene las consultas a cubos ya cargados.
+"""
+import shutil
+import threading
+
+from backend.core.config import settings
+from backend.tests.benchmarks.datos import ID_PERIODO
+
+
+def test_cubo_usa_snapshot_del_periodo(base_local, cliente_admin, monkeypatch, tmp_path):
+    from backend.database.db_config import SessionLocal
+    from backend.services.snapshot_service import generar_snapshot_matricula
+
+    monkeypatch.setattr(settings, "SNAPSHOTS_DIR", str(tmp_path))
+    with SessionLocal() as db:
+        propio = generar_snapshot_matricula(db, ID_PERIODO)["nombre"]
+    # Un snapshot más reciente de otro periodo no debe usarse por omisión
+    otro = "matricula_2024-2025-2_29991231T000000.parquet"
+    shutil.copy(tmp_path / propio, tmp_path / otro)
+
+    datos = cliente_admin.get("/analitica/cubo", params={"dimensiones": "sexo"}).json()
+    assert datos["snapshot"] == propio
+    assert datos["filtros"]["periodo"] == [ID_PERIODO]
+    assert datos["total"] > 0
+
+    assert cliente_admin.get("/analitica/cubo", params={"periodo": 6}).json()["snapshot"] == otro
+    miembros = cliente_admin.get("/analitica/cubo/miembros/sexo", params={"periodo": 6}).json()
+    assert miembros["snapshot"] == otro
+
+
+def test_carga_de_snapshot_no_bloquea_otros_cubos(monkeypatch, tmp_path):
+    from backend.services import cubo_service
+
+    monkeypatch.setattr(settings, "SNAPSHOTS_DIR", str(tmp_path))
+    cargado = "matricula_2024-2025-2_20250101T000000.parquet"
+    nuevo = "matricula_2025-2026-1_20250102T000000.parquet"
+    for nombre in (cargado, nuevo):
+        (tmp_path / nombre).write_bytes(b"")
+    monkeypatch.setattr(cubo_service, "_cubos", {cargado: "cubo cargado"})
+
+    en_lectura = threading.Event()
+    liberar = threading.Event()
+    lecturas = []
+
+    def leer_lento(nombre):
+        lecturas.append(nombre)
+        en_lectura.set()
+        liberar.wait(5)
+        return f"cubo {nombre}"
+
+    monkeypatch.setattr(cubo_service.CuboMatricula, "desde_snapshot", staticmethod(leer_lento))
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cubo_service.get_cubo(nuevo))) for _ in range(3)]
+    for hilo in hilos:
+        hilo.start()
+    assert en_lectura.wait(5)
+    # Mientras se lee el snapshot nuevo, el cubo de otro periodo responde sin esperar
+    assert cubo_service.get_cubo(cargado) == "cubo cargado"
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(5)
+    assert lecturas == [nuevo]
+    assert resultados == [f"cubo {nuevo}"] * 3
@@ -0,0 +1,37 @@
+"""
+Pruebas del vigilante de versión de /matricula/eventos: los streams abiertos de una misma
+UA/periodo comparten una sola revisión de Version_Datos por intervalo.
+"""
+import asyncio
+
+from backend.core.config import settings
+from backend.services import eventos_matricula_service as servicio
+
+
+def test_streams_de_la_misma_ua_comparten_vigilante(monkeypatch):
+    monkeypatch.setattr(settings, "EVENTOS_REVISION_SEGUNDOS", 0.02)
+    lecturas = []
+
+    def leer_version(id_unidad_academica, id_periodo):
+        lecturas.append((id_unidad_academica, id_periodo))
+        return 5 if len(lecturas) >= 3 else 4
+
+    monkeypatch.setattr(servicio, "_leer_version", leer_version)
+
+    async def escenario():
+        conectado = {"event": "conectado", "data": {"version": 4}}
+        streams = [servicio.stream_eventos_matricula(1, 7, 4, estado_inicial=lambda: conectado) for _ in range(3)]
+        for stream in streams:
+            assert "event: conectado" in await stream.__anext__()
+        activos = servicio.vigilantes_activos()
+        recibidos = [await asyncio.wait_for(stream.__anext__(), timeout=2) for stream in streams]
+        for stream in streams:
+            await stream.aclose()
+        return activos, recibidos
+
+    activos, recibidos = asyncio.run(escenario())
+    assert activos == 1
+    assert all("event: version" in r and '"version": 5' in r for r in recibidos)
+    # Una consulta por intervalo para los tres streams (con una por stream serían al menos 9)
+    assert len(lecturas) <= 4
+    assert servicio.vigilantes_activos() == 0
@@ -0,0 +1,24 @@
+"""
+Pruebas de la exportación XLSX: al llenarse una hoja, las filas siguen en otra con el mismo encabezado.
+"""
+import io
+
+from openpyxl import load_workbook
+
+from backend.services import exportacion_service
+
+
+def test_xlsx_reparte_filas_en_hojas(base_local, cliente_admin, monkeypatch):
+    monkeypatch.setattr(exportacion_service, "FILAS_MAXIMAS_HOJA_XLSX", 4)
+    respuesta = cliente_admin.get("/matricula/exportar", params={"formato": "xlsx", "id_unidad_academica": 0})
+    assert respuesta.status_code == 200
+
+    libro = load_workbook(io.BytesIO(respuesta.content), read_only=True)
+    filas = [list(hoja.iter_rows(values_only=True)) for hoja in libro.worksheets]
+    encabezados = tuple(e for e, _, _ in exportacion_service.COLUMNAS_EXPORTACION)
+    assert len(libro.worksheets) > 1
+    assert libro.sheetnames[:2] == ["Matricula", "Matricula 2"]
+    assert all(hoja[0] == encabezados and 1 < len(hoja) <= 4 for hoja in filas)
+
+    csv = cliente_admin.get("/matricula/exportar", params={"formato": "csv", "id_unidad_academica": 0})
+    assert sum(len(hoja) - 1 for hoja in filas) == len(csv.text.strip().splitlines()) - 1
@@ -0,0 +1,57 @@
+"""
+Pruebas de jobs_service: un trabajo siempre termina en un estado final y espera
+(sin ocupar el hilo) mientras otro worker tiene el bloqueo de su cola.
+"""
+import time
+
+from backend.core.config import settings
+from backend.services import jobs_service
+
+
+def _esperar(job, segundos: float = 5.0) -> dict:
+    for _ in range(int(segundos / 0.01)):
+        estado = jobs_service.get_job_estado(job.id, incluir_resultado=True)
+        if estado["estado"] in jobs_service.ESTADOS_FINALES:
+            return estado
+        time.sleep(0.01)
+    raise AssertionError(f"El trabajo sigue en {estado['estado']}")
+
+
+def test_falla_al_abrir_sesion_termina_en_error(monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_PERSISTIR", False)
+
+    def sin_conexion():
+        raise RuntimeError("pool agotado")
+
+    job = jobs_service.submit_job("prueba", 901, 1, lambda db: "ok", session_factory=sin_conexion)
+    estado = _esperar(job)
+    assert estado["estado"] == jobs_service.ESTADO_ERROR
+    assert "pool agotado" in estado["error"]
+
+    # La cola de la UA queda libre para el siguiente trabajo
+    siguiente = jobs_service.submit_job("prueba", 901, 1, lambda db: "ok", session_factory=lambda: _Sesion())
+    assert _esperar(siguiente)["resultado"] == "ok"
+
+
+def test_espera_el_bloqueo_de_otro_worker(monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_PERSISTIR", False)
+    monkeypatch.setattr(settings, "JOBS_REINTENTO_BLOQUEO_SEGUNDOS", 0.05)
+    intentos = []
+
+    def bloqueo_ocupado_dos_veces(clave):
+        intentos.append(clave)
+        return None if len(intentos) <= 2 else jobs_service._SIN_BLOQUEO
+
+    monkeypatch.setattr(jobs_service, "_tomar_bloqueo", bloqueo_ocupado_dos_veces)
+    job = jobs_service.submit_job("prueba", 902, 1, lambda db: "ok", session_factory=lambda: _Sesion())
+    estado = _esperar(job)
+    assert estado["estado"] == jobs_service.ESTADO_COMPLETADO
+    assert intentos == [902, 902, 902]
+
+
+class _Sesion:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
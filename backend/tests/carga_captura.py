@@ -0,0 +1,291 @@
+"""
+Prueba de carga de la temporada de captura (la última semana de la ventana).
+
+Simula en el mismo proceso a capturistas y validadores de varias UAs trabajando a la vez
+contra la app FastAPI (httpx.ASGITransport + asyncio) sobre una BD local en SQLite con
+los SPs emulados. Cada usuario virtual inicia sesión y repite su flujo hasta agotar la
+duración, con pausas ("think time") aleatorias entre acciones:
+
+- Capturista: consulta -> datos existentes -> guarda cada turno de un semestre -> valida el semestre.
+- Validador: consulta -> datos existentes -> valida (o rechaza con motivo) la matrícula de su UA.
+
+Reporta percentiles de latencia y tasa de error por ruta, y la ocupación del pool de
+conexiones (muestreada): conexiones en uso, pico, overflow y % del tiempo saturado.
+
+Nota: los handlers son async y usan la sesión síncrona, así que una consulta larga bloquea
+el event loop para todos; la latencia bajo concurrencia refleja esa serialización.
+
+Requiere httpx (incluido en requirements-dev.txt):
+    pip install -r requirements-dev.txt
+
+Uso:
+    python backend/tests/carga_captura.py [--unidades 20] [--capturistas 2] [--validadores 1]
+        [--duracion 60] [--pensar 0.2 1.5] [--celdas 20 200] [--semilla 7] [--json reporte.json]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import tempfile
+
+# Debe configurarse antes de importar backend: db_config y settings leen el entorno al importarse
+CARGA_DB = os.environ.get("SAE_CARGA_DB") or os.path.join(tempfile.gettempdir(), "sae_carga.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{CARGA_DB}"
+os.environ["SP_BACKEND"] = "emulado"
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from backend.tests.benchmarks.datos import (
+    PASSWORD_BENCH, PERIODO, PROGRAMAS, ROL_CAPTURISTA, SEMESTRES, TURNOS,
+    cargar_app, recrear_base, usuarios_por_unidad,
+)
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Metricas:
+    """Latencias y errores por ruta, y muestras de ocupación del pool de conexiones."""
+
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.errores: Dict[str, int] = defaultdict(int)
+        self.detalle_errores: Dict[str, int] = defaultdict(int)
+        self.pool: List[Dict[str, int]] = []
+
+    def registrar(self, ruta: str, segundos: float, error: Optional[str]) -> None:
+        self.latencias[ruta].append(segundos * 1000)
+        if error:
+            self.errores[ruta] += 1
+            self.detalle_errores[f"{ruta}: {error[:80]}"] += 1
+
+    def resumen(self, duracion: float, capacidad_pool: int) -> Dict[str, Any]:
+        rutas = {}
+        for ruta, tiempos in sorted(self.latencias.items()):
+            arreglo = np.asarray(tiempos)
+            rutas[ruta] = {
+                "peticiones": len(tiempos),
+                "errores": self.errores[ruta],
+                "tasa_error": self.errores[ruta] / len(tiempos),
+                "rps": len(tiempos) / duracion if duracion else 0.0,
+                **{f"p{p}_ms": float(np.percentile(arreglo, p)) for p in PERCENTILES},
+                "max_ms": float(arreglo.max()),
+            }
+        en_uso = np.asarray([m["en_uso"] for m in self.pool] or [0])
+        overflow = np.asarray([m["overflow"] for m in self.pool] or [0])
+        total = sum(len(t) for t in self.latencias.values())
+        return {
+            "duracion_s": duracion,
+            "peticiones": total,
+            "tasa_error": sum(self.errores.values()) / total if total else 0.0,
+            "rutas": rutas,
+            "pool": {
+                "capacidad": capacidad_pool,
+                "muestras": len(self.pool),
+                "en_uso_promedio": float(en_uso.mean()),
+                "en_uso_pico": int(en_uso.max()),
+                "overflow_pico": int(overflow.max()),
+                "pct_saturado": float((en_uso >= capacidad_pool).mean() * 100) if capacidad_pool else 0.0,
+            },
+            "errores": dict(sorted(self.detalle_errores.items(), key=lambda e: -e[1])),
+        }
+
+
+def _error_respuesta(respuesta: httpx.Response) -> Optional[str]:
+    """Los endpoints de captura regresan 200 con {"error": ...} o {"success": false}."""
+    if respuesta.status_code >= 400:
+        return f"HTTP {respuesta.status_code}"
+    if respuesta.headers.get("content-type", "").startswith("application/json"):
+        cuerpo = respuesta.json()
+        if isinstance(cuerpo, dict) and (cuerpo.get("error") or cuerpo.get("success") is False):
+            return str(cuerpo.get("error") or "success=false")
+    return None
+
+
+class UsuarioVirtual:
+    def __init__(self, app, login: str, id_rol: int, metricas: Metricas, rng: random.Random, args):
+        self.cliente = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://sae.local")
+        self.login = login
+        self.id_rol = id_rol
+        self.metricas = metricas
+        self.rng = rng
+        self.args = args
+
+    async def peticion(self, metodo: str, ruta: str, **kwargs) -> Optional[httpx.Response]:
+        inicio = time.perf_counter()
+        try:
+            respuesta = await self.cliente.request(metodo, ruta, **kwargs)
+            error = _error_respuesta(respuesta)
+        except Exception as e:
+            respuesta, error = None, f"{type(e).__name__}: {e}"
+        self.metricas.registrar(f"{metodo} {ruta}", time.perf_counter() - inicio, error)
+        return respuesta
+
+    async def pensar(self, factor: float = 1.0) -> None:
+        minimo, maximo = self.args.pensar
+        await asyncio.sleep(self.rng.uniform(minimo, maximo) * factor)
+
+    async def iniciar_sesion(self) -> bool:
+        respuesta = await self.peticion(
+            "POST", "/login/", data={"usuario_email": self.login, "password": PASSWORD_BENCH}
+        )
+        return respuesta is not None and respuesta.status_code == 303
+
+    def _captura(self, programa: int, semestre: int, turno: int) -> Dict[str, Any]:
+        celdas = self.rng.randint(*self.args.celdas)
+        tipo = 1 if semestre == 1 else 2
+        datos = {}
+        for i in range(celdas):
+            grupo, sexo = divmod(i, 2)
+            datos[f"{tipo}_{grupo + 1}_{sexo}"] = {
+                "tipo_ingreso": tipo, "grupo_edad": grupo + 1, "sexo": "M" if sexo == 0 else "F",
+                "matricula": self.rng.randint(0, 40), "salones": 2,
+            }
+        return {
+            "periodo": PERIODO, "programa": programa, "modalidad": 1, "semestre": semestre,
+            "turno": turno, "total_grupos": 2, "datos_matricula": datos,
+        }
+
+    async def flujo_capturista(self) -> None:
+        await self.peticion("GET", "/matricula/consulta")
+        await self.pensar()
+        await self.peticion("POST", "/matricula/obtener_datos_existentes_sp", json={"periodo": PERIODO})
+        programa = self.rng.randint(1, PROGRAMAS)
+        semestre = self.rng.randint(1, SEMESTRES)
+        for turno in range(1, TURNOS + 1):
+            await self.pensar(2)
+            await self.peticion("POST", "/matricula/guardar_captura_completa", json=self._captura(programa, semestre, turno))
+        await self.pensar()
+        await self.peticion("POST", "/matricula/validar_captura_semestre", json={
+            "periodo": PERIODO, "programa": programa, "modalidad": 1, "semestre": semestre, "total_grupos": 2,
+        })
+
+    async def flujo_validador(self) -> None:
+        await self.peticion("GET", "/matricula/consulta")
+        await self.pensar()
+        await self.peticion("POST", "/matricula/obtener_datos_existentes_sp", json={"periodo": PERIODO})
+        await self.pensar(3)
+        if self.rng.random() < self.args.rechazo:
+            await self.peticion("POST", "/matricula/rechazar_semestre_rol", json={
+                "periodo": PERIODO, "motivo": "Revisar matrícula de reingreso (prueba de carga)",
+            })
+        else:
+            await self.peticion("POST", "/matricula/validar_semestre_rol", json={"periodo": PERIODO})
+
+    async def correr(self, fin: float) -> None:
+        # Escalonar los inicios de sesión para no arrancar todos en el mismo instante
+        await asyncio.sleep(self.rng.uniform(0, self.args.rampa))
+        try:
+            if not await self.iniciar_sesion():
+                return
+            flujo = self.flujo_capturista if self.id_rol == ROL_CAPTURISTA else self.flujo_validador
+            while time.perf_counter() < fin:
+                await flujo()
+                await self.pensar()
+        finally:
+            await self.cliente.aclose()
+
+
+async def muestrear_pool(engine, metricas: Metricas, intervalo: float, fin: float) -> None:
+    pool = engine.pool
+    while time.perf_counter() < fin:
+        metricas.pool.append({
+            "en_uso": pool.checkedout() if hasattr(pool, "checkedout") else 0,
+            "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0,
+        })
+        await asyncio.sleep(intervalo)
+
+
+def capacidad_pool(engine) -> int:
+    pool = engine.pool
+    if not hasattr(pool, "size"):
+        return 0
+    return pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+
+
+async def correr_carga(app, engine, args) -> Dict[str, Any]:
+    metricas = Metricas()
+    rng = random.Random(args.semilla)
+    usuarios = [
+        UsuarioVirtual(app, login, id_rol, metricas, random.Random(rng.random()), args)
+        for login, id_rol, _ in usuarios_por_unidad(args.unidades, args.capturistas, args.validadores)
+    ]
+    inicio = time.perf_counter()
+    fin = inicio + args.duracion
+    await asyncio.gather(
+        muestrear_pool(engine, metricas, args.muestreo, fin),
+        *(u.correr(fin) for u in usuarios),
+    )
+    return metricas.resumen(time.perf_counter() - inicio, capacidad_pool(engine))
+
+
+def imprimir_reporte(reporte: Dict[str, Any]) -> None:
+    print(f"\n{'Ruta':<52}{'n':>7}{'err%':>7}{'rps':>7}" + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f"{'max':>9}")
+    for ruta, r in reporte["rutas"].items():
+        print(
+            f"{ruta:<52}{r['peticiones']:>7}{r['tasa_error'] * 100:>6.1f}%{r['rps']:>7.1f}"
+            + "".join(f"{r[f'p{p}_ms']:>9.1f}" for p in PERCENTILES) + f"{r['max_ms']:>9.1f}"
+        )
+    pool = reporte["pool"]
+    print(
+        f"\nPool de conexiones: capacidad {pool['capacidad']}, en uso promedio {pool['en_uso_promedio']:.2f}, "
+        f"pico {pool['en_uso_pico']}, overflow pico {pool['overflow_pico']}, "
+        f"saturado {pool['pct_saturado']:.1f}% del tiempo ({pool['muestras']} muestras)"
+    )
+    print(f"Total: {reporte['peticiones']} peticiones en {reporte['duracion_s']:.1f}s, errores {reporte['tasa_error'] * 100:.2f}%")
+    for error, veces in list(reporte["errores"].items())[:10]:
+        print(f"   ❌ {veces}× {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--unidades", type=int, default=20, help="UAs capturando a la vez")
+    parser.add_argument("--capturistas", type=int, default=2, help="capturistas por UA")
+    parser.add_argument("--validadores", type=int, default=1, help="validadores por UA")
+    parser.add_argument("--duracion", type=float, default=60.0, help="segundos de carga")
+    parser.add_argument("--pensar", type=float, nargs=2, default=(0.2, 1.5), metavar=("MIN", "MAX"),
+                        help="pausa aleatoria entre acciones (s)")
+    parser.add_argument("--rampa", type=float, default=5.0, help="ventana (s) para escalonar los inicios de sesión")
+    parser.add_argument("--celdas", type=int, nargs=2, default=(20, 200), metavar=("MIN", "MAX"),
+                        help="celdas por captura de turno")
+    parser.add_argument("--rechazo", type=float, default=0.2, help="probabilidad de que un validador rechace")
+    parser.add_argument("--muestreo", type=float, default=0.05, help="intervalo (s) de muestreo del pool")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--json", help="guardar el reporte en este archivo")
+    parser.add_argument("--verbose", action="store_true", help="mostrar los print de los endpoints")
+    args = parser.parse_args()
+
+    from backend.database.db_config import engine
+
+    print(f"Preparando BD local {CARGA_DB} ({args.unidades} UAs)...")
+    recrear_base(
+        engine, CARGA_DB,
+        unidades=args.unidades, capturistas_por_ua=args.capturistas, validadores_por_ua=args.validadores,
+    )
+    app = cargar_app()
+    total = args.unidades * (args.capturistas + args.validadores)
+    print(f"Corriendo {total} usuarios virtuales durante {args.duracion:.0f}s...")
+
+    # Los endpoints imprimen mucho detalle de depuración; se descarta salvo con --verbose
+    salida = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    with salida:
+        reporte = asyncio.run(correr_carga(app, engine, args))
+
+    imprimir_reporte(reporte)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump({"parametros": vars(args), **reporte}, archivo, ensure_ascii=False, indent=2)
+        print(f"Reporte guardado en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""
+Generador determinista de datos institucionales sintéticos para pruebas de escala.
+
+Llena los modelos de backend/database/models con catálogos, UAs, programas, usuarios,
+semáforos, bitácora y varios periodos de Matricula con todas las combinaciones de
+programa × modalidad × turno × semestre × grupo de edad × tipo de ingreso × sexo.
+La misma semilla y escala producen siempre los mismos datos: cada (UA, periodo) usa
+su propio generador NumPy derivado de la semilla, sin importar el orden de carga.
+
+Matricula y Bitacora se insertan con executemany sobre la conexión DBAPI (con
+fast_executemany en pyodbc) en lotes de --lote filas; --escala 11 genera ~10M filas
+de Matricula.
+
+Uso:
+    python backend/tests/generar_datos_sinteticos.py --url sqlite:////tmp/sae_escala.db --recrear [--escala 11]
+    python backend/tests/generar_datos_sinteticos.py --escala 2 --unidades 50 --periodos 4 --semilla 42
+
+Sin --url usa DATABASE_URL / la configuración de db_config. --recrear (sólo SQLite) borra
+el archivo y crea el esquema local; --limpiar vacía antes las tablas que se generan.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Sequence
+
+import numpy as np
+from sqlalchemy import column, create_engine, delete, insert, table
+from sqlalchemy.engine import Engine
+
+from backend.tests.benchmarks.datos import ordinal_semestre
+
+TIPOS_INGRESO = 2
+SEXOS = 2
+NIVELES = ["Licenciatura", "Posgrado", "Nivel Medio Superior"]
+RAMAS = [
+    ("Ingeniería y Ciencias Físico Matemáticas", "ICFM"),
+    ("Ciencias Médico Biológicas", "CMB"),
+    ("Ciencias Sociales y Administrativas", "CSA"),
+]
+ROLES = {
+    1: "Administrador", 2: "Consulta", 3: "Capturista", 4: "Director",
+    5: "Jefe de Departamento", 6: "Coordinador", 7: "Revisor DEMS", 8: "Revisor DES",
+}
+ACCIONES = [
+    "Inicio de sesión", "Guardó captura de matrícula", "Validó semestre de matrícula",
+    "Rechazó matrícula", "Exportó reporte", "Consultó avance", "Cambió contraseña",
+]
+# El periodo vigente de la app es el 7 ('2025-2026/1'); los anteriores bajan desde ahí
+ID_PERIODO_VIGENTE = 7
+
+
+@dataclass
+class Escala:
+    """Tamaño del escenario. escalar(f) multiplica el número de UAs (y con ello todo lo demás)."""
+    unidades: int = 20
+    programas: int = 300
+    programas_por_ua: int = 8
+    periodos: int = 3
+    modalidades: int = 2
+    turnos: int = 2
+    semestres: int = 10
+    grupos_edad: int = 12
+    usuarios_por_ua: int = 5
+    bitacora_por_usuario: int = 40
+
+    def escalar(self, factor: float) -> "Escala":
+        return replace(self, unidades=max(1, round(self.unidades * factor)))
+
+    @property
+    def celdas_por_ua(self) -> int:
+        return (self.programas_por_ua * self.modalidades * self.turnos * self.semestres
+                * self.grupos_edad * TIPOS_INGRESO * SEXOS)
+
+    @property
+    def filas_matricula(self) -> int:
+        return self.periodos * self.unidades * self.celdas_por_ua
+
+    def ids_periodo(self) -> List[int]:
+        ultimo = max(ID_PERIODO_VIGENTE, self.periodos)
+        return list(range(ultimo - self.periodos + 1, ultimo + 1))
+
+
+def periodo_literal(id_periodo: int) -> str:
+    """'2025-2026/1' para el 7; cada id anterior retrocede medio año escolar."""
+    atras = ID_PERIODO_VIGENTE - id_periodo
+    inicio = 2025 - (atras + 1) // 2
+    return f"{inicio}-{inicio + 1}/{1 if atras % 2 == 0 else 2}"
+
+
+def _inicio_periodo(id_periodo: int) -> datetime:
+    literal = periodo_literal(id_periodo)
+    anio, mitad = int(literal[:4]), literal[-1]
+    return datetime(anio, 8, 1) if mitad == "1" else datetime(anio + 1, 2, 1)
+
+
+def insertar_bulk(engine: Engine, tabla, columnas: Sequence[str], filas: Iterable[Sequence], lote: int = 100_000) -> int:
+    """
+    INSERT masivo con executemany sobre la conexión DBAPI, en lotes y una transacción.
+    Los valores pasan por el bind processor del tipo de cada columna (fechas en SQLite).
+    """
+    dialecto = engine.dialect
+    preparador = dialecto.identifier_preparer
+    marcadores = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+    if dialecto.paramstyle not in marcadores:
+        raise ValueError(f"paramstyle no soportado para carga masiva: {dialecto.paramstyle}")
+    sql = (
+        f"INSERT INTO {preparador.format_table(tabla)} ({', '.join(preparador.quote(c) for c in columnas)}) "
+        f"VALUES ({', '.join([marcadores[dialecto.paramstyle]] * len(columnas))})"
+    )
+    procesadores = [tabla.c[c].type.bind_processor(dialecto) for c in columnas]
+    procesar = any(procesadores)
+
+    total = 0
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if dialecto.name == "mssql":
+            cursor.fast_executemany = True
+        elif dialecto.name == "sqlite":
+            cursor.execute("PRAGMA synchronous = OFF")
+        pendiente: List[Sequence] = []
+
+        def vaciar():
+            nonlocal total
+            if procesar:
+                pendiente[:] = [[p(v) if p else v for p, v in zip(procesadores, fila)] for fila in pendiente]
+            cursor.executemany(sql, pendiente)
+            total += len(pendiente)
+            pendiente.clear()
+
+        for fila in filas:
+            pendiente.append(fila)
+            if len(pendiente) >= lote:
+                vaciar()
+        if pendiente:
+            vaciar()
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return total
+
+
+def _insertar_catalogo(conexion, modelo, filas: List[Dict]) -> None:
+    if not filas:
+        return
+    # Tabla ligera con las mismas columnas: Unidad_Programa_Modalidad declara dos columnas
+    # autoincrement en su llave y el Table del modelo no se puede usar en un INSERT
+    destino = table(modelo.__tablename__, *(column(c.name, c.type) for c in modelo.__table__.columns))
+    # Las filas usan el nombre del atributo ORM (Usuario.Password -> columna Contrasena)
+    columnas = {attr.key: attr.columns[0].name for attr in modelo.__mapper__.column_attrs}
+    conexion.execute(insert(destino), [{columnas[k]: v for k, v in f.items()} for f in filas])
+
+
+def _programas(escala: Escala, semilla: int) -> np.ndarray:
+    """(Id_Programa, Id_Nivel, Id_Rama) de todo el catálogo."""
+    rng = np.random.default_rng([semilla, 0, 0])
+    ids = np.arange(1, escala.programas + 1)
+    niveles = rng.choice(len(NIVELES), size=escala.programas, p=[0.7, 0.2, 0.1]) + 1
+    ramas = rng.integers(1, len(RAMAS) + 1, size=escala.programas)
+    return np.stack([ids, niveles, ramas], axis=1)
+
+
+def _programas_de_ua(escala: Escala, semilla: int, id_ua: int) -> np.ndarray:
+    rng = np.random.default_rng([semilla, id_ua])
+    return np.sort(rng.choice(escala.programas, size=min(escala.programas_por_ua, escala.programas), replace=False)) + 1
+
+
+def sembrar_catalogos(engine: Engine, escala: Escala, semilla: int) -> None:
+    """Catálogos, UAs, programas y sus modalidades, usuarios y semáforos (todo con Core insert)."""
+    from backend.database.models.CatEstatus import CatEstatus
+    from backend.database.models.CatPeriodo import CatPeriodo
+    from backend.database.models.CatUnidadAcademica import CatUnidadAcademica
+    from backend.database.models.CatNivel import CatNivel
+    from backend.database.models.CatRama import CatRama
+    from backend.database.models.CatProgramas import CatProgramas
+    from backend.database.models.CatModalidad import CatModalidad
+    from backend.database.models.CatTurno import CatTurno
+    from backend.database.models.CatSemestre import CatSemestre
+    from backend.database.models.CatGrupoEdad import CatGrupoEdad
+    from backend.database.models.CatTipoIngreso import TipoIngreso
+    from backend.database.models.CatSexo import CatSexo
+    from backend.database.models.CatSemaforo import CatSemaforo
+    from backend.database.models.CatRoles import CatRoles
+    from backend.database.models.ProgramaModalidad import ProgramaModalidad
+    from backend.database.models.UnidadProgramaModalidad import CatUnidadProgramaModalidad
+    from backend.database.models.Usuario import Usuario
+    from backend.database.models.SemaforoUnidadAcademica import SemaforoUnidadAcademica
+    from backend.tests.benchmarks.datos import PASSWORD_BENCH
+    from backend.utils.security import hash_password
+
+    rng = np.random.default_rng([semilla, 0, 1])
+    programas = _programas(escala, semilla)
+    periodos = escala.ids_periodo()
+    modalidades = ["Escolarizada", "No Escolarizada", "Mixta"]
+    turnos = ["Matutino", "Vespertino", "Nocturno", "Mixto"]
+
+    # Programa_Modalidad: cada programa en todas las modalidades del escenario
+    programa_modalidad = {
+        (int(p), m): i + 1
+        for i, (p, m) in enumerate((p, m) for p in programas[:, 0] for m in range(1, escala.modalidades + 1))
+    }
+    unidad_programa_modalidad = [
+        {"Id_Unidad_Academica": ua, "Id_Modalidad_Programa": programa_modalidad[(int(p), m)], "Id_Estatus": 1}
+        for ua in range(1, escala.unidades + 1)
+        for p in _programas_de_ua(escala, semilla, ua)
+        for m in range(1, escala.modalidades + 1)
+    ]
+
+    password = hash_password(PASSWORD_BENCH)
+    usuarios = [{
+        "Id_Usuario": 1, "Id_Unidad_Academica": 1, "Id_Rol": 1, "Usuario": "admin", "Password": password,
+        "Email": "admin@sintetico.local", "Id_Estatus": 1, "Nombre": "Admin", "Paterno": "Sintético", "Materno": "",
+        "Id_Nivel": 1,
+    }]
+    for ua in range(1, escala.unidades + 1):
+        for k in range(1, escala.usuarios_por_ua + 1):
+            # Cada UA tiene al menos un capturista y un validador; el resto con rol al azar
+            id_rol = 3 if k == 1 else 5 if k == 2 else int(rng.integers(2, 9))
+            login = f"u{ua:04d}_{k}"
+            usuarios.append({
+                "Id_Usuario": len(usuarios) + 1, "Id_Unidad_Academica": ua, "Id_Rol": id_rol, "Usuario": login,
+                "Password": password, "Email": f"{login}@sintetico.local", "Id_Estatus": 1,
+                "Nombre": f"Usuario {k}", "Paterno": f"UA{ua:04d}", "Materno": "", "Id_Nivel": int(rng.integers(1, 4)),
+            })
+
+    semaforos = [
+        {
+            "Id_Periodo": periodo, "Id_Unidad_Academica": ua, "Id_Formato": formato,
+            # Los periodos anteriores ya cerraron; el vigente queda en cualquier estado
+            "Id_Semaforo": 3 if periodo != periodos[-1] else int(rng.integers(1, 4)),
+        }
+        for periodo in periodos
+        for ua in range(1, escala.unidades + 1)
+        for formato in (1, 2)
+    ]
+
+    catalogos = [
+        (CatEstatus, [{"Id_Estatus": 1, "Descripcion": "Activo"}, {"Id_Estatus": 2, "Descripcion": "Inactivo"}]),
+        (CatPeriodo, [
+            {"Id_Periodo": p, "Periodo": periodo_literal(p), "Fecha_Inicio": _inicio_periodo(p), "Id_Estatus": 1}
+            for p in periodos
+        ]),
+        (CatRama, [
+            {"Id_Rama": i, "Nombre_Rama": nombre, "Nombre_Sigla": sigla, "Id_Estatus": 1}
+            for i, (nombre, sigla) in enumerate(RAMAS, 1)
+        ]),
+        (CatNivel, [{"Id_Nivel": i, "Nivel": n, "Id_Estatus": 1} for i, n in enumerate(NIVELES, 1)]),
+        (CatUnidadAcademica, [
+            {"Id_Unidad_Academica": ua, "Sigla": f"UA{ua:04d}", "Nombre": f"Unidad Académica Sintética {ua}",
+             "Id_Estatus": 1, "Id_Rama_Unidad": (ua - 1) % len(RAMAS) + 1}
+            for ua in range(1, escala.unidades + 1)
+        ]),
+        (CatProgramas, [
+            {"Id_Programa": int(p), "Nombre_Programa": f"Programa Sintético {int(p)}", "Id_Nivel": int(n),
+             "Id_Rama_Programa": int(r), "Id_Semestre": escala.semestres, "Id_Estatus": 1}
+            for p, n, r in programas
+        ]),
+        (CatModalidad, [{"Id_Modalidad": i, "Modalidad": modalidades[(i - 1) % len(modalidades)], "Id_Estatus": 1}
+                        for i in range(1, escala.modalidades + 1)]),
+        (CatTurno, [{"Id_Turno": i, "Turno": turnos[(i - 1) % len(turnos)], "Id_Estatus": 1}
+                    for i in range(1, escala.turnos + 1)]),
+        (CatSemestre, [{"Id_Semestre": s, "Semestre": ordinal_semestre(min(s, 10)), "Id_Estatus": 1}
+                       for s in range(1, escala.semestres + 1)]),
+        (CatGrupoEdad, [{"Id_Grupo_Edad": g, "Grupo_Edad": f"{17 + g} años", "Id_Estatus": 1}
+                        for g in range(1, escala.grupos_edad + 1)]),
+        (TipoIngreso, [{"Id_Tipo_Ingreso": 1, "Tipo_de_Ingreso": "Nuevo Ingreso", "Id_Estatus": 1},
+                       {"Id_Tipo_Ingreso": 2, "Tipo_de_Ingreso": "Reingreso", "Id_Estatus": 1}]),
+        (CatSexo, [{"Id_Sexo": 1, "Sexo": "Hombre", "Id_Estatus": 1}, {"Id_Sexo": 2, "Sexo": "Mujer", "Id_Estatus": 1}]),
+        (CatSemaforo, [
+            {"Id_Semaforo": 1, "Descripcion_Semaforo": "Pendiente", "Color_Semaforo": "#dc3545", "Id_Estatus": 1},
+            {"Id_Semaforo": 2, "Descripcion_Semaforo": "En captura", "Color_Semaforo": "#ffc107", "Id_Estatus": 1},
+            {"Id_Semaforo": 3, "Descripcion_Semaforo": "Completado", "Color_Semaforo": "#28a745", "Id_Estatus": 1},
+        ]),
+        (CatRoles, [{"Id_Rol": i, "Rol": r, "Descripcion": r, "Id_Estatus": 1} for i, r in ROLES.items()]),
+        (ProgramaModalidad, [
+            {"Id_Modalidad_Programa": i, "Id_Programa": p, "Id_Modalidad": m, "Id_Estatus": 1}
+            for (p, m), i in programa_modalidad.items()
+        ]),
+        (CatUnidadProgramaModalidad, unidad_programa_modalidad),
+        (Usuario, usuarios),
+        (SemaforoUnidadAcademica, semaforos),
+    ]
+    with engine.begin() as conexion:
+        for modelo, filas in catalogos:
+            _insertar_catalogo(conexion, modelo, filas)
+
+
+def _celdas_base(escala: Escala) -> np.ndarray:
+    """Índices (programa, modalidad, turno, semestre, grupo, tipo, sexo) de todas las celdas de una UA."""
+    dimensiones = (escala.programas_por_ua, escala.modalidades, escala.turnos, escala.semestres,
+                   escala.grupos_edad, TIPOS_INGRESO, SEXOS)
+    return np.indices(dimensiones).reshape(len(dimensiones), -1).T + 1
+
+
+def filas_matricula(escala: Escala, semilla: int) -> Iterable[List[int]]:
+    """Filas de Matricula en el orden de las columnas de COLUMNAS_MATRICULA, por (periodo, UA)."""
+    programas = _programas(escala, semilla)
+    base = _celdas_base(escala)
+    n = len(base)
+    for ua in range(1, escala.unidades + 1):
+        ids_programa = _programas_de_ua(escala, semilla, ua)
+        programa = ids_programa[base[:, 0] - 1]
+        nivel = programas[programa - 1, 1]
+        rama = programas[programa - 1, 2]
+        for periodo in escala.ids_periodo():
+            rng = np.random.default_rng([semilla, ua, periodo])
+            # Muchas celdas vacías y el resto con matrícula tipo Poisson
+            matricula = rng.poisson(18, size=n) * (rng.random(n) > 0.35)
+            bloque = np.column_stack([
+                np.full(n, periodo), np.full(n, ua), programa, rama, nivel,
+                base[:, 1], base[:, 2], base[:, 3], base[:, 4], base[:, 5], base[:, 6], matricula,
+            ])
+            yield from bloque.tolist()
+
+
+COLUMNAS_MATRICULA = [
+    "Id_Periodo", "Id_Unidad_Academica", "Id_Programa", "Id_Rama", "Id_Nivel", "Id_Modalidad", "Id_Turno",
+    "Id_Semestre", "Id_Grupo_Edad", "Id_Tipo_Ingreso", "Id_Sexo", "Matricula",
+]
+COLUMNAS_BITACORA = ["Id_Usuario", "Id_Modulo", "Id_Periodo", "Acciones", "Host", "Fecha"]
+
+
+def filas_bitacora(escala: Escala, semilla: int) -> Iterable[list]:
+    periodos = escala.ids_periodo()
+    id_usuario = 1
+    for ua in range(1, escala.unidades + 1):
+        rng = np.random.default_rng([semilla, ua, 0])
+        for _ in range(escala.usuarios_por_ua):
+            id_usuario += 1
+            n = escala.bitacora_por_usuario
+            ids_periodo = rng.choice(periodos, size=n)
+            segundos = rng.integers(0, 150 * 24 * 3600, size=n)
+            acciones = rng.integers(0, len(ACCIONES), size=n)
+            modulos = rng.integers(1, 13, size=n)
+            for periodo, s, a, m in zip(ids_periodo.tolist(), segundos.tolist(), acciones.tolist(), modulos.tolist()):
+                yield [
+                    id_usuario, m, periodo, ACCIONES[a], f"10.{ua % 256}.{id_usuario % 256}.{m}",
+                    _inicio_periodo(periodo) + timedelta(seconds=s),
+                ]
+
+
+def limpiar(engine: Engine) -> None:
+    """Vacía las tablas que llena el generador."""
+    from backend.database.esquema_local import cargar_modelos
+    from backend.database.db_base import Base
+
+    cargar_modelos()
+    tablas = [
+        "Matricula", "Bitacora", "Semaforo_Unidad_Academica", "Usuarios", "Unidad_Programa_Modalidad",
+        "Programa_Modalidad", "Cat_Roles", "Cat_Semaforo", "Cat_Sexo", "Cat_Tipo_Ingreso", "Cat_Grupo_Edad",
+        "Cat_Semestre", "Cat_Turno", "Cat_Modalidad", "Cat_Programas", "Cat_Unidad_Academica", "Cat_Nivel",
+        "Cat_Rama", "Cat_Periodo", "Cat_Estatus",
+    ]
+    with engine.begin() as conexion:
+        for nombre in tablas:
+            if nombre in Base.metadata.tables:
+                conexion.execute(delete(Base.metadata.tables[nombre]))
+
+
+def generar(engine: Engine, escala: Escala, semilla: int = 7, lote: int = 100_000,
+            progreso: Callable[[str], None] = print) -> Dict[str, int]:
+    """Genera el escenario completo; regresa las filas insertadas por tabla masiva."""
+    from backend.database.models.Matricula import Matricula
+    from backend.database.models.Bitacora import Bitacora
+
+    inicio = time.perf_counter()
+    sembrar_catalogos(engine, escala, semilla)
+    progreso(f"📚 Catálogos, {escala.unidades} UAs y usuarios listos ({time.perf_counter() - inicio:.1f}s)")
+
+    inicio = time.perf_counter()
+    total_matricula = insertar_bulk(engine, Matricula.__table__, COLUMNAS_MATRICULA, filas_matricula(escala, semilla), lote)
+    segundos = time.perf_counter() - inicio
+    progreso(f"📊 Matricula: {total_matricula:,} filas en {segundos:.1f}s ({total_matricula / max(segundos, 1e-9):,.0f} filas/s)")
+
+    inicio = time.perf_counter()
+    total_bitacora = insertar_bulk(engine, Bitacora.__table__, COLUMNAS_BITACORA, filas_bitacora(escala, semilla), lote)
+    progreso(f"📝 Bitacora: {total_bitacora:,} filas en {time.perf_counter() - inicio:.1f}s")
+    return {"Matricula": total_matricula, "Bitacora": total_bitacora}
+
+
+def main():
+    base = Escala()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="URL de la BD destino (default: DATABASE_URL / db_config)")
+    parser.add_argument("--recrear", action="store_true", help="SQLite: borrar el archivo y crear el esquema local")
+    parser.add_argument("--limpiar", action="store_true", help="vaciar antes las tablas que se generan")
+    parser.add_argument("--escala", type=float, default=1.0, help="multiplica el número de UAs")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--lote", type=int, default=100_000, help="filas por executemany")
+    for campo, valor in vars(base).items():
+        parser.add_argument(f"--{campo.replace('_', '-')}", type=int, default=valor)
+    args = parser.parse_args()
+
+    escala = Escala(**{campo: getattr(args, campo) for campo in vars(base)}).escalar(args.escala)
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        from backend.database.db_config import engine
+
+    if args.recrear:
+        if engine.dialect.name != "sqlite":
+            parser.error("--recrear sólo aplica a SQLite")
+        from backend.database.esquema_local import crear_esquema_local
+        ruta = engine.url.database
+        engine.dispose()
+        if ruta and os.path.exists(ruta):
+            os.remove(ruta)
+        crear_esquema_local(engine)
+    elif args.limpiar:
+        limpiar(engine)
+
+    print(f"Escala: {escala}")
+    print(f"Filas de Matricula esperadas: {escala.filas_matricula:,}")
+    inicio = time.perf_counter()
+    generar(engine, escala, semilla=args.semilla, lote=args.lote)
+    print(f"✅ Listo en {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
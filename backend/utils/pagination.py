@@ -0,0 +1,25 @@
+import base64
+import json
+from typing import Any, List, Optional
+
+
+def encode_cursor(*valores: Any) -> str:
+    """Codifica la llave de ordenamiento del último registro de una página como cursor opaco.
+
+    Los valores deben ser serializables a JSON (fechas como isoformat()).
+    """
+    raw = json.dumps(list(valores), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], longitud: int) -> Optional[List[Any]]:
+    """Decodifica un cursor de encode_cursor. Devuelve None si no hay cursor y lanza ValueError si es inválido."""
+    if not cursor:
+        return None
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
+    if not isinstance(valores, list) or len(valores) != longitud:
+        raise ValueError("Cursor de paginación inválido")
+    return valores
@@ -0,0 +1,119 @@
+"""
+Utilidades para Server-Sent Events (SSE).
+
+EventChannel permite publicar eventos desde cualquier hilo (p. ej. un worker del
+ejecutor de trabajos) hacia los clientes SSE conectados, que los consumen como
+colas de asyncio dentro del event loop de FastAPI.
+
+El canal es del proceso: con varios workers de uvicorn un cliente sólo recibe lo que
+publica el worker al que está conectado. Para eventos de otros workers, un vigilante por
+clave puede consultar una fuente compartida y publicar en el canal (ver
+eventos_matricula_service).
+"""
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Intervalo para enviar comentarios de keep-alive y que proxies no cierren la conexión
+SSE_KEEPALIVE_SEGUNDOS = 15
+
+# Encabezados recomendados para respuestas SSE
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(data: Any, event: Optional[str] = None, id: Optional[str] = None) -> str:
+    """Serializa un evento en el formato de texto de SSE."""
+    lineas = []
+    if id is not None:
+        lineas.append(f"id: {id}")
+    if event:
+        lineas.append(f"event: {event}")
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False, default=str)
+    for linea in payload.splitlines() or [""]:
+        lineas.append(f"data: {linea}")
+    return "\n".join(lineas) + "\n\n"
+
+
+class EventChannel:
+    """Canal pub/sub por clave. publish() es seguro desde cualquier hilo."""
+
+    def __init__(self, max_cola: int = 100):
+        self._lock = threading.Lock()
+        self._suscriptores: Dict[Hashable, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._max_cola = max_cola
+
+    def subscribe(self, clave: Hashable) -> asyncio.Queue:
+        """Registra una cola para la clave. Debe llamarse desde el event loop."""
+        loop = asyncio.get_running_loop()
+        cola: asyncio.Queue = asyncio.Queue(maxsize=self._max_cola)
+        with self._lock:
+            self._suscriptores.setdefault(clave, []).append((loop, cola))
+        return cola
+
+    def unsubscribe(self, clave: Hashable, cola: asyncio.Queue) -> None:
+        with self._lock:
+            subs = self._suscriptores.get(clave, [])
+            self._suscriptores[clave] = [(l, q) for l, q in subs if q is not cola]
+            if not self._suscriptores[clave]:
+                del self._suscriptores[clave]
+
+    def subscriber_count(self, clave: Hashable) -> int:
+        with self._lock:
+            return len(self._suscriptores.get(clave, []))
+
+    @staticmethod
+    def _entregar(cola: asyncio.Queue, evento: Dict[str, Any]) -> None:
+        try:
+            cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: se descarta el evento más viejo para conservar el más reciente
+            try:
+                cola.get_nowait()
+                cola.put_nowait(evento)
+            except (asyncio.QueueEmpty, asyncio.QueueFull):
+                pass
+
+    def publish(self, clave: Hashable, evento: str, data: Any) -> None:
+        """Publica un evento a todos los suscriptores de la clave."""
+        with self._lock:
+            subs = list(self._suscriptores.get(clave, []))
+        mensaje = {"event": evento, "data": data}
+        for loop, cola in subs:
+            if loop.is_closed():
+                continue
+            loop.call_soon_threadsafe(self._entregar, cola, mensaje)
+
+    async def stream(
+        self,
+        clave: Hashable,
+        estado_inicial: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+        terminar_en: Tuple[str, ...] = (),
+    ) -> AsyncIterator[str]:
+        """
+        Generador para StreamingResponse. Envía primero el evento inicial (si hay),
+        luego cada evento publicado, y termina al recibir un evento listado en terminar_en.
+        El estado inicial se calcula después de suscribirse para no perder eventos intermedios.
+        """
+        cola = self.subscribe(clave)
+        try:
+            inicial = estado_inicial() if estado_inicial else None
+            if inicial is not None:
+                yield format_sse(inicial["data"], event=inicial["event"])
+                if inicial["event"] in terminar_en:
+                    return
+            while True:
+                try:
+                    mensaje = await asyncio.wait_for(cola.get(), timeout=SSE_KEEPALIVE_SEGUNDOS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(mensaje["data"], event=mensaje["event"])
+                if mensaje["event"] in terminar_en:
+                    return
+        finally:
+            self.unsubscribe(clave, cola)
@@ -0,0 +1,111 @@
+// JavaScript para el tablero de avance institucional - Datos desde /avance/datos (con ETag)
+
+document.addEventListener('DOMContentLoaded', function() {
+    const tbody = document.querySelector('#tabla-avance tbody');
+    const resumen = document.getElementById('resumen-avance');
+    const selectPeriodo = document.getElementById('filtro-periodo-avance');
+    const filtroSigla = document.getElementById('filtro-sigla-avance');
+
+    // Última respuesta por periodo, para reutilizarla cuando el servidor responde 304
+    const cachePorPeriodo = {};
+    let unidades = [];
+    let orden = { campo: 'sigla', asc: true };
+
+    function valorCampo(unidad, campo) {
+        return campo.split('.').reduce((obj, k) => (obj == null ? null : obj[k]), unidad);
+    }
+
+    function celdaSemaforo(formato) {
+        const td = document.createElement('td');
+        const marca = document.createElement('span');
+        marca.textContent = '●';
+        marca.style.color = formato.color || '#999';
+        marca.style.marginRight = '0.4em';
+        td.appendChild(marca);
+        td.appendChild(document.createTextNode(formato.semaforo));
+        if (formato.fecha_modificacion) {
+            td.title = `Última modificación: ${new Date(formato.fecha_modificacion).toLocaleString('es-MX')}`;
+        }
+        return td;
+    }
+
+    function celdaTexto(valor) {
+        const td = document.createElement('td');
+        td.textContent = valor;
+        return td;
+    }
+
+    function renderizar() {
+        const texto = filtroSigla.value.trim().toLowerCase();
+        const visibles = unidades
+            .filter(u => !texto || (u.sigla || '').toLowerCase().includes(texto) || (u.nombre || '').toLowerCase().includes(texto))
+            .sort((a, b) => {
+                const va = valorCampo(a, orden.campo);
+                const vb = valorCampo(b, orden.campo);
+                if (va == null && vb == null) return 0;
+                if (va == null) return 1;
+                if (vb == null) return -1;
+                const cmp = typeof va === 'number' ? va - vb : String(va).localeCompare(String(vb), 'es');
+                return orden.asc ? cmp : -cmp;
+            });
+
+        const fragmento = document.createDocumentFragment();
+        visibles.forEach(u => {
+            const tr = document.createElement('tr');
+            tr.appendChild(celdaTexto(u.sigla));
+            tr.appendChild(celdaTexto(u.nombre));
+            tr.appendChild(celdaSemaforo(u.matricula));
+            tr.appendChild(celdaTexto(`${u.matricula.validaciones} / ${u.matricula.rechazos}`));
+            tr.appendChild(celdaSemaforo(u.aprovechamiento));
+            tr.appendChild(celdaTexto(`${u.aprovechamiento.validaciones} / ${u.aprovechamiento.rechazos}`));
+            tr.appendChild(celdaTexto(u.ultima_validacion ? new Date(u.ultima_validacion).toLocaleString('es-MX') : ''));
+            fragmento.appendChild(tr);
+        });
+        tbody.innerHTML = '';
+        tbody.appendChild(fragmento);
+    }
+
+    function mostrarResumen(data) {
+        const r = data.resumen;
+        const generado = new Date(data.generado).toLocaleTimeString('es-MX');
+        resumen.textContent = `${r.total_unidades} Unidades Académicas · Matrícula completa: ${r.matricula_completadas} · ` +
+            `Aprovechamiento completo: ${r.aprovechamiento_completadas} (datos al ${generado})`;
+    }
+
+    async function cargarAvance() {
+        const periodo = selectPeriodo.value;
+        const previo = cachePorPeriodo[periodo];
+        const opciones = previo ? { headers: { 'If-None-Match': previo.etag } } : {};
+        try {
+            const response = await fetch(`/avance/datos?periodo=${encodeURIComponent(periodo)}`, opciones);
+            let data;
+            if (response.status === 304 && previo) {
+                data = previo.data;
+            } else {
+                data = await response.json();
+                if (!response.ok) throw new Error(data.detail || 'No se pudo consultar el avance');
+                cachePorPeriodo[periodo] = { etag: response.headers.get('ETag'), data: data };
+            }
+            limpiarMensajes();
+            unidades = data.unidades;
+            mostrarResumen(data);
+            renderizar();
+        } catch (err) {
+            mostrarMensaje(err.message, 'error');
+        }
+    }
+
+    document.querySelectorAll('#tabla-avance th[data-orden]').forEach(th => {
+        th.addEventListener('click', function() {
+            const campo = th.dataset.orden;
+            orden = { campo: campo, asc: orden.campo === campo ? !orden.asc : true };
+            renderizar();
+        });
+    });
+
+    selectPeriodo.addEventListener('change', cargarAvance);
+    document.getElementById('btn-actualizar-avance').addEventListener('click', cargarAvance);
+    filtroSigla.addEventListener('input', renderizar);
+
+    cargarAvance();
+});
@@ -0,0 +1,81 @@
+// JavaScript para la bitácora - Carga paginada (keyset) desde /bitacora/registros
+
+document.addEventListener('DOMContentLoaded', function() {
+    const tabla = document.getElementById('tabla-bitacora');
+    const tbody = tabla.querySelector('tbody');
+    const btnMas = document.getElementById('btn-mas-bitacora');
+    const resumen = document.getElementById('resumen-bitacora');
+    const form = document.getElementById('filtros-bitacora');
+    const limite = tabla.dataset.limite || '50';
+
+    let siguienteCursor = null;
+    let cargando = false;
+
+    function construirParametros() {
+        const params = new URLSearchParams({ limite: limite });
+        const idUsuario = document.getElementById('filtro-id-usuario').value.trim();
+        const idModulo = document.getElementById('filtro-modulo').value;
+        const idPeriodo = document.getElementById('filtro-periodo').value;
+        const host = document.getElementById('filtro-host').value.trim();
+        if (idUsuario) params.set('id_usuario', idUsuario);
+        if (idModulo) params.set('id_modulo', idModulo);
+        if (idPeriodo) params.set('id_periodo', idPeriodo);
+        if (host) params.set('host', host);
+        if (siguienteCursor) params.set('cursor', siguienteCursor);
+        return params;
+    }
+
+    function agregarFila(r) {
+        const tr = document.createElement('tr');
+        const fecha = r.Fecha ? new Date(r.Fecha).toLocaleString('es-MX') : '';
+        const usuario = r.Usuario ? `${r.Usuario} (${r.Id_Usuario})` : String(r.Id_Usuario);
+        [fecha, usuario, r.Id_Modulo, r.Id_Periodo ?? '', r.Host, r.Acciones].forEach(valor => {
+            const td = document.createElement('td');
+            td.textContent = valor;
+            tr.appendChild(td);
+        });
+        tbody.appendChild(tr);
+    }
+
+    async function cargarPagina() {
+        if (cargando) return;
+        cargando = true;
+        btnMas.disabled = true;
+        try {
+            const response = await fetch(`/bitacora/registros?${construirParametros().toString()}`);
+            const data = await response.json();
+            if (!response.ok) throw new Error(data.detail || 'No se pudo consultar la bitácora');
+            data.registros.forEach(agregarFila);
+            siguienteCursor = data.siguiente_cursor;
+            btnMas.style.display = siguienteCursor ? '' : 'none';
+            const generado = data.total_generado ? new Date(data.total_generado).toLocaleTimeString('es-MX') : '';
+            resumen.textContent = `Mostrando ${tbody.children.length} de ${data.total} registros (conteo al ${generado})`;
+        } catch (err) {
+            mostrarMensaje(err.message, 'error');
+        } finally {
+            cargando = false;
+            btnMas.disabled = false;
+        }
+    }
+
+    function reiniciar() {
+        siguienteCursor = null;
+        tbody.innerHTML = '';
+        limpiarMensajes();
+        cargarPagina();
+    }
+
+    form.addEventListener('submit', function(e) {
+        e.preventDefault();
+        reiniciar();
+    });
+
+    document.getElementById('btn-limpiar-bitacora').addEventListener('click', function() {
+        form.reset();
+        reiniciar();
+    });
+
+    btnMas.addEventListener('click', cargarPagina);
+
+    cargarPagina();
+});
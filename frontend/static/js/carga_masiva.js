@@ -0,0 +1,64 @@
+// JavaScript para el alta masiva de usuarios desde CSV
+
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('form-carga-masiva');
+    if (!form) return;
+
+    const inputArchivo = document.getElementById('archivo-carga-masiva');
+    const btnCargar = document.getElementById('btn-carga-masiva');
+    const resultado = document.getElementById('resultado-carga-masiva');
+
+    function mostrarReporte(data) {
+        resultado.innerHTML = '';
+        const resumen = document.createElement('p');
+        resumen.textContent = `Usuarios creados: ${data.creados}. Filas con error: ${data.errores}.`;
+        resultado.appendChild(resumen);
+
+        const errores = data.filas.filter(f => f.estado !== 'creado');
+        if (errores.length === 0) return;
+
+        const tabla = document.createElement('table');
+        const thead = document.createElement('thead');
+        thead.innerHTML = '<tr><th>Fila</th><th>Usuario</th><th>Email</th><th>Detalle</th></tr>';
+        tabla.appendChild(thead);
+        const tbody = document.createElement('tbody');
+        errores.forEach(f => {
+            const tr = document.createElement('tr');
+            [f.fila, f.usuario, f.email, f.detalle].forEach(valor => {
+                const td = document.createElement('td');
+                td.textContent = valor ?? '';
+                tr.appendChild(td);
+            });
+            tbody.appendChild(tr);
+        });
+        tabla.appendChild(tbody);
+        resultado.appendChild(tabla);
+    }
+
+    form.addEventListener('submit', async function(e) {
+        e.preventDefault();
+        if (!inputArchivo.files.length) return;
+
+        const datos = new FormData();
+        datos.append('archivo', inputArchivo.files[0]);
+        btnCargar.disabled = true;
+        resultado.textContent = 'Procesando archivo...';
+        try {
+            const resp = await fetch('/usuarios/carga_masiva', { method: 'POST', body: datos });
+            const data = await resp.json();
+            if (!resp.ok) {
+                resultado.textContent = data.detail || 'No se pudo procesar el archivo.';
+                return;
+            }
+            mostrarReporte(data);
+            if (data.creados > 0 && window.recargarListadoUsuarios) {
+                window.recargarListadoUsuarios();
+            }
+        } catch (err) {
+            console.error('Error en carga masiva:', err);
+            resultado.textContent = 'Error de conexión al cargar el archivo.';
+        } finally {
+            btnCargar.disabled = false;
+        }
+    });
+});
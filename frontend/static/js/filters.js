@@ -1,34 +1,129 @@
-// JavaScript para filtros - Lógica de filtrado en tablas
+// JavaScript para filtros - Listado de usuarios paginado desde el servidor
 
 document.addEventListener('DOMContentLoaded', function() {
     // Elementos de filtros
     const filtro = document.getElementById('filtro-usuarios');
     const filtroUA = document.getElementById('filtro-ua');
-    
-    // Función principal para aplicar todos los filtros
-    function aplicarFiltros() {
-        const textoFiltro = filtro ? filtro.value.trim().toLowerCase() : '';
-        const uaFiltro = filtroUA ? filtroUA.value : '';
-        
-        document.querySelectorAll('#tabla-usuarios tbody tr').forEach(tr => {
-            const textoFila = tr.innerText.toLowerCase();
-            // Acceder correctamente al atributo data-id_unidad
-            const idUnidad = tr.getAttribute('data-id_unidad');
-            
-            const coincideTexto = !textoFiltro || textoFila.includes(textoFiltro);
-            // Convertir ambos valores a string para comparación correcta
-            const coincideUA = !uaFiltro || String(idUnidad) === String(uaFiltro);
-            
-            tr.style.display = (coincideTexto && coincideUA) ? '' : 'none';
+    const tabla = document.getElementById('tabla-usuarios');
+    if (!tabla) return;
+
+    const tbody = tabla.querySelector('tbody');
+    const estado = document.getElementById('usuarios-estado');
+    const btnCargarMas = document.getElementById('btn-cargar-mas-usuarios');
+    const limite = parseInt(tabla.dataset.limite || '50', 10);
+    const esSuperAdmin = tabla.dataset.superAdmin === 'true';
+
+    // Estado del listado
+    let siguienteCursor = null;
+    let orden = 'nombre';
+    let descendente = false;
+    let cargando = false;
+    let solicitud = 0;  // descarta respuestas de búsquedas anteriores
+    let temporizador = null;
+
+    function construirFila(u) {
+        const tr = document.createElement('tr');
+        tr.className = 'fila-usuario';
+        tr.dataset.id = u.Id_Usuario;
+        tr.dataset.nombre = u.Nombre;
+        tr.dataset.paterno = u.Paterno;
+        tr.dataset.materno = u.Materno;
+        tr.dataset.usuario = u.Usuario;
+        tr.dataset.email = u.Email;
+        tr.setAttribute('data-id_unidad', u.Id_Unidad_Academica);
+        tr.setAttribute('data-id_rol', u.Id_Rol);
+        tr.setAttribute('data-id_nivel', u.Id_Nivel ?? '');
+
+        const celdas = [
+            [u.Nombre, u.Paterno, u.Materno].filter(Boolean).join(' '),
+            u.Usuario,
+            u.Email,
+            u.Rol,
+        ];
+        if (esSuperAdmin) celdas.push(u.Sigla_UA);
+        celdas.forEach(texto => {
+            const td = document.createElement('td');
+            td.textContent = texto ?? '';
+            tr.appendChild(td);
         });
+        return tr;
     }
-    
+
+    async function cargarPagina(reiniciar) {
+        if (cargando && !reiniciar) return;
+        cargando = true;
+        const idSolicitud = ++solicitud;
+
+        const params = new URLSearchParams({ limite: String(limite), orden: orden });
+        if (descendente) params.set('desc', 'true');
+        const texto = filtro ? filtro.value.trim() : '';
+        if (texto) params.set('q', texto);
+        if (filtroUA && filtroUA.value) params.set('id_unidad_academica', filtroUA.value);
+        if (!reiniciar && siguienteCursor) params.set('cursor', siguienteCursor);
+
+        if (estado) estado.textContent = 'Cargando...';
+        try {
+            const resp = await fetch(`/usuarios/listado?${params.toString()}`);
+            if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+            const data = await resp.json();
+            if (idSolicitud !== solicitud) return;
+
+            if (reiniciar) tbody.innerHTML = '';
+            const fragmento = document.createDocumentFragment();
+            data.usuarios.forEach(u => fragmento.appendChild(construirFila(u)));
+            tbody.appendChild(fragmento);
+
+            siguienteCursor = data.siguiente_cursor;
+            if (btnCargarMas) btnCargarMas.style.display = siguienteCursor ? 'inline-block' : 'none';
+            if (estado) {
+                estado.textContent = tbody.children.length === 0 ? 'No se encontraron usuarios.' : '';
+            }
+        } catch (err) {
+            if (idSolicitud === solicitud && estado) {
+                estado.textContent = 'No se pudo cargar el listado de usuarios.';
+            }
+            console.error('Error al cargar usuarios:', err);
+        } finally {
+            if (idSolicitud === solicitud) cargando = false;
+        }
+    }
+
+    // Recarga desde la primera página al cambiar filtros u orden
+    function reiniciarListado() {
+        siguienteCursor = null;
+        cargarPagina(true);
+    }
+
     // Event listeners para filtros
     if (filtro) {
-        filtro.addEventListener('input', aplicarFiltros);
+        filtro.addEventListener('input', function() {
+            clearTimeout(temporizador);
+            temporizador = setTimeout(reiniciarListado, 300);
+        });
     }
-    
+
     if (filtroUA) {
-        filtroUA.addEventListener('change', aplicarFiltros);
+        filtroUA.addEventListener('change', reiniciarListado);
+    }
+
+    if (btnCargarMas) {
+        btnCargarMas.addEventListener('click', () => cargarPagina(false));
     }
-});
\ No newline at end of file
+
+    // Ordenamiento por columna (segundo clic invierte el sentido)
+    tabla.querySelectorAll('th.th-ordenable').forEach(th => {
+        th.addEventListener('click', function() {
+            const nuevoOrden = this.dataset.orden;
+            descendente = (nuevoOrden === orden) ? !descendente : false;
+            orden = nuevoOrden;
+            tabla.querySelectorAll('th.th-ordenable').forEach(h => h.removeAttribute('aria-sort'));
+            this.setAttribute('aria-sort', descendente ? 'descending' : 'ascending');
+            reiniciarListado();
+        });
+    });
+
+    // Permite a otros scripts (p. ej. user_form.js) refrescar el listado
+    window.recargarListadoUsuarios = reiniciarListado;
+
+    cargarPagina(true);
+});
@@ -0,0 +1,82 @@
+// JavaScript para trabajos en segundo plano (SPs largos)
+// Envía el trabajo, sigue su estado por SSE (o polling si SSE no está disponible)
+// y resuelve con el resultado que devolvería el endpoint síncrono.
+
+(function() {
+    const ESTADOS_FINALES = ['completado', 'error'];
+    const INTERVALO_POLLING_MS = 2000;
+
+    async function obtenerResultado(jobId) {
+        const resp = await fetch(`/jobs/${jobId}/resultado`);
+        const data = await resp.json();
+        if (data.estado === 'error') {
+            throw new Error(data.error || 'El proceso terminó con error');
+        }
+        return data.resultado;
+    }
+
+    function esperarPorSSE(jobId, onEstado) {
+        return new Promise((resolve, reject) => {
+            const fuente = new EventSource(`/jobs/${jobId}/eventos`);
+            const manejar = (evento) => {
+                let estado = null;
+                try { estado = JSON.parse(evento.data); } catch (e) { return; }
+                if (onEstado) onEstado(estado);
+                if (ESTADOS_FINALES.includes(estado.estado)) {
+                    fuente.close();
+                    resolve(estado);
+                }
+            };
+            ['pendiente', 'ejecutando', 'completado', 'error'].forEach(tipo => fuente.addEventListener(tipo, manejar));
+            fuente.onerror = () => {
+                fuente.close();
+                reject(new Error('sse'));
+            };
+        });
+    }
+
+    async function esperarPorPolling(jobId, onEstado) {
+        while (true) {
+            const resp = await fetch(`/jobs/${jobId}`);
+            if (!resp.ok) throw new Error('No se pudo consultar el estado del proceso');
+            const estado = await resp.json();
+            if (onEstado) onEstado(estado);
+            if (ESTADOS_FINALES.includes(estado.estado)) return estado;
+            await new Promise(r => setTimeout(r, INTERVALO_POLLING_MS));
+        }
+    }
+
+    /**
+     * Envía un trabajo y espera su resultado.
+     * @param {string} url - endpoint de envío (p. ej. '/matricula/jobs/actualizar_matricula')
+     * @param {object} body - cuerpo JSON
+     * @param {function} [onEstado] - callback con cada cambio de estado
+     * @returns {Promise<object>} resultado del trabajo
+     */
+    async function ejecutarJob(url, body, onEstado) {
+        const resp = await fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(body)
+        });
+        const envio = await resp.json();
+        if (!resp.ok || envio.error || !envio.job_id) {
+            // Errores de validación previos al encolado se devuelven tal cual
+            if (envio.error) return envio;
+            throw new Error(envio.detail || 'No se pudo iniciar el proceso');
+        }
+
+        if (window.EventSource) {
+            try {
+                await esperarPorSSE(envio.job_id, onEstado);
+            } catch (e) {
+                await esperarPorPolling(envio.job_id, onEstado);
+            }
+        } else {
+            await esperarPorPolling(envio.job_id, onEstado);
+        }
+        return obtenerResultado(envio.job_id);
+    }
+
+    window.ejecutarJob = ejecutarJob;
+})();
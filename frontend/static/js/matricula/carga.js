@@ -0,0 +1,999 @@
+// Captura de matrícula: carga de datos del SP y render de la tabla por semestre/turno.
+// Usa las variables globales que declara matricula_consulta.html (gruposEdad, tiposIngreso, ...).
+
+// Crear mapa de semestres (ID -> Nombre)
+const semestresMap = semestresMapJson || {};
+
+console.log('📊 Grupos de edad disponibles:', gruposEdad);
+console.log('📊 Tipos de ingreso disponibles:', tiposIngreso);
+console.log('📊 Semestres map:', semestresMap);
+console.log('📅 Periodo literal:', periodoLiteral);
+console.log(`🔐 Modo de vista: ${modoVista} (Rol ID: ${idRol}, Es capturista: ${esCapturista})`);
+
+// Mapa: Total Grupos por semestre Y turno (independiente por cada combinación semestre-turno)
+let totalGruposPorSemestreYTurno = {};
+
+function generarClaveTotalGrupos() {
+    const periodo = document.getElementById('periodo').value;
+    const programa = document.getElementById('programa').value;
+    const modalidad = document.getElementById('modalidad').value;
+    const turno = document.getElementById('turno').value;
+    // Ahora incluimos turno porque el valor es independiente por turno
+    return `totalgrupos_${periodo}_${programa}_${modalidad}_${turno}`;
+}
+
+function cargarTotalGruposDeLocalStorage() {
+    try {
+        const key = generarClaveTotalGrupos();
+        const raw = localStorage.getItem(key);
+        totalGruposPorSemestreYTurno = raw ? JSON.parse(raw) : {};
+        if (typeof totalGruposPorSemestreYTurno !== 'object' || totalGruposPorSemestreYTurno === null) {
+            totalGruposPorSemestreYTurno = {};
+        }
+    } catch (e) {
+        console.warn('No se pudo cargar totalGruposPorSemestreYTurno de localStorage', e);
+        totalGruposPorSemestreYTurno = {};
+    }
+}
+
+function guardarTotalGruposEnLocalStorage() {
+    try {
+        const key = generarClaveTotalGrupos();
+        localStorage.setItem(key, JSON.stringify(totalGruposPorSemestreYTurno));
+    } catch (e) {
+        console.warn('No se pudo guardar totalGruposPorSemestreYTurno en localStorage', e);
+    }
+}
+
+function aplicarTotalGruposParaSemestreYTurnoActual() {
+    const semestreActual = document.getElementById('semestre').value;
+    const turnoActual = document.getElementById('turno').value;
+    const inputTG = document.getElementById('input-total-grupos');
+    if (!inputTG) return;
+
+    // Generar clave única para semestre-turno
+    const claveSemestreTurno = `${semestreActual}_${turnoActual}`;
+
+    // Valor guardado para esta combinación semestre-turno
+    const valor = totalGruposPorSemestreYTurno[claveSemestreTurno];
+    inputTG.value = (valor !== undefined && valor !== null) ? valor : '';
+
+    // Bloquear sólo si el semáforo de este semestre está en 3
+    const estado = estadosSemaforoPorSemestre[parseInt(semestreActual)];
+    const debeBloquear = parseInt(estado) === 3;
+    inputTG.disabled = !!debeBloquear;
+    inputTG.classList.toggle('input-disabled', !!debeBloquear);
+    if (debeBloquear) {
+        inputTG.title = 'Semestre finalizado (bloqueado)';
+    } else {
+        inputTG.title = '';
+    }
+
+    console.log(`📊 Total Grupos aplicado para ${claveSemestreTurno}: ${inputTG.value}`);
+}
+
+// Función para cargar datos existentes cuando cambien los filtros usando SP
+async function cargarDatosExistentes() {
+    const periodo = document.getElementById('periodo').value;
+    const programa = document.getElementById('programa').value;
+    const modalidad = document.getElementById('modalidad').value;
+    const semestre = document.getElementById('semestre').value;
+    const turno = document.getElementById('turno').value;
+
+    console.log('=== cargarDatosExistentes ===');
+    console.log('Periodo:', periodo);
+    console.log('Programa:', programa);
+    console.log('Modalidad:', modalidad);
+    console.log('Semestre:', semestre);
+    console.log('Turno:', turno);
+
+    if (!periodo || !programa || !modalidad || !semestre || !turno) {
+        console.log('Faltan datos en los filtros, generando tabla vacía');
+        generarTablaVacia();
+        return;
+    }
+
+    try {
+        const response = await fetch('/matricula/obtener_datos_existentes_sp', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                periodo: periodo,
+                programa: programa,
+                modalidad: modalidad,
+                semestre: semestre,
+                turno: turno
+            })
+        });
+
+        const resultado = await response.json();
+        console.log('Resultado del backend:', resultado);
+        if (resultado.version !== undefined) {
+            versionMatricula = resultado.version;
+        }
+
+        if (resultado.error) {
+            console.error('Error al cargar datos existentes:', resultado.error);
+            generarTablaVacia();
+            return;
+        }
+
+        // Si el backend devolvió rows (raw) preferimos reconstruir la tabla desde ellas
+        if (resultado.rows && resultado.rows.length > 0) {
+            console.log('✅ Renderizando desde SP con rows:', resultado.rows.length);
+            console.log('Primera fila:', resultado.rows[0]);
+            renderMatriculaFromSP(resultado.rows, resultado.datos || {});
+        } else {
+            console.log('⚠️ No hay rows del SP, generando tabla por defecto');
+            // Si no hay datos del SP, generar estructura por defecto
+            generarTablaVacia();
+        }
+
+    } catch (error) {
+        console.error('❌ Error al cargar datos existentes:', error);
+        generarTablaVacia();
+    }
+}
+
+// Función para procesar los estados de semáforo que vienen del SP
+function procesarEstadosSemaforoDelSP(rows) {
+    console.log('🚦 === PROCESANDO ESTADOS DE SEMÁFORO DEL SP ===');
+
+    // NO limpiar estados anteriores - queremos preservar estados validados
+    // estadosSemaforoPorSemestre = {}; // ❌ ELIMINADO
+
+    if (!rows || rows.length === 0) {
+        console.log('⚠️ No hay rows del SP para procesar estados');
+        return;
+    }
+
+    // Cargar estados validados desde localStorage
+    const estadosValidados = cargarEstadosValidadosDeLocalStorage();
+    console.log('💾 Estados validados desde localStorage:', estadosValidados);
+
+    // Mapeo de semestres a números
+    const semestreANumero = {
+        'Primero': 1, 'Primer': 1, '1': 1, 'I': 1,
+        'Segundo': 2, '2': 2, 'II': 2,
+        'Tercero': 3, 'Tercer': 3, '3': 3, 'III': 3,
+        'Cuarto': 4, '4': 4, 'IV': 4,
+        'Quinto': 5, '5': 5, 'V': 5,
+        'Sexto': 6, '6': 6, 'VI': 6,
+        'Séptimo': 7, 'Septimo': 7, '7': 7, 'VII': 7,
+        'Octavo': 8, '8': 8, 'VIII': 8,
+        'Noveno': 9, '9': 9, 'IX': 9,
+        'Décimo': 10, 'Decimo': 10, '10': 10, 'X': 10
+    };
+
+    // Extraer semestres únicos disponibles del SP
+    const semestresUnicos = new Set();
+
+    // Procesar cada fila del SP
+    rows.forEach(row => {
+        const semestre = row.Semestre;
+        const idSemaforo = row.Id_Semaforo;
+
+        if (semestre && idSemaforo) {
+            const semestreNum = semestreANumero[semestre] || parseInt(semestre) || null;
+
+            if (semestreNum) {
+                // Agregar a la lista de semestres únicos
+                semestresUnicos.add(semestreNum);
+
+                // NUEVA LÓGICA: Preservar estados validados (estado 3)
+                if (estadosValidados[semestreNum] === 3) {
+                    // Este semestre ya fue validado, NO sobrescribir
+                    console.log(`🔒 Semestre ${semestreNum} YA VALIDADO - Preservando estado 3`);
+                    estadosSemaforoPorSemestre[semestreNum] = 3;
+                } else {
+                    // Semestre no validado, usar estado del SP
+                    if (!estadosSemaforoPorSemestre[semestreNum] || idSemaforo > estadosSemaforoPorSemestre[semestreNum]) {
+                        estadosSemaforoPorSemestre[semestreNum] = idSemaforo;
+                        console.log(`🚦 Semestre "${semestre}" (${semestreNum}) -> Estado ${idSemaforo} del SP`);
+                    }
+                }
+            }
+        }
+    });
+
+    // Actualizar variable global con semestres disponibles (ordenados)
+    semestresDisponiblesSP = Array.from(semestresUnicos).sort((a, b) => a - b);
+    console.log('📚 Semestres disponibles del SP:', semestresDisponiblesSP);
+
+    console.log('🚦 Estados finales por semestre:', estadosSemaforoPorSemestre);
+}
+
+// Función para procesar TODAS las filas del SP y organizar los datos por semestre
+function procesarYGuardarDatosPorSemestre(rows) {
+    console.log('📦 Procesando y guardando datos por semestre...');
+
+    if (!rows || rows.length === 0) {
+        console.log('⚠️ No hay filas para procesar');
+        return;
+    }
+
+    // Determinar turno actual (ID y nombre)
+    const turnoActualId = parseInt(document.getElementById('turno')?.value || '');
+    let turnoActualNombre = document.getElementById('turno-nombre')?.textContent || '';
+    if ((!turnoActualNombre || !turnoActualNombre.trim()) && Array.isArray(turnosDisponibles)) {
+        const t = turnosDisponibles.find(x => parseInt(x.Id_Turno) === turnoActualId);
+        if (t) turnoActualNombre = t.Turno;
+    }
+
+    // Si el SP trae columna de Turno, filtrar a solo el turno actual
+    const turnoCandidates = ['Turno','Nombre_Turno','Id_Turno','IdTurno'];
+    const firstRow = rows[0] || {};
+    const firstKeys = Object.keys(firstRow);
+    function findKeyLocal(cands) {
+        for (let c of cands) if (firstKeys.includes(c)) return c;
+        const low = firstKeys.reduce((acc,k)=>{acc[k.toLowerCase()]=k;return acc;},{});
+        for (let c of cands) if (low[c.toLowerCase()]) return low[c.toLowerCase()];
+        return null;
+    }
+    const turnoKey = findKeyLocal(turnoCandidates);
+    const rowsTurno = turnoKey
+        ? rows.filter(r => {
+            const tv = r[turnoKey];
+            const byNameT = String(tv).toLowerCase() === String(turnoActualNombre).toLowerCase();
+            const byIdT = !isNaN(parseInt(tv)) && parseInt(tv) === turnoActualId;
+            return byNameT || byIdT;
+        })
+        : rows;
+    console.log(`🧭 Filtrado por turno: ${rows.length} → ${rowsTurno.length} filas para turno actual (${turnoActualNombre || turnoActualId})`);
+
+    // Objeto temporal para organizar datos por semestre
+    const datosPorSemestre = {};
+
+    rowsTurno.forEach((row, index) => {
+        // Extraer información de la fila
+        const semestre = row.Semestre;
+        const tipoIngreso = row.Tipo_de_Ingreso;
+        const grupoEdad = row.Grupo_Edad;
+        const sexo = row.Sexo;
+        // NO forzar 0: conservar null/undefined si vienen así del SP
+        const matricula = (row.Matricula !== undefined) ? row.Matricula : row['Total'];
+
+        if (!semestre || !tipoIngreso || !grupoEdad || !sexo) {
+            console.log(`⚠️ Fila ${index} incompleta, saltando...`);
+            return;
+        }
+
+        // Convertir semestre a ID numérico
+        const semestreANumero = {
+            'Primero': 1, '1': 1, 'I': 1,
+            'Segundo': 2, '2': 2, 'II': 2,
+            'Tercero': 3, '3': 3, 'III': 3,
+            'Cuarto': 4, '4': 4, 'IV': 4,
+            'Quinto': 5, '5': 5, 'V': 5,
+            'Sexto': 6, '6': 6, 'VI': 6,
+            'Septimo': 7, 'Séptimo': 7, '7': 7, 'VII': 7,
+            'Octavo': 8, '8': 8, 'VIII': 8,
+            'Noveno': 9, '9': 9, 'IX': 9,
+            'Décimo': 10, 'Decimo': 10, '10': 10, 'X': 10
+        };
+
+        const semestreId = semestreANumero[semestre] || parseInt(semestre) || null;
+        if (!semestreId) {
+            console.log(`⚠️ No se pudo convertir semestre "${semestre}" a ID numérico`);
+            return;
+        }
+
+        // Convertir tipo de ingreso a ID
+        const tipoNorm = String(tipoIngreso).toLowerCase();
+        let tipoId = '1';
+        if (tipoNorm.includes('nuevo')) {
+            tipoId = '1';
+        } else if (tipoNorm.includes('reingreso') || tipoNorm.includes('re-ingreso')) {
+            tipoId = '2';
+        } else if (tipoNorm.includes('repet') || tipoNorm.includes('repetidor')) {
+            tipoId = '3';
+        }
+
+        // Convertir sexo
+        const sexoStr = String(sexo).toLowerCase();
+        let sexoFinal = 'M';
+        if (sexoStr.includes('mujer') || sexoStr.startsWith('f')) {
+            sexoFinal = 'F';
+        }
+
+        // Buscar el ID del grupo de edad en base al valor
+        // grupoEdad del SP es el VALOR ("18"), necesitamos el ID (4)
+        const grupoEdadObj = gruposEdad.find(g => String(g.Grupo_Edad) === String(grupoEdad));
+        const grupoEdadId = grupoEdadObj ? grupoEdadObj.Id_Grupo_Edad : grupoEdad;
+
+        if (!grupoEdadObj) {
+            console.warn(`⚠️ No se encontró ID para grupo de edad "${grupoEdad}", usando valor directo`);
+        }
+
+        // Inicializar objeto del semestre si no existe
+        if (!datosPorSemestre[semestreId]) {
+            datosPorSemestre[semestreId] = {};
+        }
+
+        // Crear clave única: tipoId_grupoEdadID_sexo (USAR ID, NO VALOR)
+        const key = `${tipoId}_${grupoEdadId}_${sexoFinal}`;
+
+        console.log(`🔑 Fila ${index}: Semestre ${semestreId}, Grupo "${grupoEdad}"→ID:${grupoEdadId}, Clave: ${key}`);
+
+        // Guardar el valor SOLO si es numérico (incluye 0); si es null/undefined, no guardar clave
+        const valor = parseInt(matricula);
+        if (!isNaN(valor)) {
+            datosPorSemestre[semestreId][key] = valor;
+        }
+    });
+
+    // Guardar en la variable global datosMatriculaPorSemestre (por turno y semestre)
+    if (!datosMatriculaPorSemestre[turnoActualId]) {
+        datosMatriculaPorSemestre[turnoActualId] = {};
+    }
+    for (let semestreId in datosPorSemestre) {
+        const datos = datosPorSemestre[semestreId];
+        const cantidadDatos = Object.keys(datos).length;
+        const existente = datosMatriculaPorSemestre[turnoActualId][semestreId] || {};
+        if (Object.keys(existente).length === 0) {
+            datosMatriculaPorSemestre[turnoActualId][semestreId] = datos;
+            console.log(`💾 [Turno ${turnoActualId}] Guardados ${cantidadDatos} valores del SP para semestre ${semestreId}`);
+        } else {
+            console.log(`📌 [Turno ${turnoActualId}] Semestre ${semestreId} ya tiene ${Object.keys(existente).length} valores guardados, conservando...`);
+        }
+    }
+
+    console.log('✅ Procesamiento y guardado por semestre completado');
+}
+
+// Renderiza la tabla de captura a partir de rows devueltas por el SP con nueva estructura
+// rows: array de objetos; datosMap: mapa opcional para poblar valores
+    function renderMatriculaFromSP(rows, datosMap) {
+        console.log('=== renderMatriculaFromSP ===');
+        console.log('Número de rows:', rows.length);
+        console.log('datosMap:', datosMap);
+
+        // EXTRAER Y POBLAR TOTAL GRUPOS (y sembrar mapa por semestre)
+        if (rows && rows.length > 0) {
+            // Debug: mostrar columnas disponibles en la primera fila
+            console.log('🔍 Columnas disponibles en la primera fila del SP:', Object.keys(rows[0]));
+            console.log('🔍 Primera fila completa:', rows[0]);
+            // Determinar columnas
+            const turnoCandidates = ['Turno','Nombre_Turno','Id_Turno','IdTurno'];
+            const semestreCandidates = ['Semestre', 'Id_Semestre', 'IdSemestre'];
+            const findKey = (cands, sample) => {
+                const keys = Object.keys(sample||{});
+                for (let c of cands) if (keys.includes(c)) return c;
+                const low = keys.reduce((a,k)=>{a[k.toLowerCase()]=k;return a;},{});
+                for (let c of cands) if (low[c.toLowerCase()]) return low[c.toLowerCase()];
+                return null;
+            };
+            const turnoKey = findKey(turnoCandidates, rows[0]);
+            const semestreKeyLocal = findKey(semestreCandidates, rows[0]);
+
+            // Contexto actual
+            const semestreActualId = parseInt(document.getElementById('semestre')?.value || '');
+            const semestreActualNombre = semestresMap[semestreActualId];
+            const turnoActualId = parseInt(document.getElementById('turno')?.value || '');
+            let turnoActualNombre = document.getElementById('turno-nombre')?.textContent || '';
+            if ((!turnoActualNombre || !turnoActualNombre.trim()) && Array.isArray(turnosDisponibles)) {
+                const t = turnosDisponibles.find(x => parseInt(x.Id_Turno) === turnoActualId);
+                if (t) turnoActualNombre = t.Turno;
+            }
+
+            // Filtrar filas por semestre y turno para obtener el total correcto del contexto
+            const filasContexto = rows.filter(r => {
+                let semOK = true;
+                if (semestreKeyLocal) {
+                    const v = r[semestreKeyLocal];
+                    const byName = String(v).toLowerCase() === String(semestreActualNombre).toLowerCase();
+                    const byId = !isNaN(parseInt(v)) && parseInt(v) === semestreActualId;
+                    semOK = byName || byId;
+                }
+                if (!semOK) return false;
+                if (turnoKey) {
+                    const tv = r[turnoKey];
+                    const byNameT = String(tv).toLowerCase() === String(turnoActualNombre).toLowerCase();
+                    const byIdT = !isNaN(parseInt(tv)) && parseInt(tv) === turnoActualId;
+                    return byNameT || byIdT;
+                }
+                return true;
+            });
+
+            // Buscar 'Grupos' dentro del contexto filtrado (campo actualizado del SP modificado)
+            let totalGrupos = null;
+            for (const r of (filasContexto.length ? filasContexto : rows)) {
+                // Prioridad: buscar columna 'Grupos' primero (nueva estructura del SP)
+                if (r && Object.prototype.hasOwnProperty.call(r, 'Grupos')) { totalGrupos = r.Grupos; break; }
+                if (r && Object.prototype.hasOwnProperty.call(r, 'grupos')) { totalGrupos = r.grupos; break; }
+                if (r && Object.prototype.hasOwnProperty.call(r, 'GRUPOS')) { totalGrupos = r.GRUPOS; break; }
+                // Fallback: buscar 'salones' para compatibilidad con versiones anteriores
+                if (r && Object.prototype.hasOwnProperty.call(r, 'salones')) { totalGrupos = r.salones; break; }
+                if (r && Object.prototype.hasOwnProperty.call(r, 'Salones')) { totalGrupos = r.Salones; break; }
+                if (r && Object.prototype.hasOwnProperty.call(r, 'SALONES')) { totalGrupos = r.SALONES; break; }
+            }
+            const totalGruposNum = (totalGrupos === null || totalGrupos === undefined || totalGrupos === '')
+                ? 0
+                : (isNaN(parseInt(totalGrupos)) ? 0 : parseInt(totalGrupos));
+
+            console.log(`🏢 Total Grupos extraído del SP: ${totalGrupos} -> convertido a: ${totalGruposNum}`);
+
+            // Sembrar/actualizar almacén por semestre-turno con el valor del SP
+            try {
+                cargarTotalGruposDeLocalStorage();
+                const claveSemestreTurno = `${semestreActualId}_${turnoActualId}`;
+                const prev = totalGruposPorSemestreYTurno[claveSemestreTurno];
+                const spHasValue = !isNaN(totalGruposNum);
+                // Regla: si no hay valor previo o es 0 y el SP trae >0, o viene diferente, actualizar
+                if (spHasValue && (prev === undefined || prev === null || (parseInt(prev) === 0 && totalGruposNum > 0) || parseInt(prev) !== totalGruposNum)) {
+                    totalGruposPorSemestreYTurno[claveSemestreTurno] = totalGruposNum;
+                    guardarTotalGruposEnLocalStorage();
+                    console.log(`💾 Total Grupos (SP) para semestre-turno ${claveSemestreTurno}: ${totalGruposNum} (almacenado)`);
+                }
+            } catch (e) { console.warn('No se pudo sembrar Total Grupos desde SP', e); }
+
+            // Poblar el input con el valor vigente del almacén (o el del SP si no hay)
+            const totalGruposInput = document.getElementById('input-total-grupos');
+            if (totalGruposInput) {
+                const claveSemestreTurno = `${semestreActualId}_${turnoActualId}`;
+                const valorAlmacen = totalGruposPorSemestreYTurno[claveSemestreTurno];
+                const definitivo = (valorAlmacen !== undefined && valorAlmacen !== null) ? valorAlmacen : totalGruposNum;
+                totalGruposInput.value = (definitivo !== undefined && definitivo !== null) ? String(definitivo) : '';
+            }
+        }
+
+        // PRIMERO: Cargar estados validados guardados en localStorage
+        cargarEstadosValidadosDeLocalStorage();
+
+        // NUEVA LÓGICA: Extraer estados de semáforo del SP (ahora respeta los estados validados)
+        // IMPORTANTE: Esto también actualiza semestresDisponiblesSP con los semestres únicos del SP
+        procesarEstadosSemaforoDelSP(rows);
+
+        // REGENERAR PESTAÑAS basadas en los semestres reales del SP
+        if (semestresDisponiblesSP && semestresDisponiblesSP.length > 0) {
+            console.log('🔄 Regenerando pestañas con semestres del SP:', semestresDisponiblesSP);
+
+            // Obtener información del programa y periodo
+            const programaSelect = document.getElementById('programa');
+            const programaTexto = programaSelect ? programaSelect.selectedOptions[0]?.text : '';
+
+            // Usar la variable global periodoLiteral del backend
+            const periodoTexto = periodoLiteral || '';
+
+            let semestresAMostrar = [...semestresDisponiblesSP];
+
+            // Detectar si el periodo termina en /1 o /2
+            const esPeriodo1 = periodoTexto.includes('/1');
+            const esPeriodo2 = periodoTexto.includes('/2');
+
+            console.log('📊 Contexto actual:');
+            console.log('   Programa:', programaTexto);
+            console.log('   Periodo:', periodoTexto);
+            console.log('   Es periodo /1:', esPeriodo1);
+            console.log('   Es periodo /2:', esPeriodo2);
+
+            // LÓGICA 1: Tronco Común
+            if (programaTexto && programaTexto.toLowerCase().includes('tronco común')) {
+                console.log('🎓 TRONCO COMÚN detectado');
+
+                if (esPeriodo1) {
+                    semestresAMostrar = [1]; // Solo Semestre 1 para periodo /1
+                    console.log('   ✅ Periodo /1 → Mostrando SOLO Semestre 1');
+                } else if (esPeriodo2) {
+                    semestresAMostrar = [2]; // Solo Semestre 2 para periodo /2
+                    console.log('   ✅ Periodo /2 → Mostrando SOLO Semestre 2');
+                } else {
+                    console.warn('   ⚠️ Periodo sin /1 ni /2, mostrando semestres disponibles del SP');
+                }
+            }
+            // LÓGICA 2: Técnico en... (Medio Superior)
+            else if (programaTexto && (programaTexto.toLowerCase().includes('técnico') || programaTexto.toLowerCase().includes('tecnico'))) {
+                console.log('🔧 TÉCNICO (Medio Superior) detectado');
+
+                // Eliminar semestres 1 y 2 (exclusivos de Tronco Común)
+                semestresAMostrar = semestresAMostrar.filter(sem => sem > 2);
+                console.log('   🚫 Removidos semestres 1 y 2:', semestresAMostrar);
+
+                if (esPeriodo1) {
+                    // Periodo /1: Solo semestres IMPARES (3, 5, 7, 9...)
+                    semestresAMostrar = semestresAMostrar.filter(sem => sem % 2 !== 0);
+                    console.log('   ✅ Periodo /1 → Mostrando solo IMPARES:', semestresAMostrar);
+                } else if (esPeriodo2) {
+                    // Periodo /2: Solo semestres PARES (4, 6, 8, 10...)
+                    semestresAMostrar = semestresAMostrar.filter(sem => sem % 2 === 0);
+                    console.log('   ✅ Periodo /2 → Mostrando solo PARES:', semestresAMostrar);
+                } else {
+                    console.warn('   ⚠️ Periodo sin /1 ni /2, mostrando todos (excepto 1 y 2)');
+                }
+            }
+            // LÓGICA 3: Otros programas (usar semestres del SP)
+            else {
+                console.log('📚 Otro tipo de programa, usando semestres del SP sin filtrar');
+            }
+
+            console.log('🎯 Semestres finales a mostrar:', semestresAMostrar);
+
+            // Validar que haya al menos un semestre para mostrar
+            if (semestresAMostrar.length === 0) {
+                console.error('❌ No hay semestres disponibles después del filtrado!');
+                alert('No hay semestres disponibles para este programa y periodo.');
+                return;
+            }
+
+            // Generar las pestañas
+            generarPestanasSemestres(semestresAMostrar);
+
+            // Validar que el semestre actual esté en la lista de disponibles
+            const semestreActualElement = document.getElementById('semestre');
+            const semestreActualId = semestreActualElement ? parseInt(semestreActualElement.value) : null;
+
+            // Si el semestre actual no está en los disponibles, seleccionar el primero
+            if (!semestresAMostrar.includes(semestreActualId)) {
+                const primerSemestre = semestresAMostrar[0];
+                console.log(`⚠️ Semestre ${semestreActualId} no disponible. Cambiando a semestre ${primerSemestre}`);
+                semestreActualElement.value = primerSemestre;
+
+                // Actualizar pestaña activa
+                const tabs = document.querySelectorAll('.semestre-tab');
+                tabs.forEach(tab => {
+                    if (parseInt(tab.getAttribute('data-semestre')) === primerSemestre) {
+                        tab.classList.add('active');
+                    } else {
+                        tab.classList.remove('active');
+                    }
+                });
+            }
+        } else {
+            console.warn('⚠️ No se extrajeron semestres del SP, usando configuración por defecto');
+        }
+
+        // PROCESAR Y GUARDAR DATOS DE TODOS LOS SEMESTRES
+        procesarYGuardarDatosPorSemestre(rows);
+
+        const tbody = document.getElementById('matricula-tbody');
+
+        // Validar que el tbody exista
+        if (!tbody) {
+            console.error('❌ Error: No se encontró el elemento tbody con id "matricula-tbody"');
+            return;
+        }
+
+        tbody.innerHTML = '';
+
+        if (!rows || rows.length === 0) {
+            console.log('⚠️ No hay rows para renderizar, generando tabla vacía');
+            generarTablaVacia();
+            return;
+        }
+
+        // Obtener el semestre actualmente seleccionado
+        const semestreActualElement = document.getElementById('semestre');
+        const semestreActualId = semestreActualElement ? parseInt(semestreActualElement.value) : null;
+
+        // Obtener el nombre del semestre actual desde el mapa
+        const semestreActualNombre = semestreActualId ? semestresMap[semestreActualId] : null;
+
+        console.log(`📌 Semestre seleccionado: ID=${semestreActualId}, Nombre="${semestreActualNombre}"`);
+
+        // Heurísticas para columnas posibles
+        const tipoCandidates = ['Id_Tipo_Ingreso','Id_TipoIngreso','Tipo_Id','Tipo_de_Ingreso','TipoIngreso','Tipo_Ingreso','Tipo'];
+        const grupoCandidates = ['Id_Grupo_Edad','Id_GrupoEdad','IdGrupoEdad','Grupo_Edad','GrupoEdad','Grupo'];
+        const sexoCandidates = ['Id_Sexo','IdSexo','Sexo','Genero','Nombre_Sexo'];
+        const matriculaCandidates = ['Matricula','Total','Cantidad','Numero','Valor'];
+        const semestreCandidates = ['Semestre', 'Id_Semestre', 'IdSemestre'];
+        const turnoCandidates = ['Turno','Nombre_Turno','Id_Turno','IdTurno'];
+
+        console.log('Columnas disponibles en la primera fila:', Object.keys(rows[0]));
+
+        // Determinar columnas presentes
+        const first = rows[0] || {};
+        const keys = Object.keys(first);
+
+        function findKey(cands) {
+            for (let c of cands) if (keys.includes(c)) return c;
+            const low = keys.reduce((acc,k)=>{acc[k.toLowerCase()]=k;return acc;},{})
+            for (let c of cands) if (low[c.toLowerCase()]) return low[c.toLowerCase()];
+            return null;
+        }
+
+        const tipoKey = findKey(tipoCandidates);
+        const grupoKey = findKey(grupoCandidates);
+        const sexoKey = findKey(sexoCandidates);
+        const matriculaKey = findKey(matriculaCandidates);
+        const semestreKey = findKey(semestreCandidates);
+        const turnoKey = findKey(turnoCandidates);
+
+        // Determinar turno actual (nombre e id)
+        const turnoActualId = parseInt(document.getElementById('turno')?.value || '');
+        let turnoActualNombre = document.getElementById('turno-nombre')?.textContent || '';
+        if ((!turnoActualNombre || !turnoActualNombre.trim()) && Array.isArray(turnosDisponibles)) {
+            const t = turnosDisponibles.find(x => parseInt(x.Id_Turno) === turnoActualId);
+            if (t) turnoActualNombre = t.Turno;
+        }
+
+        // FILTRAR: Solo procesar filas del semestre actual
+        const rowsFiltradas = rows.filter(r => {
+            // Filtro por semestre
+            let semestreMatch = true;
+            if (semestreKey && semestreActualNombre) {
+                const semestreRow = r[semestreKey];
+                // Aceptar coincidencia por nombre o por id
+                const byName = String(semestreRow).toLowerCase() === String(semestreActualNombre).toLowerCase();
+                const byId = !isNaN(parseInt(semestreRow)) && parseInt(semestreRow) === semestreActualId;
+                semestreMatch = byName || byId;
+                if (!semestreMatch) {
+                    // console.log(`⏭️ Semestre no coincide (${semestreRow} vs ${semestreActualNombre}/${semestreActualId})`);
+                    return false;
+                }
+            }
+
+            // Filtro por turno (si la columna existe)
+            if (turnoKey) {
+                const turnoRow = r[turnoKey];
+                const byNameTurno = String(turnoRow).toLowerCase() === String(turnoActualNombre).toLowerCase();
+                const byIdTurno = !isNaN(parseInt(turnoRow)) && parseInt(turnoRow) === turnoActualId;
+                const turnoMatch = byNameTurno || byIdTurno;
+                return semestreMatch && turnoMatch;
+            }
+
+            return semestreMatch;
+        });
+
+        console.log(`🔍 Filtrando: ${rows.length} filas totales → ${rowsFiltradas.length} filas del semestre "${semestreActualNombre}"`);
+
+        if (rowsFiltradas.length === 0) {
+            console.log('⚠️ No hay datos para el semestre seleccionado, generando tabla vacía');
+            generarTablaVacia();
+            return;
+        }
+
+        // Construir estructura: agrupar por edad y tipo de ingreso
+        const edadMap = {};
+
+        console.log('🔍 Procesando rows del SP para poblar inputs...');
+
+        rowsFiltradas.forEach((r, index) => {
+            const tipoVal = tipoKey ? r[tipoKey] : (r['Tipo_de_Ingreso'] || r['Tipo'] || r['TipoIngreso'] || null);
+            const grupoVal = grupoKey ? r[grupoKey] : (r['Grupo_Edad'] || r['Grupo'] || r['GrupoEdad'] || null);
+            const sexoVal = sexoKey ? r[sexoKey] : (r['Sexo'] || r['Genero'] || null);
+            const matriculaVal = matriculaKey ? r[matriculaKey] : (r['Matricula'] || r['Total'] || 0);
+
+            console.log(`Row ${index + 1}:`, {
+                tipo: tipoVal,
+                grupo: grupoVal,
+                sexo: sexoVal,
+                matricula: matriculaVal
+            });
+
+            // Normalizar grupo de edad: si SP trae ID, convertir a etiqueta usando gruposEdad
+            let grupoId = String(grupoVal || '');
+            let grupoLabel = String(grupoVal || '');
+            const geByLabel = gruposEdad.find(g => String(g.Grupo_Edad) === String(grupoVal));
+            const geById = gruposEdad.find(g => String(g.Id_Grupo_Edad) === String(grupoVal));
+            const ge = geByLabel || geById || null;
+            if (ge) {
+                grupoId = String(ge.Grupo_Edad);
+                grupoLabel = String(ge.Grupo_Edad);
+            }
+
+            // Determinar sexo: Hombre/M → M, Mujer/F → F
+            let sexo = 'M';
+            if (sexoVal) {
+                const sexoStr = String(sexoVal).toLowerCase();
+                if (sexoStr.includes('mujer') || sexoStr.startsWith('f')) {
+                    sexo = 'F';
+                }
+            }
+
+            // Normalizar tipo de ingreso y mapear a ID
+            let tipoCategoria = 'Nuevo Ingreso';
+            let tipoId = '1'; // Default
+
+            if (tipoVal) {
+                const tipoNorm = String(tipoVal).toLowerCase();
+                if (tipoNorm.includes('nuevo')) {
+                    tipoCategoria = 'Nuevo Ingreso';
+                    tipoId = '1';
+                } else if (tipoNorm.includes('reingreso') || tipoNorm.includes('re-ingreso')) {
+                    tipoCategoria = 'Reingreso';
+                    tipoId = '2';
+                } else if (tipoNorm.includes('repet') || tipoNorm.includes('repetidor')) {
+                    tipoCategoria = 'Repetidores';
+                    tipoId = '3';
+                }
+            }
+
+            console.log(`✅ Procesando: Grupo=${grupoId}, Tipo=${tipoCategoria}(ID:${tipoId}), Sexo=${sexo}, Valor=${matriculaVal}`);
+
+            // Inicializar estructura para este grupo de edad
+            if (!edadMap[grupoId]) {
+                edadMap[grupoId] = {
+                    grupoLabel: grupoLabel,
+                    'Nuevo Ingreso': { tipoId: '1', M: undefined, F: undefined },
+                    'Reingreso': { tipoId: '2', M: undefined, F: undefined },
+                    'Repetidores': { tipoId: '3', M: undefined, F: undefined }
+                };
+            }
+
+            // Asignar el valor de matrícula SOLO si es numérico (incluye 0 explícito)
+            const vNum = parseInt(matriculaVal);
+            if (!isNaN(vNum)) {
+                edadMap[grupoId][tipoCategoria][sexo] = vNum;
+                console.log(`🎯 Asignado: ${tipoCategoria} ${sexo} = ${vNum} (grupo ${grupoId})`);
+            } else {
+                console.log(`⚪ Sin valor numérico para ${tipoCategoria} ${sexo} en grupo ${grupoId}`);
+            }
+        });
+
+        console.log('📊 edadMap con datos del SP:', edadMap);
+        console.log('🔑 Claves en edadMap:', Object.keys(edadMap));
+
+        // Usar TODOS los grupos de edad definidos, no solo los que tienen datos
+        if (!gruposEdad || gruposEdad.length === 0) {
+            console.log('⚠️ No hay grupos de edad definidos');
+            generarTablaVacia();
+            return;
+        }
+
+        console.log('📊 Grupos de edad disponibles (sin ordenar):', gruposEdad.map(g => `${g.Grupo_Edad} (ID:${g.Id_Grupo_Edad})`));
+
+        // Función para ordenar grupos de edad correctamente
+        function ordenarGruposEdad(grupos) {
+            // Crear una copia del array para no modificar el original
+            const gruposCopia = [...grupos];
+
+            return gruposCopia.sort((a, b) => {
+                const edadA = String(a.Grupo_Edad).trim();
+                const edadB = String(b.Grupo_Edad).trim();
+
+                console.log(`🔄 Comparando: "${edadA}" vs "${edadB}"`);
+
+                // Casos especiales: <18 va primero
+                if (edadA.startsWith('<') && !edadB.startsWith('<')) {
+                    console.log(`  → "${edadA}" va primero (es <)`);
+                    return -1;
+                }
+                if (!edadA.startsWith('<') && edadB.startsWith('<')) {
+                    console.log(`  → "${edadB}" va primero (es <)`);
+                    return 1;
+                }
+
+                // Casos especiales: >=40 va al final
+                if ((edadA.startsWith('>') || edadA.includes('>=')) && !(edadB.startsWith('>') || edadB.includes('>='))) {
+                    console.log(`  → "${edadA}" va al final (es >)`);
+                    return 1;
+                }
+                if (!(edadA.startsWith('>') || edadA.includes('>=')) && (edadB.startsWith('>') || edadB.includes('>='))) {
+                    console.log(`  → "${edadB}" va al final (es >)`);
+                    return -1;
+                }
+
+                // Para números o rangos, extraer el primer número
+                const getNumero = (str) => {
+                    // Extraer el primer número encontrado
+                    const match = str.match(/\d+/);
+                    return match ? parseInt(match[0]) : 999;
+                };
+
+                const numA = getNumero(edadA);
+                const numB = getNumero(edadB);
+
+                console.log(`  → Números extraídos: ${numA} vs ${numB}`);
+
+                return numA - numB;
+            });
+        }
+
+        // Ordenar grupos de edad
+        console.log('🔀 Iniciando ordenamiento...');
+        const gruposEdadOrdenados = ordenarGruposEdad(gruposEdad);
+        console.log('✅ Grupos de edad ordenados:', gruposEdadOrdenados.map(g => `${g.Grupo_Edad} (ID:${g.Id_Grupo_Edad})`));
+
+        // Renderizar filas por TODOS los grupos de edad (no solo los que tienen datos)
+        gruposEdadOrdenados.forEach((edadObj, index) => {
+            const grupoIdBD = edadObj.Id_Grupo_Edad; // Este es el ID en la BD: 4, 5, 6, etc.
+            const grupoValor = String(edadObj.Grupo_Edad); // Este es el valor real: "18", "19", etc.
+            const grupoLabel = grupoValor;
+
+            // Buscar si hay datos para este grupo de edad en el edadMap
+            // El edadMap usa el VALOR como clave ("18"), no el ID
+            const edadData = edadMap[grupoValor] || {
+                grupoLabel: grupoLabel,
+                'Nuevo Ingreso': { tipoId: '1', M: 0, F: 0 },
+                'Reingreso': { tipoId: '2', M: 0, F: 0 },
+                'Repetidores': { tipoId: '3', M: 0, F: 0 }
+            };
+
+            // Log detallado para depuración
+            if (edadMap[grupoValor]) {
+                console.log(`✅ Fila ${index}: Grupo "${grupoValor}" (ID:${grupoIdBD}) - Tiene datos:`, edadMap[grupoValor]);
+            } else {
+                console.log(`⚪ Fila ${index}: Grupo "${grupoValor}" (ID:${grupoIdBD}) - Sin datos (vacío)`);
+            }
+            const tr = document.createElement('tr');
+            tr.style.borderBottom = '1px solid #e0e0e0';
+            tr.style.transition = 'all 0.2s ease';
+            tr.onmouseover = () => tr.style.backgroundColor = '#f5f5f5';
+            tr.onmouseout = () => tr.style.backgroundColor = '';
+
+            // Columna de Edad (solo una vez)
+            const tdEdad = document.createElement('td');
+            tdEdad.textContent = edadData.grupoLabel || grupoValor;
+            tdEdad.style.padding = '12px';
+            tdEdad.style.textAlign = 'center';
+            tdEdad.style.fontWeight = '500';
+            tdEdad.style.fontSize = '15px';
+            tdEdad.style.color = '#424242';
+            tdEdad.style.background = '#f8f9fa';
+            tdEdad.style.verticalAlign = 'middle';
+            tr.appendChild(tdEdad);
+
+            // Columnas para cada tipo de ingreso
+            ['Nuevo Ingreso', 'Reingreso', 'Repetidores'].forEach(tipoCategoria => {
+                const tdTipo = document.createElement('td');
+                tdTipo.style.padding = '10px';
+                tdTipo.style.verticalAlign = 'middle';
+
+                const datos = edadData[tipoCategoria];
+                const tipoId = datos.tipoId;
+
+                // Obtener valores del SP (preservar cero explícito). Si el semestre está finalizado (3), mostrar 0 en ausentes
+                const estadoSem = estadosSemaforoPorSemestre[parseInt(semestreActualId)];
+                const mostrarCeroSiVacio = parseInt(estadoSem) === 3;
+                const valorM = (datos.M === undefined || datos.M === null || datos.M === '')
+                    ? (mostrarCeroSiVacio ? '0' : '')
+                    : String(datos.M);
+                const valorF = (datos.F === undefined || datos.F === null || datos.F === '')
+                    ? (mostrarCeroSiVacio ? '0' : '')
+                    : String(datos.F);
+
+                console.log(`🎯 Generando inputs: ${tipoCategoria} - Grupo "${grupoValor}" (ID:${grupoIdBD})`);
+                console.log(`   - valorM: ${valorM} (tipo: ${typeof valorM}, isNaN: ${isNaN(valorM)})`);
+                console.log(`   - valorF: ${valorF} (tipo: ${typeof valorF}, isNaN: ${isNaN(valorF)})`);
+
+                tdTipo.innerHTML = `
+                <div style="display:inline-flex; gap:6px; justify-content:center; align-items:center; width:auto;">
+
+                    <div style="display:inline-flex; align-items:center; gap:3px; padding:2px 4px; background:#e3f2fd; border-radius:4px; border:1px solid #90caf9; line-height:1;">
+                        <div style="font-weight:700;color:#1976d2;font-size:11px;min-width:14px;text-align:center;">H</div>
+                        <input type="number"
+                            id="input_${tipoId}_${grupoIdBD}_M"
+                            value="${valorM}"
+                            min="0"
+                            class="input-matricula-nueva"
+                            data-tipo-ingreso="${tipoId}"
+                            data-grupo-edad="${grupoIdBD}"
+                            data-sexo="M"
+                            style="width:42px;padding:2px 3px;border:2px solid #2196f3;border-radius:3px;background:#fff;color:#1976d2;font-weight:600;text-align:center;font-size:11px;line-height:1.1;"
+                            placeholder="">
+                    </div>
+
+                    <div style="display:inline-flex; align-items:center; gap:3px; padding:2px 4px; background:#fce4ec; border-radius:4px; border:1px solid #f48fb1; line-height:1;">
+                        <div style="font-weight:700;color:#c2185b;font-size:11px;min-width:14px;text-align:center;">M</div>
+                        <input type="number"
+                            id="input_${tipoId}_${grupoIdBD}_F"
+                            value="${valorF}"
+                            min="0"
+                            class="input-matricula-nueva"
+                            data-tipo-ingreso="${tipoId}"
+                            data-grupo-edad="${grupoIdBD}"
+                            data-sexo="F"
+                            style="width:42px;padding:2px 3px;border:2px solid #e91e63;border-radius:3px;background:#fff;color:#c2185b;font-weight:600;text-align:center;font-size:11px;line-height:1.1;"
+                            placeholder="">
+                    </div>
+                </div>`;
+
+                tr.appendChild(tdTipo);
+            });
+
+            tbody.appendChild(tr);
+        });
+
+    // Agregar fila de totales
+    const trTot = document.createElement('tr');
+    trTot.className = 'totales-row';
+    trTot.style.borderTop = '3px solid #8B2635';
+    trTot.style.backgroundColor = '#f8f9fa';
+    trTot.innerHTML = `
+        <td style="padding:12px;text-align:center;font-weight:700;font-size:16px;background:#8B2635;color:white;">TOTALES</td>
+        <td style="padding:12px;text-align:center;" colspan="3">
+            <div style="display:flex;justify-content:space-around;align-items:center;flex-wrap:wrap;gap:15px;">
+                <div style="flex:1;min-width:120px;">
+                    <div style="background:#e3f2fd;padding:8px;border-radius:8px;border:2px solid #2196f3;">
+                        <div style="font-size:13px;color:#1976d2;font-weight:600;margin-bottom:4px;">Masculino</div>
+                        <div id="total_masculino" style="font-size:24px;color:#1976d2;font-weight:700;">0</div>
+                    </div>
+                </div>
+                <div style="flex:1;min-width:120px;">
+                    <div style="background:#fce4ec;padding:8px;border-radius:8px;border:2px solid #e91e63;">
+                        <div style="font-size:13px;color:#c2185b;font-weight:600;margin-bottom:4px;">Femenino</div>
+                        <div id="total_femenino" style="font-size:24px;color:#c2185b;font-weight:700;">0</div>
+                    </div>
+                </div>
+                <div style="flex:1;min-width:140px;">
+                    <div style="background:#e8f5e9;padding:8px;border-radius:8px;border:2px solid #4caf50;">
+                        <div style="font-size:13px;color:#2e7d32;font-weight:600;margin-bottom:4px;">TOTAL GENERAL</div>
+                        <div id="total_general" style="font-size:26px;color:#2e7d32;font-weight:700;">0</div>
+                    </div>
+                </div>
+            </div>
+            <div id="totales-fijos-container">
+            </div>
+        </td>`;
+    tbody.appendChild(trTot);
+
+    // Re-bind events for inputs
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+    inputs.forEach(input => {
+        input.addEventListener('input', calcularTotales);
+        input.addEventListener('change', calcularTotales);
+        input.addEventListener('focus', scrollToVisibleInput);
+        // Guardar datos automáticamente cuando cambie el valor
+        input.addEventListener('input', guardarDatosSemestreActual);
+        input.addEventListener('change', guardarDatosSemestreActual);
+    });
+
+    // Bind para Total Grupos por semestre-turno
+    const tgInput = document.getElementById('input-total-grupos');
+    if (tgInput && !tgInput.dataset.bound) {
+        tgInput.addEventListener('input', () => {
+            const semestreActual = document.getElementById('semestre').value;
+            const turnoActual = document.getElementById('turno').value;
+            const claveSemestreTurno = `${semestreActual}_${turnoActual}`;
+            totalGruposPorSemestreYTurno[claveSemestreTurno] = tgInput.value;
+            guardarTotalGruposEnLocalStorage();
+        });
+        tgInput.addEventListener('change', () => {
+            const semestreActual = document.getElementById('semestre').value;
+            const turnoActual = document.getElementById('turno').value;
+            const claveSemestreTurno = `${semestreActual}_${turnoActual}`;
+            totalGruposPorSemestreYTurno[claveSemestreTurno] = tgInput.value;
+            guardarTotalGruposEnLocalStorage();
+            // Salones va en cada celda: cambiar Total Grupos obliga a enviar todo el grid
+            cambiosGridActual().totalGrupos = true;
+        });
+        tgInput.dataset.bound = '1';
+    }
+
+    // Si se pasó un datosMap, poblar valores
+    if (datosMap) {
+        for (let key in datosMap) {
+            const val = datosMap[key];
+            const parts = key.split('_');
+            if (parts.length === 3) {
+                const idTipo = parts[0], idGrupo = parts[1], sexo = parts[2];
+                const el = document.getElementById(`input_${idTipo}_${idGrupo}_${sexo}`);
+                if (el) el.value = val;
+            }
+        }
+    }
+
+    // Restaurar datos guardados del semestre actual después de renderizar
+    // NOTA: Solo restaurar si hay datos guardados localmente,
+    // de lo contrario conservar los valores que vienen del SP
+    const semestreActual = parseInt(document.getElementById('semestre').value);
+    const turnoActualId_forRestore = parseInt(document.getElementById('turno').value);
+    setTimeout(() => {
+        const datosExistentes = (datosMatriculaPorSemestre[turnoActualId_forRestore] || {})[semestreActual] || {};
+        if (Object.keys(datosExistentes).length > 0) {
+            console.log('📦 Hay datos guardados localmente, restaurando...');
+            restaurarDatosSemestre(semestreActual);
+        } else {
+            console.log('📊 No hay datos guardados localmente');
+            console.log('   (Los datos del SP ya fueron guardados por procesarYGuardarDatosPorSemestre)');
+
+            // Solo aplicar reglas de validación por semestre
+            updateInputsBySemestre(semestreActual);
+        }
+    }, 100); // Pequeño delay para asegurar que los inputs estén renderizados
+
+calcularTotales();
+// Cargar Total Grupos del semestre-turno y aplicar bloqueo si corresponde
+cargarTotalGruposDeLocalStorage();
+aplicarTotalGruposParaSemestreYTurnoActual();
+// Si el semestre actual ya fue finalizado (semaforo=3), bloquear edición
+aplicarBloqueoPorSemaforo();
+
+// NUEVO: Inicializar sistema de validación por turnos
+inicializarSistemaValidacionTurnos();
+
+// NUEVO: Aplicar modo de vista según el rol
+aplicarModoVista();
+}
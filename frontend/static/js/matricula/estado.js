@@ -0,0 +1,136 @@
+// Captura de matrícula: estado global (turnos, semáforos, datos por semestre, deltas) y su
+// persistencia en localStorage. turnosDisponibles y semaforoEstados vienen del template.
+
+// Variables globales para manejo de turnos
+let turnoActualIndex = 0;
+
+console.log('🚦 Estados del semáforo cargados:', semaforoEstados);
+
+// Almacén global de datos por semestre y turno
+// Estructura: { [turnoId]: { [semestreId]: { "tipo_grupo_sexo": valor } } }
+let datosMatriculaPorSemestre = {};
+
+// Almacén de estados de semáforo por semestre (viene del SP)
+let estadosSemaforoPorSemestre = {};
+
+// Almacén de semestres disponibles extraídos del SP (dinámico por nivel educativo)
+let semestresDisponiblesSP = [];
+
+// ===== GUARDADO POR DELTAS =====
+// Versión de los datos de matrícula (UA/periodo) sobre la que se está editando.
+// Se obtiene al consultar el SP y se actualiza con cada guardado.
+let versionMatricula = null;
+
+// Celdas modificadas por el usuario desde el último guardado
+// Estructura: { "programa_modalidad_semestre_turno": { celdas: Set("tipo_grupo_sexo"), totalGrupos: bool } }
+const celdasModificadas = {};
+
+function claveGridActual() {
+    const campos = ['programa', 'modalidad', 'semestre', 'turno'];
+    return campos.map(id => document.getElementById(id)?.value || '').join('_');
+}
+
+function cambiosGridActual() {
+    const clave = claveGridActual();
+    if (!celdasModificadas[clave]) {
+        celdasModificadas[clave] = { celdas: new Set(), totalGrupos: false };
+    }
+    return celdasModificadas[clave];
+}
+
+function marcarCeldaModificada(input) {
+    const key = `${input.getAttribute('data-tipo-ingreso')}_${input.getAttribute('data-grupo-edad')}_${input.getAttribute('data-sexo')}`;
+    cambiosGridActual().celdas.add(key);
+}
+
+function limpiarCeldasModificadas() {
+    delete celdasModificadas[claveGridActual()];
+}
+
+// Lee sólo la versión vigente (una fila) tras escrituras que no la regresan, p. ej. los trabajos
+async function refrescarVersionMatricula() {
+    try {
+        const periodo = document.getElementById('periodo').value;
+        const r = await fetch(`/versiones/?formato=1&periodo=${encodeURIComponent(periodo)}`);
+        if (r.ok) {
+            versionMatricula = (await r.json()).version;
+        }
+    } catch (e) {
+        console.warn('No se pudo refrescar la versión de datos:', e);
+    }
+}
+
+// ============================================
+// FUNCIONES PARA PERSISTENCIA DE SEMÁFOROS
+// ============================================
+
+/**
+ * Genera una clave única para localStorage basada en los filtros actuales
+ * Formato: "semaforo_periodoId_programaId_modalidadId_turnoId"
+ */
+function generarClaveLocalStorage() {
+    const periodo = document.getElementById('periodo').value;
+    const programa = document.getElementById('programa').value;
+    const modalidad = document.getElementById('modalidad').value;
+    const turno = document.getElementById('turno').value;
+
+    return `semaforo_${periodo}_${programa}_${modalidad}_${turno}`;
+}
+
+/**
+ * Guarda los estados validados (estado 3) en localStorage
+ */
+function guardarEstadosValidadosEnLocalStorage() {
+    const clave = generarClaveLocalStorage();
+
+    // Filtrar solo los semestres con estado 3 (validados)
+    const estadosValidados = {};
+    for (let semestre in estadosSemaforoPorSemestre) {
+        if (estadosSemaforoPorSemestre[semestre] === 3) {
+            estadosValidados[semestre] = 3;
+        }
+    }
+
+    try {
+        localStorage.setItem(clave, JSON.stringify(estadosValidados));
+        console.log(`💾 Estados validados guardados en localStorage:`, estadosValidados);
+    } catch (e) {
+        console.error('❌ Error al guardar en localStorage:', e);
+    }
+}
+
+/**
+ * Carga los estados validados desde localStorage
+ */
+function cargarEstadosValidadosDeLocalStorage() {
+    const clave = generarClaveLocalStorage();
+
+    try {
+        const datos = localStorage.getItem(clave);
+        if (datos) {
+            const estadosValidados = JSON.parse(datos);
+            console.log(`📂 Estados validados cargados desde localStorage:`, estadosValidados);
+            return estadosValidados;
+        }
+    } catch (e) {
+        console.error('❌ Error al cargar desde localStorage:', e);
+    }
+
+    return {}; // Retornar objeto vacío si no hay datos
+}
+
+/**
+ * Marca un semestre como validado (estado 3) y lo persiste
+ */
+function marcarSemestreComoValidado(semestreNum) {
+    console.log(`✅ Marcando semestre ${semestreNum} como validado (estado 3)`);
+
+    // Actualizar en memoria
+    estadosSemaforoPorSemestre[semestreNum] = 3;
+
+    // Persistir en localStorage
+    guardarEstadosValidadosEnLocalStorage();
+
+    // Actualizar UI
+    actualizarColoresPestanas();
+}
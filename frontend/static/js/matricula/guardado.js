@@ -0,0 +1,412 @@
+// Captura de matrícula: guardado (completo y por deltas) e inicialización de los inputs.
+
+function guardarMatricula() {
+    // Validar que al menos un campo tenga datos (ahora aceptando 0)
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+    let hasData = false;
+
+    for (let input of inputs) {
+        // Aceptar cualquier valor numérico válido (incluyendo 0)
+        const valor = parseInt(input.value);
+        if (!isNaN(valor) && valor >= 0) {
+            hasData = true;
+            break;
+        }
+    }
+
+    if (!hasData) {
+        alert('⚠️ Por favor, ingrese datos antes de guardar.');
+        return;
+    }
+
+    // Validar que los filtros estén seleccionados
+    const periodo = document.getElementById('periodo').value;
+    const programa = document.getElementById('programa').value;
+    const semestre = document.getElementById('semestre').value;
+    const modalidad = document.getElementById('modalidad').value;
+    const turno = document.getElementById('turno').value;
+
+    if (!periodo || !programa || !semestre || !modalidad || !turno) {
+        alert('⚠️ Por favor, complete todos los filtros antes de guardar.');
+        return;
+    }
+
+    // Obtener valor de Total Grupos
+    const totalGruposInput = document.getElementById('input-total-grupos');
+    const totalGrupos = totalGruposInput ? parseInt(totalGruposInput.value) || 0 : 0;
+
+    // Recopilar todos los datos del formulario
+    const data = {
+        periodo: periodo,
+        programa: programa,
+        semestre: semestre,
+        modalidad: modalidad,
+        turno: turno,
+        total_grupos: totalGrupos,
+        datos_matricula: {}
+    };
+
+    // Obtener datos solo de inputs válidos (no deshabilitados y con datos reales)
+    inputs.forEach(input => {
+        // Solo procesar si el input NO está deshabilitado
+        if (!input.disabled) {
+            const tipoIngreso = input.getAttribute('data-tipo-ingreso');
+            const grupoEdad = input.getAttribute('data-grupo-edad');
+            const sexo = input.getAttribute('data-sexo');
+            const inputValue = input.value ? input.value.trim() : '';
+
+            // Solo enviar si:
+            // 1. El usuario realmente puso un valor (incluyendo '0')
+            // 2. O fue auto-rellenado por el botón
+            const isAutoFilled = input.hasAttribute('data-auto-filled');
+            const hasUserValue = inputValue !== '';
+
+            if (hasUserValue || isAutoFilled) {
+                const valor = parseInt(inputValue) || 0;
+
+                if (valor >= 0) {
+                    const key = `${tipoIngreso}_${grupoEdad}_${sexo}`;
+                    data.datos_matricula[key] = {
+                        tipo_ingreso: tipoIngreso,
+                        grupo_edad: grupoEdad,
+                        sexo: sexo,
+                        matricula: valor,
+                        salones: totalGrupos
+                    };
+                }
+            }
+        }
+    });
+
+    // Mostrar indicador de carga
+    const saveBtn = document.querySelector('.btn-primary');
+    const originalText = saveBtn.textContent;
+    saveBtn.textContent = '⏳ Guardando...';
+    saveBtn.disabled = true;
+
+    // Enviar datos al backend
+    fetch('/matricula/guardar_captura_completa', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.mensaje) {
+            alert('✅ ' + data.mensaje);
+            limpiarFormulario();
+        } else {
+            alert('❌ Error: ' + (data.error || 'Error desconocido'));
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('❌ Error al procesar la solicitud. Por favor, intente nuevamente.');
+    })
+    .finally(() => {
+        // Restaurar botón
+        saveBtn.textContent = originalText;
+        saveBtn.disabled = false;
+    });
+}
+
+// Nuevo flujo unificado: guarda en Temp_Matricula y, si todo va bien, ejecuta el SP de actualización
+async function guardarYActualizarMatricula() {
+    // Validar que al menos un campo tenga datos (incluye 0)
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+    let hasData = false;
+    for (let input of inputs) {
+        const valor = parseInt(input.value);
+        if (!isNaN(valor) && valor >= 0) { hasData = true; break; }
+    }
+    if (!hasData) { alert('⚠️ Por favor, ingrese datos antes de guardar.'); return; }
+
+    // Filtros requeridos
+    const periodo = document.getElementById('periodo').value;
+    const programa = document.getElementById('programa').value;
+    const semestre = document.getElementById('semestre').value;
+    const modalidad = document.getElementById('modalidad').value;
+    const turno = document.getElementById('turno').value;
+    if (!periodo || !programa || !semestre || !modalidad || !turno) {
+        alert('⚠️ Por favor, complete todos los filtros antes de guardar.');
+        return;
+    }
+
+    const totalGruposInput = document.getElementById('input-total-grupos');
+    const totalGrupos = totalGruposInput ? (parseInt(totalGruposInput.value) || 0) : 0;
+
+    // Guardado por deltas: sólo se envían las celdas modificadas. Se envía el grid completo
+    // si cambió Total Grupos (Salones va en cada celda) o si aún no se conoce la versión base.
+    const cambiosGrid = cambiosGridActual();
+    const usarDelta = versionMatricula !== null && !cambiosGrid.totalGrupos;
+    const celdas = {};
+    inputs.forEach(input => {
+        if (!input.disabled) {
+            const tipoIngreso = input.getAttribute('data-tipo-ingreso');
+            const grupoEdad = input.getAttribute('data-grupo-edad');
+            const sexo = input.getAttribute('data-sexo');
+            const key = `${tipoIngreso}_${grupoEdad}_${sexo}`;
+            const inputValue = input.value ? input.value.trim() : '';
+            const isAutoFilled = input.hasAttribute('data-auto-filled');
+            const hasUserValue = inputValue !== '';
+            if (usarDelta && !cambiosGrid.celdas.has(key) && !isAutoFilled) return;
+            if (hasUserValue || isAutoFilled) {
+                const valor = parseInt(inputValue) || 0;
+                if (valor >= 0) {
+                    celdas[key] = {
+                        tipo_ingreso: tipoIngreso,
+                        grupo_edad: grupoEdad,
+                        sexo: sexo,
+                        matricula: valor,
+                        salones: totalGrupos
+                    };
+                }
+            }
+        }
+    });
+    if (usarDelta && Object.keys(celdas).length === 0) {
+        alert('ℹ️ No hay cambios por guardar.');
+        return;
+    }
+
+    const payload = {
+        periodo, programa, semestre, modalidad, turno,
+        total_grupos: totalGrupos
+    };
+    if (usarDelta) {
+        payload.cambios = celdas;
+        payload.version_base = versionMatricula;
+    } else {
+        payload.datos_matricula = celdas;
+    }
+
+    const btn = document.getElementById('btn-guardar-matricula');
+    const original = btn.textContent;
+    btn.textContent = '⏳ Guardando…';
+    btn.disabled = true;
+
+    try {
+        // Guardar en Temp_Matricula y consolidar en Matricula en una sola petición/transacción
+        const url = usarDelta ? '/matricula/guardar_delta' : '/matricula/guardar_y_consolidar';
+        console.log(`💾 Guardando ${Object.keys(celdas).length} celdas (${usarDelta ? 'delta' : 'completo'})`);
+        const r = await fetch(url, {
+            method: 'POST', headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        });
+        const d = await r.json();
+        if (r.status === 409) {
+            // Otro usuario guardó antes: refrescar datos y versión; las celdas editadas se conservan
+            alert(`⚠️ ${d.error}`);
+            await cargarDatosExistentes();
+            return;
+        }
+        if (d.detail) throw new Error(d.detail);
+        if (d.error) throw new Error(d.error);
+        if (d.warning) { alert(`⚠️ ${d.warning}`); return; }
+
+        if (d.version !== undefined && d.version !== null) {
+            versionMatricula = d.version;
+        }
+        limpiarCeldasModificadas();
+
+        // Éxito total
+        let msg = `✅ ${d.mensaje}`;
+        if (typeof d.registros_procesados !== 'undefined') {
+            msg += `\n📊 Registros procesados: ${d.registros_procesados}`;
+        }
+        msg += `\n👤 Usuario: ${d.usuario || ''}`;
+        msg += `\n📅 Período: ${d.periodo || periodo}`;
+        alert(msg);
+
+        // El guardado completo trae las filas oficiales del SP; el delta no las necesita
+        // porque la tabla ya muestra lo que se guardó
+        if (d.rows && d.rows.length > 0) {
+            renderMatriculaFromSP(d.rows, {});
+        } else if (!usarDelta) {
+            location.reload();
+        }
+    } catch (e) {
+        console.error('Error en Guardar Matrícula unificado:', e);
+        alert(`❌ Error al guardar la matrícula: ${e.message}`);
+    } finally {
+        btn.textContent = original;
+        btn.disabled = false;
+    }
+}
+
+function scrollToVisibleInput(event) {
+    const input = event.target;
+    const container = document.querySelector('.tabla-matricula-completa tbody');
+
+    if (!container || !input) return;
+
+    // Agregar un pequeño retraso para que el foco se establezca completamente
+    setTimeout(() => {
+        // Obtener la fila que contiene el input
+        const row = input.closest('tr');
+        if (!row) return;
+
+        // Calcular la posición de la fila dentro del contenedor
+        const rowRect = row.getBoundingClientRect();
+        const containerRect = container.getBoundingClientRect();
+
+        // Posición relativa de la fila dentro del contenedor scrolleable
+        const rowTop = rowRect.top - containerRect.top + container.scrollTop;
+        const rowHeight = rowRect.height;
+
+        // Altura útil del contenedor (descontando espacio para totales)
+        const containerHeight = container.clientHeight;
+        const reservedSpace = 80; // Espacio para totales y margen
+        const usableHeight = containerHeight - reservedSpace;
+
+        // Centrar la fila en el área visible
+        const targetScrollTop = rowTop - (usableHeight / 2) + (rowHeight / 2);
+
+        // Aplicar scroll suave hacia la posición calculada
+        container.scrollTo({
+            top: Math.max(0, targetScrollTop), // No permitir scroll negativo
+            behavior: 'smooth'
+        });
+
+        // Resaltar temporalmente el input para que sea más visible
+        input.style.boxShadow = '0 0 10px 3px rgba(110, 3, 67, 0.5)';
+        input.style.transform = 'scale(1.05)';
+
+        // Quitar el resaltado después de 1 segundo
+        setTimeout(() => {
+            input.style.boxShadow = '';
+            input.style.transform = '';
+        }, 1000);
+
+    }, 10); // Pequeño retraso para asegurar que el foco esté establecido
+}
+
+function limpiarFormulario() {
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+    inputs.forEach(input => {
+        input.value = '';
+        // Quitar marcador de auto-rellenado
+        input.removeAttribute('data-auto-filled');
+    });
+
+    // Limpiar también el input de Total Grupos
+    const totalGruposInput = document.getElementById('input-total-grupos');
+    if (totalGruposInput) {
+        totalGruposInput.value = '';
+    }
+
+    calcularTotales(); // Recalcular totales después de limpiar
+}
+
+// Agregar eventos a los inputs para cálculos automáticos
+document.addEventListener('DOMContentLoaded', function() {
+    // Inicializar pestañas de semestres según programa seleccionado
+    const programaEl = document.getElementById('programa');
+    if (programaEl) {
+        const opt = programaEl.selectedOptions[0];
+        const maxSem = parseInt(opt?.getAttribute('data-max-semestre')) || 5;
+        generarPestanasSemestres(maxSem);
+
+        // Actualizar pestañas cuando cambie el programa
+        // NOTA: Las pestañas se regenerarán dinámicamente cuando lleguen los datos del SP
+        programaEl.addEventListener('change', function() {
+            console.log('🔄 Programa cambiado, los datos del SP determinarán los semestres disponibles');
+            // NO regenerar pestañas aquí - se hará en renderMatriculaFromSP con datos del SP
+        });
+    }
+
+    // Inicializar turno
+    if (turnosDisponibles && turnosDisponibles.length > 0) {
+        document.getElementById('turno-nombre').textContent = turnosDisponibles[0].Turno;
+        document.getElementById('turno').value = turnosDisponibles[0].Id_Turno;
+        document.getElementById('btn-turno-anterior').disabled = true;
+        document.getElementById('btn-turno-siguiente').disabled = turnosDisponibles.length <= 1;
+    }
+
+    // Agregar eventos a los filtros para cargar datos existentes
+    const filtros = ['periodo', 'programa', 'modalidad'];
+    filtros.forEach(filtroId => {
+        const elemento = document.getElementById(filtroId);
+        if (elemento) {
+            elemento.addEventListener('change', function() {
+                // Limpiar datos guardados cuando cambie programa o modalidad
+                console.log(`🔄 Cambió ${filtroId}, limpiando datos guardados`);
+                datosMatriculaPorSemestre = {};
+
+                // NUEVO: Limpiar turnos validados
+                turnosValidadosPorSemestre = {};
+                try {
+                    const key = `turnos_validados_${document.getElementById('periodo').value}_${document.getElementById('programa').value}_${document.getElementById('modalidad').value}`;
+                    localStorage.removeItem(key);
+                    console.log('🗑️ Turnos validados limpiados de localStorage');
+                } catch (e) {
+                    console.warn('No se pudo limpiar turnos validados de localStorage', e);
+                }
+
+                // Limpiar atributos data-auto-filled de todos los inputs
+                const inputs = document.querySelectorAll('input.input-matricula-nueva');
+                inputs.forEach(input => {
+                    input.removeAttribute('data-auto-filled');
+                });
+
+                // Limpiar también el input de Total Grupos
+                const totalGruposInput = document.getElementById('input-total-grupos');
+                if (totalGruposInput) {
+                    totalGruposInput.value = '';
+                }
+
+                console.log('🗑️ Datos de matrícula, Total Grupos, marcadores auto-filled y turnos validados limpiados por cambio de contexto');
+
+                // Reinicializar botón de validar
+                reinicializarBotonValidar();
+
+                // Cargar nuevos datos
+                cargarDatosExistentes();
+
+                // Asegurar que roles de validación no puedan editar después de cargar
+                setTimeout(() => {
+                    aplicarModoVista();
+                }, 200);
+            });
+        }
+    });
+
+    // Generar tabla vacía inicial
+    generarTablaVacia();
+
+    // Cargar datos existentes desde el SP para poblar la vista al inicio
+    cargarDatosExistentes();
+
+    // Calcular totales iniciales
+    calcularTotales();
+});
+
+// Función para validar campos vacíos
+function validarCamposVacios() {
+    const inputs = document.querySelectorAll('.input-matricula-nueva');
+    let camposVacios = 0;
+
+    inputs.forEach(input => {
+        if (!input.value || input.value.trim() === '') {
+            camposVacios++;
+        }
+    });
+
+    if (camposVacios > 0) {
+        if (confirm(`Se detectaron ${camposVacios} campos vacíos. ¿Desea llenarlos con ceros?`)) {
+            inputs.forEach(input => {
+                if (!input.value || input.value.trim() === '') {
+                    input.value = '0';
+                    // Marcar como auto-rellenado
+                    input.setAttribute('data-auto-filled', 'true');
+                }
+            });
+            calcularTotales();
+            alert('Los campos vacíos se han llenado con ceros.');
+        }
+    } else {
+        alert('✓ Todos los campos están completos.');
+    }
+}
@@ -0,0 +1,268 @@
+// Captura de matrícula: panel de depuración del SP y panel de notificaciones.
+
+// Función para renderizar rows devueltas por el backend (para debug)
+function renderSPRows(rows) {
+    const panel = document.getElementById('sp-debug-panel');
+    const content = document.getElementById('sp-debug-content');
+    if (!rows || !rows.length) {
+        panel.style.display = 'none';
+        return;
+    }
+    panel.style.display = 'block';
+    // Construir tabla HTML
+    const cols = Object.keys(rows[0]);
+    let html = '<table style="width:100%; border-collapse:collapse;">';
+    html += '<thead><tr>' + cols.map(c => `<th style="border:1px solid #ccc;padding:6px;background:#f5f5f5;">${c}</th>`).join('') + '</tr></thead>';
+    html += '<tbody>';
+    rows.forEach(r => {
+        html += '<tr>' + cols.map(c => `<td style="border:1px solid #eee;padding:6px;">${(r[c] === null || r[c] === undefined) ? '' : r[c]}</td>`).join('') + '</tr>';
+    });
+    html += '</tbody></table>';
+    content.innerHTML = html;
+}
+
+// Función para actualizar la matrícula definitiva usando el SP
+function actualizarMatricula() {
+    // Confirmar la acción
+    if (!confirm('🔄 ¿Está seguro de que desea actualizar la matrícula definitiva?\n\n⚠️ Esta acción:\n• Transferirá todos los datos de la tabla temporal a la matrícula oficial\n• Limpiará la tabla temporal\n• No se puede deshacer\n\n¿Continuar?')) {
+        return;
+    }
+
+    const updateBtn = document.querySelector('.btn-success');
+    const originalText = updateBtn.textContent;
+    updateBtn.textContent = '⏳ Actualizando...';
+    updateBtn.disabled = true;
+
+    // Obtener período desde el campo hidden
+    const periodo = document.getElementById('periodo').value;
+
+    ejecutarJob('/matricula/jobs/actualizar_matricula', {
+        periodo: periodo
+    })
+    .then(data => {
+        if (data.error) {
+            throw new Error(data.error);
+        }
+
+        console.log('Respuesta del servidor:', data);
+
+        if (data.warning) {
+            alert(`⚠️ ${data.warning}`);
+            return;
+        }
+
+        // Mostrar mensaje de éxito detallado
+        let mensaje = `✅ ${data.mensaje}\n\n`;
+        mensaje += `📊 Registros procesados: ${data.registros_procesados}\n`;
+        mensaje += `🧹 Tabla temporal limpiada: ${data.temp_matricula_limpiada ? 'Sí' : 'No'}\n`;
+        mensaje += `👤 Usuario: ${data.usuario}\n`;
+        mensaje += `📅 Período: ${data.periodo}\n`;
+        mensaje += `⏰ Fecha: ${new Date(data.timestamp).toLocaleString()}`;
+
+        alert(mensaje);
+
+        // Opcional: Recargar la página o actualizar la vista
+         location.reload();
+    })
+    .catch(error => {
+        console.error('Error al actualizar matrícula:', error);
+        alert(`❌ Error al actualizar la matrícula: ${error.message}`);
+    })
+    .finally(() => {
+        // Restaurar botón
+        updateBtn.textContent = originalText;
+        updateBtn.disabled = false;
+    });
+}
+
+// FUNCIÓN YA NO NECESARIA - El informe siempre está visible
+/*
+function toggleInformePanel() {
+    const panel = document.getElementById('informe-panel');
+    if(!panel) return;
+    if (panel.style.display === 'none' || panel.style.display === '') {
+        panel.style.display = 'block';
+        // Asegurar contenido actualizado antes de desplazarse
+        try { actualizarInforme(); } catch(e){ console.warn('No se pudo actualizar informe antes de scroll', e); }
+        // Desplazamiento suave al panel
+        setTimeout(() => {
+            panel.scrollIntoView({behavior:'smooth', block:'start'});
+        }, 50);
+    } else {
+        panel.style.display = 'none';
+    }
+}
+*/
+
+// ¡Nombre corregido a actualizarInforme!
+function actualizarInforme() {
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+
+    // 1. Estructura de totales (usando IDs como clave para que coincida con data-tipo-ingreso)
+    const totalesTipoIngreso = {
+        '1': { M: 0, F: 0, label: 'Nuevo Ingreso' },
+        '2': { M: 0, F: 0, label: 'Reingreso' },
+        '3': { M: 0, F: 0, label: 'Repetidores' }
+    };
+
+    // Almacenará { 'id_grupo_edad': { M: 0, F: 0, label: '18', sortKey: 18 } }
+    const totalesGrupoEdad = {};
+
+    // PASO 1: Recolectar y sumar los datos
+    inputs.forEach(input => {
+        const valor = parseInt(input.value) || 0;
+        const tipoIngresoId = input.getAttribute('data-tipo-ingreso');
+        const grupoEdadId = input.getAttribute('data-grupo-edad');
+        const sexo = input.getAttribute('data-sexo'); // 'M' o 'F'
+
+        // 2. Sumar por tipo de ingreso (ahora funciona)
+        if (totalesTipoIngreso[tipoIngresoId]) {
+            totalesTipoIngreso[tipoIngresoId][sexo] += valor;
+        }
+
+        // 3. Sumar por grupo de edad (corregido)
+        if (!totalesGrupoEdad[grupoEdadId]) {
+            // Si el grupo de edad no existe, lo inicializamos
+            // Obtenemos la etiqueta de la primera celda (Edad) en la fila del input
+            const label = input.closest('tr').querySelector('td:first-child').textContent;
+
+            // Extraemos una clave numérica para ordenar (ej. '18' de '18', '<18' es 0)
+            let sortKey = 99;
+            if (label.startsWith('<')) {
+                sortKey = 0;
+            } else if (label.startsWith('>')) {
+                sortKey = 999;
+            } else {
+                sortKey = parseInt(label.match(/\d+/)) || 99;
+            }
+
+            totalesGrupoEdad[grupoEdadId] = { M: 0, F: 0, label: label, sortKey: sortKey };
+        }
+
+        // Sumamos el valor
+        totalesGrupoEdad[grupoEdadId][sexo] += valor;
+    });
+
+    // PASO 2: Renderizar las tablas (FUERA del bucle forEach)
+
+    // 4. Renderizar tabla TIPO DE INGRESO
+    const tablaTipoBody = document.querySelector('#informe-tipo-ingreso-table tbody');
+    if (tablaTipoBody) {
+        let htmlTipo = '';
+        for (const key in totalesTipoIngreso) {
+            const data = totalesTipoIngreso[key];
+            const totalFila = data.M + data.F;
+
+            // Opcional: solo mostrar filas que tengan datos
+            if (totalFila > 0) {
+                htmlTipo += `<tr>
+                    <td>${data.label}</td>
+                    <td>${data.M}</td>
+                    <td>${data.F}</td>
+                    <td>${totalFila}</td>
+                </tr>`;
+            }
+        }
+        tablaTipoBody.innerHTML = htmlTipo || '<tr><td colspan="4">Sin datos</td></tr>';
+    } else {
+        console.error("No se encontró el tbody de informe-tipo-ingreso-table");
+    }
+
+    // 5. Renderizar tabla GRUPO DE EDAD
+    const tablaEdadBody = document.querySelector('#informe-grupo-edad-table tbody');
+    if (tablaEdadBody) {
+        let htmlEdad = '';
+
+        // 6. Ordenar los grupos de edad usando la 'sortKey' que creamos
+        const edadesOrdenadas = Object.values(totalesGrupoEdad).sort((a, b) => {
+            return a.sortKey - b.sortKey;
+        });
+
+        // 7. Generar el HTML
+        edadesOrdenadas.forEach(data => {
+            const totalFila = data.M + data.F;
+            // Opcional: solo mostrar filas que tengan datos
+            if (totalFila > 0) {
+                htmlEdad += `<tr>
+                    <td>${data.label}</td>
+                    <td>${data.M}</td>
+                    <td>${data.F}</td>
+                    <td>${totalFila}</td>
+                </tr>`;
+            }
+        });
+
+        tablaEdadBody.innerHTML = htmlEdad || '<tr><td colspan="4">Sin datos</td></tr>';
+    } else {
+        console.error("No se encontró el tbody de informe-grupo-edad-table");
+    }
+}
+
+/* ========================================
+   FUNCIONES DEL BANNER DE RECHAZO Y NOTIFICACIONES
+   ======================================== */
+
+/**
+ * Cerrar el banner de rechazo (ocultarlo temporalmente)
+ * El banner se puede volver a ver desde la campanita de notificaciones
+ */
+function cerrarBannerRechazo() {
+    const banner = document.getElementById('banner-rechazo');
+    if (banner) {
+        banner.style.animation = 'slideDownBanner 0.3s ease-out reverse';
+        setTimeout(() => {
+            banner.style.display = 'none';
+        }, 300);
+    }
+}
+
+/**
+ * Mostrar el banner de rechazo (desde la campanita de notificaciones)
+ */
+function mostrarBannerRechazo() {
+    const banner = document.getElementById('banner-rechazo');
+    if (banner) {
+        banner.style.display = 'flex';
+        banner.style.animation = 'slideDownBanner 0.5s ease-out';
+
+        // Cerrar el panel de notificaciones
+        const panel = document.getElementById('panel-notificaciones');
+        if (panel) {
+            panel.style.display = 'none';
+        }
+
+        // Hacer scroll suave hasta el banner
+        setTimeout(() => {
+            banner.scrollIntoView({ behavior: 'smooth', block: 'start' });
+        }, 100);
+    }
+}
+
+/**
+ * Toggle (abrir/cerrar) el panel de notificaciones
+ */
+function togglePanelNotificaciones() {
+    const panel = document.getElementById('panel-notificaciones');
+    if (panel) {
+        if (panel.style.display === 'none' || panel.style.display === '') {
+            // Abrir panel
+            panel.style.display = 'block';
+        } else {
+            // Cerrar panel
+            panel.style.display = 'none';
+        }
+    }
+}
+
+// Cerrar panel de notificaciones al hacer clic fuera
+document.addEventListener('click', function(event) {
+    const panel = document.getElementById('panel-notificaciones');
+    const btnNotificaciones = document.querySelector('.btn-notificaciones');
+
+    // Si el panel está abierto y el clic NO fue en el panel ni en el botón
+    if (panel && panel.style.display === 'block') {
+        if (!panel.contains(event.target) && !btnNotificaciones.contains(event.target)) {
+            panel.style.display = 'none';
+        }
+    }
+});
@@ -0,0 +1,335 @@
+// Captura de matrícula: eventos en vivo (SSE) y acciones de los roles de validación.
+
+// ===== EVENTOS EN VIVO (SSE) =====
+// Cambios de semáforo, validaciones y rechazos de la UA/periodo: la página sólo vuelve a
+// consultar el SP cuando llega un evento, en lugar de recargarse completa.
+let eventosMatricula = null;
+
+function mostrarAvisoEnVivo(mensaje) {
+    if (!mensaje) return;
+    let aviso = document.getElementById('aviso-en-vivo');
+    if (!aviso) {
+        aviso = document.createElement('div');
+        aviso.id = 'aviso-en-vivo';
+        aviso.style.cssText = 'position:fixed;bottom:20px;right:20px;z-index:2000;padding:12px 16px;' +
+            'background:#333;color:#fff;border-radius:6px;box-shadow:0 2px 8px rgba(0,0,0,.3);max-width:360px;';
+        document.body.appendChild(aviso);
+    }
+    aviso.textContent = `🔔 ${mensaje}`;
+    aviso.style.display = 'block';
+    clearTimeout(aviso._timer);
+    aviso._timer = setTimeout(() => { aviso.style.display = 'none'; }, 6000);
+}
+
+function suscribirEventosMatricula() {
+    if (!window.EventSource || eventosMatricula) return;
+    const periodo = document.getElementById('periodo')?.value;
+    if (!periodo) return;
+
+    eventosMatricula = new EventSource(`/matricula/eventos?periodo=${encodeURIComponent(periodo)}`);
+
+    // Al (re)conectar: si la versión avanzó mientras no hubo conexión, refrescar
+    eventosMatricula.addEventListener('conectado', e => {
+        const d = JSON.parse(e.data);
+        if (versionMatricula !== null && d.version !== versionMatricula) {
+            cargarDatosExistentes();
+        }
+    });
+
+    // Revisión periódica del servidor: escrituras atendidas por otro worker (sin evento aquí)
+    eventosMatricula.addEventListener('version', e => {
+        const d = JSON.parse(e.data);
+        if (versionMatricula !== null && d.version !== versionMatricula) {
+            cargarDatosExistentes();
+        }
+    });
+
+    ['semaforo', 'validacion', 'rechazo'].forEach(tipo => {
+        eventosMatricula.addEventListener(tipo, e => {
+            const d = JSON.parse(e.data);
+            console.log(`📣 Evento en vivo (${tipo}):`, d);
+            mostrarAvisoEnVivo(d.mensaje);
+            // Si la página ya conoce esa versión (lo generó ella misma) no hace falta reconsultar
+            if (d.version !== undefined && d.version !== null && d.version === versionMatricula) return;
+            cargarDatosExistentes();
+        });
+    });
+}
+
+document.addEventListener('DOMContentLoaded', suscribirEventosMatricula);
+
+// ===== FUNCIONES PARA MODO DE VISTA SEGÚN ROL =====
+
+// Aplicar modo de vista (solo lectura para roles de validación)
+function aplicarModoVista() {
+    console.log(`🔐 Aplicando modo de vista: ${modoVista}`);
+
+    if (!esCapturista) {
+        console.log('👁️ Modo validación activado - Deshabilitando edición de matrícula');
+
+        // Deshabilitar TODOS los inputs de matrícula
+        const inputs = document.querySelectorAll('input.input-matricula-nueva');
+        inputs.forEach(input => {
+            input.disabled = true;
+            input.classList.add('input-disabled');
+            input.style.backgroundColor = '#f0f0f0';
+            input.style.cursor = 'not-allowed';
+            // Eliminar cualquier evento que pudiera habilitar el input
+            input.readOnly = true;
+        });
+
+        // Deshabilitar input de Total Grupos
+        const totalGruposInput = document.getElementById('input-total-grupos');
+        if (totalGruposInput) {
+            totalGruposInput.disabled = true;
+            totalGruposInput.classList.add('input-disabled');
+            totalGruposInput.style.backgroundColor = '#f0f0f0';
+            totalGruposInput.style.cursor = 'not-allowed';
+            totalGruposInput.readOnly = true;
+        }
+
+        // Deshabilitar botones de acción del capturista si existen
+        const btnGuardar = document.getElementById('btn-guardar-matricula');
+        const btnLimpiar = document.getElementById('btn-limpiar-formulario');
+        const btnValidarCaptura = document.getElementById('btn-validar-matricula');
+
+        if (btnGuardar) {
+            btnGuardar.style.display = 'none';
+        }
+        if (btnLimpiar) {
+            btnLimpiar.style.display = 'none';
+        }
+        if (btnValidarCaptura) {
+            btnValidarCaptura.style.display = 'none';
+        }
+
+        // ⚠️ IMPORTANTE: Los filtros (programa, modalidad y turnos) PERMANECEN HABILITADOS
+        // para que roles 4, 5, 6, 7, 8 puedan filtrar diferentes programas/modalidades/turnos
+        console.log('✅ Filtros de programa, modalidad y turnos habilitados para validación');
+
+        // Los botones de navegación de turno PERMANECEN habilitados para roles de validación
+        // para que puedan revisar diferentes turnos
+
+        console.log('✅ Vista configurada en modo solo lectura (filtros y turnos activos)');
+        console.log('🔒 TODOS los inputs están permanentemente deshabilitados para roles de validación');
+    }
+}
+
+// Función para validar el semestre (roles de validación)
+async function validarSemestre() {
+    // Verificar si el botón está deshabilitado
+    const btnValidar = document.getElementById('btn-validar-semestre');
+    if (btnValidar.disabled) {
+        alert('Ya has validado o rechazado esta matrícula. No puedes realizar esta acción nuevamente.');
+        return;
+    }
+
+    const periodo = document.getElementById('periodo').value;
+    const programa = document.getElementById('programa').value;
+    const modalidad = document.getElementById('modalidad').value;
+    const semestre = document.getElementById('semestre').value;
+
+    const semestreNombre = semestresMap[parseInt(semestre)] || `Semestre ${semestre}`;
+
+    const confirmar = confirm(
+        `¿Está seguro que desea VALIDAR?\n\n` +
+        `Esta acción marcará el semestre como aprobado y bloqueará cualquier modificación futura.\n\n` +
+        `¿Continuar?`
+    );
+
+    if (!confirmar) {
+        console.log('❌ Usuario canceló la validación');
+        return;
+    }
+
+    try {
+        console.log('🔄 Enviando validación al servidor...');
+
+        const response = await fetch('/matricula/validar_semestre_rol', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                periodo: periodo
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            console.log('✅ Matrícula validada exitosamente:', data);
+            alert(
+                `✅ ${data.mensaje}\n\n` +
+                `Validado por: ${data.data.validado_por}\n` +
+                `Unidad Académica: ${data.data.unidad_academica}\n` +
+                `Periodo: ${data.data.periodo}\n` +
+                `Fecha: ${new Date(data.data.fecha_validacion).toLocaleString()}\n\n` +
+                `La matrícula ha sido aprobada completamente.`
+            );
+
+            // Recargar la página para reflejar los cambios
+            setTimeout(() => {
+                location.reload();
+            }, 2000);
+        } else {
+            throw new Error(data.error || 'Error desconocido al validar');
+        }
+
+    } catch (error) {
+        console.error('❌ Error al validar la matrícula:', error);
+        alert(`❌ Error al validar la matrícula:\n\n${error.message}`);
+    }
+}
+
+// Función para rechazar el semestre (roles de validación) - Abre panel desplegable
+async function rechazarSemestre() {
+    // Verificar si el botón está deshabilitado
+    const btnRechazar = document.getElementById('btn-rechazar-semestre');
+    if (btnRechazar.disabled) {
+        alert('Ya has validado o rechazado esta matrícula. No puedes realizar esta acción nuevamente.');
+        return;
+    }
+
+    const panel = document.getElementById('panel-rechazo');
+    const textarea = document.getElementById('motivo-rechazo-panel');
+    const contador = document.getElementById('contador-caracteres-panel');
+
+    // Toggle: si ya está abierto, cerrarlo
+    if (panel.style.display === 'block') {
+        cerrarPanelRechazo();
+        return;
+    }
+
+    // Limpiar textarea y reiniciar contador
+    textarea.value = '';
+    contador.textContent = '0';
+
+    // Mostrar panel con animación
+    panel.style.display = 'block';
+
+    // Pequeño delay para que la animación se vea
+    setTimeout(() => {
+        panel.classList.add('panel-abierto');
+    }, 10);
+
+    // Focus en el textarea
+    setTimeout(() => textarea.focus(), 300);
+
+    // Actualizar contador de caracteres
+    textarea.oninput = function() {
+        contador.textContent = this.value.length;
+
+        // Cambiar color si se acerca al límite
+        if (this.value.length > 230) {
+            contador.style.color = '#dc3545';
+            contador.style.fontWeight = 'bold';
+        } else {
+            contador.style.color = '#666';
+            contador.style.fontWeight = 'normal';
+        }
+    };
+
+    // Scroll suave hacia el panel
+    setTimeout(() => {
+        panel.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+    }, 350);
+}
+
+// Función para actualizar el contador de caracteres del panel
+function actualizarContadorPanel() {
+    const textarea = document.getElementById('motivo-rechazo-panel');
+    const contador = document.getElementById('contador-caracteres-panel');
+    contador.textContent = textarea.value.length;
+}
+
+// Función para cerrar el panel de rechazo
+function cerrarPanelRechazo() {
+    const panel = document.getElementById('panel-rechazo');
+    const textarea = document.getElementById('motivo-rechazo-panel');
+
+    // Quitar clase de animación
+    panel.classList.remove('panel-abierto');
+
+    // Limpiar textarea y contador
+    textarea.value = '';
+    document.getElementById('contador-caracteres-panel').textContent = '0';
+
+    // Esperar a que termine la animación antes de ocultar
+    setTimeout(() => {
+        panel.style.display = 'none';
+    }, 300);
+}
+
+// Función para confirmar el rechazo desde el panel
+async function confirmarRechazoPanel() {
+    const periodo = document.getElementById('periodo').value;
+    const textarea = document.getElementById('motivo-rechazo-panel');
+    const motivo = textarea.value.trim();
+
+    // Validar que hay motivo
+    if (!motivo) {
+        alert('❌ Debe ingresar un motivo para el rechazo');
+        textarea.focus();
+        return;
+    }
+
+    if (motivo.length < 10) {
+        alert('❌ El motivo debe tener al menos 10 caracteres para ser descriptivo');
+        textarea.focus();
+        return;
+    }
+
+    // Deshabilitar botón para evitar doble click
+    const btnConfirmar = document.querySelector('.btn-confirmar-rechazo');
+    btnConfirmar.disabled = true;
+    btnConfirmar.textContent = '⏳ Procesando...';
+
+    try {
+        console.log('🔄 Enviando rechazo al servidor...');
+
+        const response = await fetch('/matricula/rechazar_semestre_rol', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                periodo: periodo,
+                motivo: motivo
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            // Cerrar panel
+            cerrarPanelRechazo();
+
+            console.log('❌ Matrícula rechazada:', data);
+            alert(
+                `✅ Matrícula Rechazada Exitosamente\n\n` +
+                `Rechazado por: ${data.data.rechazado_por}\n` +
+                `Unidad Académica: ${data.data.unidad_academica}\n` +
+                `Periodo: ${data.data.periodo}\n` +
+                `Motivo: ${data.data.motivo}\n` +
+                `Fecha: ${new Date(data.data.fecha_rechazo).toLocaleString()}\n\n` +
+                `El capturista será notificado para realizar las correcciones necesarias.`
+            );
+
+            // Recargar la página para reflejar los cambios
+            setTimeout(() => {
+                location.reload();
+            }, 2000);
+        } else {
+            throw new Error(data.error || 'Error desconocido al rechazar');
+        }
+
+    } catch (error) {
+        console.error('❌ Error al rechazar la matrícula:', error);
+        alert(`❌ Error al rechazar la matrícula:\n\n${error.message}`);
+
+        // Rehabilitar botón en caso de error
+        btnConfirmar.disabled = false;
+        btnConfirmar.textContent = '✅ Confirmar Rechazo';
+    }
+}
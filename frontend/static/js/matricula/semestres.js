@@ -0,0 +1,383 @@
+// Captura de matrícula: turnos, pestañas de semestres y bloqueo de inputs.
+
+// Función para cambiar turno
+function cambiarTurno(direccion) {
+    // Guardar datos del contexto actual antes de cambiar turno
+    try { guardarDatosSemestreActual(); } catch (e) { console.warn('No se pudo guardar antes de cambiar turno', e); }
+    turnoActualIndex += direccion;
+
+    // Validar límites
+    if (turnoActualIndex < 0) turnoActualIndex = 0;
+    if (turnoActualIndex >= turnosDisponibles.length) turnoActualIndex = turnosDisponibles.length - 1;
+
+    // Actualizar UI
+    const turnoActual = turnosDisponibles[turnoActualIndex];
+    document.getElementById('turno-nombre').textContent = turnoActual.Turno;
+    document.getElementById('turno').value = turnoActual.Id_Turno;
+
+    // Actualizar estado de botones
+    document.getElementById('btn-turno-anterior').disabled = turnoActualIndex === 0;
+    document.getElementById('btn-turno-siguiente').disabled = turnoActualIndex === turnosDisponibles.length - 1;
+
+    // Recargar datos con el nuevo turno
+    cargarDatosExistentes();
+
+    // Actualizar Total Grupos para el nuevo contexto turno-semestre
+    setTimeout(() => {
+        aplicarTotalGruposParaSemestreYTurnoActual();
+        // Asegurar que roles de validación no puedan editar
+        aplicarModoVista();
+    }, 100);
+}
+
+// Función para determinar el estado de progreso de un semestre
+function determinarEstadoSemestre(semestreNum) {
+    // Buscar el estado del semáforo que viene del SP para este semestre
+    const estadoDelSP = estadosSemaforoPorSemestre[semestreNum];
+
+    if (estadoDelSP) {
+        console.log(`🚦 Semestre ${semestreNum}: Estado del SP = ${estadoDelSP}`);
+        return estadoDelSP;
+    }
+
+    // Si no hay estado del SP, usar estado por defecto (sin datos)
+    console.log(`🚦 Semestre ${semestreNum}: Sin estado del SP, usando estado por defecto (1)`);
+    return 1; // Estado por defecto - Sin datos
+}
+
+// Función para generar pestañas de semestres con semáforo
+// Ahora acepta un array de semestres o un número máximo (para compatibilidad)
+function generarPestanasSemestres(semestresParam) {
+    const tabsContainer = document.getElementById('semestres-tabs');
+    tabsContainer.innerHTML = '';
+
+    let semestresAGenerar = [];
+
+    // Si es un número, generar del 1 al número (modo antiguo)
+    if (typeof semestresParam === 'number') {
+        for (let i = 1; i <= semestresParam; i++) {
+            semestresAGenerar.push(i);
+        }
+    }
+    // Si es un array, usar el array directamente (modo nuevo - del SP)
+    else if (Array.isArray(semestresParam) && semestresParam.length > 0) {
+        semestresAGenerar = [...semestresParam].sort((a, b) => a - b);
+    }
+    // Si no hay parámetro válido, usar semestresDisponiblesSP o generar 6 por defecto
+    else {
+        if (semestresDisponiblesSP && semestresDisponiblesSP.length > 0) {
+            semestresAGenerar = [...semestresDisponiblesSP];
+        } else {
+            // Fallback: generar 6 semestres por defecto
+            for (let i = 1; i <= 6; i++) {
+                semestresAGenerar.push(i);
+            }
+        }
+    }
+
+    console.log('🎯 Generando pestañas para semestres:', semestresAGenerar);
+
+    // Obtener el semestre actualmente seleccionado
+    const semestreActualElement = document.getElementById('semestre');
+    const semestreActualSeleccionado = semestreActualElement ? parseInt(semestreActualElement.value) : null;
+
+    console.log(`📌 Semestre actualmente seleccionado: ${semestreActualSeleccionado}`);
+
+    // Generar las pestañas
+    semestresAGenerar.forEach((semestreNum, index) => {
+        const tab = document.createElement('button');
+        tab.className = 'semestre-tab';
+        tab.textContent = `Semestre ${semestreNum}`;
+        tab.setAttribute('data-semestre', semestreNum);
+        tab.onclick = () => seleccionarSemestre(semestreNum);
+
+        // Aplicar color del semáforo
+        actualizarColorPestana(tab, semestreNum);
+
+        // Marcar como activo el semestre que está seleccionado actualmente
+        // Si no hay ninguno seleccionado, marcar el primero
+        if (semestreActualSeleccionado) {
+            if (semestreNum === semestreActualSeleccionado) {
+                tab.classList.add('active');
+                console.log(`✅ Pestaña Semestre ${semestreNum} marcada como activa (coincide con seleccionado)`);
+            }
+        } else if (index === 0) {
+            tab.classList.add('active');
+            console.log(`✅ Pestaña Semestre ${semestreNum} marcada como activa (primero por defecto)`);
+        }
+
+        tabsContainer.appendChild(tab);
+    });
+}
+
+// Función para actualizar el color de una pestaña según su estado
+function actualizarColorPestana(tab, semestreNum) {
+    const estadoId = determinarEstadoSemestre(semestreNum);
+    const estado = semaforoEstados.find(s => s.id === estadoId);
+
+    if (estado) {
+        // Remover clases de color anteriores
+        tab.classList.remove('semaforo-estado-1', 'semaforo-estado-2', 'semaforo-estado-3');
+
+        // Agregar clase y estilo para el estado actual
+        tab.classList.add(`semaforo-estado-${estadoId}`);
+        tab.style.setProperty('--semaforo-color', estado.color);
+
+        // Agregar tooltip con la descripción
+        tab.title = `${estado.descripcion}`;
+
+        console.log(`🚦 Semestre ${semestreNum}: Estado ${estadoId} (${estado.descripcion}) - Color: ${estado.color}`);
+    }
+}
+
+// Función para actualizar todos los colores de las pestañas
+function actualizarColoresPestanas() {
+    const tabs = document.querySelectorAll('.semestre-tab');
+    tabs.forEach(tab => {
+        const semestreNum = parseInt(tab.getAttribute('data-semestre'));
+        actualizarColorPestana(tab, semestreNum);
+    });
+}
+
+// Función para guardar datos del semestre actual
+function guardarDatosSemestreActual() {
+    const semestreActual = parseInt(document.getElementById('semestre').value);
+    const turnoActualId = parseInt(document.getElementById('turno').value);
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+
+    // Inicializar almacén por turno/semestre si no existe
+    if (!datosMatriculaPorSemestre[turnoActualId]) {
+        datosMatriculaPorSemestre[turnoActualId] = {};
+    }
+    if (!datosMatriculaPorSemestre[turnoActualId][semestreActual]) {
+        datosMatriculaPorSemestre[turnoActualId][semestreActual] = {};
+    }
+
+    inputs.forEach(input => {
+        const tipoIngreso = input.getAttribute('data-tipo-ingreso');
+        const grupoEdad = input.getAttribute('data-grupo-edad');
+        const sexo = input.getAttribute('data-sexo');
+        const valor = input.value || '';
+        const key = `${tipoIngreso}_${grupoEdad}_${sexo}`;
+
+        datosMatriculaPorSemestre[turnoActualId][semestreActual][key] = valor;
+    });
+
+    console.log(`💾 [Turno ${turnoActualId}] Datos guardados para semestre ${semestreActual}:`, datosMatriculaPorSemestre[turnoActualId][semestreActual]);
+}
+
+// Función para restaurar datos del semestre seleccionado
+function restaurarDatosSemestre(semestreNum) {
+    const turnoActualId = parseInt(document.getElementById('turno').value);
+    const datosDelSemestre = (datosMatriculaPorSemestre[turnoActualId] || {})[semestreNum] || {};
+    const tieneDatosGuardados = Object.keys(datosDelSemestre).length > 0;
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+
+    console.log(`🔄 [Turno ${turnoActualId}] Restaurando semestre ${semestreNum}: ${tieneDatosGuardados ? 'Tiene datos guardados' : 'Sin datos guardados - conservando valores del SP'}`);
+
+    inputs.forEach(input => {
+        const tipoIngreso = input.getAttribute('data-tipo-ingreso');
+        const grupoEdad = input.getAttribute('data-grupo-edad');
+        const sexo = input.getAttribute('data-sexo');
+        const key = `${tipoIngreso}_${grupoEdad}_${sexo}`;
+
+        if (datosDelSemestre[key] !== undefined) {
+            // Si hay datos guardados, restaurarlos
+            input.value = datosDelSemestre[key];
+        } else {
+            // Si no hay dato guardado para esta clave, conservar el valor ya pintado (del SP)
+        }
+        // Si NO hay datos guardados, NO hacer nada (conservar valores del SP)
+    });
+
+    console.log(`✅ Datos restaurados para semestre ${semestreNum}:`, Object.keys(datosDelSemestre).length, 'campos');
+
+    // Recalcular totales después de restaurar
+    calcularTotales();
+
+    // Ajustar inputs habilitados/inhabilitados según reglas de semestres
+    updateInputsBySemestre(semestreNum);
+}
+
+// Función para seleccionar semestre
+function seleccionarSemestre(semestreNum) {
+    // Guardar datos del semestre actual antes de cambiar
+    guardarDatosSemestreActual();
+
+    // Actualizar tabs activas
+    const tabs = document.querySelectorAll('.semestre-tab');
+    tabs.forEach(tab => {
+        if (parseInt(tab.getAttribute('data-semestre')) === semestreNum) {
+            tab.classList.add('active');
+        } else {
+            tab.classList.remove('active');
+        }
+    });
+
+    // Actualizar campo oculto (usar el ID del semestre correspondiente)
+    document.getElementById('semestre').value = semestreNum;
+
+    // REINICIAR AL PRIMER TURNO SIEMPRE que se cambie de semestre
+    console.log('🔄 Cambio de semestre detectado - Reiniciando al primer turno disponible...');
+    if (turnosDisponibles && turnosDisponibles.length > 0) {
+        turnoActualIndex = 0;
+        const primerTurno = turnosDisponibles[0];
+
+        // Actualizar UI del indicador de turno
+        document.getElementById('turno-nombre').textContent = primerTurno.Turno;
+        document.getElementById('turno').value = primerTurno.Id_Turno;
+
+        // Actualizar estado de botones de navegación
+        document.getElementById('btn-turno-anterior').disabled = true; // Siempre deshabilitado en el primer turno
+        document.getElementById('btn-turno-siguiente').disabled = turnosDisponibles.length === 1;
+
+        console.log(`✅ Reiniciado al primer turno: ${primerTurno.Turno} (ID: ${primerTurno.Id_Turno})`);
+    }
+
+    // DESPLAZAR A LA TABLA DE MATRÍCULA (dejando visibles las pestañas de semestres)
+    setTimeout(() => {
+        const tablaContainer = document.querySelector('.tabla-matricula-container');
+        if (tablaContainer) {
+            const rect = tablaContainer.getBoundingClientRect();
+            const offset = 150; // Espacio para mantener las pestañas visibles
+            const scrollPosition = window.pageYOffset + rect.top - offset;
+
+            window.scrollTo({
+                top: scrollPosition,
+                behavior: 'smooth'
+            });
+            console.log('📍 Desplazamiento a la tabla de matrícula (con offset para pestañas)');
+        }
+    }, 200);
+
+    // Recargar datos
+    cargarDatosExistentes();
+    // Aplicar Total Grupos correspondiente después de que lleguen los datos
+    setTimeout(() => {
+        aplicarTotalGruposParaSemestreYTurnoActual();
+        // Aplicar bloqueo de botones según el estado del semestre seleccionado
+        aplicarBloqueoPorSemaforo();
+        // Asegurar que roles de validación no puedan editar
+        aplicarModoVista();
+    }, 150);
+}
+
+// Función que habilita/inhabilita inputs según el semestre seleccionado
+// Regla: Si Semestre 1 -> bloquear 'Reingreso' (tipo id = 2)
+//       Si Semestre != 1 -> bloquear 'Nuevo Ingreso' (tipo id = 1)
+function updateInputsBySemestre(semestreNum) {
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+    inputs.forEach(input => {
+        const tipo = input.getAttribute('data-tipo-ingreso');
+        if (!tipo) return;
+
+        let shouldDisable = false;
+        let tooltipMessage = '';
+        // Si el semestre ya está finalizado (semaforo=3) deshabilitar TODOS preservando valores
+        const estadoSemaforo = estadosSemaforoPorSemestre[parseInt(semestreNum)];
+        if (parseInt(estadoSemaforo) === 3) {
+            shouldDisable = true;
+            tooltipMessage = 'Semestre finalizado';
+        } else {
+            // Lógica anterior condicional (podría ajustarse o eliminarse si ya no aplica)
+            if (parseInt(semestreNum) === 1) {
+                // Bloquear Reingreso (tipo 2) en semestre 1
+                if (tipo === '2') {
+                    shouldDisable = true;
+                    tooltipMessage = 'Reingreso no aplica en Semestre 1';
+                }
+            } else {
+                // En cualquier otro semestre, bloquear Nuevo Ingreso (tipo 1)
+                if (tipo === '1') {
+                    shouldDisable = true;
+                    tooltipMessage = `Nuevo Ingreso no aplica en Semestre ${semestreNum}`;
+                }
+            }
+        }
+
+        if (shouldDisable) {
+            input.disabled = true;
+            input.classList.add('input-disabled');
+            input.title = tooltipMessage;
+            // No limpiar el valor si es por semáforo finalizado, conservar lo traído del SP
+            if (tooltipMessage !== 'Semestre finalizado') {
+                input.value = ''; // Sólo limpiar si es por regla de tipo ingreso
+            }
+
+            // Agregar indicador visual al contenedor padre
+            const container = input.closest('.matricula-box');
+            if (container) {
+                container.classList.add('input-container-disabled');
+                container.setAttribute('data-tooltip', tooltipMessage);
+            }
+        } else {
+            // Solo habilitar inputs si el usuario ES CAPTURISTA
+            // Los roles de validación (4-8) NUNCA deben poder editar
+            if (esCapturista) {
+                input.disabled = false;
+                input.classList.remove('input-disabled');
+                input.title = '';
+
+                // Remover indicador visual del contenedor padre
+                const container = input.closest('.matricula-box');
+                if (container) {
+                    container.classList.remove('input-container-disabled');
+                    container.removeAttribute('data-tooltip');
+                }
+            } else {
+                // Roles de validación: mantener deshabilitado siempre
+                input.disabled = true;
+                input.classList.add('input-disabled');
+                input.style.backgroundColor = '#f0f0f0';
+                input.style.cursor = 'not-allowed';
+            }
+        }
+    });
+
+    console.log(`🚫 Inputs actualizados para Semestre ${semestreNum}: ${document.querySelectorAll('.input-disabled').length} deshabilitados`);
+}
+
+// Deshabilita todos los inputs de la vista (incluye Total Grupos)
+function deshabilitarTodaLaVista() {
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+    inputs.forEach(input => {
+        input.disabled = true;
+        input.classList.add('input-disabled');
+        const container = input.closest('.matricula-box');
+        if (container) {
+            container.classList.add('input-container-disabled');
+            if (!container.getAttribute('data-tooltip')) {
+                container.setAttribute('data-tooltip', 'Semestre finalizado (bloqueado)');
+            }
+        }
+    });
+    const totalGruposInput = document.getElementById('input-total-grupos');
+    if (totalGruposInput) {
+        totalGruposInput.disabled = true;
+        totalGruposInput.classList.add('input-disabled');
+    }
+    console.log('🔒 Vista de captura bloqueada: todos los inputs deshabilitados');
+}
+
+// Si el semáforo del semestre actual está en 3 (completado), bloquear edición
+function aplicarBloqueoPorSemaforo() {
+    const semestreActual = parseInt(document.getElementById('semestre').value);
+    const estado = estadosSemaforoPorSemestre[semestreActual];
+    const btnGuardar = document.getElementById('btn-guardar-matricula');
+    const btnLimpiar = document.getElementById('btn-limpiar-formulario');
+    const btnValidar = document.getElementById('btn-validar-matricula');
+
+    if (parseInt(estado) === 3) {
+        // Bloquear todos los inputs de matrícula (incluye ambos turnos conceptualmente porque se recrean por turno)
+        deshabilitarTodaLaVista();
+        // Bloquear también el Total Grupos de este semestre-turno
+        aplicarTotalGruposParaSemestreYTurnoActual();
+        // Deshabilitar botones de acción
+        [btnGuardar, btnLimpiar, btnValidar].forEach(b => { if (b) { b.disabled = true; b.classList.add('input-disabled'); }});
+        console.log('🛑 Semestre finalizado: botones Guardar/Limpiar/Validar deshabilitados.');
+    } else {
+        // Rehabilitar botones si el semestre NO está finalizado
+        [btnGuardar, btnLimpiar, btnValidar].forEach(b => { if (b) { b.disabled = false; b.classList.remove('input-disabled'); }});
+        console.log('✅ Semestre activo: todos los botones habilitados.');
+    }
+}
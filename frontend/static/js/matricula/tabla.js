@@ -0,0 +1,208 @@
+// Captura de matrícula: totales y tabla vacía por grupos de edad.
+
+function calcularTotales() {
+    // Calcular totales por sexo y total general
+    let totalMasculino = 0;
+    let totalFemenino = 0;
+    let totalGeneral = 0;
+
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+
+    inputs.forEach(input => {
+        const valor = parseInt(input.value) || 0;
+        const sexo = input.getAttribute('data-sexo');
+
+        totalGeneral += valor;
+
+        if (sexo === 'M') {
+            totalMasculino += valor;
+        } else if (sexo === 'F') {
+            totalFemenino += valor;
+        }
+    });
+
+    // Actualizar los spans de totales
+    const totalMasculinoEl = document.querySelector('#total_masculino');
+    const totalFemeninoEl = document.querySelector('#total_femenino');
+    const totalGeneralEl = document.querySelector('#total_general');
+
+    if (totalMasculinoEl) totalMasculinoEl.textContent = totalMasculino;
+    if (totalFemeninoEl) totalFemeninoEl.textContent = totalFemenino;
+    if (totalGeneralEl) totalGeneralEl.textContent = totalGeneral;
+
+    // Actualizar colores del semáforo en las pestañas
+    if (typeof actualizarColoresPestanas === 'function') {
+        actualizarColoresPestanas();
+    }
+    actualizarInforme();
+}
+
+// Función para generar tabla vacía con estructura basada en grupos de edad del backend
+function generarTablaVacia() {
+    // Limpiar estados de semáforo al generar tabla vacía
+    estadosSemaforoPorSemestre = {};
+    console.log('🚦 Estados de semáforo limpiados (tabla vacía)');
+
+    const tbody = document.getElementById('matricula-tbody');
+
+    // Validar que el tbody exista antes de intentar acceder a él
+    if (!tbody) {
+        console.error('❌ Error: No se encontró el elemento tbody con id "matricula-tbody"');
+        return;
+    }
+
+    tbody.innerHTML = '';
+
+    // Usar grupos de edad globales del backend
+    console.log('Grupos de edad desde backend para tabla vacía:', gruposEdad);
+
+    // Si no hay grupos de edad del backend, usar valores por defecto
+    let edadesParaUsar = [];
+    if (gruposEdad && gruposEdad.length > 0) {
+        edadesParaUsar = gruposEdad.map(g => ({
+            id: g.Id_Grupo_Edad,
+            label: g.Grupo_Edad
+        }));
+    } else {
+        // Fallback: edades por defecto
+        const edadesDefault = [
+            '15', '16', '17', '18', '19', '20', '21', '22', '23', '24', '25', 'Más de 25'
+        ];
+        edadesParaUsar = edadesDefault.map((edad, idx) => ({
+            id: idx + 1,
+            label: edad
+        }));
+    }
+
+    // Tipos de ingreso fijos
+    const tiposIngreso = [
+        { id: 1, nombre: 'Nuevo Ingreso' },
+        { id: 2, nombre: 'Reingreso' },
+        { id: 3, nombre: 'Repetidores' }
+    ];
+
+    edadesParaUsar.forEach((edadObj, idxEdad) => {
+        const tr = document.createElement('tr');
+        tr.style.borderBottom = '1px solid #e0e0e0';
+        tr.style.transition = 'all 0.2s ease';
+        tr.onmouseover = () => tr.style.backgroundColor = '#f5f5f5';
+        tr.onmouseout = () => tr.style.backgroundColor = '';
+
+        // Columna de Edad
+        const tdEdad = document.createElement('td');
+        tdEdad.textContent = edadObj.label;
+        tdEdad.style.padding = '12px';
+        tdEdad.style.textAlign = 'center';
+        tdEdad.style.fontWeight = '700';
+        tdEdad.style.fontSize = '15px';
+        tdEdad.style.color = '#424242';
+        tdEdad.style.background = '#f8f9fa';
+        tdEdad.style.verticalAlign = 'middle';
+        tr.appendChild(tdEdad);
+
+        // Columnas para cada tipo de ingreso
+        tiposIngreso.forEach((tipo) => {
+            const tdTipo = document.createElement('td');
+            tdTipo.style.padding = '10px';
+            tdTipo.style.verticalAlign = 'middle';
+
+            tdTipo.innerHTML = `
+            <div style="display:inline-flex; gap:6px; justify-content:center; align-items:center; width:auto; /* Contenedor general */">
+
+                <div style="display:inline-flex; align-items:center; gap:3px; padding:2px 4px; background:#e3f2fd; border-radius:4px; border:1px solid #90caf9; line-height:1;">
+                    <div style="font-weight:700;color:#1976d2;font-size:11px;min-width:14px;text-align:center;">H</div>
+                    <input type="number"
+                        id="input_${tipo.id}_${edadObj.id}_M"
+                        value=""
+                        min="0"
+                        class="input-matricula-nueva"
+                        data-tipo-ingreso="${tipo.id}"
+                        data-grupo-edad="${edadObj.id}"
+                        data-sexo="M"
+                        oninput="this.value = this.value.replace(/[^0-9]/g, '')"
+                        style="width:42px;padding:2px 3px;border:2px solid #2196f3;border-radius:3px;background:#fff;color:#1976d2;font-weight:600;text-align:center;font-size:11px;line-height:1.1;"
+                        placeholder="">
+                </div>
+
+                <div style="display:inline-flex; align-items:center; gap:3px; padding:2px 4px; background:#fce4ec; border-radius:4px; border:1px solid #f48fb1; line-height:1;">
+                    <div style="font-weight:700;color:#c2185b;font-size:11px;min-width:14px;text-align:center;">M</div>
+                    <input type="number"
+                        id="input_${tipo.id}_${edadObj.id}_F"
+                        value=""
+                        min="0"
+                        class="input-matricula-nueva"
+                        data-tipo-ingreso="${tipo.id}"
+                        data-grupo-edad="${edadObj.id}"
+                        data-sexo="F"
+                        oninput="this.value = this.value.replace(/[^0-9]/g, '')"
+                        style="width:42px;padding:2px 3px;border:2px solid #e91e63;border-radius:3px;background:#fff;color:#c2185b;font-weight:600;text-align:center;font-size:11px;line-height:1.1;"
+                        placeholder="">
+                </div>
+            </div>`;
+
+        tr.appendChild(tdTipo);
+    });
+
+    tbody.appendChild(tr);
+});
+
+    // Agregar fila de totales
+    const trTot = document.createElement('tr');
+    trTot.className = 'totales-row';
+    trTot.style.borderTop = '3px solid #8B2635';
+    trTot.style.backgroundColor = '#f8f9fa';
+    trTot.innerHTML = `
+        <td style="padding:12px;text-align:center;font-weight:700;font-size:16px;background:#8B2635;color:white;">TOTALES</td>
+        <td style="padding:12px;text-align:center;" colspan="3">
+            <div style="display:flex;justify-content:space-around;align-items:center;flex-wrap:wrap;gap:15px;">
+                <div style="flex:1;min-width:120px;">
+                    <div style="background:#e3f2fd;padding:8px;border-radius:8px;border:2px solid #2196f3;">
+                        <div style="font-size:13px;color:#1976d2;font-weight:600;margin-bottom:4px;">Masculino</div>
+                        <div id="total_masculino" style="font-size:24px;color:#1976d2;font-weight:700;">0</div>
+                    </div>
+                </div>
+                <div style="flex:1;min-width:120px;">
+                    <div style="background:#fce4ec;padding:8px;border-radius:8px;border:2px solid #e91e63;">
+                        <div style="font-size:13px;color:#c2185b;font-weight:600;margin-bottom:4px;">Femenino</div>
+                        <div id="total_femenino" style="font-size:24px;color:#c2185b;font-weight:700;">0</div>
+                    </div>
+                </div>
+                <div style="flex:1;min-width:140px;">
+                    <div style="background:#e8f5e9;padding:8px;border-radius:8px;border:2px solid #4caf50;">
+                        <div style="font-size:13px;color:#2e7d32;font-weight:600;margin-bottom:4px;">TOTAL GENERAL</div>
+                        <div id="total_general" style="font-size:26px;color:#2e7d32;font-weight:700;">0</div>
+                    </div>
+                </div>
+            </div>
+        </td>`;
+    tbody.appendChild(trTot);
+
+    // Re-bind events for inputs
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+    inputs.forEach(input => {
+        input.addEventListener('input', calcularTotales);
+        input.addEventListener('change', calcularTotales);
+        input.addEventListener('focus', scrollToVisibleInput);
+        // Guardar datos automáticamente cuando cambie el valor
+        input.addEventListener('input', guardarDatosSemestreActual);
+        input.addEventListener('change', guardarDatosSemestreActual);
+    });
+
+    // Restaurar datos guardados del semestre actual después de renderizar
+    // NOTA: Solo restaurar si hay datos guardados localmente
+    const semestreActual = parseInt(document.getElementById('semestre').value);
+    const turnoActualId = parseInt(document.getElementById('turno').value);
+    setTimeout(() => {
+        const datosExistentes = (datosMatriculaPorSemestre[turnoActualId] || {})[semestreActual] || {};
+        if (Object.keys(datosExistentes).length > 0) {
+            console.log('📦 Hay datos guardados localmente (tabla vacía), restaurando...');
+            restaurarDatosSemestre(semestreActual);
+        } else {
+            console.log('📊 No hay datos guardados (tabla vacía), tabla queda vacía');
+            // Solo aplicar reglas de validación por semestre
+            updateInputsBySemestre(semestreActual);
+        }
+    }, 100); // Pequeño delay para asegurar que los inputs estén renderizados
+
+    calcularTotales();
+}
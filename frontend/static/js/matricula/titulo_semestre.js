@@ -0,0 +1,29 @@
+// Captura de matrícula: mantiene el número de semestre del título sincronizado.
+
+// Actualiza el título cuando cambie el input oculto de semestre
+(function(){
+    function actualizarTituloSemestre() {
+        const input = document.getElementById('semestre');
+        const span = document.getElementById('semestre-num');
+        if (!span) return;
+        span.textContent = input && input.value ? input.value : '1';
+    }
+
+    document.addEventListener('DOMContentLoaded', function() {
+        actualizarTituloSemestre();
+        const input = document.getElementById('semestre');
+        if (input) {
+            input.addEventListener('change', actualizarTituloSemestre);
+            input.addEventListener('input', actualizarTituloSemestre);
+            // Poll como fallback por si se cambia .value sin disparar eventos
+            let last = input.value;
+            const poll = setInterval(() => {
+                if (input.value !== last) {
+                    last = input.value;
+                    actualizarTituloSemestre();
+                }
+            }, 300);
+            window.addEventListener('beforeunload', () => clearInterval(poll));
+        }
+    });
+})();
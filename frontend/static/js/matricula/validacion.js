@@ -0,0 +1,544 @@
+// Captura de matrícula: validación por turnos y consolidación del semestre (SP final).
+
+// ===== NUEVO SISTEMA: VALIDACIÓN POR TURNOS CON EJECUCIÓN CONSOLIDADA =====
+
+// Estructura para rastrear turnos validados por semestre
+let turnosValidadosPorSemestre = {};
+
+// Cargar turnos validados desde localStorage
+function cargarTurnosValidadosDeLocalStorage() {
+    try {
+        const key = `turnos_validados_${document.getElementById('periodo').value}_${document.getElementById('programa').value}_${document.getElementById('modalidad').value}`;
+        const raw = localStorage.getItem(key);
+        turnosValidadosPorSemestre = raw ? JSON.parse(raw) : {};
+        console.log('📂 Turnos validados cargados:', turnosValidadosPorSemestre);
+    } catch (e) {
+        console.warn('No se pudo cargar turnos validados de localStorage', e);
+        turnosValidadosPorSemestre = {};
+    }
+}
+
+// Inicializar el sistema de validación por turnos
+function inicializarSistemaValidacionTurnos() {
+    cargarTurnosValidadosDeLocalStorage();
+    aplicarEstadoValidacionTurnos();
+}
+
+// Aplicar el estado de validación a los turnos (bloquear los ya validados)
+function aplicarEstadoValidacionTurnos() {
+    const semestreActual = parseInt(document.getElementById('semestre').value);
+    const turnoActual = parseInt(document.getElementById('turno').value);
+
+    // Verificar si el turno actual ya está validado
+    const turnoYaValidado = turnosValidadosPorSemestre[semestreActual]?.includes(turnoActual);
+
+    if (turnoYaValidado) {
+        console.log(`🔒 Turno ${turnoActual} del semestre ${semestreActual} ya está validado - aplicando bloqueo PERMANENTE`);
+
+        // Bloquear todos los inputs del turno
+        const inputs = document.querySelectorAll('input.input-matricula-nueva');
+        inputs.forEach(input => {
+            input.disabled = true;
+            input.classList.add('input-disabled');
+        });
+
+        // Bloquear también el input de Total Grupos
+        const totalGruposInput = document.getElementById('input-total-grupos');
+        if (totalGruposInput) {
+            totalGruposInput.disabled = true;
+            totalGruposInput.classList.add('input-disabled');
+        }
+
+        // Bloquear botón de validar
+        const btnValidar = document.getElementById('btn-validar-matricula');
+        if (btnValidar) {
+            btnValidar.disabled = true;
+            btnValidar.classList.add('input-disabled');
+            btnValidar.textContent = '✅ Turno Validado';
+        }
+
+        // Bloquear botón de guardar avance
+        const btnGuardar = document.getElementById('btn-guardar-matricula');
+        if (btnGuardar) {
+            btnGuardar.disabled = true;
+            btnGuardar.classList.add('input-disabled');
+        }
+
+        // Verificar si todos los turnos del semestre están validados
+        if (todosTurnosValidados(semestreActual)) {
+            console.log('🎉 Todos los turnos del semestre están validados');
+            // El botón de SP final ya no es necesario - se eliminó
+        }
+    }
+}
+
+// Reinicializar botón de validar
+function reinicializarBotonValidar() {
+    const btnValidar = document.getElementById('btn-validar-matricula');
+    if (btnValidar) {
+        btnValidar.disabled = false;
+        btnValidar.classList.remove('input-disabled');
+        btnValidar.textContent = 'Validar Captura';
+    }
+}
+
+// Guardar turnos validados en localStorage
+function guardarTurnosValidadosEnLocalStorage() {
+    try {
+        const key = `turnos_validados_${document.getElementById('periodo').value}_${document.getElementById('programa').value}_${document.getElementById('modalidad').value}`;
+        localStorage.setItem(key, JSON.stringify(turnosValidadosPorSemestre));
+    } catch (e) {
+        console.warn('No se pudo guardar turnos validados en localStorage', e);
+    }
+}
+
+// Marcar turno como validado (sin ejecutar SP)
+function marcarTurnoComoValidado(semestre, turno) {
+    if (!turnosValidadosPorSemestre[semestre]) {
+        turnosValidadosPorSemestre[semestre] = [];
+    }
+    if (!turnosValidadosPorSemestre[semestre].includes(turno)) {
+        turnosValidadosPorSemestre[semestre].push(turno);
+        guardarTurnosValidadosEnLocalStorage();
+    }
+}
+
+// Verificar si todos los turnos de un semestre están validados
+function todosTurnosValidados(semestre) {
+    const turnosDelSemestre = turnosValidadosPorSemestre[semestre] || [];
+    const turnosDisponiblesIds = (turnosDisponibles || []).map(t => parseInt(t.Id_Turno));
+    return turnosDisponiblesIds.every(turnoId => turnosDelSemestre.includes(turnoId));
+}
+
+// Función para ejecutar el SP final cuando todos los turnos están listos
+async function ejecutarSPFinalSemestre(semestreActual, periodo, programa, modalidad, semestre) {
+    console.log('🚀 === EJECUTANDO SP FINAL DEL SEMESTRE ===');
+
+    try {
+        // Obtener Total Grupos del semestre (puede ser de cualquier turno ya que es por semestre)
+        const claveSemestreTurno = Object.keys(totalGruposPorSemestreYTurno)
+            .find(key => key.startsWith(`${semestreActual}_`));
+        const totalGrupos = claveSemestreTurno ? totalGruposPorSemestreYTurno[claveSemestreTurno] : 0;
+
+        console.log(`📊 Ejecutando SP final con Total Grupos: ${totalGrupos}`);
+
+        // Ejecutar el SP de validación final (el que actualiza el semáforo)
+        // NOTA: NO se envía 'turno' porque el SP procesa TODO el semestre
+        const resultado = await ejecutarJob('/matricula/jobs/validar_captura_semestre', {
+            periodo: periodo,
+            programa: programa,
+            modalidad: modalidad,
+            semestre: semestre,
+            total_grupos: totalGrupos
+        });
+        console.log('📥 Respuesta del SP final:', resultado);
+
+        if (resultado.error) {
+            console.error('❌ Error en el SP final:', resultado.error);
+            alert(`❌ Error al ejecutar el SP final:\n\n${resultado.error}`);
+            return;
+        }
+
+        if (resultado.success) {
+            console.log('✅ SP final ejecutado exitosamente!');
+            refrescarVersionMatricula();
+
+            // Actualizar estado del semáforo
+            const estadoVerificado = (typeof resultado.estado_semaforo === 'number') ? resultado.estado_semaforo : null;
+
+            if (estadoVerificado === 3) {
+                // Marcar semestre como completado
+                marcarSemestreComoValidado(semestreActual);
+                console.log(`🚦 Semestre ${semestreActual} marcado como COMPLETADO (estado: ${estadoVerificado})`);
+
+                // Bloquear toda la vista del semestre
+                deshabilitarTodaLaVista();
+
+                // Deshabilitar botones de acción
+                const btnGuardar = document.getElementById('btn-guardar-matricula');
+                const btnLimpiar = document.getElementById('btn-limpiar-formulario');
+                const btnValidar = document.getElementById('btn-validar-matricula');
+
+                [btnGuardar, btnLimpiar, btnValidar].forEach(b => {
+                    if (b) {
+                        b.disabled = true;
+                        b.classList.add('input-disabled');
+                    }
+                });
+
+                console.log('🔒 Vista bloqueada - semestre completado');
+            }
+
+            // Actualizar colores de pestañas
+            actualizarColoresPestanas();
+
+            // Procesar datos actualizados del SP si están disponibles
+            if (resultado.rows && resultado.rows.length > 0) {
+                console.log('🔄 Procesando datos actualizados del SP final...');
+                procesarEstadosSemaforoDelSP(resultado.rows);
+                procesarYGuardarDatosPorSemestre(resultado.rows);
+                actualizarColoresPestanas();
+            }
+
+            // Mensaje de éxito
+            const semestreNombre = semestresMap[semestreActual] || `Semestre ${semestreActual}`;
+            let mensajeEstado = '';
+
+            if (estadoVerificado === 3) {
+                mensajeEstado = '🟢 El semestre ha sido marcado como COMPLETADO';
+            } else if (estadoVerificado === 2) {
+                mensajeEstado = '🟡 El semestre tiene datos parciales';
+            } else if (estadoVerificado === 1) {
+                mensajeEstado = '🔴 El semestre sigue sin datos';
+            } else {
+                mensajeEstado = 'No se pudo confirmar el estado del semáforo';
+            }
+
+            alert(`🎉 ¡SP FINAL EJECUTADO EXITOSAMENTE!\n\n` +
+                `✅ ${semestreNombre} consolidado completamente\n` +
+                `${mensajeEstado}\n\n` +
+                `📊 Todos los turnos han sido procesados\n` +
+                `🔒 El semestre está ahora bloqueado para edición\n\n` +
+                `¡Proceso completado!`);
+
+            console.log('✅ SP final completado exitosamente');
+
+            // AUTO-AVANCE: Pasar al siguiente semestre automáticamente
+            console.log('🔄 Auto-avance: Verificando si hay más semestres disponibles...');
+            const semestreActualIdx = semestresDisponiblesSP.indexOf(semestreActual);
+            console.log(`📍 Índice del semestre actual: ${semestreActualIdx}, Total semestres: ${semestresDisponiblesSP.length}`);
+
+            if (semestreActualIdx !== -1 && semestreActualIdx < semestresDisponiblesSP.length - 1) {
+                const siguienteSemestre = semestresDisponiblesSP[semestreActualIdx + 1];
+                const siguienteSemestreNombre = semestresMap[siguienteSemestre] || `Semestre ${siguienteSemestre}`;
+                console.log(`✨ Avanzando al ${siguienteSemestreNombre}...`);
+
+                setTimeout(() => {
+                    seleccionarSemestre(siguienteSemestre);
+                    console.log(`✅ Auto-avance completado al ${siguienteSemestreNombre}`);
+
+                    // Reiniciar al primer turno del nuevo semestre
+                    setTimeout(() => {
+                        if (turnosDisponibles && turnosDisponibles.length > 0) {
+                            turnoActualIndex = 0;
+                            cambiarTurno(0); // Seleccionar primer turno
+                            console.log('🔄 Reiniciado al primer turno del nuevo semestre');
+                        }
+                    }, 500);
+                }, 1000); // Delay más largo para que el usuario vea el mensaje de éxito del semestre
+            } else if (semestreActualIdx === semestresDisponiblesSP.length - 1) {
+                console.log('🏁 Ya completaste el último semestre disponible');
+                setTimeout(() => {
+                    alert('🏁 ¡FELICIDADES! Has completado TODOS los semestres disponibles.\n\n✅ Proceso de captura finalizado completamente.');
+                }, 2500);
+            } else {
+                console.log('⚠️ No se pudo determinar el siguiente semestre');
+            }
+
+        } else {
+            console.warn('⚠️ Respuesta inesperada del SP final');
+            alert('⚠️ No se pudo confirmar la ejecución del SP final.');
+        }
+
+    } catch (error) {
+        console.error('❌ Error al ejecutar SP final:', error);
+        alert(`❌ Error al ejecutar el SP final:\n\n${error.message}`);
+    }
+}
+
+// Función para validar y finalizar la captura del semestre actual - NUEVO SISTEMA DE DOS FASES
+async function validarCapturaSemestre() {
+    console.log('🔍 === VALIDANDO TURNO INDIVIDUAL (NUEVA LÓGICA) ===');
+
+    // Cargar turnos validados desde localStorage
+    cargarTurnosValidadosDeLocalStorage();
+
+    // Obtener el semestre y turno actual
+    const semestreActual = parseInt(document.getElementById('semestre').value);
+    const turnoActual = parseInt(document.getElementById('turno').value);
+    const semestreNombre = semestresMap[semestreActual] || `Semestre ${semestreActual}`;
+    const turnoNombre = turnosDisponibles.find(t => parseInt(t.Id_Turno) === turnoActual)?.Turno || `Turno ${turnoActual}`;
+
+    console.log(`🎯 Procesando: ${semestreNombre} - ${turnoNombre}`);
+
+    // Obtener todos los inputs del turno actual
+    const inputs = document.querySelectorAll('input.input-matricula-nueva');
+
+    // FASE 1: VALIDACIÓN DEL TURNO (con SP de Unidad Académica)
+    console.log('📋 === FASE 1: VALIDACIÓN DEL TURNO INDIVIDUAL ===');
+
+    // Aplicar reglas de habilitación/deshabilitación
+    updateInputsBySemestre(semestreActual);
+
+    // Rellenar campos vacíos con '0'
+    let camposRellenados = 0;
+    let camposDeshabilitados = 0;
+    let camposYaConValor = 0;
+
+    inputs.forEach((input, index) => {
+        const inputId = input.id || `input-${index}`;
+        const disabled = input.disabled;
+        const currentValue = input.value;
+        const isEmpty = !currentValue || currentValue.trim() === '';
+
+        if (disabled) {
+            camposDeshabilitados++;
+            return;
+        }
+
+        if (isEmpty) {
+            input.value = '0';
+            input.setAttribute('data-auto-filled', 'true');
+            camposRellenados++;
+            console.log(`    ✅ Rellenado con '0': ${inputId}`);
+            input.dispatchEvent(new Event('input', { bubbles: true }));
+        } else {
+            camposYaConValor++;
+        }
+    });
+
+    console.log(`📋 Resumen preparación: ${camposRellenados} campos rellenados, ${camposYaConValor} ya tenían valor`);
+
+    if (camposRellenados > 0) {
+        calcularTotales();
+    }
+
+    // Contar datos totales del turno
+    let totalDatos = 0;
+    let camposConDatos = 0;
+
+    inputs.forEach(input => {
+        if (input.disabled) return;
+        const valor = parseInt(input.value) || 0;
+        totalDatos += valor;
+        if (valor > 0) camposConDatos++;
+    });
+
+    // Confirmación para validar el turno
+    const mensajePreparacion = `¿Desea validar el turno ${turnoNombre} del ${semestreNombre}?\n\n` +
+        `📊 Campos con datos: ${camposConDatos}\n` +
+        `📈 Total de estudiantes: ${totalDatos}\n` +
+        (camposRellenados > 0 ? `✏️ Se rellenaron ${camposRellenados} campos vacíos con '0'\n` : '') +
+        `\n⚠️ Esta acción:\n` +
+        `• Guardará los datos de este turno\n` +
+        `• Ejecutará SP_Actualiza_Matricula_Por_Unidad_Academica\n` +
+        `• Bloqueará PERMANENTEMENTE los inputs de este turno\n` +
+        `• El turno no se podrá editar después de validar\n` +
+        `• El SP final (por semestre) se ejecutará cuando todos los turnos estén validados\n\n` +
+        `¿Continuar?`;
+
+    if (!confirm(mensajePreparacion)) {
+        console.log('❌ Usuario canceló la validación del turno');
+        return;
+    }
+
+    // Obtener parámetros
+    const periodo = document.getElementById('periodo').value;
+    const programa = document.getElementById('programa').value;
+    const modalidad = document.getElementById('modalidad').value;
+    const semestre = document.getElementById('semestre').value;
+    const turno = document.getElementById('turno').value;
+    const totalGruposInput = document.getElementById('input-total-grupos');
+    const totalGrupos = totalGruposInput ? parseInt(totalGruposInput.value) || 0 : 0;
+
+    if (!periodo || !programa || !modalidad || !semestre || !turno) {
+        alert('⚠️ Por favor, complete todos los filtros antes de validar.');
+        return;
+    }
+
+    // Mostrar indicador de carga
+    const btnValidar = event.target;
+    const textoOriginal = btnValidar.textContent;
+    btnValidar.textContent = '⏳ Validando turno...';
+    btnValidar.disabled = true;
+
+    try {
+        // Guardar datos del turno en la base de datos
+        console.log('💾 Guardando datos del turno en la base de datos...');
+
+        // Persistir Total Grupos en estructura por semestre-turno
+        const claveSemestreTurno = `${semestreActual}_${turnoActual}`;
+        totalGruposPorSemestreYTurno[claveSemestreTurno] = totalGrupos;
+        guardarTotalGruposEnLocalStorage();
+
+        // Preparar datos para guardar
+        const data = {
+            periodo: periodo,
+            programa: programa,
+            semestre: semestre,
+            modalidad: modalidad,
+            turno: turno,
+            total_grupos: totalGrupos,
+            datos_matricula: {}
+        };
+
+        // Recopilar datos de inputs habilitados
+        inputs.forEach(input => {
+            if (!input.disabled) {
+                const tipoIngreso = input.getAttribute('data-tipo-ingreso');
+                const grupoEdad = input.getAttribute('data-grupo-edad');
+                const sexo = input.getAttribute('data-sexo');
+                const inputValue = input.value ? input.value.trim() : '';
+
+                const isAutoFilled = input.hasAttribute('data-auto-filled');
+                const hasUserValue = inputValue !== '';
+
+                if (hasUserValue || isAutoFilled) {
+                    const valor = parseInt(inputValue) || 0;
+
+                    if (valor >= 0) {
+                        const key = `${tipoIngreso}_${grupoEdad}_${sexo}`;
+                        data.datos_matricula[key] = {
+                            tipo_ingreso: tipoIngreso,
+                            grupo_edad: grupoEdad,
+                            sexo: sexo,
+                            matricula: valor,
+                            salones: totalGrupos
+                        };
+                    }
+                }
+            }
+        });
+
+        // Guardar, consolidar y marcar el turno en una sola petición/transacción
+        data.validar_turno = true;
+        const prepararResponse = await fetch('/matricula/guardar_y_consolidar', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+
+        const prepararResult = await prepararResponse.json();
+        const errorTurno = prepararResult.error || prepararResult.detail || prepararResult.warning;
+
+        if (errorTurno) {
+            console.error('❌ Error al validar turno:', errorTurno);
+            alert(`❌ Error al guardar y validar el turno:\n\n${errorTurno}`);
+            return;
+        }
+
+        if (prepararResult.version !== undefined && prepararResult.version !== null) {
+            versionMatricula = prepararResult.version;
+        }
+        limpiarCeldasModificadas();
+
+        console.log('✅ Turno validado en el backend (SP de Unidad Académica ejecutado)');
+        console.log(`📋 Fase: ${prepararResult.fase}`);
+        console.log(`📋 SP ejecutado: ${prepararResult.sp_ejecutado}`);
+
+        // Marcar turno como validado (preparado)
+        marcarTurnoComoValidado(semestreActual, turnoActual);
+
+        // Bloquear inputs del turno actual PERMANENTEMENTE
+        inputs.forEach(input => {
+            input.disabled = true;
+            input.classList.add('input-disabled');
+        });
+
+        // Bloquear también el input de Total Grupos
+        if (totalGruposInput) {
+            totalGruposInput.disabled = true;
+            totalGruposInput.classList.add('input-disabled');
+        }
+
+        // Bloquear botón de validar para este turno PERMANENTEMENTE
+        btnValidar.disabled = true;
+        btnValidar.classList.add('input-disabled');
+        btnValidar.textContent = '✅ Turno Validado';
+
+        // Bloquear también el botón de Guardar Avance
+        const btnGuardar = document.getElementById('btn-guardar-matricula');
+        if (btnGuardar) {
+            btnGuardar.disabled = true;
+            btnGuardar.classList.add('input-disabled');
+        }
+
+        console.log(`✅ Turno ${turnoNombre} validado y bloqueado PERMANENTEMENTE`);
+
+        // FASE 2: VERIFICAR SI TODOS LOS TURNOS ESTÁN LISTOS
+        console.log('🔍 === FASE 2: VERIFICACIÓN DE COMPLETITUD ===');
+
+        if (todosTurnosValidados(semestreActual)) {
+            console.log('🎉 ¡Todos los turnos del semestre están validados!');
+
+            // Mostrar confirmación para ejecutar SP final
+            const mensajeFinal = `🎉 ¡TODOS LOS TURNOS DEL ${semestreNombre.toUpperCase()} ESTÁN COMPLETOS!\n\n` +
+                `Los siguientes turnos han sido validados:\n` +
+                turnosValidadosPorSemestre[semestreActual].map(tId => {
+                    const t = turnosDisponibles.find(turno => parseInt(turno.Id_Turno) === tId);
+                    return `• ${t?.Turno || `Turno ${tId}`}`;
+                }).join('\n') +
+                `\n\n¿Desea ejecutar el procedimiento almacenado final para consolidar todo el semestre?\n\n` +
+                `⚠️ Esta acción:\n` +
+                `• Ejecutará el SP de matrícula por semestre\n` +
+                `• Actualizará el semáforo del semestre\n` +
+                `• Marcará el semestre como COMPLETADO\n` +
+                `• Esta acción NO se puede deshacer\n\n` +
+                `¿Continuar con la consolidación final?`;
+
+            if (confirm(mensajeFinal)) {
+                await ejecutarSPFinalSemestre(semestreActual, periodo, programa, modalidad, semestre);
+            } else {
+                console.log('❌ Usuario canceló la ejecución del SP final');
+                alert(`✅ Turno ${turnoNombre} validado exitosamente.\n\n` +
+                    `🔧 SP ejecutado: SP_Actualiza_Matricula_Por_Unidad_Academica\n` +
+                    `🔒 El turno está bloqueado permanentemente\n\n` +
+                    `⚠️ Todos los turnos están listos, pero NO se ejecutó el SP final.\n` +
+                    `El semestre NO está completado aún.\n\n` +
+                    `Para consolidar el semestre, deberá validar cualquier turno nuevamente\n` +
+                    `y aceptar la ejecución del SP final cuando se le pregunte.`);
+            }
+        } else {
+            console.log('⏳ Aún faltan turnos por validar en este semestre');
+            const turnosFaltantes = (turnosDisponibles || [])
+                .filter(t => {
+                    const tId = parseInt(t.Id_Turno);
+                    return !turnosValidadosPorSemestre[semestreActual]?.includes(tId);
+                })
+                .map(t => t.Turno)
+                .join(', ');
+
+            alert(`✅ Turno ${turnoNombre} validado exitosamente.\n\n` +
+                `� SP ejecutado: SP_Actualiza_Matricula_Por_Unidad_Academica\n` +
+                `🔒 El turno está bloqueado permanentemente\n\n` +
+                `�📋 Turnos pendientes: ${turnosFaltantes}\n\n` +
+                `⚠️ Cuando valides todos los turnos, se ejecutará automáticamente\n` +
+                `el SP_Actualiza_Matricula_Por_Semestre_AU para consolidar el semestre.`);
+
+            // AUTO-AVANCE: Pasar al siguiente turno automáticamente
+            console.log('🔄 Auto-avance: Verificando si hay más turnos disponibles...');
+            if (turnoActualIndex < turnosDisponibles.length - 1) {
+                console.log(`✨ Avanzando al siguiente turno (índice actual: ${turnoActualIndex})`);
+                setTimeout(() => {
+                    cambiarTurno(1); // Avanzar al siguiente turno
+                    console.log('✅ Auto-avance completado al siguiente turno');
+                }, 1000); // Delay para que el usuario vea el mensaje de éxito
+            } else {
+                console.log('⏹️ Ya estás en el último turno disponible, no se puede avanzar');
+            }
+        }
+
+    } catch (error) {
+        console.error('❌ Error en la preparación del turno:', error);
+        alert(`❌ Error al preparar el turno:\n\n${error.message}`);
+    } finally {
+        // Si el turno no está completamente validado, restaurar botón
+        if (!turnosValidadosPorSemestre[semestreActual]?.includes(turnoActual)) {
+            btnValidar.textContent = textoOriginal;
+            btnValidar.disabled = false;
+        } else {
+            btnValidar.textContent = '✅ Turno Validado';
+        }
+    }
+}
+
+// Agregar validación solo números en inputs
+document.addEventListener('DOMContentLoaded', function() {
+    document.addEventListener('input', function(e) {
+        if (e.target.classList.contains('input-matricula-nueva')) {
+            // Solo permitir números
+            e.target.value = e.target.value.replace(/[^0-9]/g, '');
+            marcarCeldaModificada(e.target);
+        }
+    });
+});
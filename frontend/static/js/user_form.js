@@ -69,65 +69,73 @@ document.addEventListener('DOMContentLoaded', function() {
         document.getElementById('usuario').value = usuario;
     };
 
-    // Al hacer clic en una fila de usuario, cargar datos en el formulario
-    document.querySelectorAll('.fila-usuario').forEach(fila => {
-        fila.addEventListener('click', async function() {
-            editando = true;
-            idUsuarioEdit = this.dataset.id;
-            if (window.setIdUsuarioEdit) {
-                window.setIdUsuarioEdit(idUsuarioEdit);
-            }
-            document.getElementById('id_usuario').value = this.dataset.id;
-            document.getElementById('nombre').value = this.dataset.nombre;
-            document.getElementById('ap_pat').value = this.dataset.paterno;
-            document.getElementById('ap_mat').value = this.dataset.materno;
-            document.getElementById('usuario').value = this.dataset.usuario;
-            document.getElementById('email').value = this.dataset.email;
-            document.getElementById('id_unidad_academica').value = this.getAttribute('data-id_unidad');
-            document.getElementById('id_rol').value = this.dataset.id_rol;
-            // --- Niveles válidos para la UA del usuario ---
-            const idUA = this.getAttribute('data-id_unidad');
-            const idNivelUsuario = this.dataset.id_nivel;
-            if (idUA) {
-                try {
-                    const response = await fetch(`/registro/niveles-por-ua/${idUA}`);
-                    if (!response.ok) throw new Error('No se pudo obtener niveles');
-                    const niveles = await response.json();
-                    const selectNivel = document.getElementById('id_nivel');
-                    selectNivel.innerHTML = '';
-                    niveles.forEach(nivel => {
-                        const opt = document.createElement('option');
-                        opt.value = nivel.Id_Nivel;
-                        opt.textContent = nivel.Nivel;
-                        selectNivel.appendChild(opt);
-                    });
-                    // Seleccionar el nivel actual del usuario
-                    if (idNivelUsuario) {
-                        selectNivel.value = idNivelUsuario;
-                    }
-                } catch (err) {
-                    // Si falla, dejar el select como está
+    // Al hacer clic en una fila de usuario, cargar datos en el formulario.
+    // Se delega en la tabla porque las filas se cargan por páginas desde el servidor.
+    const tablaUsuarios = document.getElementById('tabla-usuarios');
+    if (tablaUsuarios) {
+        tablaUsuarios.addEventListener('click', async function(e) {
+            const fila = e.target.closest('.fila-usuario');
+            if (!fila) return;
+            await cargarUsuarioEnFormulario.call(fila);
+        });
+    }
+
+    async function cargarUsuarioEnFormulario() {
+        editando = true;
+        idUsuarioEdit = this.dataset.id;
+        if (window.setIdUsuarioEdit) {
+            window.setIdUsuarioEdit(idUsuarioEdit);
+        }
+        document.getElementById('id_usuario').value = this.dataset.id;
+        document.getElementById('nombre').value = this.dataset.nombre;
+        document.getElementById('ap_pat').value = this.dataset.paterno;
+        document.getElementById('ap_mat').value = this.dataset.materno;
+        document.getElementById('usuario').value = this.dataset.usuario;
+        document.getElementById('email').value = this.dataset.email;
+        document.getElementById('id_unidad_academica').value = this.getAttribute('data-id_unidad');
+        document.getElementById('id_rol').value = this.dataset.id_rol;
+        // --- Niveles válidos para la UA del usuario ---
+        const idUA = this.getAttribute('data-id_unidad');
+        const idNivelUsuario = this.dataset.id_nivel;
+        if (idUA) {
+            try {
+                const response = await fetch(`/registro/niveles-por-ua/${idUA}`);
+                if (!response.ok) throw new Error('No se pudo obtener niveles');
+                const niveles = await response.json();
+                const selectNivel = document.getElementById('id_nivel');
+                selectNivel.innerHTML = '';
+                niveles.forEach(nivel => {
+                    const opt = document.createElement('option');
+                    opt.value = nivel.Id_Nivel;
+                    opt.textContent = nivel.Nivel;
+                    selectNivel.appendChild(opt);
+                });
+                // Seleccionar el nivel actual del usuario
+                if (idNivelUsuario) {
+                    selectNivel.value = idNivelUsuario;
                 }
-            } else if (this.dataset.id_nivel) {
-                document.getElementById('id_nivel').value = this.dataset.id_nivel;
-            }
-            document.getElementById('titulo-usuario').textContent = 'Editar Usuario';
-            document.getElementById('btn-guardar').textContent = 'Actualizar';
-            document.getElementById('btn-cancelar').style.display = 'inline-block';
-            document.getElementById('btn-eliminar').style.display = 'inline-block';
-            document.getElementById('btn-limpiar').style.display = 'none';
-            document.getElementById('password').removeAttribute('required');
-            // --- Scroll automático al encabezado 'Bienvenido' y enfoque en el campo nombre ---
-            const headerBienvenido = document.querySelector('.bienvenido');
-            if (headerBienvenido) {
-                headerBienvenido.scrollIntoView({ behavior: 'smooth', block: 'start' });
-                setTimeout(() => {
-                    const inputNombre = document.getElementById('nombre');
-                    if (inputNombre) inputNombre.focus();
-                }, 300);
+            } catch (err) {
+                // Si falla, dejar el select como está
             }
-        });
-    });
+        } else if (this.dataset.id_nivel) {
+            document.getElementById('id_nivel').value = this.dataset.id_nivel;
+        }
+        document.getElementById('titulo-usuario').textContent = 'Editar Usuario';
+        document.getElementById('btn-guardar').textContent = 'Actualizar';
+        document.getElementById('btn-cancelar').style.display = 'inline-block';
+        document.getElementById('btn-eliminar').style.display = 'inline-block';
+        document.getElementById('btn-limpiar').style.display = 'none';
+        document.getElementById('password').removeAttribute('required');
+        // --- Scroll automático al encabezado 'Bienvenido' y enfoque en el campo nombre ---
+        const headerBienvenido = document.querySelector('.bienvenido');
+        if (headerBienvenido) {
+            headerBienvenido.scrollIntoView({ behavior: 'smooth', block: 'start' });
+            setTimeout(() => {
+                const inputNombre = document.getElementById('nombre');
+                if (inputNombre) inputNombre.focus();
+            }, 300);
+        }
+    }
     // --- Lógica para limpiar filtros ---
     const btnLimpiarFiltros = document.getElementById('btn-limpiar-filtros');
     if (btnLimpiarFiltros) {